@@ -0,0 +1,219 @@
+"""
+Weekly request counts per dataset, kept up to date incrementally.
+
+Every job is a request for its dataset. Each dataset's counts are a ring of
+weekly buckets (a compact array of integers) that is advanced as weeks pass.
+New jobs are found by listing the names of the RDS job store's files and
+reading only those not seen before; jobs that disappear are subtracted again.
+What's known about each job (its dataset, week and requester) is saved next
+to the workspace, so the job list is never read in full again, not even
+after a restart.
+
+Weeks start on Monday, in UTC.
+"""
+
+import json
+import os
+import threading
+import time
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+import yaml
+from loguru import logger
+from syft_core import Client
+
+ACTIVITY_FILE = "rds-dashboard-activity.json"
+# Weeks of counts kept per dataset
+RETAINED_WEEKS = 52
+DEFAULT_WEEKS = 12
+
+_EPOCH = date(1970, 1, 1)
+# libyaml's loader if available, it's much faster
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_indexes: dict[Path, "ActivityIndex"] = {}
+_indexes_lock = threading.Lock()
+
+
+def week_of(day: date) -> int:
+    """Number of the week `day` is in, counted from the epoch's week."""
+    # 1970-01-01 was a Thursday
+    return ((day - _EPOCH).days + 3) // 7
+
+
+def week_start(week: int) -> date:
+    return _EPOCH + timedelta(days=week * 7 - 3)
+
+
+@dataclass
+class _Series:
+    """A dataset's weekly counts, up to and including week `week`."""
+
+    counts: array = field(default_factory=lambda: array("I", [0] * RETAINED_WEEKS))
+    week: int = 0
+    requests: int = 0
+    requesters: Counter = field(default_factory=Counter)
+
+    def advance(self, week: int) -> None:
+        """Move on to `week`, clearing the buckets of the weeks in between."""
+        if week <= self.week:
+            return
+        for w in range(max(self.week + 1, week - RETAINED_WEEKS + 1), week + 1):
+            self.counts[w % RETAINED_WEEKS] = 0
+        self.week = week
+
+    def add(self, week: int, requester: str, n: int = 1) -> None:
+        self.advance(week)
+        if week > self.week - RETAINED_WEEKS:
+            slot = week % RETAINED_WEEKS
+            self.counts[slot] = max(self.counts[slot] + n, 0)
+        self.requests += n
+        self.requesters[requester] += n
+        if self.requesters[requester] <= 0:
+            del self.requesters[requester]
+
+    def last(self, current: int, weeks: int) -> list[int]:
+        """Counts of the `weeks` weeks up to `current`, oldest first."""
+        self.advance(current)
+        return [
+            self.counts[w % RETAINED_WEEKS]
+            for w in range(current - weeks + 1, current + 1)
+        ]
+
+
+class ActivityIndex:
+    """Request counts of the datasets of one RDS job store."""
+
+    def __init__(self, jobs_dir: Path, state_path: Path):
+        self.jobs_dir = jobs_dir
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        # Job UID -> (dataset name, week, requester)
+        self._jobs: dict[str, tuple[str, int, str]] = {}
+        self._series: dict[str, _Series] = {}
+        self._dir_mtime_ns = None
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            state = json.loads(self.state_path.read_text())
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable activity state: {e}")
+            return
+        for uid, (dataset, week, requester) in state["jobs"].items():
+            self._add(uid, dataset, week, requester)
+
+    def _save(self) -> None:
+        tmp = self.state_path.with_name(f".{self.state_path.name}.tmp")
+        tmp.write_text(json.dumps({"jobs": self._jobs}))
+        os.replace(tmp, self.state_path)
+
+    def _add(self, uid: str, dataset: str, week: int, requester: str) -> None:
+        self._jobs[uid] = (dataset, week, requester)
+        self._series.setdefault(dataset, _Series()).add(week, requester)
+
+    def _remove(self, uid: str) -> None:
+        dataset, week, requester = self._jobs.pop(uid)
+        series = self._series[dataset]
+        series.add(week, requester, n=-1)
+        if series.requests <= 0:
+            del self._series[dataset]
+
+    def _read_job(self, uid: str) -> Optional[tuple[str, int, str]]:
+        try:
+            record = yaml.load(
+                (self.jobs_dir / f"{uid}.yaml").read_text(), Loader=_Loader
+            )
+            created_at = record["created_at"]
+            if isinstance(created_at, str):
+                created_at = datetime.fromisoformat(created_at)
+            if created_at.tzinfo is not None:
+                created_at = created_at.astimezone(timezone.utc)
+            return (
+                record.get("dataset_name") or "",
+                week_of(created_at.date()),
+                record.get("created_by") or "",
+            )
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Skipping unreadable job {uid}: {e}")
+            return None
+
+    def refresh(self) -> None:
+        """Take in the jobs added to or removed from the store since last time."""
+        try:
+            mtime_ns = self.jobs_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime_ns = None
+        # Creating or deleting a job file changes its directory's mtime
+        if mtime_ns is not None and mtime_ns == self._dir_mtime_ns:
+            return
+
+        present = set()
+        if mtime_ns is not None:
+            present = {
+                entry.name[: -len(".yaml")]
+                for entry in os.scandir(self.jobs_dir)
+                if entry.name.endswith(".yaml")
+            }
+        removed = self._jobs.keys() - present
+        added = present - self._jobs.keys()
+        for uid in removed:
+            self._remove(uid)
+        for uid in added:
+            job = self._read_job(uid)
+            if job is not None:
+                self._add(uid, *job)
+
+        self._dir_mtime_ns = mtime_ns
+        if added or removed:
+            self._save()
+            logger.debug(f"Activity: {len(added)} new jobs, {len(removed)} removed")
+
+    def snapshot(self, weeks: int = DEFAULT_WEEKS) -> dict:
+        """Each dataset's requests per week for the last `weeks` weeks."""
+        current = week_of(datetime.now(timezone.utc).date())
+        with self._lock:
+            self.refresh()
+            datasets = {
+                name: {
+                    "weekly": series.last(current, weeks),
+                    "requests": series.requests,
+                    "users": len(series.requesters),
+                }
+                for name, series in self._series.items()
+                if name
+            }
+        return {
+            "week_start": week_start(current - weeks + 1).isoformat(),
+            "weeks": weeks,
+            "datasets": datasets,
+        }
+
+
+def activity_index(rds_client, syftbox_client: Client) -> ActivityIndex:
+    """The activity index of the client's job store, created on first use."""
+    jobs_dir = Path(rds_client.job.local_store.job.store.item_type_dir)
+    with _indexes_lock:
+        if jobs_dir not in _indexes:
+            state_path = (
+                syftbox_client.config.data_dir.parent / ".syftbox" / ACTIVITY_FILE
+            )
+            state_path.parent.mkdir(parents=True, exist_ok=True)
+            start = time.perf_counter()
+            _indexes[jobs_dir] = index = ActivityIndex(jobs_dir, state_path)
+            with index._lock:
+                index.refresh()
+            logger.debug(
+                f"Activity index of {jobs_dir} ready in "
+                f"{time.perf_counter() - start:.2f}s ({len(index._jobs)} jobs)"
+            )
+        return _indexes[jobs_dir]
@@ -0,0 +1,208 @@
+"""
+Admission control of expensive requests.
+
+Previews, Shopify imports and uploads read, hold or write a lot of data, so a
+few of them at once can saturate the disk and memory and slow down everything
+else, including cheap requests like listing jobs. Each of these endpoint
+classes has a budget of requests that may run at once, and all of them share
+a budget of bytes of memory, claimed up front by the requests that know how
+much they may hold (e.g. a preview's size limit).
+
+A request over budget waits in line (first come, first served) for up to
+`admission_timeout` seconds, then gets a 429 with a Retry-After header.
+Requests of other classes, and the ones that claim nothing, never wait.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+from fastapi import HTTPException
+
+from .config import get_settings
+from .metrics import ADMISSION_WAIT, ADMISSIONS
+
+# Endpoint classes
+PREVIEWS = "previews"
+IMPORTS = "imports"
+UPLOADS = "uploads"
+# Shared by all classes
+MEMORY = "memory"
+
+_CAPACITY_SETTINGS = {
+    PREVIEWS: "admission_previews",
+    IMPORTS: "admission_imports",
+    UPLOADS: "admission_uploads",
+    MEMORY: "admission_memory_bytes",
+}
+
+
+@dataclass
+class _Waiter:
+    weight: int
+    future: asyncio.Future
+    granted: bool = False
+
+
+class Budget:
+    """
+    A capacity that claims are taken from, e.g. a number of requests or bytes
+    of memory. Claims are granted in the order they're made. Taking is done
+    on the event loop, giving back is safe from any thread.
+    """
+
+    def __init__(self, name: str, capacity: int):
+        self.name = name
+        self.capacity = max(capacity, 1)
+        self._available = self.capacity
+        self._waiters: deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+
+    async def acquire(self, weight: int, timeout: float) -> bool:
+        """
+        Take `weight` from the budget, waiting up to `timeout` seconds for
+        it. Returns whether it was taken. A claim larger than the whole
+        budget waits for all of it.
+        """
+        weight = min(weight, self.capacity)
+        with self._lock:
+            if not self._waiters and self._available >= weight:
+                self._available -= weight
+                ADMISSIONS.inc(budget=self.name, result="immediate")
+                return True
+            waiter = _Waiter(weight, asyncio.get_running_loop().create_future())
+            self._waiters.append(waiter)
+
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter.future, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with self._lock:
+                if waiter.granted:
+                    # Granted just as the wait ended
+                    if isinstance(e, asyncio.TimeoutError):
+                        ADMISSION_WAIT.observe(
+                            time.perf_counter() - start, budget=self.name
+                        )
+                        ADMISSIONS.inc(budget=self.name, result="queued")
+                        return True
+                    self._available += weight
+                else:
+                    self._waiters.remove(waiter)
+                # Whoever waited behind this claim may fit now
+                self._grant()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            ADMISSIONS.inc(budget=self.name, result="rejected")
+            return False
+        ADMISSION_WAIT.observe(time.perf_counter() - start, budget=self.name)
+        ADMISSIONS.inc(budget=self.name, result="queued")
+        return True
+
+    def release(self, weight: int) -> None:
+        """Give back `weight` taken with `acquire`."""
+        with self._lock:
+            self._available += min(weight, self.capacity)
+            self._grant()
+
+    def _grant(self) -> None:
+        while self._waiters and self._waiters[0].weight <= self._available:
+            waiter = self._waiters.popleft()
+            self._available -= waiter.weight
+            waiter.granted = True
+            waiter.future.get_loop().call_soon_threadsafe(_wake, waiter.future)
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+_budgets: dict[str, Budget] = {}
+_budgets_lock = threading.Lock()
+
+
+def budget(name: str) -> Budget:
+    """The budget called `name`, sized from the settings on first use."""
+    with _budgets_lock:
+        if name not in _budgets:
+            capacity = getattr(get_settings(), _CAPACITY_SETTINGS[name])
+            _budgets[name] = Budget(name, capacity)
+        return _budgets[name]
+
+
+def _overloaded(name: str) -> HTTPException:
+    retry_after = get_settings().admission_retry_after
+    return HTTPException(
+        status_code=429,
+        detail=f"Too many {name} requests at the moment, retry in {retry_after}s",
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+class Reservation:
+    """
+    The claims taken by `reserve`. Calling it gives them back (once, from
+    any thread).
+    """
+
+    def __init__(self):
+        self._taken: list[tuple[Budget, int]] = []
+        self._lock = threading.Lock()
+
+    def _add(self, claim: Budget, weight: int) -> None:
+        with self._lock:
+            self._taken.append((claim, min(weight, claim.capacity)))
+
+    def shrink(self, nbytes: int) -> None:
+        """Give back the memory claimed beyond `nbytes`, once that's all it takes."""
+        with self._lock:
+            for i, (claim, weight) in enumerate(self._taken):
+                if claim.name == MEMORY and weight > nbytes:
+                    self._taken[i] = (claim, max(nbytes, 0))
+                    claim.release(weight - max(nbytes, 0))
+
+    def __call__(self) -> None:
+        with self._lock:
+            taken, self._taken = self._taken, []
+        for claim, weight in reversed(taken):
+            claim.release(weight)
+
+
+async def reserve(endpoint_class: str, nbytes: int = 0) -> Reservation:
+    """
+    Claim a place among the requests of `endpoint_class` running at once and
+    `nbytes` of the memory budget, or raise a 429 if that takes too long.
+    Returns the reservation to give them back with, for work that outlives
+    the request.
+    """
+    settings = get_settings()
+    deadline = time.monotonic() + settings.admission_timeout
+    claims = [(budget(endpoint_class), 1)]
+    if nbytes > 0:
+        claims.append((budget(MEMORY), nbytes))
+
+    reservation = Reservation()
+    try:
+        for claim, weight in claims:
+            if not await claim.acquire(weight, max(deadline - time.monotonic(), 0)):
+                raise _overloaded(endpoint_class)
+            reservation._add(claim, weight)
+    except BaseException:
+        reservation()
+        raise
+    return reservation
+
+
+@asynccontextmanager
+async def admit(endpoint_class: str, nbytes: int = 0) -> AsyncIterator[Reservation]:
+    """Run the body within the admission budgets, see `reserve`."""
+    reservation = await reserve(endpoint_class, nbytes)
+    try:
+        yield reservation
+    finally:
+        reservation()
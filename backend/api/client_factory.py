@@ -1,22 +1,25 @@
 """Factory functions for creating application clients."""
 
 from loguru import logger
-from syft_core import Client as SyftBoxClient
 from syft_rds import init_session, RDSClient
 from syft_rds.client.rds_client import rds_server_running
 
+from ..context import get_syftbox_context
+from ..metrics import InstrumentedRDSClient
+from ..staging import install_handover
+
 
 def create_rds_client() -> RDSClient:
     """
     Create and initialize an RDS client.
 
     Returns:
-        RDSClient: The initialized RDS client
+        RDSClient: The initialized RDS client, instrumented to record call latencies
 
     Raises:
         Exception: If client initialization fails
     """
-    syftbox_client = SyftBoxClient.load()
+    syftbox_client = get_syftbox_context().client
 
     logger.info(
         f"Starting client with email: {syftbox_client.email}. \n"
@@ -27,6 +30,7 @@ def create_rds_client() -> RDSClient:
     rds_client = init_session(
         host=syftbox_client.email,
         email=syftbox_client.email,
+        syftbox_client=syftbox_client,
     )
     logger.debug(
         f"Initialized RDS client for {syftbox_client.email}. Is admin: {rds_client.is_admin}"
@@ -34,5 +38,7 @@ def create_rds_client() -> RDSClient:
     logger.debug(
         f"RDS server is running: {rds_server_running(host=syftbox_client.email)}"
     )
+    # Staged dataset files are moved into the workspace rather than copied
+    install_handover(rds_client, syftbox_client)
 
-    return rds_client
+    return InstrumentedRDSClient(rds_client)
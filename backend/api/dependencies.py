@@ -3,13 +3,16 @@ from loguru import logger
 from syft_core import Client
 from syft_rds import RDSClient
 
+from ..changes import watch_workspace
+from ..context import get_syftbox_context
+from ..logsearch import log_index
 from .client_factory import create_rds_client
 
 
 async def get_syftbox_client() -> Client:
     """Dependency for getting the SyftBox client"""
     try:
-        return Client.load()
+        return get_syftbox_context().client
     except Exception as e:
         logger.error(f"Failed to load SyftBox client: {e}")
         raise HTTPException(
@@ -20,10 +23,23 @@ async def get_syftbox_client() -> Client:
 async def get_rds_client(request: Request) -> RDSClient:
     """Dependency for getting the cached RDS client"""
     if hasattr(request.app.state, "rds_client") and request.app.state.rds_client:
-        return request.app.state.rds_client
+        rds_client = request.app.state.rds_client
+    else:
+        try:
+            # Keep the client around so later requests don't initialize it again
+            rds_client = request.app.state.rds_client = create_rds_client()
+        except Exception as e:
+            logger.error(f"Failed to initialize RDS client: {e}")
+            raise HTTPException(
+                status_code=500, detail="Failed to initialize RDS client"
+            )
 
     try:
-        return create_rds_client()
+        # A no-op once the client's workspace is watched
+        watch_workspace(rds_client)
+        # Logs are indexed in the background as they're written from then on
+        log_index(rds_client)
     except Exception as e:
-        logger.error(f"Failed to initialize RDS client: {e}")
-        raise HTTPException(status_code=500, detail="Failed to initialize RDS client")
+        # Caches check the disk themselves while nothing's watched
+        logger.warning(f"Failed to watch the workspace for changes: {e}")
+    return rds_client
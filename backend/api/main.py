@@ -1,14 +1,21 @@
 from typing import Dict
 from fastapi import APIRouter
-from .routers import account, datasets, jobs, trusted_datasites
+from fastapi.responses import PlainTextResponse
+
+from ..config import get_settings
+from ..metrics import REGISTRY
+from .routers import account, dashboard, datasets, debug, jobs, trusted_datasites
 
 
 v1_router = APIRouter(prefix="/v1")
 
 v1_router.include_router(account.router)
+v1_router.include_router(dashboard.router)
 v1_router.include_router(datasets.router)
 v1_router.include_router(jobs.router)
 v1_router.include_router(trusted_datasites.router)
+if get_settings().profiling_enabled:
+    v1_router.include_router(debug.router)
 
 api_router = APIRouter(prefix="/api")
 api_router.include_router(v1_router)
@@ -25,4 +32,17 @@ async def health_check() -> Dict[str, str]:
     return {"status": "healthy"}
 
 
+@api_router.get(
+    "/metrics",
+    summary="Prometheus metrics",
+    description="Expose request, RDS client, filesystem and cache metrics in the Prometheus text format",
+    response_class=PlainTextResponse,
+    tags=["health"],
+)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 __all__ = ["api_router"]
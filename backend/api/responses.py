@@ -0,0 +1,17 @@
+from typing import Any
+
+import pydantic_core
+from fastapi.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response encoded by pydantic-core.
+
+    Returning it from a route skips FastAPI's `response_model` validation and
+    `jsonable_encoder` pass, so the content must already be in its output
+    shape. UUIDs, datetimes, enums and pydantic models are encoded natively.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return pydantic_core.to_json(content)
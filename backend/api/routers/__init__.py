@@ -1,8 +1,10 @@
-from . import account, datasets, jobs, trusted_datasites
+from . import account, dashboard, datasets, debug, jobs, trusted_datasites
 
 __all__ = [
     "account",
+    "dashboard",
     "datasets",
+    "debug",
     "jobs",
     "trusted_datasites",
 ]
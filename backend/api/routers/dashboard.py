@@ -0,0 +1,33 @@
+"""Router for the combined first load of the dashboard."""
+
+from fastapi import APIRouter, Depends, Query
+from syft_rds import RDSClient
+
+from ..dependencies import get_rds_client
+from ..responses import FastJSONResponse
+from ..services.dashboard_service import DashboardService
+from ...activity import DEFAULT_WEEKS, RETAINED_WEEKS
+
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+
+@router.get(
+    "",
+    summary="Get the dashboard's data",
+    description=(
+        "The account, datasets, dataset activity (for `weeks` weeks), jobs and "
+        "trusted datasites in one response, gathered concurrently. Each section "
+        "is `{version, data, error}`, with `data` as returned by the section's "
+        "own endpoint. Pass the versions you already have as `known` to leave "
+        "those sections' data out."
+    ),
+)
+async def get_dashboard(
+    weeks: int = Query(DEFAULT_WEEKS, ge=1, le=RETAINED_WEEKS),
+    known: list[str] = Query([], description="Section versions the client has"),
+    rds_client: RDSClient = Depends(get_rds_client),
+) -> FastJSONResponse:
+    """Get everything the dashboard shows on its first load."""
+    service = DashboardService(rds_client)
+    return FastJSONResponse(await service.get_dashboard(weeks, set(known)))
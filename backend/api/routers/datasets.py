@@ -1,7 +1,17 @@
 import traceback
 from typing import Literal, Optional
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    UploadFile,
+)
 from fastapi.responses import JSONResponse, StreamingResponse
 from loguru import logger
 from pydantic import BaseModel, Field, HttpUrl
@@ -10,9 +20,16 @@ from syft_rds.client.exceptions import DatasetExistsError
 from syft_rds import RDSClient
 
 from ..dependencies import get_rds_client
+from ..responses import FastJSONResponse
 from ..services.dataset_service import DatasetService
 from ..services.shopify_service import ShopifyService
-from ...models import ListDatasetsResponse, Dataset as DatasetModel
+from ..services.upload_service import UploadService
+from ...activity import DEFAULT_WEEKS, RETAINED_WEEKS
+from ...dataset_tasks import list_tasks
+from ...lib.mock_data import MAX_MOCK_ROWS
+from ...lib.tabular import DEFAULT_PREVIEW_ROWS, MAX_PREVIEW_ROWS
+from ...uploads import CHUNK_SIZE
+from ...models import ListDatasetsResponse
 
 
 router = APIRouter(prefix="/datasets", tags=["datasets"])
@@ -26,18 +43,21 @@ router = APIRouter(prefix="/datasets", tags=["datasets"])
 )
 async def get_datasets(
     rds_client: RDSClient = Depends(get_rds_client),
-) -> ListDatasetsResponse:
+) -> FastJSONResponse:
     """Get all datasets available in the system."""
     service = DatasetService(rds_client)
-    return await service.list_datasets()
+    return FastJSONResponse(await service.list_datasets())
 
 
 @router.post(
     "/create-from-file",
-    status_code=201,
+    status_code=202,
     summary="Create a new dataset",
-    description="Create a new dataset with a dataset file, name, and description",
-    response_model=DatasetModel,
+    description=(
+        "Create a new dataset with a dataset file, name, and description. The "
+        "dataset is created in the background; poll the returned task at "
+        "`/datasets/tasks/{task_id}`."
+    ),
 )
 async def dataset_create_from_file(
     dataset: list[UploadFile] = File(..., description="The dataset files to upload"),
@@ -52,18 +72,185 @@ async def dataset_create_from_file(
         max_length=350,
         description="Brief description of the dataset",
     ),
+    mock_rows: Optional[int] = Form(
+        None,
+        ge=1,
+        le=MAX_MOCK_ROWS,
+        description="Rows in the generated mock when no mock files are uploaded",
+    ),
     rds_client: RDSClient = Depends(get_rds_client),
-) -> DatasetModel:
-    """Create a new dataset from an uploaded file."""
+) -> dict:
+    """Start creating a new dataset from uploaded files."""
     service = DatasetService(rds_client)
     return await service.create_dataset(
         dataset_files=dataset,
         mock_dataset_files=mock_dataset,
         name=name,
         description=description,
+        mock_rows=mock_rows,
+    )
+
+
+@router.get(
+    "/activity",
+    summary="Get the datasets' weekly activity",
+    description=(
+        "Requests (jobs) per dataset for each of the last `weeks` weeks, oldest "
+        "first, with the total requests and distinct requesters. Weeks start on "
+        "Monday (UTC); `week_start` is the first day of the oldest week."
+    ),
+)
+async def get_datasets_activity(
+    weeks: int = Query(DEFAULT_WEEKS, ge=1, le=RETAINED_WEEKS),
+    rds_client: RDSClient = Depends(get_rds_client),
+):
+    """Get the weekly request counts of every dataset."""
+    service = DatasetService(rds_client)
+    return await service.get_activity(weeks)
+
+
+@router.get(
+    "/tasks",
+    summary="List dataset creation tasks",
+    description="Dataset creations in progress or recently finished, newest first",
+)
+async def list_dataset_tasks() -> dict:
+    """List the dataset creation tasks."""
+    return {"tasks": list_tasks()}
+
+
+@router.get(
+    "/tasks/{task_id}",
+    summary="Get a dataset creation task",
+    description=(
+        "The phase (queued, receiving, staging, generating_mock, registering, "
+        "done) and byte progress of a dataset creation, and the dataset once "
+        "it's created"
+    ),
+)
+async def get_dataset_task(
+    task_id: str,
+    rds_client: RDSClient = Depends(get_rds_client),
+) -> dict:
+    """Get the status of a dataset creation task."""
+    service = DatasetService(rds_client)
+    return await service.get_task(task_id)
+
+
+class UploadFileBody(BaseModel):
+    path: str = Field(min_length=1, description="Path within the dataset")
+    role: Literal["private", "mock"] = "private"
+    size: int = Field(ge=0)
+    sha256: str = Field(
+        description="SHA-256 of the SHA-256 digests of the file's chunks, in hex"
+    )
+
+
+class CreateUploadRequestBody(BaseModel):
+    files: list[UploadFileBody] = Field(min_length=1)
+
+
+class FinalizeUploadRequestBody(BaseModel):
+    name: str = Field(min_length=1, max_length=100)
+    description: str = Field(default="", max_length=350)
+    mock_rows: Optional[int] = Field(default=None, ge=1, le=MAX_MOCK_ROWS)
+
+
+@router.post(
+    "/uploads",
+    status_code=201,
+    summary="Start a chunked upload",
+    description=(
+        "Open a resumable upload of dataset files. Files whose content the "
+        "server already has are marked `present` and need not be sent; the "
+        f"others are sent in chunks of {CHUNK_SIZE} bytes."
+    ),
+)
+async def create_upload(
+    data: CreateUploadRequestBody,
+    rds_client: RDSClient = Depends(get_rds_client),
+) -> dict:
+    """Start a chunked upload."""
+    service = UploadService(rds_client)
+    return await service.create_upload([f.model_dump() for f in data.files])
+
+
+@router.get(
+    "/uploads/{upload_id}",
+    summary="Get a chunked upload",
+    description="The offset each file of an upload should resume from",
+)
+async def get_upload(
+    upload_id: str,
+    rds_client: RDSClient = Depends(get_rds_client),
+) -> dict:
+    """Get the state of a chunked upload."""
+    service = UploadService(rds_client)
+    return await service.get_upload(upload_id)
+
+
+@router.put(
+    "/uploads/{upload_id}/files/{index}",
+    summary="Upload a chunk of a file",
+    description=(
+        "Send the chunk of file `index` starting at `offset` as the raw request "
+        "body, with its SHA-256 in the `X-Chunk-SHA256` header. Chunks go in "
+        "order; resending a stored chunk is a no-op."
+    ),
+)
+async def put_upload_chunk(
+    upload_id: str,
+    index: int,
+    request: Request,
+    offset: int = Query(..., ge=0),
+    chunk_sha256: str = Header(..., alias="X-Chunk-SHA256"),
+    rds_client: RDSClient = Depends(get_rds_client),
+) -> dict:
+    """Upload a chunk of a file."""
+    try:
+        size = int(request.headers["content-length"])
+    except (KeyError, ValueError):
+        size = None
+    service = UploadService(rds_client)
+    return await service.put_chunk(
+        upload_id, index, offset, request.stream(), chunk_sha256, size
     )
 
 
+@router.post(
+    "/uploads/{upload_id}/finalize",
+    status_code=202,
+    summary="Create a dataset from a chunked upload",
+    description=(
+        "Check the upload's files and create the dataset from them in the "
+        "background. Poll the returned task at `/datasets/tasks/{task_id}`."
+    ),
+)
+async def finalize_upload(
+    upload_id: str,
+    data: FinalizeUploadRequestBody,
+    rds_client: RDSClient = Depends(get_rds_client),
+) -> dict:
+    """Create a dataset from a complete chunked upload."""
+    service = UploadService(rds_client)
+    return await service.finalize_upload(
+        upload_id, data.name, data.description, data.mock_rows
+    )
+
+
+@router.delete(
+    "/uploads/{upload_id}",
+    summary="Abandon a chunked upload",
+)
+async def delete_upload(
+    upload_id: str,
+    rds_client: RDSClient = Depends(get_rds_client),
+) -> dict:
+    """Abandon a chunked upload."""
+    service = UploadService(rds_client)
+    return await service.delete_upload(upload_id)
+
+
 class ImportShopifyRequestBody(BaseModel):
     """Request body for adding a dataset from Shopify."""
 
@@ -71,19 +258,23 @@ class ImportShopifyRequestBody(BaseModel):
     name: str = Field(min_length=1)
     pat: str = Field(min_length=1)
     description: Optional[str] = None
+    mock_rows: Optional[int] = Field(default=None, ge=1, le=MAX_MOCK_ROWS)
 
 
 @router.post(
     "/import-from-shopify",
-    status_code=201,
+    status_code=202,
     summary="Add a dataset from Shopify",
-    response_model=DatasetModel,
+    description=(
+        "Import a Shopify store's products as a new dataset, in the background. "
+        "Poll the returned task at `/datasets/tasks/{task_id}`."
+    ),
 )
 async def dataset_import_from_shopify(
     data: ImportShopifyRequestBody,
     rds_client: RDSClient = Depends(get_rds_client),
-) -> DatasetModel:
-    """Create a dataset by importing data from a Shopify store."""
+) -> dict:
+    """Start creating a dataset by importing data from a Shopify store."""
     try:
         shopify_service = ShopifyService(rds_client)
         return await shopify_service.create_dataset_from_shopify(
@@ -91,6 +282,7 @@ async def dataset_import_from_shopify(
             name=data.name,
             pat=data.pat,
             description=data.description,
+            mock_rows=data.mock_rows,
         )
     except HTTPException:
         raise
@@ -103,6 +295,10 @@ async def dataset_import_from_shopify(
 @router.put(
     "/sync-shopify-dataset/{dataset_uid}",
     summary="Sync a dataset imported from Shopify",
+    description=(
+        "Fetch the store's current data and record it as a new version of the "
+        "dataset. `version` is null if the data didn't change."
+    ),
 )
 async def dataset_sync_shopify(
     dataset_uid: str,
@@ -110,8 +306,7 @@ async def dataset_sync_shopify(
 ):
     """Sync an existing dataset with its Shopify source."""
     shopify_service = ShopifyService(rds_client)
-    dataset = await shopify_service.sync_dataset(dataset_uid)
-    return {"dataset": dataset}
+    return await shopify_service.sync_dataset(dataset_uid)
 
 
 class UpdateDatasetRequestBody(BaseModel):
@@ -162,6 +357,58 @@ async def delete_dataset(
     return await service.delete_dataset(dataset_name)
 
 
+@router.get(
+    "/{dataset_uid}/profile",
+    summary="Get a dataset's column profile",
+    description=(
+        "Column types, null rates, min/max and approximate distinct counts of "
+        "the dataset's private files. Returns 202 while the profile is computed."
+    ),
+)
+async def get_dataset_profile(
+    dataset_uid: str,
+    rds_client: RDSClient = Depends(get_rds_client),
+):
+    """Get the column profile of a dataset."""
+    service = DatasetService(rds_client)
+    profile = await service.get_dataset_profile(dataset_uid)
+    if profile["status"] == "computing":
+        return JSONResponse(profile, status_code=202)
+    return profile
+
+
+@router.get(
+    "/{dataset_uid}/versions",
+    summary="List a dataset's versions",
+    description=(
+        "Versions of the dataset's private data, newest first, with the bytes "
+        "each one changed and whether it can still be restored."
+    ),
+)
+async def list_dataset_versions(
+    dataset_uid: str,
+    rds_client: RDSClient = Depends(get_rds_client),
+):
+    """List the versions of a dataset."""
+    service = DatasetService(rds_client)
+    return await service.list_versions(dataset_uid)
+
+
+@router.post(
+    "/{dataset_uid}/versions/{version}/restore",
+    summary="Restore a dataset version",
+    description="Make an old version the dataset's data again, as a new version",
+)
+async def restore_dataset_version(
+    dataset_uid: str,
+    version: int,
+    rds_client: RDSClient = Depends(get_rds_client),
+):
+    """Roll a dataset back to an old version."""
+    service = DatasetService(rds_client)
+    return await service.restore_version(dataset_uid, version)
+
+
 @router.get(
     "/{dataset_uuid}/private",
     summary="Download dataset private file",
@@ -185,3 +432,18 @@ async def get_dataset_files(
     """Get the file structure and contents of a dataset."""
     service = DatasetService(rds_client)
     return await service.get_dataset_files(dataset_uid, dataset_type=dataset_type)
+
+
+@router.get("/files/{dataset_uid}/preview")
+async def get_dataset_file_preview(
+    dataset_uid: str,
+    path: str,
+    dataset_type: Literal["private", "mock"] = "private",
+    rows: int = Query(DEFAULT_PREVIEW_ROWS, ge=1, le=MAX_PREVIEW_ROWS),
+    rds_client: RDSClient = Depends(get_rds_client),
+):
+    """Get a tabular preview of a CSV/TSV/JSONL/Parquet/Arrow dataset file."""
+    service = DatasetService(rds_client)
+    return await service.get_dataset_file_preview(
+        dataset_uid, path, dataset_type=dataset_type, rows=rows
+    )
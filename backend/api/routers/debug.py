@@ -0,0 +1,55 @@
+"""Router for debugging endpoints, only mounted when profiling is enabled."""
+
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from ...lib.profiler import to_folded
+from ...profiling import get_profile_store
+
+
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+
+@router.get(
+    "/profiles",
+    summary="List request profiles",
+    description="List the most recent request profiles, newest first",
+)
+async def list_profiles():
+    """List stored request profiles."""
+    return {"profiles": get_profile_store().list()}
+
+
+@router.get(
+    "/profiles/{profile_id}",
+    summary="Download a request profile",
+    description=(
+        "Download a profile as JSON, or as collapsed stacks (for speedscope or "
+        "flamegraph.pl) of either the wall-clock or the CPU samples. Only the "
+        "event loop thread is sampled, not the threadpool"
+    ),
+)
+async def download_profile(
+    profile_id: str,
+    format: Literal["json", "folded"] = "json",
+    kind: Literal["wall", "cpu"] = "wall",
+):
+    """Download a stored request profile."""
+    try:
+        profile = get_profile_store().load(profile_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+
+    if format == "folded":
+        return PlainTextResponse(
+            to_folded(profile[kind]),
+            headers={
+                "Content-Disposition": f'attachment; filename="{profile_id}.{kind}.folded"'
+            },
+        )
+    return JSONResponse(
+        profile,
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.json"'},
+    )
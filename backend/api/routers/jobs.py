@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends
+from typing import Literal, Optional
 
-from fastapi import status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Query
+
+from fastapi import Request, Response, status
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from syft_rds import RDSClient
 
 from ..dependencies import get_rds_client
+from ..responses import FastJSONResponse
 from ..services.job_service import JobService
+from ...lib.tabular import DEFAULT_PREVIEW_ROWS, MAX_PREVIEW_ROWS
+from ...logsearch import MAX_CONTEXT_LINES, MIN_QUERY_LENGTH
 from ...models import ListJobsResponse
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
@@ -18,11 +23,36 @@ router = APIRouter(prefix="/jobs", tags=["jobs"])
     response_model=ListJobsResponse,
 )
 async def list_jobs(
+    status: Optional[str] = Query(None, description="Only jobs with this status"),
+    dataset: Optional[str] = Query(None, description="Only jobs on this dataset"),
+    requester: Optional[str] = Query(
+        None, description="Only jobs requested by this user"
+    ),
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0),
+    rds_client: RDSClient = Depends(get_rds_client),
+) -> FastJSONResponse:
+    """Get the jobs in the system, newest first."""
+    service = JobService(rds_client)
+    return FastJSONResponse(
+        await service.list_jobs(status, dataset, requester, limit, offset)
+    )
+
+
+@router.get(
+    "/counts",
+    summary="Count jobs",
+    description="Number of jobs in total and per status",
+)
+async def count_jobs(
+    dataset: Optional[str] = Query(None, description="Only jobs on this dataset"),
+    requester: Optional[str] = Query(
+        None, description="Only jobs requested by this user"
+    ),
     rds_client: RDSClient = Depends(get_rds_client),
-) -> ListJobsResponse:
-    """Get all jobs in the system."""
+):
     service = JobService(rds_client)
-    return await service.list_jobs()
+    return await service.count_jobs(dataset, requester)
 
 
 @router.post(
@@ -82,12 +112,18 @@ async def get_job_code(
 )
 async def run_job(
     job_uid: str,
+    dataset_version: Optional[int] = Query(
+        None, description="Pin the job to this version of its dataset"
+    ),
     rds_client: RDSClient = Depends(get_rds_client),
 ):
     """Run an approved job on private data."""
     service = JobService(rds_client)
-    await service.run(job_uid)
-    return JSONResponse(content={"message": f"Job {job_uid} started."}, status_code=200)
+    version = await service.run(job_uid, dataset_version)
+    return JSONResponse(
+        content={"message": f"Job {job_uid} started.", "dataset_version": version},
+        status_code=200,
+    )
 
 
 @router.post(
@@ -98,13 +134,17 @@ async def run_job(
 )
 async def rerun_job(
     job_uid: str,
+    dataset_version: Optional[int] = Query(
+        None, description="Pin the job to this version of its dataset"
+    ),
     rds_client: RDSClient = Depends(get_rds_client),
 ):
     """Rerun a finished or failed job."""
     service = JobService(rds_client)
-    await service.rerun(job_uid)
+    version = await service.rerun(job_uid, dataset_version)
     return JSONResponse(
-        content={"message": f"Job {job_uid} restarted."}, status_code=200
+        content={"message": f"Job {job_uid} restarted.", "dataset_version": version},
+        status_code=200,
     )
 
 
@@ -124,6 +164,31 @@ async def delete_job(
     return JSONResponse(content={"message": f"Job {job_uid} deleted."}, status_code=200)
 
 
+@router.get(
+    "/logs/search",
+    summary="Search job logs",
+    description=(
+        "Find the lines containing `q` (ignoring case) in the stdout and stderr "
+        "of all jobs, or of one job, most recently written first. Results are "
+        "streamed as JSON lines with the job UID, stream, line number, text and "
+        "`context` lines before and after."
+    ),
+    response_class=StreamingResponse,
+)
+async def search_job_logs(
+    q: str = Query(..., min_length=MIN_QUERY_LENGTH, max_length=200),
+    stream: Optional[Literal["stdout", "stderr"]] = Query(None),
+    job_uid: Optional[str] = Query(None, description="Only the logs of this job"),
+    context: int = Query(2, ge=0, le=MAX_CONTEXT_LINES),
+    limit: int = Query(100, ge=1, le=1000),
+    rds_client: RDSClient = Depends(get_rds_client),
+):
+    """Stream the log lines matching a query."""
+    service = JobService(rds_client)
+    results = await service.search_logs(q, stream, job_uid, context, limit)
+    return StreamingResponse(results, media_type="application/x-ndjson")
+
+
 @router.get(
     "/logs/{job_uid}",
     summary="Get job logs",
@@ -154,6 +219,83 @@ async def get_job_output(
     return await service.get_output_files(job_uid)
 
 
+@router.get(
+    "/output/{job_uid}/manifest",
+    summary="Get job output manifest",
+    description="List a job's output files with sizes, mtimes and a change token",
+    status_code=status.HTTP_200_OK,
+)
+async def get_job_output_manifest(
+    job_uid: str,
+    request: Request,
+    rds_client: RDSClient = Depends(get_rds_client),
+):
+    """Get the job output manifest; answers 304 if the token hasn't changed."""
+    service = JobService(rds_client)
+    manifest = await service.get_output_manifest(job_uid)
+    headers = {"ETag": f'"{manifest["token"]}"', "Cache-Control": "no-cache"}
+    # Compared weakly, the ETag is weakened when the response is compressed
+    known = request.headers.get("if-none-match", "").split(",")
+    if headers["ETag"] in (tag.strip().removeprefix("W/") for tag in known):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return JSONResponse(content=manifest, headers=headers)
+
+
+@router.get(
+    "/output/{job_uid}/files/{file_path:path}",
+    summary="Download a job output file",
+    description="Stream a single job output file. Supports Range requests.",
+    response_class=FileResponse,
+)
+async def get_job_output_file(
+    job_uid: str,
+    file_path: str,
+    rds_client: RDSClient = Depends(get_rds_client),
+):
+    """Stream one output file."""
+    service = JobService(rds_client)
+    path = await service.get_output_file(job_uid, file_path)
+    return FileResponse(path, headers={"Cache-Control": "no-cache"})
+
+
+@router.get(
+    "/output/{job_uid}/preview/{file_path:path}",
+    summary="Preview a tabular job output file",
+    description="Columns, inferred types, first rows and row count of a CSV/TSV/JSONL/Parquet/Arrow output file",
+    status_code=status.HTTP_200_OK,
+)
+async def get_job_output_preview(
+    job_uid: str,
+    file_path: str,
+    rows: int = Query(DEFAULT_PREVIEW_ROWS, ge=1, le=MAX_PREVIEW_ROWS),
+    rds_client: RDSClient = Depends(get_rds_client),
+):
+    """Preview a tabular output file."""
+    service = JobService(rds_client)
+    return await service.get_output_preview(job_uid, file_path, rows=rows)
+
+
+@router.get(
+    "/output/{job_uid}/archive",
+    summary="Download job output as zip",
+    description="Stream the whole output directory of a job as a zip archive",
+    response_class=StreamingResponse,
+)
+async def get_job_output_archive(
+    job_uid: str,
+    rds_client: RDSClient = Depends(get_rds_client),
+):
+    """Stream the job output directory as a zip."""
+    service = JobService(rds_client)
+    archive = await service.get_output_archive(job_uid)
+    filename = f"job-{job_uid}-output.zip"
+    return StreamingResponse(
+        archive,
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.get(
     "/{job_uid}",
     summary="Get job details",
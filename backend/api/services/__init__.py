@@ -1,9 +1,11 @@
+from .dashboard_service import DashboardService
 from .dataset_service import DatasetService
 from .job_service import JobService
 from .trusted_datasites_service import TrustedDatasitesService
 from .shopify_service import ShopifyService
 
 __all__ = [
+    "DashboardService",
     "DatasetService",
     "JobService",
     "TrustedDatasitesService",
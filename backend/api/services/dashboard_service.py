@@ -0,0 +1,77 @@
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Collection
+
+import pydantic_core
+from fastapi import HTTPException
+from loguru import logger
+from syft_rds import RDSClient
+
+from ...activity import DEFAULT_WEEKS
+from .dataset_service import DatasetService
+from .job_service import JobService
+from .trusted_datasites_service import TrustedDatasitesService
+
+
+def section_version(name: str, data: Any) -> str:
+    """Token of a section's content, which changes whenever the content does."""
+    digest = hashlib.blake2b(pydantic_core.to_json(data), digest_size=12)
+    return f"{name}-{digest.hexdigest()}"
+
+
+class DashboardService:
+    """Service class for the combined data the dashboard loads first."""
+
+    def __init__(self, rds_client: RDSClient):
+        self.rds_client = rds_client
+        self.syftbox_client = rds_client._syftbox_client
+
+    async def get_account(self) -> dict:
+        return {
+            "email": self.rds_client.email,
+            "is_admin": self.rds_client.is_admin,
+            "host_datasite_url": self.rds_client.host_datasite_url,
+        }
+
+    async def get_dashboard(
+        self, weeks: int = DEFAULT_WEEKS, known: Collection[str] = ()
+    ) -> dict:
+        """
+        The account, datasets, dataset activity, jobs and trusted datasites,
+        gathered concurrently. Each section has the same content as its own
+        endpoint, under `data`, and a `version` token. Sections whose version
+        is in `known` are left out (`data` is None), since the caller has them
+        already. A section that fails has its `error` instead, so the others
+        can still be shown.
+        """
+        datasets = DatasetService(self.rds_client)
+        sections: dict[str, Awaitable] = {
+            # Listing jobs runs in the threadpool, start it first so it
+            # overlaps with the work done on the event loop
+            "jobs": JobService(self.rds_client).list_jobs(),
+            "activity": datasets.get_activity(weeks),
+            "account": self.get_account(),
+            "datasets": datasets.list_datasets(),
+            "trustedDatasites": TrustedDatasitesService(
+                self.rds_client
+            ).get_auto_approved_datasites(),
+        }
+        results = await asyncio.gather(*sections.values(), return_exceptions=True)
+
+        dashboard = {}
+        for name, result in zip(sections, results):
+            if isinstance(result, BaseException):
+                if not isinstance(result, Exception):
+                    raise result
+                if not isinstance(result, HTTPException):
+                    logger.error(f"Error getting dashboard {name}: {result}")
+                detail = getattr(result, "detail", str(result))
+                dashboard[name] = {"version": None, "data": None, "error": detail}
+                continue
+            version = section_version(name, result)
+            dashboard[name] = {
+                "version": version,
+                "data": None if version in known else result,
+                "error": None,
+            }
+        return dashboard
@@ -1,18 +1,138 @@
 # backend/api/services/dataset_service.py
-from pathlib import Path
 import tempfile
-from typing_extensions import Iterator, Literal, Optional, List
+from pathlib import Path
+from typing_extensions import Callable, Iterator, Literal, Optional
 
 from fastapi import HTTPException, UploadFile
 from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from loguru import logger
-import requests
+from syft_rds.client.exceptions import DatasetExistsError
 from syft_rds.models import DatasetUpdate
 from syft_rds import RDSClient
 
-from ...models import ListDatasetsResponse, Dataset as DatasetModel
-from ...sources import find_source
+from ...activity import DEFAULT_WEEKS, activity_index
+from ...admission import PREVIEWS, UPLOADS, admit
+from ...catalog import catalog
+from ...changes import expect_changes
+from ...config import get_settings
+from ...dataset_tasks import (
+    DatasetTask,
+    create_task,
+    fail_task,
+    get_task,
+    submit_task,
+)
+from ...lib.handover import handover_file
+from ...lib.mock_data import generate_mock_dataset, mock_sources
+from ...lib.tabular import DEFAULT_PREVIEW_ROWS, preview_table
+from ...metrics import FS_SCAN_DURATION
+from ...models import Dataset as DatasetModel, dump_camel
+from ...profiles import get_profile, schedule_profile
+from ...sources import load_sources
+from ...staging import staging_root
 from ...utils import get_auto_approve_list
+from ...versions import drop_history, list_versions, restore_version, versions_root
+
+# Uploads are copied to the task's work directory in chunks of this size
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def generate_mock_files(
+    private_path: Path, mock_path: Path, task: DatasetTask, rows: Optional[int] = None
+) -> None:
+    """Generate synthetic mock files from the private files, offline."""
+    rows = rows or get_settings().mock_rows
+    task.set_phase(
+        "generating_mock",
+        sum(path.stat().st_size for path in mock_sources(private_path)),
+    )
+    try:
+        written = generate_mock_dataset(
+            private_path, mock_path, rows, progress=task.advance
+        )
+    except Exception as e:
+        logger.error(f"Failed to generate mock dataset: {e}")
+        raise HTTPException(
+            status_code=400,
+            detail=f"Failed to generate mock dataset: {e}",
+        )
+    if not written:
+        logger.warning(
+            f"No CSV/TSV files in {private_path} to generate a mock from, "
+            "the mock dataset only has empty placeholders"
+        )
+
+
+def write_readme(work_dir: Path, description: Optional[str]) -> Path:
+    """Write the dataset's README.md with its description, if any."""
+    readme_path = work_dir / "README.md"
+    readme_path.write_text(description or "")
+    return readme_path
+
+
+def register_dataset(
+    rds_client: RDSClient, task: DatasetTask, **dataset_fields
+) -> DatasetModel:
+    """Create the dataset in RDS from the task's staged files."""
+    task.set_phase("registering")
+    try:
+        dataset = rds_client.dataset.create(
+            **dataset_fields, auto_approval=get_auto_approve_list()
+        )
+        expect_changes()
+        return dataset
+    except DatasetExistsError:
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "type": "FormFieldError",
+                "loc": "name",
+                "message": "A dataset with this name already exists",
+            },
+        )
+    except PermissionError as e:
+        logger.error(f"Permission denied creating dataset: {e}")
+        logger.error(
+            "This usually indicates .syftbox directory is not writable. "
+            "Check Docker volume permissions if running in container."
+        )
+        raise HTTPException(
+            status_code=500,
+            detail=(
+                f"Permission denied writing to .syftbox directory: {str(e)}. "
+                "If running in Docker, check volume mount permissions."
+            ),
+        )
+
+
+def _receive_files(
+    files: list[UploadFile], target_dir: Path, task: DatasetTask
+) -> None:
+    """Copy uploaded files into `target_dir`, counting the bytes on `task`."""
+    target_resolved = target_dir.resolve()
+    for f in files:
+        # Strip the top-level folder name but preserve subdirectories
+        # since when we upload the dataset, the dataset name is the top-level folder
+        # e.g., "diabetes/part01/train.csv" -> "part01/train.csv"
+        file_path = Path(f.filename)
+        relative_path = (
+            Path(*file_path.parts[1:]) if len(file_path.parts) > 1 else file_path
+        )
+
+        full_path = target_dir / relative_path
+        try:
+            full_path.resolve().relative_to(target_resolved)
+        except ValueError:
+            raise HTTPException(
+                status_code=400, detail=f"Invalid file name: {f.filename}"
+            )
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(full_path, "wb") as out:
+            while chunk := f.file.read(UPLOAD_CHUNK_SIZE):
+                out.write(chunk)
+                task.advance(len(chunk))
+        logger.debug(f"Saved file: {full_path}")
 
 
 # Security and resource limits
@@ -28,37 +148,42 @@ class DatasetService:
         self.rds_client = rds_client
         self.syftbox_client = rds_client._syftbox_client
 
-    async def list_datasets(self) -> ListDatasetsResponse:
-        """List all datasets with proper formatting."""
-        datasets: List[DatasetModel] = [
-            DatasetModel.model_validate(dataset)
-            for dataset in self.rds_client.dataset.get_all()
-        ]
+    async def list_datasets(self) -> dict[str, list[dict]]:
+        """List all datasets in their camelCase output shape."""
+        sources = load_sources()
+        datasets = []
 
         # Process datasets to add additional metadata
-        for dataset in datasets:
-            # Calculate private dataset size
-            try:
-                private_file_path = next(dataset.private_path.iterdir(), None)
-                dataset.private_size = (
-                    private_file_path.stat().st_size if private_file_path else 0
-                )
-            except (StopIteration, OSError, FileNotFoundError):
-                dataset.private_size = 0
+        with FS_SCAN_DURATION.time(scan="dataset_sizes"):
+            for dataset in catalog(self.rds_client).datasets():
+                # Calculate private dataset size
+                try:
+                    private_file_path = next(dataset.private_path.iterdir(), None)
+                    private_size = (
+                        private_file_path.stat().st_size if private_file_path else 0
+                    )
+                except (StopIteration, OSError, FileNotFoundError):
+                    private_size = 0
 
-            # Calculate mock dataset size
-            try:
-                mock_file_path = next(dataset.mock_path.iterdir(), None)
-                dataset.mock_size = (
-                    mock_file_path.stat().st_size if mock_file_path else 0
+                # Calculate mock dataset size
+                try:
+                    mock_file_path = next(dataset.mock_path.iterdir(), None)
+                    mock_size = mock_file_path.stat().st_size if mock_file_path else 0
+                except (StopIteration, OSError, FileNotFoundError):
+                    mock_size = 0
+
+                datasets.append(
+                    dump_camel(
+                        dataset,
+                        DatasetModel,
+                        private_size=private_size,
+                        mock_size=mock_size,
+                        readme=None,
+                        source=sources.get(dataset.uid),
+                    )
                 )
-            except (StopIteration, OSError, FileNotFoundError):
-                dataset.mock_size = 0
-
-            dataset.readme = None
-            dataset.source = find_source(dataset.uid)
 
-        return ListDatasetsResponse(datasets=datasets)
+        return {"datasets": datasets}
 
     async def create_dataset(
         self,
@@ -66,118 +191,153 @@ class DatasetService:
         name: str,
         description: str,
         mock_dataset_files: Optional[list[UploadFile]] = None,
-    ) -> DatasetModel:
-        """Create a new dataset from uploaded file."""
-        try:
-            # Validate that we have at least one file
-            if not dataset_files:
-                raise HTTPException(
-                    status_code=400,
-                    detail="No dataset files provided",
-                )
-
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # Save real dataset files preserving directory structure
-                real_path = Path(temp_dir) / "real"
-                real_path.mkdir(parents=True, exist_ok=True)
-
-                for f in dataset_files:
-                    # Strip the top-level folder name but preserve subdirectories
-                    # since when we upload the dataset, the dataset name is the top-level folder
-                    # e.g., "diabetes/part01/train.csv" -> "part01/train.csv"
-                    file_path = Path(f.filename)
-                    relative_path = (
-                        Path(*file_path.parts[1:])
-                        if len(file_path.parts) > 1
-                        else file_path
-                    )
-
-                    # Create full path
-                    full_path = real_path / relative_path
-                    # Create parent directories if needed
-                    full_path.parent.mkdir(parents=True, exist_ok=True)
-                    # Write file content
-                    full_path.write_bytes(await f.read())
-                    logger.debug(f"Saved file: {full_path}")
-
-                # Create mock dataset
-                mock_path = Path(temp_dir) / "mock"
-                mock_path.mkdir(parents=True, exist_ok=True)
+        mock_rows: Optional[int] = None,
+    ) -> dict:
+        """
+        Start creating a new dataset from uploaded files.
+
+        The uploads are copied to the task's work directory before returning,
+        since they're gone once the request ends; the rest happens in the
+        background. Returns the task's snapshot.
+        """
+        # Validate that we have at least one file
+        if not dataset_files:
+            raise HTTPException(
+                status_code=400,
+                detail="No dataset files provided",
+            )
 
+        async with admit(UPLOADS):
+            task = create_task("upload", name, staging_root(self.syftbox_client))
+            try:
+                uploads = dataset_files + (mock_dataset_files or [])
+                task.set_phase("receiving", sum(f.size or 0 for f in uploads))
+                real_path = task.work_dir / "real"
+                mock_path = task.work_dir / "mock"
+                real_path.mkdir()
+                mock_path.mkdir()
+                await run_in_threadpool(_receive_files, dataset_files, real_path, task)
                 if mock_dataset_files:
-                    # Save mock dataset files, stripping top-level folder
-                    for f in mock_dataset_files:
-                        file_path = Path(f.filename)
-                        relative_path = (
-                            Path(*file_path.parts[1:])
-                            if len(file_path.parts) > 1
-                            else file_path
-                        )
-                        # Create full path
-                        full_path = mock_path / relative_path
-                        # Create parent directories if needed
-                        full_path.parent.mkdir(parents=True, exist_ok=True)
-                        # Write file content
-                        full_path.write_bytes(await f.read())
-                        logger.debug(f"Saved mock file: {full_path}")
-                else:
-                    # Fall back to downloading mock data (temporary solution)
-                    # Use the first dataset file's name
-                    first_file_name = Path(dataset_files[0].filename).name
-                    mock_dataset_path = mock_path / first_file_name
-                    await self._download_mock_dataset(mock_dataset_path)
-
-                # Create README.md with description if provided
-                readme_path = Path(temp_dir) / "README.md"
-                if description:
-                    readme_path.write_text(description)
-                else:
-                    readme_path.touch()  # Create empty README.md
-
-                # Create dataset in RDS
-                dataset = self.rds_client.dataset.create(
-                    name=name,
-                    summary=description,
-                    path=real_path,
-                    mock_path=mock_path,
-                    description_path=readme_path,
-                    auto_approval=get_auto_approve_list(self.syftbox_client),
-                )
+                    await run_in_threadpool(
+                        _receive_files, mock_dataset_files, mock_path, task
+                    )
+            except Exception as e:
+                fail_task(task, e)
+                if isinstance(e, HTTPException):
+                    raise
+                logger.error(f"Error receiving dataset files: {e}")
+                raise HTTPException(status_code=500, detail=str(e))
+
+        return self._submit_creation(
+            task, name, description, mock_rows, generate_mock=not mock_dataset_files
+        )
+
+    async def create_dataset_from_blobs(
+        self,
+        files: list[tuple[str, str, Path]],
+        name: str,
+        description: str,
+        mock_rows: Optional[int] = None,
+    ) -> dict:
+        """
+        Start creating a new dataset from finalized chunked uploads, given as
+        (role, path, blob) with role "private" or "mock".
+
+        The blobs are reflinked into the dataset where possible, copied
+        otherwise. Returns the task's snapshot.
+        """
+        if not any(role == "private" for role, _, _ in files):
+            raise HTTPException(status_code=400, detail="No dataset files provided")
+
+        def stage(task: DatasetTask) -> None:
+            task.set_phase("staging", sum(blob.stat().st_size for _, _, blob in files))
+            for role, path, blob in files:
+                target = task.work_dir / ("real" if role == "private" else "mock")
+                handover_file(blob, target / path, keep_source=True)
+                task.advance(blob.stat().st_size)
+
+        task = create_task("upload", name, staging_root(self.syftbox_client))
+        (task.work_dir / "real").mkdir()
+        (task.work_dir / "mock").mkdir()
+        return self._submit_creation(
+            task,
+            name,
+            description,
+            mock_rows,
+            generate_mock=not any(role == "mock" for role, _, _ in files),
+            stage=stage,
+        )
+
+    def _submit_creation(
+        self,
+        task: DatasetTask,
+        name: str,
+        description: str,
+        mock_rows: Optional[int],
+        generate_mock: bool,
+        stage: Optional[Callable[[DatasetTask], None]] = None,
+    ) -> dict:
+        """Create the dataset from the task's `real` and `mock` directories."""
+        real_path = task.work_dir / "real"
+        mock_path = task.work_dir / "mock"
+
+        def build(task: DatasetTask) -> dict:
+            task.set_phase("staging")
+            if stage is not None:
+                stage(task)
+            readme_path = write_readme(task.work_dir, description)
+
+            if generate_mock:
+                # Generate a synthetic mock matching the private files
+                generate_mock_files(real_path, mock_path, task, mock_rows)
+
+            dataset = register_dataset(
+                self.rds_client,
+                task,
+                name=name,
+                summary=description,
+                path=real_path,
+                mock_path=mock_path,
+                description_path=readme_path,
+            )
+            logger.debug(f"Dataset created: {dataset}")
+            return DatasetModel.model_validate(dataset).model_dump(
+                mode="json", by_alias=True
+            )
 
-                logger.debug(f"Dataset created: {dataset}")
-                return DatasetModel.model_validate(dataset)
+        return submit_task(task, build)
 
-        except HTTPException:
-            raise
-        except PermissionError as e:
-            logger.error(f"Permission denied creating dataset: {e}")
-            logger.error(
-                "This usually indicates .syftbox directory is not writable. "
-                "Check Docker volume permissions if running in container."
-            )
+    async def get_task(self, task_id: str) -> dict:
+        """Get the status of a dataset creation task."""
+        task = get_task(task_id)
+        if task is None:
             raise HTTPException(
-                status_code=500,
-                detail=(
-                    f"Permission denied writing to .syftbox directory: {str(e)}. "
-                    "If running in Docker, check volume mount permissions."
-                ),
+                status_code=404, detail=f"Dataset task '{task_id}' not found"
             )
-        except Exception as e:
-            logger.error(f"Error creating dataset: {e}")
-            raise HTTPException(status_code=500, detail=str(e))
+        return task.snapshot()
 
     async def update_dataset(self, dataset_update: DatasetUpdate) -> DatasetModel:
-        return self.rds_client.dataset.update(dataset_update)
+        dataset = self.rds_client.dataset.update(dataset_update)
+        expect_changes()
+        # Recomputed only if the data actually changed
+        schedule_profile(str(dataset.uid), dataset.private_path)
+        return dataset
 
     async def delete_dataset(self, dataset_name: str) -> JSONResponse:
         """Delete a dataset by name."""
         try:
+            dataset = catalog(self.rds_client).dataset(name=dataset_name)
             delete_res = self.rds_client.dataset.delete(dataset_name)
+            expect_changes()
             if not delete_res:
                 raise HTTPException(
                     status_code=404, detail=f"Unable to delete dataset '{dataset_name}'"
                 )
 
+            if dataset is not None:
+                await run_in_threadpool(
+                    drop_history, versions_root(self.syftbox_client), str(dataset.uid)
+                )
             logger.debug(f"Dataset {dataset_name} deleted successfully")
             return JSONResponse(
                 content={"message": f"Dataset {dataset_name} deleted successfully"},
@@ -192,7 +352,7 @@ class DatasetService:
     async def download_private_file(self, dataset_uuid: str) -> StreamingResponse:
         """Download the private file for a dataset."""
         try:
-            dataset = self.rds_client.dataset.get(uid=dataset_uuid)
+            dataset = catalog(self.rds_client).dataset(uid=dataset_uuid)
             if not dataset:
                 raise HTTPException(
                     status_code=404,
@@ -238,22 +398,6 @@ class DatasetService:
             )
             raise HTTPException(status_code=500, detail=str(e))
 
-    async def _download_mock_dataset(self, mock_dataset_path: Path) -> None:
-        """Download mock dataset from GitHub (temporary solution)."""
-        # TODO: Replace with auto-generated mock dataset
-        github_csv_url = "https://raw.githubusercontent.com/OpenMined/datasets/refs/heads/main/enclave/organic-coop/data/part_1/crop_stock_mock_1.csv"
-        try:
-            response = requests.get(github_csv_url)
-            response.raise_for_status()
-            mock_dataset_path.write_bytes(response.content)
-            logger.debug(f"Mock dataset downloaded and saved to: {mock_dataset_path}")
-        except Exception as e:
-            logger.error(f"Failed to download mock dataset: {e}")
-            raise HTTPException(
-                status_code=400,
-                detail=f"Failed to download mock dataset from GitHub: {e}",
-            )
-
     def _format_file_size(self, size_bytes: int) -> str:
         """Format file size with appropriate units consistently."""
         MB = 1024 * 1024
@@ -270,7 +414,7 @@ class DatasetService:
     ) -> dict[str, dict[str, str]]:
         """Get the dataset files and their contents (for previewable files)."""
         try:
-            dataset = self.rds_client.dataset.get(uid=dataset_uid)
+            dataset = catalog(self.rds_client).dataset(uid=dataset_uid)
             if not dataset:
                 raise HTTPException(
                     status_code=404,
@@ -280,37 +424,52 @@ class DatasetService:
             data_path = (
                 dataset.private_path if dataset_type == "private" else dataset.mock_path
             )
-            files = {}
-
-            if not data_path.exists():
-                logger.warning(f"Dataset directory does not exist: {data_path}")
-                return {
-                    "data_dir": str(data_path),
-                    "files": {},
-                    "dataset_type": dataset_type,
-                }
-
-            # Resolve paths for security validation
-            data_path_resolved = data_path.resolve()
-
-            # File extensions that can be previewed as text
-            previewable_extensions = {
-                ".txt",
-                ".csv",
-                ".json",
-                ".md",
-                ".py",
-                ".yml",
-                ".yaml",
-                ".xml",
-                ".log",
-                ".tsv",
-            }
+            # Reads up to MAX_TOTAL_SIZE of file contents
+            async with admit(PREVIEWS, MAX_TOTAL_SIZE):
+                return await run_in_threadpool(
+                    self._read_dataset_files, dataset_uid, data_path, dataset_type
+                )
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting dataset files: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+    def _read_dataset_files(
+        self, dataset_uid: str, data_path: Path, dataset_type: str
+    ) -> dict[str, dict[str, str]]:
+        files = {}
 
-            total_size = 0
-            file_count = 0
+        if not data_path.exists():
+            logger.warning(f"Dataset directory does not exist: {data_path}")
+            return {
+                "data_dir": str(data_path),
+                "files": {},
+                "dataset_type": dataset_type,
+            }
 
-            # Read all files (directories will be automatically created by frontend tree builder)
+        # Resolve paths for security validation
+        data_path_resolved = data_path.resolve()
+
+        # File extensions that can be previewed as text
+        previewable_extensions = {
+            ".txt",
+            ".csv",
+            ".json",
+            ".md",
+            ".py",
+            ".yml",
+            ".yaml",
+            ".xml",
+            ".log",
+            ".tsv",
+        }
+
+        total_size = 0
+        file_count = 0
+
+        # Read all files (directories will be automatically created by frontend tree builder)
+        with FS_SCAN_DURATION.time(scan="dataset_files"):
             for file_path in data_path.rglob("*"):
                 # Skip directories - frontend will build tree from file paths
                 if file_path.is_dir():
@@ -374,13 +533,144 @@ class DatasetService:
                         f"[Binary file: {self._format_file_size(file_size)}]"
                     )
 
-            return {
-                "data_dir": str(data_path),
-                "files": files,
-                "dataset_type": dataset_type,
-            }
+        return {
+            "data_dir": str(data_path),
+            "files": files,
+            "dataset_type": dataset_type,
+        }
+
+    async def get_dataset_file_preview(
+        self,
+        dataset_uid: str,
+        file_path: str,
+        dataset_type: Literal["private", "mock"] = "private",
+        rows: int = DEFAULT_PREVIEW_ROWS,
+    ) -> dict:
+        """Get a tabular preview (schema, first rows, row count) of a dataset file."""
+        try:
+            dataset = catalog(self.rds_client).dataset(uid=dataset_uid)
+            if not dataset:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Dataset with UID '{dataset_uid}' not found",
+                )
+
+            data_path = (
+                dataset.private_path if dataset_type == "private" else dataset.mock_path
+            ).resolve()
+            path = (data_path / file_path).resolve()
+            try:
+                path.relative_to(data_path)
+            except ValueError:
+                logger.warning(f"Path traversal attempt detected: {file_path}")
+                raise HTTPException(status_code=404, detail="File not found")
+            if not path.is_file():
+                raise HTTPException(status_code=404, detail="File not found")
+
+            # Row counting scans the whole file, keep it off the event loop
+            async with admit(PREVIEWS):
+                preview = await run_in_threadpool(preview_table, path, rows)
+            return {"path": file_path, **preview}
         except HTTPException:
             raise
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
-            logger.error(f"Error getting dataset files: {e}")
+            logger.error(f"Error previewing dataset file {file_path}: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+    async def get_activity(self, weeks: int = DEFAULT_WEEKS) -> dict:
+        """Get each dataset's weekly request counts."""
+        try:
+            # A snapshot reads the jobs added since the last one and saves the
+            # index, and building it reads every job, so both block
+            def snapshot() -> dict:
+                index = activity_index(self.rds_client, self.syftbox_client)
+                return index.snapshot(weeks)
+
+            return await run_in_threadpool(snapshot)
+        except Exception as e:
+            logger.error(f"Error getting dataset activity: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+    async def get_dataset_profile(self, dataset_uid: str) -> dict:
+        """Get the column profile of a dataset's private files."""
+        try:
+            dataset = catalog(self.rds_client).dataset(uid=dataset_uid)
+            if not dataset:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Dataset with UID '{dataset_uid}' not found",
+                )
+
+            # Versioning the data stats every file, keep it off the event loop
+            return await run_in_threadpool(
+                get_profile, str(dataset.uid), dataset.private_path
+            )
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting dataset profile: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+    async def list_versions(self, dataset_uid: str) -> dict:
+        """List the versions of a dataset's private data, newest first."""
+        try:
+            dataset = catalog(self.rds_client).dataset(uid=dataset_uid)
+            if not dataset:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Dataset with UID '{dataset_uid}' not found",
+                )
+
+            versions = await run_in_threadpool(
+                list_versions,
+                versions_root(self.syftbox_client),
+                str(dataset.uid),
+                dataset.private_path,
+            )
+            return {"versions": versions}
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error listing versions of dataset {dataset_uid}: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+    async def restore_version(self, dataset_uid: str, version: int) -> dict:
+        """Restore an old version of a dataset's private data as a new version."""
+        try:
+            dataset = catalog(self.rds_client).dataset(uid=dataset_uid)
+            if not dataset:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Dataset with UID '{dataset_uid}' not found",
+                )
+
+            def update(path: Path) -> Path:
+                updated = self.rds_client.dataset.update(
+                    DatasetUpdate(uid=dataset.uid, path=str(path))
+                )
+                expect_changes()
+                return updated.private_path
+
+            # Assembled next to the workspace, so the update moves it into place
+            with tempfile.TemporaryDirectory(
+                dir=staging_root(self.syftbox_client)
+            ) as work_dir:
+                restored = await run_in_threadpool(
+                    restore_version,
+                    versions_root(self.syftbox_client),
+                    str(dataset.uid),
+                    version,
+                    dataset.private_path,
+                    Path(work_dir),
+                    update,
+                )
+            schedule_profile(str(dataset.uid), dataset.private_path)
+            logger.info(f"Restored version {version} of dataset {dataset.name}")
+            return {"version": restored}
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error restoring version {version} of {dataset_uid}: {e}")
             raise HTTPException(status_code=500, detail=str(e))
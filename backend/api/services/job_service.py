@@ -1,11 +1,25 @@
+import copy
+import hashlib
 from pathlib import Path
+from typing import Iterator, Optional
 from uuid import UUID
 
+import pydantic_core
 from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
 from loguru import logger
 from syft_rds import RDSClient
+from syft_rds.models import JobStatus
 
-from ...models import ListJobsResponse
+from ...admission import PREVIEWS, admit
+from ...lib.tabular import DEFAULT_PREVIEW_ROWS, preview_table
+from ...catalog import catalog
+from ...changes import expect_changes
+from ...lib.zipstream import iter_zip
+from ...logsearch import log_index
+from ...metrics import FS_SCAN_DURATION
+from ...singleflight import single_flight
+from ...versions import checkout, job_pin, pin_job, unpin_job, versions_root
 
 
 # Security and resource limits
@@ -21,15 +35,50 @@ class JobService:
         self.rds_client = rds_client
         self.syftbox_client = rds_client._syftbox_client
 
-    async def list_jobs(self) -> ListJobsResponse:
-        """List all jobs in the system."""
+    def _get_job(self, job_uid: str):
+        """Look up a job in the catalog, raising 404 if there's none."""
+        job = catalog(self.rds_client).job(UUID(job_uid))
+        if not job:
+            raise HTTPException(
+                status_code=404, detail=f"Job with UID '{job_uid}' not found"
+            )
+        return job
+
+    @single_flight("list_jobs")
+    async def list_jobs(
+        self,
+        status: Optional[str] = None,
+        dataset: Optional[str] = None,
+        requester: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> dict[str, list[dict]]:
+        """List the jobs, newest first, in their camelCase output shape."""
         try:
-            jobs = self.rds_client.job.get_all()
-            return ListJobsResponse(jobs=jobs)
+            jobs = await run_in_threadpool(
+                lambda: catalog(self.rds_client).jobs(
+                    status, dataset, requester, limit, offset
+                )
+            )
+            return {"jobs": jobs}
         except Exception as e:
             logger.error(f"Error listing jobs: {e}")
             raise HTTPException(status_code=500, detail=str(e))
 
+    @single_flight("count_jobs")
+    async def count_jobs(
+        self, dataset: Optional[str] = None, requester: Optional[str] = None
+    ) -> dict:
+        """Number of jobs, in total and per status."""
+        try:
+            counts = await run_in_threadpool(
+                lambda: catalog(self.rds_client).job_counts(dataset, requester)
+            )
+            return {"total": sum(counts.values()), "status": counts}
+        except Exception as e:
+            logger.error(f"Error counting jobs: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+
     def _format_file_size(self, size_bytes: int) -> str:
         """Format file size with appropriate units consistently."""
         MB = 1024 * 1024
@@ -44,11 +93,7 @@ class JobService:
     async def get_job(self, job_uid: str):
         """Get detailed metadata for a specific job."""
         try:
-            job = self.rds_client.job.get(uid=UUID(job_uid))
-            if not job:
-                raise HTTPException(
-                    status_code=404, detail=f"Job with UID '{job_uid}' not found"
-                )
+            job = self._get_job(job_uid)
             return job
         except HTTPException:
             raise
@@ -56,14 +101,17 @@ class JobService:
             logger.error(f"Error getting job {job_uid}: {e}")
             raise HTTPException(status_code=500, detail=str(e))
 
+    @single_flight("get_job_code")
     async def get_job_code(self, job_uid: str) -> dict[str, dict[str, str]]:
         """Get the job code files and their contents."""
+        # Reads up to MAX_TOTAL_SIZE of file contents. Callers sharing the
+        # flight share its admission too.
+        async with admit(PREVIEWS, MAX_TOTAL_SIZE):
+            return await run_in_threadpool(self._read_job_code, job_uid)
+
+    def _read_job_code(self, job_uid: str) -> dict[str, dict[str, str]]:
         try:
-            job = self.rds_client.job.get(uid=UUID(job_uid))
-            if not job:
-                raise HTTPException(
-                    status_code=404, detail=f"Job with UID '{job_uid}' not found"
-                )
+            job = self._get_job(job_uid)
 
             code_dir = Path(job.user_code.local_dir)
             files = {}
@@ -111,60 +159,65 @@ class JobService:
             file_count = 0
 
             # Read all files (except ignored ones)
-            for file_path in code_dir.rglob("*"):
-                # Skip directories
-                if file_path.is_dir():
-                    continue
-
-                # Security: Validate file is within code directory (prevent path traversal)
-                try:
-                    file_path.resolve().relative_to(code_dir_resolved)
-                except ValueError:
-                    logger.warning(f"Path traversal attempt detected: {file_path}")
-                    continue
-
-                # Skip ignored paths
-                if should_ignore(file_path.relative_to(code_dir)):
-                    continue
-
-                # Check file count limit
-                file_count += 1
-                if file_count > MAX_FILE_COUNT:
-                    logger.warning(
-                        f"File count limit ({MAX_FILE_COUNT}) exceeded for job {job_uid}"
-                    )
-                    files["_limit_exceeded"] = (
-                        f"[Job contains too many files. Only first {MAX_FILE_COUNT} files shown]"
-                    )
-                    break
-
-                relative_path = file_path.relative_to(code_dir)
-                file_size = file_path.stat().st_size
-
-                # Check file size limit
-                if file_size > MAX_PREVIEW_SIZE:
-                    files[str(relative_path)] = (
-                        f"[File too large to preview: {self._format_file_size(file_size)}]"
-                    )
-                    continue
-
-                # Check total size limit
-                if total_size + file_size > MAX_TOTAL_SIZE:
-                    files[str(relative_path)] = "[Total preview size limit exceeded]"
-                    continue
-
-                try:
-                    # Try to read as text with explicit UTF-8 encoding
-                    content = file_path.read_text(encoding="utf-8", errors="replace")
-                    files[str(relative_path)] = content
-                    total_size += file_size
-                except UnicodeDecodeError:
-                    files[str(relative_path)] = "[Unable to decode file as UTF-8]"
-                    logger.debug(f"Unicode decode error for {file_path}")
-                except Exception as e:
-                    # Skip binary files or unreadable files
-                    files[str(relative_path)] = f"[Error reading file: {str(e)}]"
-                    logger.debug(f"Skipping {file_path}: {e}")
+            with FS_SCAN_DURATION.time(scan="job_code"):
+                for file_path in code_dir.rglob("*"):
+                    # Skip directories
+                    if file_path.is_dir():
+                        continue
+
+                    # Security: Validate file is within code directory (prevent path traversal)
+                    try:
+                        file_path.resolve().relative_to(code_dir_resolved)
+                    except ValueError:
+                        logger.warning(f"Path traversal attempt detected: {file_path}")
+                        continue
+
+                    # Skip ignored paths
+                    if should_ignore(file_path.relative_to(code_dir)):
+                        continue
+
+                    # Check file count limit
+                    file_count += 1
+                    if file_count > MAX_FILE_COUNT:
+                        logger.warning(
+                            f"File count limit ({MAX_FILE_COUNT}) exceeded for job {job_uid}"
+                        )
+                        files["_limit_exceeded"] = (
+                            f"[Job contains too many files. Only first {MAX_FILE_COUNT} files shown]"
+                        )
+                        break
+
+                    relative_path = file_path.relative_to(code_dir)
+                    file_size = file_path.stat().st_size
+
+                    # Check file size limit
+                    if file_size > MAX_PREVIEW_SIZE:
+                        files[str(relative_path)] = (
+                            f"[File too large to preview: {self._format_file_size(file_size)}]"
+                        )
+                        continue
+
+                    # Check total size limit
+                    if total_size + file_size > MAX_TOTAL_SIZE:
+                        files[str(relative_path)] = (
+                            "[Total preview size limit exceeded]"
+                        )
+                        continue
+
+                    try:
+                        # Try to read as text with explicit UTF-8 encoding
+                        content = file_path.read_text(
+                            encoding="utf-8", errors="replace"
+                        )
+                        files[str(relative_path)] = content
+                        total_size += file_size
+                    except UnicodeDecodeError:
+                        files[str(relative_path)] = "[Unable to decode file as UTF-8]"
+                        logger.debug(f"Unicode decode error for {file_path}")
+                    except Exception as e:
+                        # Skip binary files or unreadable files
+                        files[str(relative_path)] = f"[Error reading file: {str(e)}]"
+                        logger.debug(f"Skipping {file_path}: {e}")
 
             return {"code_dir": str(code_dir), "files": files}
         except HTTPException:
@@ -176,13 +229,10 @@ class JobService:
     async def approve(self, job_uid: str):
         """Approve a job request by its UID."""
         try:
-            job = self.rds_client.job.get(uid=UUID(job_uid))
-            if not job:
-                raise HTTPException(
-                    status_code=404, detail=f"Job with UID '{job_uid}' not found"
-                )
+            job = self._get_job(job_uid)
 
             self.rds_client.job.approve(job)
+            expect_changes()
             logger.info(f"Job {job_uid} approved.")
         except HTTPException:
             raise
@@ -193,13 +243,10 @@ class JobService:
     async def reject(self, job_uid: str):
         """Reject a job request by its UID."""
         try:
-            job = self.rds_client.job.get(uid=UUID(job_uid))
-            if not job:
-                raise HTTPException(
-                    status_code=404, detail=f"Job with UID '{job_uid}' not found"
-                )
+            job = self._get_job(job_uid)
 
             self.rds_client.job.reject(job)
+            expect_changes()
             logger.info(f"Job {job_uid} rejected.")
         except HTTPException:
             raise
@@ -207,31 +254,94 @@ class JobService:
             logger.error(f"Error rejecting job: {e}")
             raise HTTPException(status_code=500, detail=str(e))
 
-    async def run(self, job_uid: str) -> None:
-        """Run an approved job on private data."""
+    async def run(
+        self, job_uid: str, dataset_version: Optional[int] = None
+    ) -> Optional[int]:
+        """
+        Run an approved job on private data.
+
+        Pins the job to `dataset_version` of its dataset if given. Returns the
+        version the job runs on if it's pinned.
+        """
         try:
-            job = self.rds_client.job.get(uid=UUID(job_uid))
-            if not job:
-                raise HTTPException(
-                    status_code=404, detail=f"Job with UID '{job_uid}' not found"
-                )
+            job = self._get_job(job_uid)
 
-            # Run job in non-blocking mode (background)
-            self.rds_client.run_private(
-                job=job,
-                blocking=False,  # Run in background
-            )
+            version = await self._run_private(job, dataset_version)
             logger.info(f"Job {job_uid} started in background.")
+            return version
         except HTTPException:
             raise
         except Exception as e:
             logger.error(f"Error running job: {e}")
             raise HTTPException(status_code=500, detail=str(e))
 
+    async def _run_private(self, job, dataset_version: Optional[int]) -> Optional[int]:
+        """
+        Start a job on private data in the background, on the version of its
+        dataset it's pinned to, after pinning it to `dataset_version` if given.
+        Unpinned jobs run on the latest data. Returns the version if pinned.
+        """
+        root = versions_root(self.syftbox_client)
+        pin = job_pin(root, str(job.uid))
+        if dataset_version is not None:
+            dataset = job.dataset_name and catalog(self.rds_client).dataset(
+                name=job.dataset_name
+            )
+            if not dataset:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Job {job.uid} has no dataset to pin a version of",
+                )
+            pin = {"dataset_uid": str(dataset.uid), "version": dataset_version}
+
+        if pin is None:
+            self.rds_client.run_private(job=job, blocking=False)
+            expect_changes()
+            return None
+
+        if job.status == JobStatus.rejected:
+            raise HTTPException(status_code=400, detail="Cannot run a rejected job")
+        dataset = catalog(self.rds_client).dataset(uid=pin["dataset_uid"])
+        if not dataset:
+            raise HTTPException(
+                status_code=404,
+                detail=f"The dataset job {job.uid} is pinned to is gone",
+            )
+        data_path = await run_in_threadpool(
+            checkout, root, pin["dataset_uid"], pin["version"], dataset.private_path
+        )
+        if dataset_version is not None:
+            pin_job(root, str(job.uid), pin["dataset_uid"], dataset_version)
+
+        # `run_private` takes the data from the dataset's private directory,
+        # with no way to pass another one. So it's called on a copy of the
+        # client, sharing its job tracking, whose job config has the version's
+        # files as the data; everything else stays as syft_rds does it.
+        get_config = getattr(self.rds_client, "_get_config_for_job", None)
+        if not callable(get_config):
+            raise HTTPException(
+                status_code=501,
+                detail="This syft_rds version can't run jobs on a dataset version",
+            )
+
+        def config_for_job(*args, **kwargs):
+            job_config = get_config(*args, **kwargs)
+            job_config.data_path = data_path
+            return job_config
+
+        client = copy.copy(self.rds_client)
+        client._get_config_for_job = config_for_job
+        client.run_private(job=job, blocking=False)
+        expect_changes()
+        logger.debug(f"Job {job.uid} runs on dataset version {pin['version']}")
+        return pin["version"]
+
     async def get_logs(self, job_uid: str) -> dict[str, str]:
         """Get stdout and stderr logs for a job."""
         try:
-            return self.rds_client.job.get_logs(UUID(job_uid))
+            return self.rds_client.job.get_logs(self._get_job(job_uid))
+        except HTTPException:
+            raise
         except ValueError as e:
             # Logs don't exist yet (job not executed) or invalid UUID
             logger.warning(f"Logs not found for job {job_uid}: {e}")
@@ -243,10 +353,45 @@ class JobService:
             logger.error(f"Error getting logs for job {job_uid}: {e}")
             raise HTTPException(status_code=500, detail=str(e))
 
+    async def search_logs(
+        self,
+        query: str,
+        stream: Optional[str] = None,
+        job_uid: Optional[str] = None,
+        context: int = 2,
+        limit: int = 100,
+    ) -> Iterator[bytes]:
+        """Search the logs of all jobs, streaming the matching lines as JSON lines."""
+        if job_uid is not None:
+            try:
+                job_uid = str(UUID(job_uid))
+            except ValueError:
+                raise HTTPException(
+                    status_code=404, detail=f"Job with UID '{job_uid}' not found"
+                )
+        try:
+            index = log_index(self.rds_client)
+            results = index.search(query, stream, job_uid, context, limit)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        def lines() -> Iterator[bytes]:
+            try:
+                for result in results:
+                    yield pydantic_core.to_json(result) + b"\n"
+            except Exception as e:
+                # Too late for an error status, end the stream with the error
+                logger.error(f"Error searching logs for {query!r}: {e}")
+                yield pydantic_core.to_json({"error": str(e)}) + b"\n"
+
+        return lines()
+
     async def get_output_files(self, job_uid: str) -> dict[str, dict[str, str]]:
         """Get the job output files and their contents."""
         try:
-            return self.rds_client.job.get_output_dir(UUID(job_uid))
+            return self.rds_client.job.get_output_dir(self._get_job(job_uid))
+        except HTTPException:
+            raise
         except ValueError as e:
             # Output doesn't exist yet (job not executed) or invalid UUID
             logger.warning(f"Output not found for job {job_uid}: {e}")
@@ -258,14 +403,110 @@ class JobService:
             logger.error(f"Error getting output for job {job_uid}: {e}")
             raise HTTPException(status_code=500, detail=str(e))
 
+    def _get_output_dir(self, job_uid: str) -> Path:
+        """Resolve a job's output directory, raising 404 if it doesn't exist."""
+        try:
+            job = self._get_job(job_uid)
+        except ValueError:
+            raise HTTPException(
+                status_code=404, detail=f"Job with UID '{job_uid}' not found"
+            )
+
+        output_dir = (
+            self.rds_client.job._get_job_output_folder() / job.uid.hex / "output"
+        ).resolve()
+        if not output_dir.is_dir():
+            raise HTTPException(
+                status_code=404,
+                detail=f"Output not available for job {job_uid}. Job may not have been executed yet.",
+            )
+        return output_dir
+
+    def _list_output_files(self, output_dir: Path) -> list[Path]:
+        return sorted(path for path in output_dir.rglob("*") if path.is_file())
+
+    async def get_output_manifest(self, job_uid: str) -> dict:
+        """
+        List the job's output files with their sizes and mtimes.
+
+        `token` changes whenever a file is added, removed or modified, so
+        pollers can tell whether anything needs refetching.
+        """
+        try:
+            output_dir = self._get_output_dir(job_uid)
+            files = []
+            digest = hashlib.blake2b(digest_size=8)
+            with FS_SCAN_DURATION.time(scan="job_output"):
+                for path in self._list_output_files(output_dir):
+                    stat = path.stat()
+                    relative_path = path.relative_to(output_dir).as_posix()
+                    files.append(
+                        {
+                            "path": relative_path,
+                            "size": stat.st_size,
+                            "mtime": stat.st_mtime,
+                        }
+                    )
+                    digest.update(
+                        f"{relative_path}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode()
+                    )
+            return {
+                "output_dir": str(output_dir),
+                "token": digest.hexdigest(),
+                "files": files,
+            }
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting output manifest for job {job_uid}: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+    async def get_output_file(self, job_uid: str, file_path: str) -> Path:
+        """Resolve a single output file, refusing paths outside the output dir."""
+        output_dir = self._get_output_dir(job_uid)
+        path = (output_dir / file_path).resolve()
+        try:
+            path.relative_to(output_dir)
+        except ValueError:
+            logger.warning(f"Path traversal attempt detected: {file_path}")
+            raise HTTPException(status_code=404, detail="Output file not found")
+        if not path.is_file():
+            raise HTTPException(status_code=404, detail="Output file not found")
+        return path
+
+    async def get_output_preview(
+        self, job_uid: str, file_path: str, rows: int = DEFAULT_PREVIEW_ROWS
+    ) -> dict:
+        """Get a tabular preview (schema, first rows, row count) of an output file."""
+        path = await self.get_output_file(job_uid, file_path)
+        try:
+            # Row counting scans the whole file, keep it off the event loop
+            async with admit(PREVIEWS):
+                preview = await run_in_threadpool(preview_table, path, rows)
+            return {"path": file_path, **preview}
+        except HTTPException:
+            raise
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"Error previewing output file {file_path}: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+    async def get_output_archive(self, job_uid: str) -> Iterator[bytes]:
+        """Stream the job's whole output directory as a zip archive."""
+        output_dir = self._get_output_dir(job_uid)
+        return iter_zip(output_dir, self._list_output_files(output_dir))
+
     async def delete(self, job_uid: str) -> None:
         """Delete a job by its UID."""
         try:
             success = self.rds_client.job.delete(UUID(job_uid))
+            expect_changes()
             if not success:
                 raise HTTPException(
                     status_code=404, detail=f"Job with UID '{job_uid}' not found"
                 )
+            unpin_job(versions_root(self.syftbox_client), job_uid)
             logger.info(f"Job {job_uid} deleted.")
         except HTTPException:
             raise
@@ -277,23 +518,23 @@ class JobService:
         """Delete all jobs in the system."""
         try:
             deleted_count = self.rds_client.job.delete_all()
+            expect_changes()
             logger.info(f"Deleted {deleted_count} job(s).")
             return deleted_count
         except Exception as e:
             logger.error(f"Error deleting all jobs: {e}")
             raise HTTPException(status_code=500, detail=str(e))
 
-    async def rerun(self, job_uid: str) -> None:
+    async def rerun(
+        self, job_uid: str, dataset_version: Optional[int] = None
+    ) -> Optional[int]:
         """Rerun a finished or failed job.
 
-        This will re-approve the job if needed and run it again.
+        This will re-approve the job if needed and run it again, on the
+        dataset version it's pinned to (see `run`).
         """
         try:
-            job = self.rds_client.job.get(uid=UUID(job_uid))
-            if not job:
-                raise HTTPException(
-                    status_code=404, detail=f"Job with UID '{job_uid}' not found"
-                )
+            job = self._get_job(job_uid)
 
             # Check if job is in a rerunnable state (finished or failed)
             if job.status not in ["job_run_finished", "job_run_failed", "shared"]:
@@ -307,11 +548,9 @@ class JobService:
             # logger.info(f"Job {job_uid} re-approved for rerun.")
 
             # Run the job in non-blocking mode
-            self.rds_client.run_private(
-                job=job,
-                blocking=False,
-            )
+            version = await self._run_private(job, dataset_version)
             logger.info(f"Job {job_uid} restarted in background.")
+            return version
         except HTTPException:
             raise
         except Exception as e:
@@ -1,17 +1,30 @@
 from pathlib import Path
+import json
 import tempfile
+import time
 from typing import Optional
 
 from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
 from loguru import logger
-import requests
 from syft_rds.models import DatasetUpdate
 from syft_rds import RDSClient
 
+from ...admission import IMPORTS, admit, reserve
+from ...catalog import catalog
+from ...changes import expect_changes
 from ...lib.shopify import shopify_json_to_dataframe
+from ...metrics import SHOPIFY_FETCH_DURATION
 from ...models import Dataset as DatasetModel
+from ...dataset_tasks import DatasetTask, create_task, submit_task
+from ...profiles import schedule_profile
 from ...sources import ShopifySource, add_dataset_source, find_source
-from ...utils import get_auto_approve_list
+from ...staging import staging_root
+from ...versions import commit_version, versions_root
+from .dataset_service import generate_mock_files, register_dataset, write_readme
+
+# Shopify responses are read in chunks of this size to report progress
+FETCH_CHUNK_SIZE = 64 * 1024
 
 
 class ShopifyService:
@@ -22,9 +35,18 @@ class ShopifyService:
         self.syftbox_client = rds_client._syftbox_client
 
     async def create_dataset_from_shopify(
-        self, url: str, name: str, pat: str, description: Optional[str] = None
-    ) -> DatasetModel:
-        """Create a dataset by importing data from Shopify."""
+        self,
+        url: str,
+        name: str,
+        pat: str,
+        description: Optional[str] = None,
+        mock_rows: Optional[int] = None,
+    ) -> dict:
+        """
+        Start importing data from Shopify as a new dataset.
+
+        The import runs in the background; returns the task's snapshot.
+        """
 
         # check if dataset name already exists
         for dataset in self.rds_client.datasets:
@@ -38,50 +60,65 @@ class ShopifyService:
                     },
                 )
 
-        # Download data from Shopify
-        products_json = await self._fetch_shopify_products(url, pat)
-        dataset_df = shopify_json_to_dataframe(products_json)
+        def build(task: DatasetTask) -> dict:
+            # Download data from Shopify
+            products_json = self._fetch_shopify_products(url, pat, task)
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Save real dataset
-            real_path = Path(temp_dir) / "real"
-            real_path.mkdir(parents=True, exist_ok=True)
+            task.set_phase("staging")
+            dataset_df = shopify_json_to_dataframe(products_json)
+            real_path = task.work_dir / "real"
+            real_path.mkdir()
             real_dataset_path = real_path / "shopify.csv"
             real_dataset_path.write_text(dataset_df.to_csv())
             logger.debug(f"Shopify dataset temporarily saved to: {real_dataset_path}")
+            readme_path = write_readme(task.work_dir, description)
 
-            # Create mock dataset
-            mock_path = Path(temp_dir) / "mock"
-            mock_path.mkdir(parents=True, exist_ok=True)
-            mock_dataset_path = mock_path / "shopify.csv"
-            await self._download_mock_dataset(mock_dataset_path)
-
-            # Create README.md with description if provided
-            readme_path = Path(temp_dir) / "README.md"
-            if description:
-                readme_path.write_text(description)
-            else:
-                readme_path.touch()  # Create empty README.md
-
-            # Create dataset
-            dataset = self.rds_client.dataset.create(
+            # Create a mock with the same columns as the imported data
+            mock_path = task.work_dir / "mock"
+            mock_path.mkdir()
+            generate_mock_files(real_path, mock_path, task, mock_rows)
+
+            dataset = register_dataset(
+                self.rds_client,
+                task,
                 name=name,
                 summary=description or f"Shopify data from {url}",
                 path=real_path,
                 mock_path=mock_path,
                 description_path=readme_path,
-                auto_approval=get_auto_approve_list(self.syftbox_client),
             )
-
             logger.debug(f"Shopify dataset created: {dataset}")
 
             # Store Shopify source information
             add_dataset_source(str(dataset.uid), ShopifySource(store_url=url, pat=pat))
 
-            return DatasetModel.model_validate(dataset)
+            return DatasetModel.model_validate(dataset).model_dump(
+                mode="json", by_alias=True
+            )
+
+        # The import holds its place until the background work is done
+        release = await reserve(IMPORTS)
+
+        def run(task: DatasetTask) -> dict:
+            try:
+                return build(task)
+            finally:
+                release()
 
-    async def sync_dataset(self, dataset_uid: str) -> DatasetModel:
-        """Sync a Shopify datset with the most recent store data."""
+        try:
+            task = create_task("shopify", name, staging_root(self.syftbox_client))
+            return submit_task(task, run)
+        except BaseException:
+            release()
+            raise
+
+    async def sync_dataset(self, dataset_uid: str) -> dict:
+        """
+        Sync a Shopify datset with the most recent store data.
+
+        The new data is recorded as a new version of the dataset; returns the
+        dataset and that version, which is None if nothing changed.
+        """
         try:
             source = find_source(dataset_uid)
             if not source or not isinstance(source, ShopifySource):
@@ -89,26 +126,51 @@ class ShopifyService:
                     status_code=400,
                     detail="Dataset does not have associated Shopify source info",
                 )
-
-            # Fetch latest data from Shopify
-            products_json = await self._fetch_shopify_products(
-                source.store_url, source.pat
-            )
-            dataset_df = shopify_json_to_dataframe(products_json)
-
-            with tempfile.TemporaryDirectory() as temp_dir:
-                real_path = Path(temp_dir) / "real"
-                real_path.mkdir(parents=True, exist_ok=True)
-                real_dataset_path = real_path / "shopify.csv"
-                real_dataset_path.write_text(dataset_df.to_csv())
-
-                # Update the dataset
-
-                dataset = self.rds_client.dataset.update(
-                    DatasetUpdate(uid=dataset_uid, path=str(real_path)),
+            dataset = catalog(self.rds_client).dataset(uid=dataset_uid)
+            if dataset is None:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Dataset with UID '{dataset_uid}' not found",
                 )
 
-                return dataset
+            async with admit(IMPORTS):
+                # Fetch latest data from Shopify
+                products_json = await run_in_threadpool(
+                    self._fetch_shopify_products, source.store_url, source.pat
+                )
+                dataset_df = shopify_json_to_dataframe(products_json)
+
+                # Staged next to the workspace, so the update moves it into place
+                with tempfile.TemporaryDirectory(
+                    dir=staging_root(self.syftbox_client)
+                ) as temp_dir:
+                    real_path = Path(temp_dir) / "real"
+                    real_path.mkdir(parents=True, exist_ok=True)
+                    real_dataset_path = real_path / "shopify.csv"
+                    real_dataset_path.write_text(dataset_df.to_csv())
+
+                    def update() -> Path:
+                        nonlocal dataset
+                        dataset = self.rds_client.dataset.update(
+                            DatasetUpdate(uid=dataset_uid, path=str(real_path)),
+                        )
+                        expect_changes()
+                        return dataset.private_path
+
+                    # Skips the update if the store data didn't change
+                    version = await run_in_threadpool(
+                        commit_version,
+                        versions_root(self.syftbox_client),
+                        str(dataset.uid),
+                        dataset.private_path,
+                        real_path,
+                        update,
+                        "shopify_sync",
+                    )
+                    if version is not None:
+                        schedule_profile(str(dataset.uid), dataset.private_path)
+
+                    return {"dataset": dataset, "version": version}
 
         except HTTPException:
             raise
@@ -116,36 +178,43 @@ class ShopifyService:
             logger.error(f"Error syncing Shopify dataset: {e}")
             raise HTTPException(status_code=500, detail=str(e))
 
-    async def _fetch_shopify_products(self, store_url: str, pat: str) -> dict:
-        """Fetch products from Shopify API."""
+    def _fetch_shopify_products(
+        self, store_url: str, pat: str, task: Optional[DatasetTask] = None
+    ) -> dict:
+        """Fetch products from Shopify API, reporting the download on `task`."""
+        import requests  # deferred: slow to import and only needed here
+
         headers = {
             "X-Shopify-Access-Token": pat,
             "Content-Type": "application/json",
         }
 
+        start = time.perf_counter()
         try:
             response = requests.get(
-                f"{store_url}/admin/api/2024-01/products.json", headers=headers
+                f"{store_url}/admin/api/2024-01/products.json",
+                headers=headers,
+                stream=True,
             )
             response.raise_for_status()
-            return response.json()
+            if task is not None:
+                # The length is of the encoded body, only usable if it's not compressed
+                length = response.headers.get("Content-Length")
+                encoded = response.headers.get("Content-Encoding")
+                task.set_phase(
+                    "receiving", int(length) if length and not encoded else None
+                )
+            body = bytearray()
+            for chunk in response.iter_content(FETCH_CHUNK_SIZE):
+                body += chunk
+                if task is not None:
+                    task.advance(len(chunk))
+            products = json.loads(body)
+            SHOPIFY_FETCH_DURATION.observe(time.perf_counter() - start, outcome="ok")
+            return products
         except requests.RequestException as e:
+            SHOPIFY_FETCH_DURATION.observe(time.perf_counter() - start, outcome="error")
             logger.error(f"Failed to fetch Shopify products: {e}")
             raise HTTPException(
                 status_code=400, detail=f"Failed to fetch data from Shopify: {str(e)}"
             )
-
-    async def _download_mock_dataset(self, mock_dataset_path: Path) -> None:
-        """Download mock dataset from GitHub."""
-        github_csv_url = "https://raw.githubusercontent.com/OpenMined/datasets/refs/heads/main/enclave/organic-coop/data/part_1/crop_stock_mock_1.csv"
-        try:
-            response = requests.get(github_csv_url)
-            response.raise_for_status()
-            mock_dataset_path.write_bytes(response.content)
-            logger.debug(f"Mock dataset downloaded to: {mock_dataset_path}")
-        except Exception as e:
-            logger.error(f"Failed to download mock dataset: {e}")
-            raise HTTPException(
-                status_code=400,
-                detail=f"Failed to download mock dataset: {e}",
-            )
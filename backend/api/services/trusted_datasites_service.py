@@ -8,6 +8,8 @@ from loguru import logger
 from syft_rds.models import DatasetUpdate
 from syft_rds import RDSClient
 
+from ...catalog import catalog
+from ...changes import expect_changes
 from ...models import ListAutoApproveResponse
 from ...utils import (
     get_auto_approve_file_path,
@@ -26,9 +28,7 @@ class TrustedDatasitesService:
     async def set_auto_approved_datasites(self, datasites: List[str]) -> JSONResponse:
         """Set the list of auto-approved datasites."""
         # Create a lock file for thread safety
-        lock_file_path = get_auto_approve_file_path(self.syftbox_client).with_suffix(
-            ".lock"
-        )
+        lock_file_path = get_auto_approve_file_path().with_suffix(".lock")
         file_lock = FileLock(str(lock_file_path))
 
         try:
@@ -39,7 +39,7 @@ class TrustedDatasitesService:
                 ]
 
                 # Save the new auto-approve list
-                save_auto_approve_list(self.syftbox_client, datasites)
+                save_auto_approve_list(datasites)
 
                 # Update all existing datasets with the new auto-approve list
                 await self._update_datasets_auto_approval(datasites)
@@ -59,7 +59,7 @@ class TrustedDatasitesService:
     async def get_auto_approved_datasites(self) -> ListAutoApproveResponse:
         """Get the current list of auto-approved datasites."""
         try:
-            auto_approved_datasites = get_auto_approve_list(self.syftbox_client)
+            auto_approved_datasites = get_auto_approve_list()
             return ListAutoApproveResponse(datasites=auto_approved_datasites)
         except Exception as e:
             logger.error(f"Error getting auto-approve list: {e}")
@@ -67,7 +67,7 @@ class TrustedDatasitesService:
 
     async def _update_datasets_auto_approval(self, datasites: List[str]) -> None:
         """Update all datasets with new auto-approval list."""
-        datasets = self.rds_client.dataset.get_all()
+        datasets = catalog(self.rds_client).datasets()
 
         for dataset in datasets:
             try:
@@ -85,3 +85,4 @@ class TrustedDatasitesService:
                 logger.error(
                     f"Failed to update dataset {dataset.name} with auto-approval: {e}"
                 )
+        expect_changes()
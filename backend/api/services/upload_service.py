@@ -0,0 +1,115 @@
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from loguru import logger
+from syft_rds import RDSClient
+
+from ...admission import UPLOADS, admit
+from ...uploads import (
+    CHUNK_SIZE,
+    create_session,
+    delete_session,
+    finalize_session,
+    session_status,
+    uploads_root,
+    write_chunk,
+)
+from .dataset_service import DatasetService
+
+
+class UploadService:
+    """Service class for resumable chunked uploads of dataset files."""
+
+    def __init__(self, rds_client: RDSClient):
+        self.rds_client = rds_client
+        self.syftbox_client = rds_client._syftbox_client
+
+    @property
+    def root(self):
+        return uploads_root(self.syftbox_client)
+
+    async def create_upload(self, files: list[dict]) -> dict:
+        """Open an upload session; files already on the server are skipped."""
+        try:
+            return await run_in_threadpool(create_session, self.root, files)
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error creating upload: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+    async def get_upload(self, upload_id: str) -> dict:
+        """Get an upload's files and the offsets to resume them from."""
+        return await run_in_threadpool(session_status, self.root, upload_id)
+
+    async def put_chunk(
+        self,
+        upload_id: str,
+        index: int,
+        offset: int,
+        body: AsyncIterator[bytes],
+        sha256: str,
+        size: Optional[int] = None,
+    ) -> dict:
+        """
+        Store a chunk of a file, read from the request `body` of `size` bytes
+        if known, and return the next offset.
+        """
+        if size is not None and size > CHUNK_SIZE:
+            raise HTTPException(
+                status_code=413, detail=f"Chunks are at most {CHUNK_SIZE} bytes"
+            )
+        limit = CHUNK_SIZE if size is None else size
+        try:
+            # The chunk is held in memory, claim the most it can be up front
+            async with admit(UPLOADS, limit) as reservation:
+                data = bytearray()
+                async for part in body:
+                    data += part
+                    if len(data) > limit:
+                        raise HTTPException(
+                            status_code=413,
+                            detail=f"Chunks are at most {limit} bytes",
+                        )
+                reservation.shrink(len(data))
+                next_offset = await run_in_threadpool(
+                    write_chunk,
+                    self.root,
+                    upload_id,
+                    index,
+                    offset,
+                    bytes(data),
+                    sha256,
+                )
+            return {"index": index, "offset": next_offset}
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error storing chunk of upload {upload_id}: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+    async def finalize_upload(
+        self,
+        upload_id: str,
+        name: str,
+        description: str,
+        mock_rows: Optional[int] = None,
+    ) -> dict:
+        """Create a dataset from a complete upload; returns the task's snapshot."""
+        try:
+            files = await run_in_threadpool(finalize_session, self.root, upload_id)
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error finalizing upload {upload_id}: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+        return await DatasetService(self.rds_client).create_dataset_from_blobs(
+            files, name=name, description=description, mock_rows=mock_rows
+        )
+
+    async def delete_upload(self, upload_id: str) -> dict:
+        """Abandon an upload and drop its received chunks."""
+        await run_in_threadpool(delete_session, self.root, upload_id)
+        return {"message": f"Upload {upload_id} deleted"}
@@ -0,0 +1,373 @@
+"""
+SQLite index of the RDS job and dataset records.
+
+syft_rds keeps one YAML file per record and answers every lookup, even by
+UID, by parsing all of them. The catalog mirrors the records into a local
+SQLite database (in WAL mode) with the columns the dashboard filters and
+sorts on indexed, next to each record's JSON and, for jobs, their API output.
+
+Each row remembers the mtime and size of the file it was read from. A refresh
+stats the record files and only reads those that were added or changed,
+dropping the rows of the ones that are gone; looking up a single record only
+checks its own file. While the change feed watches the record directories,
+a refresh is skipped altogether if nothing changed since. The database is a cache: if it's missing, from another
+schema version or corrupted, it's deleted and rebuilt from the records.
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional, Union
+from uuid import UUID
+
+import pydantic_core
+import yaml
+from loguru import logger
+from pydantic import BaseModel
+from syft_core import Client
+from syft_rds.models import Dataset as SyftDataset, Job as SyftJob
+
+from .changes import generation
+from .lib.sqlite_cache import SQLiteCache
+from .models import Job as JobModel, dump_camel
+
+CATALOG_FILE = "rds-dashboard-catalog.sqlite3"
+# Bump when the schema or what's stored in it changes; older files are rebuilt
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE jobs (
+    uid TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    dataset_name TEXT,
+    created_by TEXT,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    record TEXT NOT NULL,
+    output TEXT NOT NULL
+);
+CREATE INDEX jobs_created_at ON jobs (created_at);
+CREATE INDEX jobs_status ON jobs (status, created_at);
+CREATE INDEX jobs_dataset ON jobs (dataset_name, created_at);
+CREATE INDEX jobs_requester ON jobs (created_by, created_at);
+
+CREATE TABLE datasets (
+    uid TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    record TEXT NOT NULL
+);
+CREATE INDEX datasets_name ON datasets (name);
+CREATE INDEX datasets_created_at ON datasets (created_at);
+"""
+
+# libyaml's loader if available, it's much faster
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_catalogs: dict[Path, "Catalog"] = {}
+_catalogs_lock = threading.Lock()
+
+
+def _job_row(job: SyftJob) -> dict:
+    return {
+        "name": job.name,
+        "dataset_name": job.dataset_name,
+        "created_by": job.created_by,
+        "status": job.status.value,
+        "created_at": job.created_at.timestamp(),
+        "updated_at": job.updated_at.timestamp(),
+        "record": job.model_dump_json(),
+        "output": pydantic_core.to_json(dump_camel(job, JobModel)).decode(),
+    }
+
+
+def _dataset_row(dataset: SyftDataset) -> dict:
+    return {
+        "name": dataset.name,
+        "created_at": dataset.created_at.timestamp(),
+        "updated_at": dataset.updated_at.timestamp(),
+        "record": dataset.model_dump_json(),
+    }
+
+
+@dataclass(frozen=True)
+class _Table:
+    name: str
+    model: type[BaseModel]
+    to_row: Callable[[BaseModel], dict]
+
+
+_JOBS = _Table("jobs", SyftJob, _job_row)
+_DATASETS = _Table("datasets", SyftDataset, _dataset_row)
+
+Stamp = tuple[int, int]
+
+
+class Catalog(SQLiteCache):
+    """Index of one RDS store's jobs and datasets."""
+
+    SCHEMA = _SCHEMA
+    SCHEMA_VERSION = SCHEMA_VERSION
+
+    def __init__(self, path: Path, jobs_dir: Path, datasets_dir: Path):
+        self.client_id: Optional[UUID] = None
+        self._dirs = {_JOBS.name: jobs_dir, _DATASETS.name: datasets_dir}
+        # Change generation of each table's directory as of its last refresh
+        self._generations: dict[str, Optional[int]] = {}
+        super().__init__(path)
+
+    def _reset(self) -> None:
+        self._generations.clear()
+
+    # Keeping up with the records
+
+    def _stamps(self, table: _Table) -> dict[str, Stamp]:
+        """The mtime and size of each record file of `table`."""
+        stamps = {}
+        try:
+            with os.scandir(self._dirs[table.name]) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(".yaml"):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    stamps[entry.name[: -len(".yaml")]] = (
+                        stat.st_mtime_ns,
+                        stat.st_size,
+                    )
+        except FileNotFoundError:
+            pass
+        return stamps
+
+    def _read(self, table: _Table, uid: str) -> Optional[BaseModel]:
+        path = self._dirs[table.name] / f"{uid}.yaml"
+        try:
+            return table.model.model_validate(
+                yaml.load(path.read_text(), Loader=_Loader)
+            )
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            # Possibly caught halfway through being written, the next refresh
+            # will see it again since its stamp changes once it's done
+            logger.warning(f"Skipping unreadable record {path}: {e}")
+            return None
+
+    def _upsert(self, table: _Table, uid: str, stamp: Stamp) -> None:
+        item = self._read(table, uid)
+        if item is None:
+            return
+        row = {"uid": uid, "mtime_ns": stamp[0], "size": stamp[1]}
+        row.update(table.to_row(item))
+        columns = ", ".join(row)
+        placeholders = ", ".join(f":{column}" for column in row)
+        self._db.execute(
+            f"INSERT OR REPLACE INTO {table.name} ({columns}) VALUES ({placeholders})",
+            row,
+        )
+
+    def _refresh_table(self, table: _Table) -> tuple[int, int]:
+        # Nothing to look at if the change feed saw no change since last time
+        current = generation(self._dirs[table.name])
+        if current is not None and self._generations.get(table.name) == current:
+            return 0, 0
+
+        stamps = self._stamps(table)
+        known = {
+            uid: (mtime_ns, size)
+            for uid, mtime_ns, size in self._db.execute(
+                f"SELECT uid, mtime_ns, size FROM {table.name}"
+            )
+        }
+        removed = known.keys() - stamps.keys()
+        changed = [uid for uid, stamp in stamps.items() if known.get(uid) != stamp]
+        if removed or changed:
+            with self._db:
+                self._db.executemany(
+                    f"DELETE FROM {table.name} WHERE uid = ?",
+                    [(uid,) for uid in removed],
+                )
+                for uid in changed:
+                    self._upsert(table, uid, stamps[uid])
+        self._generations[table.name] = current
+        return len(changed), len(removed)
+
+    def _refresh_row(self, table: _Table, uid: str) -> None:
+        """Bring the row of a single record up to date."""
+        try:
+            stat = (self._dirs[table.name] / f"{uid}.yaml").stat()
+        except FileNotFoundError:
+            with self._db:
+                self._db.execute(f"DELETE FROM {table.name} WHERE uid = ?", (uid,))
+            return
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        known = self._db.execute(
+            f"SELECT mtime_ns, size FROM {table.name} WHERE uid = ?", (uid,)
+        ).fetchone()
+        if known != stamp:
+            with self._db:
+                self._upsert(table, uid, stamp)
+
+    def refresh(self) -> None:
+        """Take in the records added, changed or removed since last time."""
+
+        def operation():
+            for table in (_JOBS, _DATASETS):
+                changed, removed = self._refresh_table(table)
+                if changed or removed:
+                    logger.debug(
+                        f"Catalog: {changed} {table.name} updated, {removed} removed"
+                    )
+
+        self._run(operation)
+
+    # Reads
+
+    def _hydrate(self, table: _Table, record: Optional[str]):
+        if record is None:
+            return None
+        item = table.model.model_validate_json(record)
+        if self.client_id is not None:
+            item._register_client_id_recursive(self.client_id)
+        return item
+
+    def job(self, uid: Union[str, UUID]) -> Optional[SyftJob]:
+        """The job with this UID, or None."""
+        uid = str(uid)
+
+        def operation():
+            self._refresh_row(_JOBS, uid)
+            row = self._db.execute(
+                "SELECT record FROM jobs WHERE uid = ?", (uid,)
+            ).fetchone()
+            return row and row[0]
+
+        return self._hydrate(_JOBS, self._run(operation))
+
+    def jobs(
+        self,
+        status: Optional[str] = None,
+        dataset: Optional[str] = None,
+        requester: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> list[dict]:
+        """The jobs' API output, newest first, filtered on the given columns."""
+        where, params = self._job_filters(status, dataset, requester)
+        query = f"SELECT output FROM jobs{where} ORDER BY created_at DESC"
+        if limit is not None or offset:
+            query += " LIMIT ? OFFSET ?"
+            params += [-1 if limit is None else limit, offset]
+
+        def operation():
+            self._refresh_table(_JOBS)
+            return [output for (output,) in self._db.execute(query, params)]
+
+        rows = self._run(operation)
+        # One parse of the whole list is much faster than one per job
+        jobs = pydantic_core.from_json("[" + ",".join(rows) + "]")
+        # Stored before any client was registered on them, as for `_hydrate`
+        client_id = self.client_id and str(self.client_id)
+        for job in jobs:
+            job["clientId"] = client_id
+        return jobs
+
+    def job_counts(
+        self, dataset: Optional[str] = None, requester: Optional[str] = None
+    ) -> dict[str, int]:
+        """Number of jobs per status."""
+        where, params = self._job_filters(None, dataset, requester)
+
+        def operation():
+            self._refresh_table(_JOBS)
+            return dict(
+                self._db.execute(
+                    f"SELECT status, COUNT(*) FROM jobs{where} GROUP BY status",
+                    params,
+                )
+            )
+
+        return self._run(operation)
+
+    @staticmethod
+    def _job_filters(
+        status: Optional[str], dataset: Optional[str], requester: Optional[str]
+    ) -> tuple[str, list]:
+        clauses, params = [], []
+        for column, value in (
+            ("status", status),
+            ("dataset_name", dataset),
+            ("created_by", requester),
+        ):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def dataset(
+        self, uid: Union[str, UUID, None] = None, name: Optional[str] = None
+    ) -> Optional[SyftDataset]:
+        """The dataset with this UID or name, or None."""
+
+        def operation():
+            if uid is not None:
+                self._refresh_row(_DATASETS, str(uid))
+                row = self._db.execute(
+                    "SELECT record FROM datasets WHERE uid = ?", (str(uid),)
+                ).fetchone()
+            else:
+                # A dataset may have been renamed or created under this name
+                self._refresh_table(_DATASETS)
+                row = self._db.execute(
+                    "SELECT record FROM datasets WHERE name = ?", (name,)
+                ).fetchone()
+            return row and row[0]
+
+        return self._hydrate(_DATASETS, self._run(operation))
+
+    def datasets(self) -> list[SyftDataset]:
+        """All datasets, newest first."""
+
+        def operation():
+            self._refresh_table(_DATASETS)
+            return [
+                record
+                for (record,) in self._db.execute(
+                    "SELECT record FROM datasets ORDER BY created_at DESC"
+                )
+            ]
+
+        return [self._hydrate(_DATASETS, record) for record in self._run(operation)]
+
+
+def catalog(rds_client) -> Catalog:
+    """The catalog of the client's RDS store, built on first use."""
+    stores = rds_client.job.local_store
+    jobs_dir = Path(stores.job.store.item_type_dir)
+    with _catalogs_lock:
+        if jobs_dir not in _catalogs:
+            syftbox_client: Client = rds_client._syftbox_client
+            path = syftbox_client.config.data_dir.parent / ".syftbox" / CATALOG_FILE
+            path.parent.mkdir(parents=True, exist_ok=True)
+            start = time.perf_counter()
+            _catalogs[jobs_dir] = index = Catalog(
+                path, jobs_dir, Path(stores.dataset.store.item_type_dir)
+            )
+            index.refresh()
+            logger.debug(
+                f"Catalog of {jobs_dir.parent} ready in "
+                f"{time.perf_counter() - start:.2f}s"
+            )
+        index = _catalogs[jobs_dir]
+    index.client_id = rds_client.uid
+    return index
@@ -0,0 +1,348 @@
+"""
+Change feed of the SyftBox workspace.
+
+Watches the paths the dashboard keeps derived state about (dataset files, the
+RDS job and dataset records, job logs and outputs, its own config files) and
+publishes what changed on an in-process bus. Watching uses the OS's file
+change notifications (inotify on Linux) through watchdog, and falls back to
+polling mtimes for paths that can't be watched that way, e.g. once the inotify
+watch limit is reached.
+
+Changes are published per topic, coalesced: an event goes out once its topic
+has been quiet for DEBOUNCE seconds (or MAX_DELAY after its first change, so
+a steady trickle still gets through) and carries every path that changed in
+the meantime.
+
+Caches that only need to know *whether* something changed can skip the wait:
+`generation(path)` counts the changes seen under a watched path as they come
+in. It's None when nothing precise is known (the feed isn't running, the path
+is only polled, or its watcher died), in which case callers check for
+themselves as before. Notifications can still be lost without a trace (the
+kernel's event queue overflowing, or a new subdirectory that couldn't be
+watched), so a generation is trusted for RESCAN_INTERVAL at most: it moves
+on by itself after that, and callers check again. The dashboard's own writes
+may not have come through yet when the next request comes in, so writers
+call `expect_changes()` to have the next reads check again too.
+"""
+
+import asyncio
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Callable, Optional
+
+from loguru import logger
+from watchdog.events import FileSystemEvent, FileSystemEventHandler
+from watchdog.observers import Observer
+from watchdog.observers.api import ObservedWatch
+from watchdog.observers.polling import PollingObserver
+
+from .context import get_syftbox_context
+
+# Topics
+DATASET_FILES = "dataset_files"
+DATASET_RECORDS = "dataset_records"
+JOB_RECORDS = "job_records"
+JOB_OUTPUTS = "job_outputs"
+SOURCES = "sources"
+AUTO_APPROVE = "auto_approve"
+
+DEBOUNCE = 0.1
+MAX_DELAY = 1.0
+POLL_INTERVAL = 2.0
+# Longest a generation is trusted without a change
+RESCAN_INTERVAL = 5.0
+
+# Reading a file isn't a change
+_IGNORED_EVENTS = {"opened", "closed_no_write"}
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    topic: str
+    paths: frozenset[Path]
+
+
+class ChangeBus:
+    """Delivers change events to the callbacks subscribed to their topic."""
+
+    def __init__(self):
+        self._subscribers: dict[str, list[Callable[[ChangeEvent], None]]] = defaultdict(
+            list
+        )
+        self._lock = threading.Lock()
+
+    def subscribe(
+        self, topic: str, callback: Callable[[ChangeEvent], None]
+    ) -> Callable[[], None]:
+        """
+        Call `callback` with each event of `topic` ("*" for all of them).
+        Callbacks run on the feed's thread and should return quickly.
+        Returns a function that unsubscribes again.
+        """
+        with self._lock:
+            self._subscribers[topic].append(callback)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if callback in self._subscribers[topic]:
+                    self._subscribers[topic].remove(callback)
+
+        return unsubscribe
+
+    def publish(self, event: ChangeEvent) -> None:
+        with self._lock:
+            callbacks = self._subscribers[event.topic] + self._subscribers["*"]
+        for callback in callbacks:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"Change subscriber failed on {event.topic}: {e}")
+
+    async def stream(self, *topics: str) -> AsyncIterator[ChangeEvent]:
+        """Iterate over the events of `topics` as they're published."""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue[ChangeEvent] = asyncio.Queue()
+        unsubscribes = [
+            self.subscribe(
+                topic, lambda event: loop.call_soon_threadsafe(queue.put_nowait, event)
+            )
+            for topic in topics or ("*",)
+        ]
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            for unsubscribe in unsubscribes:
+                unsubscribe()
+
+
+@dataclass
+class _Watch:
+    topic: str
+    path: Path
+    recursive: bool
+    # Watching a single file means watching its directory for its name
+    file: bool
+    native: bool = False
+    generation: int = 0
+    # Until when (monotonic) the generation is trusted
+    trusted_until: float = 0.0
+    observed: Optional[ObservedWatch] = None
+
+    def matches(self, path: str) -> bool:
+        return not self.file or path == str(self.path)
+
+
+class _Handler(FileSystemEventHandler):
+    def __init__(self, feed: "ChangeFeed", watch: _Watch):
+        self.feed = feed
+        self.watch = watch
+
+    def on_any_event(self, event: FileSystemEvent) -> None:
+        if event.event_type in _IGNORED_EVENTS:
+            return
+        paths = [
+            path
+            for path in (event.src_path, event.dest_path)
+            if path and self.watch.matches(path)
+        ]
+        if paths:
+            self.feed._note(self.watch, paths)
+
+
+class ChangeFeed:
+    """Watches paths and publishes their coalesced changes on `bus`."""
+
+    def __init__(self, bus: ChangeBus, poll_interval: float = POLL_INTERVAL):
+        self.bus = bus
+        self._watches: dict[Path, _Watch] = {}
+        self._observer = Observer()
+        self._poller = PollingObserver(timeout=poll_interval)
+        self._cond = threading.Condition()
+        # Topic -> (changed paths, time of first change, time of last change)
+        self._pending: dict[str, tuple[set[Path], float, float]] = {}
+        self._stopped = False
+        self._dispatcher = threading.Thread(
+            target=self._dispatch, name="change-feed", daemon=True
+        )
+
+    def start(self) -> None:
+        self._observer.start()
+        self._poller.start()
+        self._dispatcher.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        for observer in (self._observer, self._poller):
+            observer.stop()
+            observer.join()
+        self._dispatcher.join()
+
+    def watch(self, topic: str, path: Path, recursive: bool = False) -> None:
+        """Publish the changes in the directory `path` on `topic`, creating it."""
+        path.mkdir(parents=True, exist_ok=True)
+        self._schedule(_Watch(topic, path, recursive, file=False), path)
+
+    def watch_file(self, topic: str, path: Path) -> None:
+        """Publish the changes to the file `path`, which may not exist yet."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._schedule(_Watch(topic, path, recursive=False, file=True), path.parent)
+
+    def _schedule(self, watch: _Watch, directory: Path) -> None:
+        handler = _Handler(self, watch)
+        try:
+            watch.observed = self._observer.schedule(
+                handler, str(directory), recursive=watch.recursive
+            )
+            watch.native = True
+        except OSError as e:
+            logger.warning(f"Can't watch {directory} ({e}), polling it instead")
+            self._poller.schedule(handler, str(directory), recursive=watch.recursive)
+        self._watches[watch.path] = watch
+
+    def generation(self, path: Path) -> Optional[int]:
+        """
+        Number of changes seen so far under the watched `path`, moved on at
+        least every RESCAN_INTERVAL, or None if it isn't watched natively.
+        """
+        watch = self._watches.get(path)
+        if watch is None or not watch.native or not self._watching(watch):
+            return None
+        now = time.monotonic()
+        with self._cond:
+            if now >= watch.trusted_until:
+                watch.generation += 1
+                watch.trusted_until = now + RESCAN_INTERVAL
+            return watch.generation
+
+    def _watching(self, watch: _Watch) -> bool:
+        """Whether the thread reading the watch's notifications is still running."""
+        if not self._observer.is_alive():
+            return False
+        return any(
+            emitter.watch == watch.observed and emitter.is_alive()
+            for emitter in self._observer.emitters
+        )
+
+    def expect_changes(self) -> None:
+        """Move every generation on, see `expect_changes`."""
+        with self._cond:
+            for watch in self._watches.values():
+                watch.generation += 1
+
+    def _note(self, watch: _Watch, paths: list[str]) -> None:
+        now = time.monotonic()
+        with self._cond:
+            watch.generation += 1
+            changed, first, _ = self._pending.get(watch.topic, (set(), now, now))
+            changed.update(Path(path) for path in paths)
+            self._pending[watch.topic] = (changed, first, now)
+            self._cond.notify()
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    now = time.monotonic()
+                    due = [
+                        topic
+                        for topic, (_, first, last) in self._pending.items()
+                        if now - last >= DEBOUNCE or now - first >= MAX_DELAY
+                    ]
+                    if due:
+                        break
+                    timeout = min(
+                        (
+                            min(last + DEBOUNCE, first + MAX_DELAY) - now
+                            for _, first, last in self._pending.values()
+                        ),
+                        default=None,
+                    )
+                    self._cond.wait(timeout)
+                if self._stopped:
+                    return
+                events = [
+                    ChangeEvent(topic, frozenset(self._pending.pop(topic)[0]))
+                    for topic in due
+                ]
+            for event in events:
+                self.bus.publish(event)
+
+
+bus = ChangeBus()
+_feed: Optional[ChangeFeed] = None
+_feed_client = None
+_feed_lock = threading.Lock()
+
+
+def generation(path: Path) -> Optional[int]:
+    """See `ChangeFeed.generation`; None while the feed isn't running."""
+    feed = _feed
+    return feed.generation(path) if feed is not None else None
+
+
+def expect_changes() -> None:
+    """
+    Have the next `generation` calls report a change, after the dashboard
+    wrote to the workspace itself: the notifications of that may not have
+    come in yet.
+    """
+    feed = _feed
+    if feed is not None:
+        feed.expect_changes()
+
+
+def watch_workspace(rds_client) -> None:
+    """Start watching the workspace of `rds_client`, unless already watching it."""
+    global _feed, _feed_client
+
+    if _feed_client is rds_client:
+        return
+    with _feed_lock:
+        if _feed_client is rds_client:
+            return
+        if _feed is not None:
+            _feed.stop()
+        context = get_syftbox_context()
+        syftbox_client = rds_client._syftbox_client
+        feed = ChangeFeed(bus)
+        feed.start()
+        stores = rds_client.job.local_store
+        private_datasets_dir = (
+            syftbox_client.config.data_dir.parent
+            / ".syftbox"
+            / "private_datasets"
+            / syftbox_client.email
+        )
+        for topic, path, kind in (
+            (JOB_RECORDS, stores.job.store.item_type_dir, "dir"),
+            (DATASET_RECORDS, stores.dataset.store.item_type_dir, "dir"),
+            (DATASET_FILES, private_datasets_dir, "tree"),
+            (DATASET_FILES, syftbox_client.my_datasite / "public" / "datasets", "tree"),
+            (JOB_OUTPUTS, rds_client.job._get_job_output_folder(), "tree"),
+            (SOURCES, context.sources_config_path, "file"),
+            (AUTO_APPROVE, context.auto_approve_file_path, "file"),
+        ):
+            try:
+                if kind == "file":
+                    feed.watch_file(topic, Path(path))
+                else:
+                    feed.watch(topic, Path(path), recursive=kind == "tree")
+            except Exception as e:
+                logger.warning(f"Not watching {path} for {topic} changes: {e}")
+        _feed, _feed_client = feed, rds_client
+        logger.debug(f"Watching {len(feed._watches)} workspace paths for changes")
+
+
+def stop_watching() -> None:
+    global _feed, _feed_client
+
+    with _feed_lock:
+        if _feed is not None:
+            _feed.stop()
+        _feed = _feed_client = None
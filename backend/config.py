@@ -18,6 +18,31 @@ class Settings(BaseSettings):
     max_upload_size: int = 10 * 1024 * 1024  # 10MB
     allowed_file_types: list[str] = ["text/csv", "application/json", "text/plain"]
 
+    # Rows in a generated mock dataset when none is uploaded
+    mock_rows: int = 1000
+
+    # Responses at least this large are compressed when the client accepts it
+    compression_minimum_size: int = 1024
+
+    # Admission control of expensive requests: how many of each class run at
+    # once, and the bytes of memory they may claim between them. Requests
+    # over budget wait up to admission_timeout seconds, then get a 429.
+    admission_previews: int = 4
+    admission_imports: int = 2
+    admission_uploads: int = 4
+    admission_memory_bytes: int = 256 * 1024 * 1024  # 256MB
+    admission_timeout: float = 10.0
+    admission_retry_after: int = 5
+
+    # Request profiling (off by default). When enabled, requests carrying the
+    # profiling header, plus a random sample of the rest, are profiled.
+    profiling_enabled: bool = False
+    profiling_header: str = "X-Profile"
+    profiling_sample_rate: float = 0.0
+    profiling_interval: float = 0.005  # seconds between stack samples
+    profiling_dir: Optional[str] = None
+    profiling_max_profiles: int = 50
+
     class Config:
         env_file = ".env"
         case_sensitive = False  # Allow DEBUG or debug from environment
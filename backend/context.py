@@ -0,0 +1,115 @@
+"""Cached SyftBox client context shared across the backend."""
+
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from syft_core import Client
+from syft_core.config import CONFIG_PATH_ENV
+from syft_core.constants import DEFAULT_CONFIG_PATH
+
+from .config import get_settings
+from .metrics import record_cache
+
+
+@dataclass(frozen=True)
+class SyftBoxContext:
+    """A loaded SyftBox client together with the paths derived from it."""
+
+    client: Client
+    requested_config_path: Path
+    config_path: Path
+    config_stamp: Optional[tuple[int, int]]
+    data_dir: Path
+    datasites_dir: Path
+    app_data_dir: Path
+    private_app_dir: Path
+
+    @property
+    def email(self) -> str:
+        return self.client.email
+
+    @property
+    def sources_config_path(self) -> Path:
+        return self.private_app_dir / "dataset-sources.json"
+
+    @property
+    def auto_approve_file_path(self) -> Path:
+        return self.app_data_dir / "auto_approve.json"
+
+    def is_current(self, config_path: Path) -> bool:
+        """Check whether this context still matches the config on disk."""
+        return (
+            config_path == self.requested_config_path
+            and _stat_config(self.config_path) == self.config_stamp
+        )
+
+
+_context: Optional[SyftBoxContext] = None
+_context_lock = threading.Lock()
+
+
+def _resolve_config_path() -> Path:
+    """Resolve the SyftBox config path the same way `Client.load()` does."""
+    path = get_settings().config_path or os.getenv(CONFIG_PATH_ENV, DEFAULT_CONFIG_PATH)
+    return Path(path).expanduser()
+
+
+def _stat_config(path: Path) -> Optional[tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _load_context(config_path: Path) -> SyftBoxContext:
+    client = Client.load(config_path)
+    # `Client.load` may fall back to a legacy config file, so stamp the file
+    # it actually read rather than the one we asked for.
+    loaded_path = Path(client.config_path)
+
+    return SyftBoxContext(
+        client=client,
+        requested_config_path=config_path,
+        config_path=loaded_path,
+        config_stamp=_stat_config(loaded_path),
+        data_dir=client.workspace.data_dir,
+        datasites_dir=client.workspace.datasites,
+        app_data_dir=client.app_data(),
+        private_app_dir=client.workspace.data_dir / "private" / get_settings().app_name,
+    )
+
+
+def get_syftbox_context() -> SyftBoxContext:
+    """
+    Get the cached SyftBox context.
+
+    The config file is only re-read when its mtime or size changes, so the
+    common path costs a single `stat` call and no parsing.
+    """
+    global _context
+
+    config_path = _resolve_config_path()
+    context = _context
+    if context is not None and context.is_current(config_path):
+        record_cache("syftbox_context", hit=True)
+        return context
+
+    record_cache("syftbox_context", hit=False)
+    with _context_lock:
+        # Another thread may have reloaded while we waited for the lock
+        context = _context
+        if context is None or not context.is_current(config_path):
+            context = _context = _load_context(config_path)
+        return context
+
+
+def invalidate_syftbox_context() -> None:
+    """Drop the cached context so the next access reloads the config."""
+    global _context
+
+    with _context_lock:
+        _context = None
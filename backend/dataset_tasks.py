@@ -0,0 +1,193 @@
+"""
+Background dataset creation tasks.
+
+Creating a dataset (staging the files, generating the mock, registering it
+with RDS) can take longer than a proxy lets a request live, so the create
+endpoints only register a task and return its ID. The work runs on a small
+worker pool, and the task records its phase and byte progress for the status
+endpoint to report. Tasks are kept in memory for a while after they finish.
+"""
+
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Literal, Optional
+
+from fastapi import HTTPException
+from loguru import logger
+
+TaskStatus = Literal["pending", "running", "succeeded", "failed"]
+TaskPhase = Literal[
+    "queued", "receiving", "staging", "generating_mock", "registering", "done"
+]
+
+# Creations running at once; the rest wait in the "queued" phase
+MAX_WORKERS = 2
+# How long finished tasks stay around for their status to be read
+FINISHED_TASK_TTL = 60 * 60
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+@dataclass
+class DatasetTask:
+    id: str
+    kind: str
+    name: str
+    work_dir: Path
+    status: TaskStatus = "pending"
+    phase: TaskPhase = "queued"
+    bytes_done: int = 0
+    bytes_total: Optional[int] = None
+    # HTTPException detail (a message or a FormFieldError) and status code
+    error: Any = None
+    error_status: Optional[int] = None
+    dataset: Optional[dict] = None
+    created_at: str = field(default_factory=_now)
+    updated_at: str = field(default_factory=_now)
+    finished_at: Optional[float] = None
+
+    def set_phase(self, phase: TaskPhase, bytes_total: Optional[int] = None) -> None:
+        """Start a new phase, resetting the byte progress."""
+        with _lock:
+            self.phase, self.bytes_done, self.bytes_total = phase, 0, bytes_total
+            self.updated_at = _now()
+        logger.debug(f"Dataset task {self.id} ({self.name}): {phase}")
+
+    def advance(self, nbytes: int) -> None:
+        """Add `nbytes` to the current phase's progress."""
+        with _lock:
+            self.bytes_done += nbytes
+            self.updated_at = _now()
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("pending", "running")
+
+    def snapshot(self) -> dict:
+        with _lock:
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "name": self.name,
+                "status": self.status,
+                "phase": self.phase,
+                "bytes_done": self.bytes_done,
+                "bytes_total": self.bytes_total,
+                "error": self.error,
+                "error_status": self.error_status,
+                "dataset": self.dataset,
+                "created_at": self.created_at,
+                "updated_at": self.updated_at,
+            }
+
+
+_tasks: dict[str, DatasetTask] = {}
+_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _prune() -> None:
+    cutoff = time.monotonic() - FINISHED_TASK_TTL
+    for task_id, task in list(_tasks.items()):
+        if task.finished_at is not None and task.finished_at < cutoff:
+            del _tasks[task_id]
+
+
+def create_task(kind: str, name: str, work_root: Path) -> DatasetTask:
+    """
+    Register a new task with its own work directory under `work_root`.
+
+    Raises a 409 FormFieldError if a dataset with the same name is already
+    being created.
+    """
+    with _lock:
+        _prune()
+        if any(task.active and task.name == name for task in _tasks.values()):
+            raise HTTPException(
+                status_code=409,
+                detail={
+                    "type": "FormFieldError",
+                    "loc": "name",
+                    "message": "A dataset with this name is already being created",
+                },
+            )
+        task = DatasetTask(
+            id=uuid.uuid4().hex,
+            kind=kind,
+            name=name,
+            work_dir=Path(tempfile.mkdtemp(prefix="dataset-", dir=work_root)),
+        )
+        _tasks[task.id] = task
+    return task
+
+
+def _finish(task: DatasetTask, **values: Any) -> None:
+    with _lock:
+        for key, value in values.items():
+            setattr(task, key, value)
+        task.updated_at = _now()
+        task.finished_at = time.monotonic()
+    shutil.rmtree(task.work_dir, ignore_errors=True)
+
+
+def fail_task(task: DatasetTask, error: Exception) -> None:
+    """Mark a task as failed and remove its work directory."""
+    if isinstance(error, HTTPException):
+        detail, status_code = error.detail, error.status_code
+    else:
+        detail, status_code = str(error), 500
+    _finish(task, status="failed", error=detail, error_status=status_code)
+
+
+def _run(task: DatasetTask, work: Callable[[DatasetTask], dict]) -> None:
+    with _lock:
+        task.status = "running"
+    try:
+        dataset = work(task)
+    except Exception as e:
+        if not isinstance(e, HTTPException):
+            logger.error(f"Dataset task {task.id} ({task.name}) failed: {e}")
+        fail_task(task, e)
+        return
+    _finish(task, status="succeeded", phase="done", dataset=dataset)
+    logger.debug(f"Dataset task {task.id} ({task.name}) succeeded")
+
+
+def submit_task(task: DatasetTask, work: Callable[[DatasetTask], dict]) -> dict:
+    """
+    Run `work(task)` in the background and return the task's snapshot.
+
+    `work` reports progress through the task and returns the created
+    dataset's output; any exception fails the task.
+    """
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=MAX_WORKERS, thread_name_prefix="dataset-task"
+            )
+    task.set_phase("queued")
+    _executor.submit(_run, task, work)
+    return task.snapshot()
+
+
+def get_task(task_id: str) -> Optional[DatasetTask]:
+    with _lock:
+        return _tasks.get(task_id)
+
+
+def list_tasks() -> list[dict]:
+    """Snapshots of every known task, newest first."""
+    with _lock:
+        _prune()
+        tasks = sorted(_tasks.values(), key=lambda task: task.created_at, reverse=True)
+    return [task.snapshot() for task in tasks]
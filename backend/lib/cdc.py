@@ -0,0 +1,61 @@
+"""
+Content-defined chunking.
+
+Files are cut into chunks whose boundaries depend on the content around them
+rather than on offsets, so an insertion or deletion only changes the chunks
+it touches and the rest of the file chunks the same way as before.
+
+Boundaries are taken at line ends: a line closes a chunk when its CRC-32 is
+below a threshold proportional to its length, which makes the average chunk
+size independent of the line length. That suits the tabular data datasets
+hold (a changed row only changes its own chunk) and keeps the scan in C for
+all but one step per line. Binary data has a newline every 256 bytes on
+average, so it chunks the same way; content without any is cut at the
+maximum chunk size.
+"""
+
+import zlib
+from typing import BinaryIO, Iterator
+
+AVG_CHUNK_SIZE = 64 * 1024
+READ_SIZE = 1024 * 1024
+
+
+def iter_chunks(stream: BinaryIO, avg_size: int = AVG_CHUNK_SIZE) -> Iterator[bytes]:
+    """Read `stream` to the end, yielding its content-defined chunks."""
+    min_size, max_size = avg_size // 4, avg_size * 4
+    # A line of n bytes closes a chunk with probability n / avg_size
+    per_byte = (1 << 32) // avg_size
+
+    buf = b""
+    start = line = 0
+    while True:
+        block = stream.read(READ_SIZE)
+        if not block:
+            break
+        # Keep only the chunk in progress
+        buf = buf[start:] + block
+        line -= start
+        start = 0
+
+        while True:
+            end = buf.find(b"\n", line, start + max_size)
+            if end < 0:
+                if len(buf) - start < max_size:
+                    # The line goes on in the next block
+                    break
+                end = start + max_size
+            else:
+                end += 1
+                size = end - start
+                if size < min_size or (
+                    size < max_size
+                    and zlib.crc32(memoryview(buf)[line:end]) >= (end - line) * per_byte
+                ):
+                    line = end
+                    continue
+            yield buf[start:end]
+            start = line = end
+
+    if start < len(buf):
+        yield buf[start:]
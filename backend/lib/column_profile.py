@@ -0,0 +1,383 @@
+"""
+Per-column statistics of tabular files, computed in one streaming pass.
+
+Each column keeps a constant amount of state: counts, running min/max, the
+candidate types still consistent with its values and a HyperLogLog sketch for
+the distinct count, so memory doesn't grow with the number of rows. Text
+formats are read record by record; Parquet and Arrow files batch by batch.
+"""
+
+import csv
+import json
+import math
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from .tabular import (
+    _BOOL_VALUES,
+    _INT_PATTERN,
+    _TYPE_ORDER,
+    _arrow_type,
+    _json_safe,
+    _json_type,
+    _require_pyarrow,
+    table_format,
+)
+
+# Rows per batch when reading Parquet and Arrow files
+BATCH_SIZE = 64 * 1024
+# Rows per chunk when reading text files; cells are processed column by column
+TEXT_CHUNK_ROWS = 4096
+# Distinct values are counted exactly up to this many, then estimated
+EXACT_DISTINCT_LIMIT = 1024
+
+
+class HyperLogLog:
+    """
+    Distinct count estimator with a ~0.8% standard error in 16 KB.
+
+    Values are hashed with Python's string hash (SipHash). It is salted per
+    process, which is fine since only the estimate outlives the pass.
+    """
+
+    PRECISION = 14
+
+    def __init__(self):
+        self.registers = bytearray(1 << self.PRECISION)
+        # Small cardinalities are counted exactly
+        self.exact: Optional[set[int]] = set()
+
+    def add(self, values: Iterable[str]) -> None:
+        registers = self.registers
+        exact = self.exact
+        shift = 64 - self.PRECISION
+        mask = (1 << shift) - 1
+        for value in values:
+            h = hash(value) & 0xFFFFFFFFFFFFFFFF
+            if exact is not None:
+                exact.add(h)
+            # Position of the leftmost 1 bit after the register index
+            rank = shift - (h & mask).bit_length() + 1
+            if rank > registers[h >> shift]:
+                registers[h >> shift] = rank
+        if exact is not None and len(exact) > EXACT_DISTINCT_LIMIT:
+            self.exact = None
+
+    def add_hashes(self, hashes) -> None:
+        """Add a numpy array of uint64 hashes."""
+        import numpy as np
+
+        shift = 64 - self.PRECISION
+        rest = hashes & np.uint64((1 << shift) - 1)
+        # frexp's exponent is the bit length; `rest` is below 2**53 so exact
+        _, bit_length = np.frexp(rest.astype(np.float64))
+        ranks = (shift - bit_length + 1).astype(np.uint8)
+        registers = np.frombuffer(self.registers, dtype=np.uint8)
+        np.maximum.at(registers, (hashes >> np.uint64(shift)).astype(np.intp), ranks)
+        if self.exact is not None:
+            self.exact.update(hashes.tolist())
+            if len(self.exact) > EXACT_DISTINCT_LIMIT:
+                self.exact = None
+
+    def estimate(self) -> int:
+        if self.exact is not None:
+            return len(self.exact)
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0**-r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
+
+
+def _hash_numbers(values):
+    """splitmix64 of the bit patterns of a fixed-width numpy array."""
+    import numpy as np
+
+    x = values.view(f"u{values.itemsize}").astype(np.uint64)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+class ColumnProfiler:
+    """
+    Running statistics of one column.
+
+    Text cells narrow a set of candidate types (as in the previews), JSON
+    values collect the types seen, and Arrow columns take the schema's type.
+    """
+
+    def __init__(self, name: str, physical_type: Any = None):
+        self.name = name
+        self.count = 0
+        self.null_count = 0
+        self.candidates: set[str] = set(_TYPE_ORDER)
+        self.json_types: set[str] = set()
+        self.physical_type = physical_type
+        self.minimum: Any = None
+        self.maximum: Any = None
+        self.text_min: Optional[str] = None
+        self.text_max: Optional[str] = None
+        self.distinct: Optional[HyperLogLog] = HyperLogLog()
+        if physical_type is not None and physical_type.num_fields:
+            # Distinct nested values aren't worth converting every one to Python
+            self.distinct = None
+
+    def _update_range(self, low: Any, high: Any) -> None:
+        if self.minimum is None or low < self.minimum:
+            self.minimum = low
+        if self.maximum is None or high > self.maximum:
+            self.maximum = high
+
+    def _update_text_range(self, value: str) -> None:
+        if self.text_min is None or value < self.text_min:
+            self.text_min = value
+        if self.text_max is None or value > self.text_max:
+            self.text_max = value
+
+    def add_nulls(self, count: int) -> None:
+        self.count += count
+        self.null_count += count
+
+    def add_texts(self, values: list[str]) -> None:
+        """Add a chunk of CSV/TSV cells; empty cells are nulls."""
+        present = [value for value in values if value != ""]
+        self.add_nulls(len(values) - len(present))
+        if not present:
+            return
+        self.count += len(present)
+        # Hash each distinct value of the chunk once
+        self.distinct.add(set(present))
+        low, high = min(present), max(present)
+        if self.text_min is None or low < self.text_min:
+            self.text_min = low
+        if self.text_max is None or high > self.text_max:
+            self.text_max = high
+        if len(self.candidates) > 1:
+            self._narrow_types(present)
+
+    def _narrow_types(self, values: list[str]) -> None:
+        """Drop the candidate types that some of `values` don't fit."""
+        candidates = self.candidates
+        if "float" in candidates:
+            try:
+                numbers = [float(value) for value in values]
+            except ValueError:
+                candidates -= {"integer", "float"}
+            else:
+                self._update_range(min(numbers), max(numbers))
+                if "integer" in candidates and not all(
+                    _INT_PATTERN.match(value.strip()) for value in values
+                ):
+                    candidates.discard("integer")
+        if "boolean" in candidates and not all(
+            value.strip().lower() in _BOOL_VALUES for value in values
+        ):
+            candidates.discard("boolean")
+        if "datetime" in candidates:
+            try:
+                for value in values:
+                    datetime.fromisoformat(value.strip())
+            except ValueError:
+                candidates.discard("datetime")
+
+    def add_json(self, value: Any) -> None:
+        """Add a JSON Lines value; missing keys and nulls are nulls."""
+        if value is None:
+            self.add_nulls(1)
+            return
+        self.count += 1
+        value_type = _json_type(value)
+        self.json_types.add(value_type)
+        if isinstance(value, (dict, list)):
+            self.distinct.add([json.dumps(value, sort_keys=True)])
+        else:
+            # Keep 1 and "1" apart
+            self.distinct.add([f"{value_type}:{value}"])
+        if value_type in ("integer", "float"):
+            self._update_range(value, value)
+        elif value_type == "string":
+            self._update_text_range(value)
+
+    def add_array(self, array) -> None:
+        """Add a pyarrow array from one record batch."""
+        import pyarrow.compute as pc
+
+        self.count += len(array)
+        self.null_count += array.null_count
+        if self.distinct is not None:
+            # Hash each distinct value of the batch once
+            values = pc.unique(array.drop_null()).to_numpy(zero_copy_only=False)
+            if values.dtype.kind in "biufmM":
+                self.distinct.add_hashes(_hash_numbers(values))
+            else:
+                self.distinct.add(str(value) for value in values)
+        try:
+            bounds = pc.min_max(array).as_py()
+        except Exception:
+            # Not orderable (nested types, etc.)
+            return
+        if bounds["min"] is not None:
+            self._update_range(bounds["min"], bounds["max"])
+
+    def column_type(self) -> str:
+        if self.physical_type is not None:
+            return _arrow_type(self.physical_type)
+        if self.count == self.null_count:
+            return "null"
+        if self.json_types:
+            if self.json_types == {"integer", "float"}:
+                return "float"
+            if len(self.json_types) == 1:
+                return next(iter(self.json_types))
+            return "mixed"
+        return next(t for t in _TYPE_ORDER if t in self.candidates)
+
+    def result(self) -> dict:
+        column_type = self.column_type()
+        result = {
+            "name": self.name,
+            "type": column_type,
+            "count": self.count,
+            "null_count": self.null_count,
+            "null_rate": self.null_count / self.count if self.count else 0.0,
+        }
+        if self.distinct is not None:
+            result["distinct"] = self.distinct.estimate()
+            result["distinct_exact"] = self.distinct.exact is not None
+        if self.physical_type is not None:
+            result["physical_type"] = str(self.physical_type)
+
+        minimum, maximum = None, None
+        if self.physical_type is not None or column_type in ("integer", "float"):
+            minimum, maximum = self.minimum, self.maximum
+            if column_type == "integer" and minimum is not None:
+                # Text cells were parsed as floats
+                minimum, maximum = int(minimum), int(maximum)
+        elif column_type in ("string", "datetime"):
+            minimum, maximum = self.text_min, self.text_max
+        if minimum is not None:
+            result["min"], result["max"] = _json_safe(minimum), _json_safe(maximum)
+        return result
+
+
+def _profile_delimited(path: Path, delimiter: str) -> tuple[int, list[ColumnProfiler]]:
+    rows = 0
+    with open(path, newline="", encoding="utf-8", errors="replace") as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader, [])
+        columns = [ColumnProfiler(name) for name in header]
+        while chunk := list(islice(reader, TEXT_CHUNK_ROWS)):
+            width = max(len(row) for row in chunk)
+            for i in range(len(columns), width):
+                # Ragged rows: earlier rows lacked this column entirely
+                column = ColumnProfiler(f"column_{i + 1}")
+                column.add_nulls(rows)
+                columns.append(column)
+            chunk = [
+                row + [""] * (len(columns) - len(row))
+                if len(row) < len(columns)
+                else row
+                for row in chunk
+            ]
+            for column, values in zip(columns, zip(*chunk)):
+                column.add_texts(list(values))
+            rows += len(chunk)
+    return rows, columns
+
+
+def _profile_jsonl(path: Path) -> tuple[int, list[ColumnProfiler]]:
+    rows = 0
+    columns: dict[str, ColumnProfiler] = {}
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON on line {line_number}: {e}")
+            if not isinstance(record, dict):
+                record = {"value": record}
+            rows += 1
+            for name in record.keys() - columns.keys():
+                column = ColumnProfiler(name)
+                column.add_nulls(rows - 1)
+                columns[name] = column
+            for name, column in columns.items():
+                column.add_json(record.get(name))
+    return rows, list(columns.values())
+
+
+def _profile_batches(schema, batches) -> tuple[int, list[ColumnProfiler]]:
+    columns = [ColumnProfiler(field.name, field.type) for field in schema]
+    rows = 0
+    for batch in batches:
+        rows += batch.num_rows
+        for column, array in zip(columns, batch.columns):
+            column.add_array(array)
+    return rows, columns
+
+
+def _profile_parquet(path: Path) -> tuple[int, list[ColumnProfiler]]:
+    _require_pyarrow("Parquet")
+    import pyarrow.parquet as pq
+
+    try:
+        parquet_file = pq.ParquetFile(path, memory_map=True)
+    except Exception as e:
+        raise ValueError(f"Could not read {path.name}: {e}")
+    return _profile_batches(
+        parquet_file.schema_arrow, parquet_file.iter_batches(batch_size=BATCH_SIZE)
+    )
+
+
+def _profile_arrow(path: Path) -> tuple[int, list[ColumnProfiler]]:
+    _require_pyarrow("Arrow")
+    import pyarrow as pa
+
+    with pa.memory_map(str(path), "r") as source:
+        try:
+            reader = pa.ipc.open_file(source)
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        except pa.ArrowInvalid:
+            source.seek(0)
+            try:
+                reader = pa.ipc.open_stream(source)
+            except pa.ArrowInvalid as e:
+                raise ValueError(f"Could not read {path.name}: {e}")
+            batches = iter(reader)
+        return _profile_batches(reader.schema, batches)
+
+
+def profile_file(path: Path) -> dict:
+    """
+    Profile every column of a tabular file.
+
+    Raises ValueError if the file isn't a supported format or can't be parsed.
+    """
+    fmt = table_format(path)
+    if fmt is None:
+        raise ValueError(f"Unsupported tabular format: {path.suffix or path.name}")
+    if fmt == "jsonl":
+        rows, columns = _profile_jsonl(path)
+    elif fmt == "parquet":
+        rows, columns = _profile_parquet(path)
+    elif fmt == "arrow":
+        rows, columns = _profile_arrow(path)
+    else:
+        try:
+            rows, columns = _profile_delimited(path, "\t" if fmt == "tsv" else ",")
+        except csv.Error as e:
+            raise ValueError(f"Could not parse {path.name}: {e}")
+    return {
+        "format": fmt,
+        "size": path.stat().st_size,
+        "rows": rows,
+        "columns": [column.result() for column in columns],
+    }
@@ -0,0 +1,249 @@
+"""
+Content-Encoding negotiation and streaming response compression.
+
+gzip is always available; brotli and zstd are used when the `brotli` and
+`zstandard` modules are installed. Levels favour latency over ratio since
+responses are compressed on the fly.
+"""
+
+import zlib
+from typing import Iterable, Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/javascript",
+    "application/json",
+    "application/manifest+json",
+    "application/xml",
+    "application/x-ndjson",
+    "image/svg+xml",
+)
+# Bodies sent as a stream of records, each of which the client wants as soon
+# as it's sent
+STREAMING_TYPES = (
+    "application/x-ndjson",
+    "text/event-stream",
+)
+
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+ZSTD_LEVEL = 3
+# A streamed body's compressed output is flushed once this much went in since
+# the last flush, rather than after each chunk: small chunks flushed one by
+# one barely compress. Streams of records are flushed after each chunk.
+FLUSH_SIZE = 64 * 1024
+# Chunks at least this big are compressed in a worker thread, so that a large
+# response doesn't hold up the event loop (zlib and friends release the GIL)
+THREAD_SIZE = 256 * 1024
+
+
+def available_encodings() -> list[str]:
+    """Encodings this process can produce, preferred first."""
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return encodings
+
+
+def is_compressible(media_type: str) -> bool:
+    return media_type.lower().startswith(COMPRESSIBLE_TYPES)
+
+
+def is_streaming(media_type: str) -> bool:
+    return media_type.lower().startswith(STREAMING_TYPES)
+
+
+def accepted_encodings(accept_encoding: str, supported: Iterable[str]) -> list[str]:
+    """
+    Encodings from an `Accept-Encoding` header that are in `supported`,
+    ordered by the client's q-value and then by the order of `supported`.
+    """
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    ranked = [
+        (accepted.get(encoding, wildcard), -i, encoding)
+        for i, encoding in enumerate(supported)
+    ]
+    return [
+        encoding for quality, _, encoding in sorted(ranked, reverse=True) if quality > 0
+    ]
+
+
+class StreamCompressor:
+    """Incremental compressor for one response body."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+        elif encoding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        elif encoding == "gzip":
+            # wbits=31 writes a gzip header and trailer
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        else:
+            raise ValueError(f"Unsupported encoding: {encoding}")
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data)
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        """Emit buffered output without ending the stream."""
+        if self.encoding == "br":
+            return self._compressor.flush()
+        if self.encoding == "zstd":
+            return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses with the client's preferred encoding.
+
+    Responses smaller than `minimum_size`, already encoded, partial, or of a
+    non-text media type pass through untouched. Bodies are compressed chunk by
+    chunk as the app sends them, so streamed responses are never held back
+    more than FLUSH_SIZE, and streams of records (NDJSON, server-sent events)
+    not at all. Chunks of THREAD_SIZE or more are compressed off the event
+    loop. The ETag of an encoded body is made weak, since it's no longer byte
+    for byte what the app's ETag identifies.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = available_encodings()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encodings = accepted_encodings(
+            Headers(scope=scope).get("accept-encoding", ""), self.encodings
+        )
+        if not encodings:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(send, encodings[0], self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, send, encoding: str, minimum_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message: Optional[dict] = None
+        self.compressor: Optional[StreamCompressor] = None
+        self.passthrough = False
+        self.streaming = False
+        self.unflushed = 0
+
+    def _should_compress(self, message: dict) -> bool:
+        headers = Headers(raw=message.get("headers", []))
+        if message["status"] in (204, 206, 304) or "content-encoding" in headers:
+            return False
+        if not is_compressible(headers.get("content-type", "")):
+            return False
+        content_length = headers.get("content-length")
+        if content_length is not None and int(content_length) < self.minimum_size:
+            return False
+        return True
+
+    async def send(self, message: dict) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Hold the headers until the first body chunk shows how big it is
+            self.start_message = message
+            self.passthrough = not self._should_compress(message)
+            content_type = Headers(raw=message.get("headers", [])).get("content-type")
+            self.streaming = is_streaming(content_type or "")
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            if self.start_message is not None:
+                await self._send(self.start_message)
+                self.start_message = None
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self._send(self.start_message)
+                self.start_message = None
+                await self._send(message)
+                return
+
+            self.compressor = StreamCompressor(self.encoding)
+            self.start_message["headers"] = list(self.start_message.get("headers", []))
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if "content-length" in headers:
+                del headers["content-length"]
+            etag = headers.get("etag")
+            if etag is not None and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+            await self._send(self.start_message)
+            self.start_message = None
+
+        if len(body) >= THREAD_SIZE:
+            chunk = await run_in_threadpool(self._compress, body, more_body)
+        else:
+            chunk = self._compress(body, more_body)
+        if chunk or not more_body:
+            await self._send(
+                {"type": "http.response.body", "body": chunk, "more_body": more_body}
+            )
+
+    def _compress(self, body: bytes, more_body: bool) -> bytes:
+        if not more_body:
+            return self.compressor.compress(body) + self.compressor.finish()
+        chunk = self.compressor.compress(body)
+        self.unflushed += len(body)
+        if self.streaming or self.unflushed >= FLUSH_SIZE:
+            chunk += self.compressor.flush()
+            self.unflushed = 0
+        return chunk
@@ -0,0 +1,101 @@
+"""
+Handing files over to their final location without copying their bytes.
+
+A file that is moved (its source is disposable, e.g. staged for a dataset) is
+renamed, which is free on the same filesystem. A file whose source must stay
+is reflinked where the filesystem supports copy-on-write clones (Btrfs, XFS),
+and copied otherwise. Never hardlinked: the file would be shared, and writing
+to it in place through either name would change both. Crossing filesystems
+always falls back to a copy.
+
+Destinations are always replaced with a new file rather than written in
+place.
+"""
+
+import errno
+import os
+import shutil
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Literal
+
+HandoverMethod = Literal["rename", "reflink", "copy"]
+
+# ioctl(2) request cloning a whole file (linux/fs.h)
+FICLONE = 0x40049409
+
+# Errors meaning the filesystem can't do it, rather than that something's wrong
+_UNSUPPORTED = {
+    errno.EXDEV,
+    errno.EPERM,
+    errno.EINVAL,
+    errno.ENOTTY,
+    errno.EOPNOTSUPP,
+}
+
+
+def _reflink(src: Path, dst: Path) -> None:
+    if sys.platform != "linux":
+        raise OSError(errno.EOPNOTSUPP, "Reflinks are only supported on Linux")
+    import fcntl
+
+    with open(src, "rb") as source, open(dst, "wb") as target:
+        try:
+            fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+        except OSError:
+            target.close()
+            dst.unlink()
+            raise
+    shutil.copystat(src, dst)
+
+
+def _replace_with(dst: Path, make: Callable[[Path], None]) -> None:
+    """Create `dst` through `make(tmp)` and atomically put it in place."""
+    tmp = dst.with_name(f".{dst.name}.handover")
+    tmp.unlink(missing_ok=True)
+    make(tmp)
+    os.replace(tmp, dst)
+
+
+def handover_file(src: Path, dst: Path, keep_source: bool = False) -> HandoverMethod:
+    """Put `src`'s content at `dst`, without copying if possible."""
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    if not keep_source:
+        try:
+            os.replace(src, dst)
+            return "rename"
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED:
+                raise
+    else:
+        try:
+            _replace_with(dst, lambda tmp: _reflink(src, tmp))
+            return "reflink"
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED:
+                raise
+
+    _replace_with(dst, lambda tmp: shutil.copy2(src, tmp))
+    if not keep_source:
+        src.unlink()
+    return "copy"
+
+
+def handover_tree(
+    src_dir: Path, dst_dir: Path, keep_source: bool = False
+) -> Counter[str]:
+    """
+    Hand every file under `src_dir` over to the same path under `dst_dir`.
+
+    Returns the bytes handed over by each method.
+    """
+    handed_over: Counter[str] = Counter()
+    for root, _, files in os.walk(src_dir):
+        (dst_dir / Path(root).relative_to(src_dir)).mkdir(parents=True, exist_ok=True)
+        for name in files:
+            src = Path(root) / name
+            size = src.stat().st_size
+            dst = dst_dir / src.relative_to(src_dir)
+            handed_over[handover_file(src, dst, keep_source)] += size
+    return handed_over
@@ -1,7 +1,85 @@
+"""
+Static file serving for the exported Next.js frontend.
+
+The export directory is indexed once when the app is created, so serving a
+file is a dict lookup rather than a series of `stat` calls. Compressible
+assets are served as `.br`/`.gz` when the client accepts it: precompressed
+siblings on disk (e.g. produced by a build step) are used as-is, otherwise the
+compressed body is generated on first request and kept in memory. Hashed
+`_next/static` assets are sent with an immutable cache policy; everything else
+is revalidated with its ETag.
+"""
+
+import gzip
+import mimetypes
+import os
+import stat
+import threading
+from dataclasses import dataclass, field
+from email.utils import formatdate
+from hashlib import md5
+from pathlib import Path
+
+import anyio
 from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import URL, Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, RedirectResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+
+from .compression import accepted_encodings, brotli, is_compressible
+
+IMMUTABLE_PREFIX = "_next/static/"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# Below this size compression saves less than the extra headers cost
+MIN_COMPRESS_SIZE = 1024
+# Preferred first; suffix of the precompressed sibling on disk
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+
+@dataclass
+class StaticAsset:
+    """An indexed file and its compressed variants."""
+
+    path: str
+    stat_result: os.stat_result
+    media_type: str
+    cache_control: str
+    compressible: bool
+    precompressed: dict[str, tuple[str, os.stat_result]] = field(default_factory=dict)
+    # Compressed bodies generated on demand, by encoding
+    compressed: dict[str, bytes] = field(default_factory=dict)
+
+    @property
+    def etag(self) -> str:
+        # Same scheme as starlette's FileResponse so conditional requests match
+        etag_base = f"{self.stat_result.st_mtime}-{self.stat_result.st_size}"
+        return f'"{md5(etag_base.encode(), usedforsecurity=False).hexdigest()}"'
+
+    @property
+    def last_modified(self) -> str:
+        return formatdate(self.stat_result.st_mtime, usegmt=True)
+
+
+def _is_compressible(media_type: str, size: int) -> bool:
+    return size >= MIN_COMPRESS_SIZE and is_compressible(media_type)
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
 
 
 class HTMLStaticFiles(StaticFiles):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._compress_lock = threading.Lock()
+        self._directories: set[str] = set()
+        self.index = self.build_index()
+
     def lookup_path(self, path):
         full_path, stat = super().lookup_path(path)
 
@@ -10,3 +88,147 @@ class HTMLStaticFiles(StaticFiles):
             return super().lookup_path(f"{path}.html")
 
         return full_path, stat
+
+    def build_index(self) -> dict[str, StaticAsset]:
+        """
+        Walk the served directory once, keyed by the paths `get_path` produces.
+
+        Extensionless routes (`jobs` -> `jobs.html`) and directory indexes
+        (`.` -> `index.html`) get their own keys so they resolve in one lookup.
+        """
+        index: dict[str, StaticAsset] = {}
+        if self.directory is None or not os.path.isdir(self.directory):
+            return index
+
+        root = Path(self.directory)
+        files = {}
+        for dirpath, _, filenames in os.walk(root, followlinks=self.follow_symlink):
+            for filename in filenames:
+                full_path = Path(dirpath) / filename
+                try:
+                    stat_result = full_path.stat()
+                except OSError:
+                    continue
+                if stat.S_ISREG(stat_result.st_mode):
+                    files[full_path.relative_to(root).as_posix()] = (
+                        str(full_path),
+                        stat_result,
+                    )
+
+        for rel_path, (full_path, stat_result) in files.items():
+            if rel_path.endswith(tuple(ENCODINGS.values())):
+                continue
+            media_type = mimetypes.guess_type(rel_path)[0] or "text/plain"
+            asset = StaticAsset(
+                path=full_path,
+                stat_result=stat_result,
+                media_type=media_type,
+                cache_control=IMMUTABLE_CACHE_CONTROL
+                if rel_path.startswith(IMMUTABLE_PREFIX)
+                else REVALIDATE_CACHE_CONTROL,
+                compressible=_is_compressible(media_type, stat_result.st_size),
+            )
+            for encoding, suffix in ENCODINGS.items():
+                variant = files.get(rel_path + suffix)
+                # Ignore stale variants left over from a previous build
+                if variant and variant[1].st_mtime >= stat_result.st_mtime:
+                    asset.precompressed[encoding] = variant
+            index[os.path.normpath(rel_path)] = asset
+
+        if self.html:
+            for rel_path, asset in list(index.items()):
+                if rel_path.endswith(".html"):
+                    route = rel_path[: -len(".html")]
+                    if "." not in route:
+                        index.setdefault(route, asset)
+                if os.path.basename(rel_path) == "index.html":
+                    directory = os.path.dirname(rel_path) or "."
+                    index[directory] = asset
+                    self._directories.add(directory)
+
+        return index
+
+    async def get_response(self, path: str, scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405, headers={"Allow": "GET, HEAD"})
+
+        asset = self.index.get(path)
+        if asset is None:
+            # Not in the startup index (or the directory didn't exist then);
+            # fall back to the regular filesystem lookup and 404 handling
+            return await super().get_response(path, scope)
+
+        if path in self._directories and not scope["path"].endswith("/"):
+            # Directory URLs should redirect to always end in "/"
+            url = URL(scope=scope)
+            return RedirectResponse(url=url.replace(path=url.path + "/"))
+
+        return await self.asset_response(asset, scope)
+
+    async def asset_response(self, asset: StaticAsset, scope) -> Response:
+        request_headers = Headers(scope=scope)
+        headers = {"cache-control": asset.cache_control}
+        if asset.compressible:
+            headers["vary"] = "Accept-Encoding"
+
+        encoding = None
+        # Ranges apply to the identity representation
+        if asset.compressible and "range" not in request_headers:
+            for candidate in accepted_encodings(
+                request_headers.get("accept-encoding", ""), ENCODINGS
+            ):
+                if (
+                    candidate in asset.precompressed
+                    or candidate == "gzip"
+                    or brotli is not None
+                ):
+                    encoding = candidate
+                    break
+
+        if encoding is None:
+            response = FileResponse(
+                asset.path,
+                stat_result=asset.stat_result,
+                media_type=asset.media_type,
+                headers=headers,
+            )
+        elif encoding in asset.precompressed:
+            variant_path, variant_stat = asset.precompressed[encoding]
+            headers["content-encoding"] = encoding
+            response = FileResponse(
+                variant_path,
+                stat_result=variant_stat,
+                media_type=asset.media_type,
+                headers=headers,
+            )
+        else:
+            body = asset.compressed.get(encoding)
+            if body is None:
+                body = await anyio.to_thread.run_sync(
+                    self._compress_asset, asset, encoding
+                )
+            headers.update(
+                {
+                    "content-encoding": encoding,
+                    "etag": f'{asset.etag[:-1]}-{encoding}"',
+                    "last-modified": asset.last_modified,
+                }
+            )
+            response = Response(
+                body,
+                media_type=asset.media_type,
+                headers=headers,
+            )
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    def _compress_asset(self, asset: StaticAsset, encoding: str) -> bytes:
+        with self._compress_lock:
+            body = asset.compressed.get(encoding)
+            if body is None:
+                with open(asset.path, "rb") as f:
+                    body = _compress(f.read(), encoding)
+                asset.compressed[encoding] = body
+            return body
@@ -0,0 +1,281 @@
+"""
+Synthetic mock data generated from the private data, entirely offline.
+
+Each private CSV/TSV file is read once, keeping a fixed-size uniform sample of
+its rows. Every column's marginal distribution is fitted from that sample:
+
+- numbers and datetimes: the empirical quantiles, sampled by inverse CDF
+- low-cardinality columns: the category frequencies
+- other text: the values' shapes, with letters and digits replaced at random
+
+and the mock is drawn column by column with vectorized NumPy sampling. Only
+marginals are kept; correlations between columns are not reproduced, and
+category values (not their rows) do appear in the mock.
+"""
+
+import csv
+import random
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from loguru import logger
+
+from .tabular import _TYPE_ORDER, _value_types, table_format
+
+# Rows kept to fit the column distributions
+SAMPLE_ROWS = 10_000
+# Quantiles kept for numeric and datetime columns
+QUANTILES = 101
+# Columns with at most this many distinct values (and mostly repeated ones)
+# are sampled as categories
+MAX_CATEGORIES = 50
+# Cap on the decimals kept for float columns
+MAX_DECIMALS = 10
+
+MAX_MOCK_ROWS = 1_000_000
+
+MOCK_FORMATS = ("csv", "tsv")
+
+
+@dataclass
+class ColumnModel:
+    """Fitted marginal distribution of one column."""
+
+    name: str
+    kind: str
+    null_rate: float
+    # numeric/datetime: quantiles; category: values; text: templates
+    values: list = field(default_factory=list)
+    weights: list[float] = field(default_factory=list)
+    # float output precision
+    decimals: int = 0
+    # datetime output format
+    date_only: bool = False
+    separator: str = "T"
+
+
+def _reservoir_sample(path: Path, delimiter: str, size: int, seed: Optional[int]):
+    """Header and a uniform sample of `size` rows, in one streaming pass."""
+    rng = random.Random(seed)
+    sample: list[list[str]] = []
+    with open(path, newline="", encoding="utf-8", errors="replace") as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader, [])
+        for i, row in enumerate(reader):
+            if i < size:
+                sample.append(row)
+            else:
+                j = rng.randrange(i + 1)
+                if j < size:
+                    sample[j] = row
+    return header, sample
+
+
+def _decimals(value: str) -> int:
+    """Digits after the decimal point of a plain (non-exponent) number."""
+    _, dot, fraction = value.strip().partition(".")
+    if not dot or "e" in value.lower():
+        return 0
+    return len(fraction)
+
+
+def _column_type(values: list[str]) -> str:
+    candidates = set(_TYPE_ORDER)
+    for value in values:
+        candidates &= _value_types(value)
+        if candidates == {"string"}:
+            break
+    return next(t for t in _TYPE_ORDER if t in candidates)
+
+
+def fit_column(name: str, values: list[str]) -> ColumnModel:
+    """Fit the marginal distribution of a column from sampled cells."""
+    import numpy as np
+
+    present = [value for value in values if value != ""]
+    null_rate = 1 - len(present) / len(values) if values else 1.0
+    if not present:
+        return ColumnModel(name, "null", 1.0)
+
+    distinct, counts = np.unique(np.array(present, dtype=str), return_counts=True)
+    column_type = _column_type(present)
+    grid = np.linspace(0, 1, QUANTILES)
+
+    if len(distinct) <= MAX_CATEGORIES and len(distinct) <= len(present) / 2:
+        return ColumnModel(
+            name,
+            "category",
+            null_rate,
+            values=distinct.tolist(),
+            weights=(counts / counts.sum()).tolist(),
+        )
+    if column_type in ("integer", "float"):
+        numbers = np.array([float(value) for value in present])
+        # "nan" and "inf" cells parse as floats, but they're missing values
+        finite = np.isfinite(numbers)
+        if not finite.any():
+            return ColumnModel(name, "null", 1.0)
+        return ColumnModel(
+            name,
+            column_type,
+            1 - int(finite.sum()) / len(values),
+            values=np.quantile(numbers[finite], grid).tolist(),
+            decimals=min(
+                max(
+                    _decimals(value)
+                    for value, keep in zip(present, finite.tolist())
+                    if keep
+                ),
+                MAX_DECIMALS,
+            ),
+        )
+    if column_type == "datetime":
+        parsed = [datetime.fromisoformat(value.strip()) for value in present]
+        timestamps = np.array(
+            [value.replace(tzinfo=None) for value in parsed], dtype="datetime64[s]"
+        )
+        # The date and time separator most of the values use
+        separators = Counter(
+            value.strip()[10] for value in present if len(value.strip()) > 10
+        )
+        return ColumnModel(
+            name,
+            "datetime",
+            null_rate,
+            values=np.quantile(timestamps.astype(np.int64), grid).tolist(),
+            date_only=all(len(value.strip()) == 10 for value in present),
+            separator=separators.most_common(1)[0][0] if separators else "T",
+        )
+    return ColumnModel(name, "text", null_rate, values=present)
+
+
+def fit_file(
+    path: Path, sample_rows: int = SAMPLE_ROWS, seed: Optional[int] = None
+) -> list[ColumnModel]:
+    """Fit the column models of a CSV/TSV file."""
+    delimiter = "\t" if table_format(path) == "tsv" else ","
+    header, sample = _reservoir_sample(path, delimiter, sample_rows, seed)
+    columns = []
+    for i, name in enumerate(header):
+        cells = [row[i] if i < len(row) else "" for row in sample]
+        columns.append(fit_column(name, cells))
+    return columns
+
+
+def _scramble(templates, rng):
+    """Replace every letter and digit of `templates`, keeping case and layout."""
+    import numpy as np
+
+    chars = np.array(templates, dtype=str)
+    width = chars.dtype.itemsize // 4
+    if width == 0:
+        return chars
+    codes = chars.view(np.uint32).reshape(len(chars), width).copy()
+    for low, high in ((ord("0"), ord("9")), (ord("a"), ord("z")), (ord("A"), ord("Z"))):
+        mask = (codes >= low) & (codes <= high)
+        codes[mask] = rng.integers(low, high + 1, size=int(mask.sum()), dtype=np.uint32)
+    return codes.view(f"<U{width}").reshape(len(chars))
+
+
+def sample_column(model: ColumnModel, rows: int, rng) -> Any:
+    """Draw `rows` cells from a fitted column as a NumPy string array."""
+    import numpy as np
+
+    grid = np.linspace(0, 1, QUANTILES)
+    if model.kind == "null":
+        return np.full(rows, "", dtype=str)
+    if model.kind == "category":
+        cells = rng.choice(
+            np.array(model.values, dtype=str), size=rows, p=model.weights
+        )
+    elif model.kind in ("integer", "float"):
+        numbers = np.interp(rng.random(rows), grid, model.values)
+        if model.kind == "integer":
+            cells = np.rint(numbers).astype(np.int64).astype(str)
+        else:
+            # Same number of decimals as the private values
+            cells = np.char.mod(f"%.{model.decimals}f", numbers)
+    elif model.kind == "datetime":
+        seconds = np.interp(rng.random(rows), grid, model.values).astype(np.int64)
+        timestamps = seconds.astype("datetime64[s]")
+        cells = np.datetime_as_string(timestamps, unit="D" if model.date_only else "s")
+        if model.separator != "T":
+            cells = np.char.replace(cells, "T", model.separator)
+    else:
+        cells = _scramble(rng.choice(np.array(model.values, dtype=str), size=rows), rng)
+
+    if model.null_rate:
+        cells = cells.astype(object)
+        cells[rng.random(rows) < model.null_rate] = ""
+    return cells
+
+
+def write_mock(
+    columns: list[ColumnModel],
+    path: Path,
+    rows: int,
+    delimiter: str = ",",
+    seed: Optional[int] = None,
+) -> None:
+    """Write `rows` synthetic rows drawn from `columns` to `path`."""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    cells = [sample_column(column, rows, rng) for column in columns]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=delimiter)
+        writer.writerow([column.name for column in columns])
+        writer.writerows(zip(*cells) if cells else [])
+
+
+def mock_sources(private_dir: Path) -> list[Path]:
+    """The files under `private_dir` a mock is generated from."""
+    return [
+        path
+        for path in sorted(private_dir.rglob("*"))
+        if path.is_file() and table_format(path) in MOCK_FORMATS
+    ]
+
+
+def generate_mock_dataset(
+    private_dir: Path,
+    mock_dir: Path,
+    rows: int,
+    seed: Optional[int] = None,
+    progress: Optional[Callable[[int], None]] = None,
+) -> list[Path]:
+    """
+    Write a synthetic mock of every CSV/TSV file under `private_dir` to the
+    same relative path under `mock_dir`. Returns the files written.
+
+    Other files get an empty placeholder, since RDS requires the mock to have
+    the same file extensions as the private data. `progress` is called with
+    the size of each CSV/TSV file once it's done.
+    """
+    sources = mock_sources(private_dir)
+    for path in sorted(set(private_dir.rglob("*")) - set(sources)):
+        if path.is_file() and not path.name.startswith("."):
+            target = mock_dir / path.relative_to(private_dir)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.touch()
+
+    written = []
+    for path in sources:
+        target = mock_dir / path.relative_to(private_dir)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        columns = fit_file(path, seed=seed)
+        write_mock(
+            columns,
+            target,
+            rows,
+            delimiter="\t" if table_format(path) == "tsv" else ",",
+            seed=seed,
+        )
+        logger.debug(f"Generated mock {target} ({rows} rows) from {path}")
+        written.append(target)
+        if progress is not None:
+            progress(path.stat().st_size)
+    return written
@@ -0,0 +1,148 @@
+"""Sampling profiler for a single thread, plus a bounded on-disk profile store.
+
+A background thread periodically grabs the target thread's Python stack via
+`sys._current_frames()`. Every sample counts towards the wall-clock profile;
+samples are weighted by the CPU time the target thread consumed since the
+previous sample for the CPU profile. Stacks are kept in the collapsed
+("folded") format understood by speedscope and flamegraph.pl.
+"""
+
+import json
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+PROFILE_ID_PATTERN = re.compile(r"^[0-9]{8}T[0-9]{12}-[0-9a-f]{8}$")
+
+
+def _thread_cpu_clock(thread_id: int) -> Optional[int]:
+    try:
+        return time.pthread_getcpuclockid(thread_id)
+    except (AttributeError, OSError):
+        # Not available on this platform; fall back to wall-clock only
+        return None
+
+
+def _collapse(frame) -> str:
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+class StackSampler:
+    """Sample the stacks of one thread from a background thread."""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.wall: Counter[str] = Counter()
+        self.cpu: Counter[str] = Counter()
+        self.samples = 0
+        self.cpu_time = 0.0
+        self._clock = _thread_cpu_clock(thread_id)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _cpu_now(self) -> float:
+        if self._clock is None:
+            return 0.0
+        try:
+            return time.clock_gettime(self._clock)
+        except OSError:
+            return 0.0
+
+    def _run(self) -> None:
+        last_cpu = self._cpu_now()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            stack = _collapse(frame)
+            del frame
+
+            cpu_now = self._cpu_now()
+            cpu_delta = max(0.0, cpu_now - last_cpu)
+            last_cpu = cpu_now
+
+            self.samples += 1
+            self.wall[stack] += 1
+            if cpu_delta:
+                # Weighted in microseconds of CPU time
+                self.cpu[stack] += int(cpu_delta * 1_000_000)
+                self.cpu_time += cpu_delta
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self, wait: bool = True) -> None:
+        """Stop sampling, and wait for the last sample to be counted if `wait`."""
+        self._stop.set()
+        if wait:
+            self._thread.join()
+
+
+class ProfileStore:
+    """A directory of JSON profiles that keeps only the newest `max_profiles`."""
+
+    def __init__(self, directory: Path, max_profiles: int = 50):
+        self.directory = directory
+        self.max_profiles = max_profiles
+        self._lock = threading.Lock()
+
+    def _path(self, profile_id: str) -> Path:
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            raise KeyError(profile_id)
+        return self.directory / f"{profile_id}.json"
+
+    def save(self, profile_id: str, profile: dict) -> Path:
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self._path(profile_id)
+            path.write_text(json.dumps(profile))
+            self._prune()
+        return path
+
+    def _prune(self) -> None:
+        profiles = sorted(self.directory.glob("*.json"))
+        for stale in profiles[: max(0, len(profiles) - self.max_profiles)]:
+            stale.unlink(missing_ok=True)
+
+    def list(self) -> list[dict]:
+        """Metadata of stored profiles, newest first."""
+        if not self.directory.is_dir():
+            return []
+
+        entries = []
+        for path in sorted(self.directory.glob("*.json"), reverse=True):
+            try:
+                profile = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            entries.append(
+                {k: v for k, v in profile.items() if k not in ("wall", "cpu")}
+            )
+        return entries
+
+    def load(self, profile_id: str) -> dict:
+        path = self._path(profile_id)
+        try:
+            return json.loads(path.read_text())
+        except FileNotFoundError:
+            raise KeyError(profile_id)
+
+
+def to_folded(stacks: dict[str, int]) -> str:
+    """Render stack counts in the collapsed format, heaviest first."""
+    lines = [
+        f"{stack} {count}"
+        for stack, count in sorted(stacks.items(), key=lambda item: -item[1])
+    ]
+    return "\n".join(lines) + "\n"
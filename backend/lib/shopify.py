@@ -1,6 +1,3 @@
-import pandas as pd
-
-
 def shopify_json_to_dataframe(data):
     """
     Convert Shopify products JSON data to a pandas DataFrame.
@@ -11,6 +8,9 @@ def shopify_json_to_dataframe(data):
     Returns:
     pd.DataFrame: DataFrame containing product and variant information
     """
+    # pandas takes a large share of the app's import time, so it is only
+    # loaded once a Shopify dataset is actually built
+    import pandas as pd
 
     # List to store all rows
     rows = []
@@ -0,0 +1,95 @@
+"""
+SQLite databases that cache what's derived from files.
+
+The files stay the source of truth, so the database can always be rebuilt
+from them: if it's missing, from another schema version or corrupted, it's
+deleted and created again empty, and its owner fills it back in.
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Optional, TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+
+
+class SQLiteCache:
+    """
+    Base of the caches kept in an SQLite database (in WAL mode), created
+    from `SCHEMA`. Bump `SCHEMA_VERSION` when the schema or what's stored in
+    it changes; databases of other versions are rebuilt.
+    """
+
+    SCHEMA: str = ""
+    SCHEMA_VERSION: int = 1
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._open()
+
+    @property
+    def _label(self) -> str:
+        return f"{type(self).__name__} {self.path}"
+
+    def _reset(self) -> None:
+        """Forget what's known about the cached files, the database is empty."""
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode = WAL")
+        # The files are the source of truth, durability isn't needed here
+        db.execute("PRAGMA synchronous = NORMAL")
+        return db
+
+    def _open(self) -> None:
+        try:
+            db = self._connect()
+            version = db.execute("PRAGMA user_version").fetchone()[0]
+            if version == self.SCHEMA_VERSION:
+                if db.execute("PRAGMA quick_check").fetchone()[0] == "ok":
+                    self._db = db
+                    return
+                logger.warning(f"{self._label} is corrupted, rebuilding it")
+            elif version != 0:
+                logger.info(f"{self._label} has an old schema, rebuilding it")
+            db.close()
+        except sqlite3.DatabaseError as e:
+            logger.warning(f"{self._label} can't be opened ({e}), rebuilding it")
+        self._create()
+
+    def _create(self) -> None:
+        """Start over with an empty database."""
+        self._reset()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{self.path}{suffix}").unlink(missing_ok=True)
+        db = self._connect()
+        db.executescript(self.SCHEMA)
+        db.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        db.commit()
+        self._db = db
+
+    def _run(self, operation: Callable[[], T]) -> T:
+        """
+        Run `operation` under the lock, rebuilding the database from the
+        files and trying again once if it turns out to be broken.
+        """
+        with self._lock:
+            if not self.path.exists():
+                logger.warning(f"{self._label} is gone, rebuilding it")
+                self._create()
+            try:
+                return operation()
+            except sqlite3.DatabaseError as e:
+                if isinstance(e, sqlite3.OperationalError) and "locked" in str(e):
+                    raise
+                logger.warning(f"{self._label} failed ({e}), rebuilding it")
+                self._create()
+                return operation()
@@ -0,0 +1,412 @@
+"""
+Cheap previews of CSV, TSV, JSON Lines, Parquet and Arrow files.
+
+Only the first rows are parsed. For text formats the total row count comes
+from counting newlines over a memory-mapped view of the file; Parquet and
+Arrow IPC files carry their schema, row counts and (for Parquet) column
+statistics in their metadata, so those are read without touching the data.
+Even multi-GB files are previewed without reading them into memory. Results
+are cached per (path, mtime, size).
+
+Parquet and Arrow support needs the optional `pyarrow` package.
+"""
+
+import csv
+import json
+import math
+import mmap
+import re
+from datetime import date, datetime, time
+from decimal import Decimal
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from typing import Any, Optional
+
+FORMATS = {
+    ".csv": "csv",
+    ".tsv": "tsv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+}
+DEFAULT_PREVIEW_ROWS = 50
+MAX_PREVIEW_ROWS = 1000
+MAX_CELL_CHARS = 1000
+_COUNT_CHUNK = 64 * 1024 * 1024
+
+_INT_PATTERN = re.compile(r"^[+-]?\d+$")
+_BOOL_VALUES = {"true", "false"}
+# Narrowest first; a column gets the first type every non-empty value fits
+_TYPE_ORDER = ("boolean", "integer", "float", "datetime", "string")
+
+
+def table_format(path: Path) -> Optional[str]:
+    """The preview format for `path`, or None if it isn't tabular."""
+    return FORMATS.get(path.suffix.lower())
+
+
+def count_lines(path: Path) -> int:
+    """Count lines by scanning a memory map for newlines."""
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped
+            return 0
+        with mm:
+            lines = 0
+            for offset in range(0, len(mm), _COUNT_CHUNK):
+                lines += mm[offset : offset + _COUNT_CHUNK].count(b"\n")
+            if len(mm) and mm[-1:] != b"\n":
+                lines += 1
+            return lines
+
+
+def _value_types(value: str) -> set[str]:
+    """All types a CSV cell could be read as."""
+    types = {"string"}
+    lowered = value.strip().lower()
+    if lowered in _BOOL_VALUES:
+        types.add("boolean")
+    if _INT_PATTERN.match(lowered):
+        types.update(("integer", "float"))
+    else:
+        try:
+            float(lowered)
+            types.add("float")
+        except ValueError:
+            pass
+    if "float" not in types:
+        try:
+            datetime.fromisoformat(value.strip())
+            types.add("datetime")
+        except ValueError:
+            pass
+    return types
+
+
+def _json_type(value: Any) -> str:
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int):
+        return "integer"
+    if isinstance(value, float):
+        return "float"
+    if isinstance(value, dict):
+        return "object"
+    if isinstance(value, list):
+        return "array"
+    return "string"
+
+
+def _infer_csv_column(values: list[str]) -> dict:
+    present = [v for v in values if v != ""]
+    if not present:
+        return {"type": "null", "nullable": True}
+    candidates = set(_TYPE_ORDER)
+    for value in present:
+        candidates &= _value_types(value)
+    column_type = next(t for t in _TYPE_ORDER if t in candidates)
+    return {"type": column_type, "nullable": len(present) < len(values)}
+
+
+def _infer_json_column(values: list[Any]) -> dict:
+    types = {_json_type(v) for v in values if v is not None}
+    if not types:
+        column_type = "null"
+    elif types == {"integer", "float"}:
+        column_type = "float"
+    elif len(types) == 1:
+        column_type = types.pop()
+    else:
+        column_type = "mixed"
+    return {"type": column_type, "nullable": any(v is None for v in values)}
+
+
+def _clip(value: Any) -> Any:
+    if isinstance(value, str) and len(value) > MAX_CELL_CHARS:
+        return value[:MAX_CELL_CHARS] + "…"
+    return value
+
+
+def _preview_delimited(path: Path, delimiter: str, rows: int) -> dict:
+    with open(path, newline="", encoding="utf-8", errors="replace") as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        try:
+            header = next(reader, [])
+            sample = list(islice(reader, rows))
+        except csv.Error as e:
+            raise ValueError(f"Could not parse {path.name}: {e}")
+
+    width = max([len(header)] + [len(row) for row in sample])
+    names = header + [f"column_{i + 1}" for i in range(len(header), width)]
+    sample = [row + [""] * (width - len(row)) for row in sample]
+    columns = [
+        {"name": name, **_infer_csv_column([row[i] for row in sample])}
+        for i, name in enumerate(names)
+    ]
+    # One line per record, minus the header; records with quoted newlines
+    # make this an overestimate
+    total_rows = max(count_lines(path) - 1, 0) if header else 0
+    return {
+        "columns": columns,
+        "rows": [[_clip(v) for v in row] for row in sample],
+        "total_rows": total_rows,
+    }
+
+
+def _preview_jsonl(path: Path, rows: int) -> dict:
+    records = []
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON on line {line_number}: {e}")
+            records.append(record if isinstance(record, dict) else {"value": record})
+            if len(records) >= rows:
+                break
+
+    names: dict[str, None] = {}
+    for record in records:
+        names.update(dict.fromkeys(record))
+    columns = [
+        {"name": name, **_infer_json_column([r.get(name) for r in records])}
+        for name in names
+    ]
+    return {
+        "columns": columns,
+        "rows": [[_clip(r.get(name)) for name in names] for r in records],
+        "total_rows": count_lines(path),
+    }
+
+
+def _json_safe(value: Any) -> Any:
+    """Convert a value read by pyarrow into something JSON can carry."""
+    if isinstance(value, bytes):
+        return _clip(value.decode("utf-8", errors="replace"))
+    if isinstance(value, float) and not math.isfinite(value):
+        return str(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, dict):
+        return {str(k): _json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(v) for v in value]
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return _clip(value)
+    return _clip(str(value))
+
+
+def _arrow_type(data_type) -> str:
+    import pyarrow.types as pat
+
+    if pat.is_boolean(data_type):
+        return "boolean"
+    if pat.is_integer(data_type):
+        return "integer"
+    if pat.is_floating(data_type) or pat.is_decimal(data_type):
+        return "float"
+    if pat.is_temporal(data_type):
+        return "datetime"
+    if pat.is_null(data_type):
+        return "null"
+    if pat.is_struct(data_type) or pat.is_map(data_type):
+        return "object"
+    if (
+        pat.is_list(data_type)
+        or pat.is_large_list(data_type)
+        or pat.is_fixed_size_list(data_type)
+    ):
+        return "array"
+    return "string"
+
+
+def _arrow_columns(schema, null_counts: dict[str, int]) -> list[dict]:
+    """Columns of an Arrow schema; nullable from actual null counts if known."""
+    columns = []
+    for field in schema:
+        nullable = field.nullable
+        if field.name in null_counts:
+            nullable = null_counts[field.name] > 0
+        columns.append(
+            {
+                "name": field.name,
+                "type": _arrow_type(field.type),
+                "nullable": nullable,
+                "physical_type": str(field.type),
+            }
+        )
+    return columns
+
+
+def _batch_rows(batch, rows: int) -> list[list]:
+    records = batch.slice(0, rows).to_pylist()
+    return [[_json_safe(v) for v in record.values()] for record in records]
+
+
+def _require_pyarrow(fmt: str) -> None:
+    try:
+        # deferred: slow to import and only needed here
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ValueError(f"Previewing {fmt} files requires pyarrow to be installed")
+
+
+def _parquet_statistics(metadata) -> dict[str, dict]:
+    """
+    Per-column null count and min/max across all row groups, from the footer.
+
+    Only top-level leaf columns are covered; a statistic is omitted as soon
+    as one row group doesn't record it.
+    """
+    stats: dict[str, dict] = {}
+    for i in range(metadata.num_columns):
+        name = metadata.schema.column(i).path
+        if "." in name:
+            continue
+        null_count, minimum, maximum = 0, None, None
+        has_nulls = has_min_max = True
+        for rg in range(metadata.num_row_groups):
+            column_stats = metadata.row_group(rg).column(i).statistics
+            if column_stats is None:
+                has_nulls = has_min_max = False
+                break
+            if column_stats.has_null_count:
+                null_count += column_stats.null_count
+            else:
+                has_nulls = False
+            if column_stats.has_min_max:
+                try:
+                    minimum = (
+                        column_stats.min
+                        if minimum is None
+                        else min(minimum, column_stats.min)
+                    )
+                    maximum = (
+                        column_stats.max
+                        if maximum is None
+                        else max(maximum, column_stats.max)
+                    )
+                except TypeError:
+                    has_min_max = False
+            elif column_stats.num_values:
+                has_min_max = False
+        column: dict[str, Any] = {}
+        if has_nulls and metadata.num_row_groups:
+            column["null_count"] = null_count
+        if has_min_max and minimum is not None:
+            column["min"] = _json_safe(minimum)
+            column["max"] = _json_safe(maximum)
+        stats[name] = column
+    return stats
+
+
+def _preview_parquet(path: Path, rows: int) -> dict:
+    _require_pyarrow("Parquet")
+    import pyarrow.parquet as pq
+
+    try:
+        parquet_file = pq.ParquetFile(path, memory_map=True)
+    except Exception as e:
+        raise ValueError(f"Could not read {path.name}: {e}")
+
+    metadata = parquet_file.metadata
+    stats = _parquet_statistics(metadata)
+    null_counts = {
+        name: column["null_count"]
+        for name, column in stats.items()
+        if "null_count" in column
+    }
+    columns = _arrow_columns(parquet_file.schema_arrow, null_counts)
+    for column in columns:
+        column.update(stats.get(column["name"], {}))
+
+    sample = []
+    if metadata.num_row_groups and metadata.num_rows:
+        # Decode only as many rows as requested from the first row group
+        batch = next(parquet_file.iter_batches(batch_size=rows, row_groups=[0]), None)
+        if batch is not None:
+            sample = _batch_rows(batch, rows)
+
+    return {
+        "columns": columns,
+        "rows": sample,
+        "total_rows": metadata.num_rows,
+        "row_groups": metadata.num_row_groups,
+    }
+
+
+def _preview_arrow(path: Path, rows: int) -> dict:
+    _require_pyarrow("Arrow")
+    import pyarrow as pa
+
+    with pa.memory_map(str(path), "r") as source:
+        sample: list[list] = []
+        try:
+            reader = pa.ipc.open_file(source)
+        except pa.ArrowInvalid:
+            reader = None
+
+        if reader is not None:
+            # The file footer indexes every batch, so rows are counted from
+            # metadata and only the batches needed for the sample are read
+            total_rows = reader.count_rows()
+            for i in range(reader.num_record_batches):
+                if len(sample) >= rows:
+                    break
+                sample.extend(_batch_rows(reader.get_batch(i), rows - len(sample)))
+        else:
+            # The streaming format has no footer; batches are zero-copy views
+            # of the map, so walking them is still cheap
+            source.seek(0)
+            try:
+                reader = pa.ipc.open_stream(source)
+            except pa.ArrowInvalid as e:
+                raise ValueError(f"Could not read {path.name}: {e}")
+            total_rows = 0
+            for batch in reader:
+                total_rows += batch.num_rows
+                if len(sample) < rows:
+                    sample.extend(_batch_rows(batch, rows - len(sample)))
+
+        columns = _arrow_columns(reader.schema, {})
+    return {"columns": columns, "rows": sample, "total_rows": total_rows}
+
+
+@lru_cache(maxsize=128)
+def _cached_preview(path: str, mtime_ns: int, size: int, rows: int) -> dict:
+    file_path = Path(path)
+    fmt = table_format(file_path)
+    if fmt == "jsonl":
+        preview = _preview_jsonl(file_path, rows)
+    elif fmt == "parquet":
+        preview = _preview_parquet(file_path, rows)
+    elif fmt == "arrow":
+        preview = _preview_arrow(file_path, rows)
+    else:
+        preview = _preview_delimited(file_path, "\t" if fmt == "tsv" else ",", rows)
+    return {"format": fmt, "size": size, **preview}
+
+
+def preview_table(path: Path, rows: int = DEFAULT_PREVIEW_ROWS) -> dict:
+    """
+    Columns with inferred types, the first `rows` rows and the total row
+    count of a tabular file. The result is shared between callers and must
+    not be modified.
+
+    Raises ValueError if the file isn't a supported format or can't be parsed.
+    """
+    if table_format(path) is None:
+        raise ValueError(f"Unsupported tabular format: {path.suffix or path.name}")
+    stat = path.stat()
+    return _cached_preview(str(path), stat.st_mtime_ns, stat.st_size, rows)
@@ -0,0 +1,55 @@
+"""Build a zip archive incrementally, yielding bytes as they are produced."""
+
+import zipfile
+from pathlib import Path
+from typing import Iterable, Iterator
+
+CHUNK_SIZE = 64 * 1024
+
+
+class _ChunkSink:
+    """Write-only, non-seekable file object collecting what zipfile writes."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._offset = 0
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_zip(root: Path, paths: Iterable[Path]) -> Iterator[bytes]:
+    """
+    Stream a zip of `paths`, stored relative to `root`.
+
+    Files are read in chunks and never held in memory whole; since the output
+    isn't seekable, sizes and CRCs go in data descriptors after each entry.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for path in paths:
+            info = zipfile.ZipInfo.from_file(path, path.relative_to(root).as_posix())
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with open(path, "rb") as src, archive.open(info, "w") as dest:
+                while chunk := src.read(CHUNK_SIZE):
+                    dest.write(chunk)
+                    if data := sink.drain():
+                        yield data
+            if data := sink.drain():
+                yield data
+    # Central directory
+    if data := sink.drain():
+        yield data
@@ -0,0 +1,493 @@
+"""
+Full-text search of the job logs.
+
+Jobs write their stdout and stderr to `logs/stdout.log` and `logs/stderr.log`
+in their output folder. The log index keeps their lines in an SQLite database,
+in blocks of BLOCK_LINES lines with an FTS5 trigram index over the blocks, so
+any piece of a line at least MIN_QUERY_LENGTH characters long is found
+without reading the logs; the matching blocks are then split into lines.
+
+Logs are indexed as they're written: the change feed reports the log files
+that changed, and a background thread reads only what was appended to them
+since last time (a file that was written over is read again from the start).
+When it starts, and before each search, the index catches up with whatever
+the feed missed, checking the files' mtimes and sizes like the catalog does;
+searches made while it's first catching up find what's indexed so far.
+
+Memory use doesn't grow with the logs: files are read in chunks of READ_SIZE,
+overly long lines are cut at MAX_LINE_CHARS, and searches read the matching
+blocks PAGE_BLOCKS at a time while their results are streamed.
+"""
+
+import threading
+import time
+from functools import partial
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator, Optional
+from uuid import UUID
+
+from loguru import logger
+from syft_core import Client
+
+from .changes import JOB_OUTPUTS, ChangeEvent, bus, generation
+from .lib.sqlite_cache import SQLiteCache
+from .metrics import FS_SCAN_DURATION
+
+LOG_INDEX_FILE = "rds-dashboard-logs.sqlite3"
+SCHEMA_VERSION = 1
+
+STREAMS = ("stdout", "stderr")
+BLOCK_LINES = 64
+MAX_LINE_CHARS = 1000
+MIN_QUERY_LENGTH = 3
+MAX_CONTEXT_LINES = 5
+READ_SIZE = 1024 * 1024
+PAGE_BLOCKS = 32
+
+# Lines are cut to this many bytes before decoding
+_MAX_LINE_BYTES = MAX_LINE_CHARS * 4
+# Bytes at the end of a file's indexed part that are compared on the next
+# read, to tell whether the file was appended to or written over
+_TAIL_BYTES = 256
+
+_SCHEMA = """
+CREATE TABLE log_files (
+    job_uid TEXT NOT NULL,
+    stream TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    -- The part of the file in complete blocks, which isn't read again
+    indexed_bytes INTEGER NOT NULL,
+    indexed_lines INTEGER NOT NULL,
+    tail BLOB NOT NULL,
+    PRIMARY KEY (job_uid, stream)
+);
+
+CREATE TABLE log_blocks (
+    id INTEGER PRIMARY KEY,
+    job_uid TEXT NOT NULL,
+    stream TEXT NOT NULL,
+    first_line INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE UNIQUE INDEX log_blocks_position ON log_blocks (job_uid, stream, first_line);
+
+CREATE VIRTUAL TABLE log_search USING fts5(
+    text, content = 'log_blocks', content_rowid = 'id', tokenize = 'trigram'
+);
+CREATE TRIGGER log_blocks_insert AFTER INSERT ON log_blocks BEGIN
+    INSERT INTO log_search (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER log_blocks_delete AFTER DELETE ON log_blocks BEGIN
+    INSERT INTO log_search (log_search, rowid, text)
+    VALUES ('delete', old.id, old.text);
+END;
+"""
+
+_indexes: dict[Path, "LogIndex"] = {}
+_indexes_lock = threading.Lock()
+
+Stamp = tuple[int, int]
+
+
+def _read_lines(file: BinaryIO) -> Iterator[tuple[bytes, int, bool]]:
+    """
+    The lines of `file` from its position on, each with the position after
+    it and whether it's complete (ends with a newline). Lines are cut at
+    _MAX_LINE_BYTES.
+    """
+    position = file.tell()
+    head, pending = b"", 0
+    for chunk in iter(partial(file.read, READ_SIZE), b""):
+        *complete, rest = chunk.split(b"\n")
+        for piece in complete:
+            position += pending + len(piece) + 1
+            line = head + piece[: _MAX_LINE_BYTES - len(head)]
+            head, pending = b"", 0
+            yield line, position, True
+        if rest:
+            head += rest[: _MAX_LINE_BYTES - len(head)]
+            pending += len(rest)
+    if pending:
+        yield head, position + pending, False
+
+
+def _decode(line: bytes) -> str:
+    return line.decode("utf-8", errors="replace").rstrip("\r")[:MAX_LINE_CHARS]
+
+
+class LogIndex(SQLiteCache):
+    """Full-text index of the logs of the jobs in one output folder."""
+
+    SCHEMA = _SCHEMA
+    SCHEMA_VERSION = SCHEMA_VERSION
+
+    def __init__(self, path: Path, outputs_dir: Path):
+        self.outputs_dir = outputs_dir
+        # Change generation of the output folder as of the last refresh
+        self._generation: Optional[int] = None
+        self._refreshed = False
+        self._pending: set[tuple[str, str]] = set()
+        self._wake = threading.Condition()
+        self._caught_up = threading.Event()
+        self._stopped = False
+        self._unsubscribe: Optional[Callable[[], None]] = None
+        self._thread: Optional[threading.Thread] = None
+        super().__init__(path)
+
+    def _reset(self) -> None:
+        self._refreshed = False
+
+    def _log_path(self, job_uid: str, stream: str) -> Path:
+        return self.outputs_dir / UUID(job_uid).hex / "logs" / f"{stream}.log"
+
+    # Keeping up with the logs
+
+    def _stamps(self) -> dict[tuple[str, str], Stamp]:
+        """The mtime and size of each job's log files."""
+        stamps = {}
+        try:
+            entries = list(self.outputs_dir.iterdir())
+        except FileNotFoundError:
+            return stamps
+        for entry in entries:
+            try:
+                job_uid = str(UUID(hex=entry.name))
+            except ValueError:
+                continue
+            for stream in STREAMS:
+                try:
+                    stat = (entry / "logs" / f"{stream}.log").stat()
+                except (FileNotFoundError, NotADirectoryError):
+                    continue
+                stamps[job_uid, stream] = (stat.st_mtime_ns, stat.st_size)
+        return stamps
+
+    def _drop_file(self, job_uid: str, stream: str) -> None:
+        with self._db:
+            self._db.execute(
+                "DELETE FROM log_blocks WHERE job_uid = ? AND stream = ?",
+                (job_uid, stream),
+            )
+            self._db.execute(
+                "DELETE FROM log_files WHERE job_uid = ? AND stream = ?",
+                (job_uid, stream),
+            )
+
+    def _index_file(self, job_uid: str, stream: str) -> None:
+        """Read what was added to a log file since it was last indexed."""
+        path = self._log_path(job_uid, stream)
+        try:
+            file = path.open("rb")
+        except (FileNotFoundError, NotADirectoryError):
+            self._drop_file(job_uid, stream)
+            return
+        with file:
+            stat = path.stat()
+            known = self._db.execute(
+                "SELECT mtime_ns, size, indexed_bytes, indexed_lines, tail "
+                "FROM log_files WHERE job_uid = ? AND stream = ?",
+                (job_uid, stream),
+            ).fetchone()
+            if known and known[:2] == (stat.st_mtime_ns, stat.st_size):
+                return
+            indexed_bytes, indexed_lines = 0, 0
+            if known:
+                _, _, offset, lines, tail = known
+                file.seek(offset - len(tail))
+                # Written over if what was read before isn't there anymore
+                if offset <= stat.st_size and file.read(len(tail)) == tail:
+                    indexed_bytes, indexed_lines = offset, lines
+
+            with self._db:
+                # The last block may be incomplete, it's read again
+                self._db.execute(
+                    "DELETE FROM log_blocks "
+                    "WHERE job_uid = ? AND stream = ? AND first_line >= ?",
+                    (job_uid, stream, indexed_lines),
+                )
+                file.seek(indexed_bytes)
+                block: list[str] = []
+                for line, position, complete in _read_lines(file):
+                    block.append(_decode(line))
+                    if len(block) == BLOCK_LINES and complete:
+                        self._insert_block(job_uid, stream, indexed_lines, block)
+                        indexed_bytes, indexed_lines = (
+                            position,
+                            indexed_lines + len(block),
+                        )
+                        block = []
+                if block:
+                    self._insert_block(job_uid, stream, indexed_lines, block)
+
+                file.seek(max(indexed_bytes - _TAIL_BYTES, 0))
+                tail = file.read(min(indexed_bytes, _TAIL_BYTES))
+                self._db.execute(
+                    "INSERT OR REPLACE INTO log_files VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        job_uid,
+                        stream,
+                        stat.st_mtime_ns,
+                        stat.st_size,
+                        indexed_bytes,
+                        indexed_lines,
+                        tail,
+                    ),
+                )
+
+    def _insert_block(
+        self, job_uid: str, stream: str, first_line: int, lines: list[str]
+    ) -> None:
+        self._db.execute(
+            "INSERT INTO log_blocks (job_uid, stream, first_line, text) "
+            "VALUES (?, ?, ?, ?)",
+            (job_uid, stream, first_line, "\n".join(lines)),
+        )
+
+    def _changes(self) -> tuple[Optional[int], list, list]:
+        """The log files changed and removed since they were last indexed."""
+        # Nothing to look at if the change feed saw no change since last time
+        current = generation(self.outputs_dir)
+        if current is not None and self._refreshed and self._generation == current:
+            return current, [], []
+
+        stamps = self._stamps()
+        known = {
+            (job_uid, stream): (mtime_ns, size)
+            for job_uid, stream, mtime_ns, size in self._db.execute(
+                "SELECT job_uid, stream, mtime_ns, size FROM log_files"
+            )
+        }
+        removed = list(known.keys() - stamps.keys())
+        changed = [key for key, stamp in stamps.items() if known.get(key) != stamp]
+        return current, changed, removed
+
+    def refresh(self) -> None:
+        """Take in the logs written or removed since last time."""
+        with FS_SCAN_DURATION.time(scan="log_index"):
+            current, changed, removed = self._run(self._changes)
+            # A file at a time, so that searches needn't wait for all of them
+            for job_uid, stream in removed:
+                self._run(partial(self._drop_file, job_uid, stream))
+            for job_uid, stream in changed:
+                if self._stopped:
+                    return
+                self._run(partial(self._index_file, job_uid, stream))
+            with self._lock:
+                self._generation, self._refreshed = current, True
+        if changed or removed:
+            logger.debug(
+                f"Log index: {len(changed)} logs updated, {len(removed)} removed"
+            )
+
+    def _on_change(self, event: ChangeEvent) -> None:
+        logs = set()
+        for path in event.paths:
+            if path.parent.name != "logs" or path.suffix != ".log":
+                continue
+            try:
+                job_uid = str(UUID(hex=path.parent.parent.name))
+            except ValueError:
+                continue
+            if path.stem in STREAMS:
+                logs.add((job_uid, path.stem))
+        if logs:
+            with self._wake:
+                self._pending |= logs
+                self._wake.notify()
+
+    def _index_changes(self) -> None:
+        # Catch up with what was written while nobody was watching first
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.error(f"Log index: catching up failed: {e}")
+        self._caught_up.set()
+        while True:
+            with self._wake:
+                while not self._pending and not self._stopped:
+                    self._wake.wait()
+                if self._stopped:
+                    return
+                pending, self._pending = self._pending, set()
+            for job_uid, stream in pending:
+                try:
+                    self._run(partial(self._index_file, job_uid, stream))
+                except Exception as e:
+                    logger.error(f"Log index: indexing {job_uid} {stream} failed: {e}")
+
+    def start(self) -> None:
+        """Index logs in the background as the change feed sees them written."""
+        self._unsubscribe = bus.subscribe(JOB_OUTPUTS, self._on_change)
+        self._thread = threading.Thread(
+            target=self._index_changes, name="log-index", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop indexing, once the file being read is done, and close the database."""
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+        with self._wake:
+            self._stopped = True
+            self._wake.notify()
+        if self._thread is not None:
+            self._thread.join()
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    # Searching
+
+    def _block_text(self, job_uid: str, stream: str, first_line: int) -> list[str]:
+        row = self._db.execute(
+            "SELECT text FROM log_blocks "
+            "WHERE job_uid = ? AND stream = ? AND first_line = ?",
+            (job_uid, stream, first_line),
+        ).fetchone()
+        return row[0].split("\n") if row else []
+
+    def search(
+        self,
+        query: str,
+        stream: Optional[str] = None,
+        job_uid: Optional[str] = None,
+        context: int = 2,
+        limit: int = 100,
+    ) -> Iterator[dict]:
+        """
+        The log lines containing `query` (ignoring case), those written most
+        recently first, with `context` lines before and after them. Lines
+        are numbered from 1.
+
+        Raises ValueError if the query is shorter than MIN_QUERY_LENGTH.
+        """
+        if len(query) < MIN_QUERY_LENGTH:
+            raise ValueError(
+                f"Search for at least {MIN_QUERY_LENGTH} characters at a time"
+            )
+        context = min(max(context, 0), MAX_CONTEXT_LINES)
+        return self._search(query, stream, job_uid, context, limit)
+
+    def _search(
+        self,
+        query: str,
+        stream: Optional[str],
+        job_uid: Optional[str],
+        context: int,
+        limit: int,
+    ) -> Iterator[dict]:
+        needle = query.lower()
+        phrase = '"' + query.replace('"', '""') + '"'
+        filters, filter_params = "", []
+        for column, value in (("stream", stream), ("job_uid", job_uid)):
+            if value is not None:
+                filters += f" AND {column} = ?"
+                filter_params.append(value)
+
+        # Until the background thread has caught up with the logs written
+        # while nobody was watching, search what it has indexed so far
+        if self._caught_up.is_set():
+            self.refresh()
+        found = 0
+        last_id = None
+        while found < limit:
+
+            def page():
+                ids = [
+                    id
+                    for (id,) in self._db.execute(
+                        "SELECT rowid FROM log_search WHERE log_search MATCH ?"
+                        + ("" if last_id is None else " AND rowid < ?")
+                        + " ORDER BY rowid DESC LIMIT ?",
+                        [phrase]
+                        + ([] if last_id is None else [last_id])
+                        + [PAGE_BLOCKS],
+                    )
+                ]
+                if not ids:
+                    return ids, []
+                blocks = self._db.execute(
+                    "SELECT id, job_uid, stream, first_line, text FROM log_blocks "
+                    f"WHERE id IN ({', '.join('?' * len(ids))}){filters} "
+                    "ORDER BY id DESC",
+                    ids + filter_params,
+                ).fetchall()
+                return ids, blocks
+
+            ids, blocks = self._run(page)
+            if not ids:
+                return
+            last_id = ids[-1]
+            for _, block_job, block_stream, first_line, text in blocks:
+                lines = text.split("\n")
+                before_block = after_block = None
+                for i, line in enumerate(lines):
+                    if needle not in line.lower():
+                        continue
+                    before = lines[max(i - context, 0) : i]
+                    if i < context and first_line > 0:
+                        if before_block is None:
+                            before_block = self._run(
+                                partial(
+                                    self._block_text,
+                                    block_job,
+                                    block_stream,
+                                    first_line - BLOCK_LINES,
+                                )
+                            )
+                        before = (
+                            before_block[max(len(before_block) - context + i, 0) :]
+                            + before
+                        )
+                    after = lines[i + 1 : i + 1 + context]
+                    if len(after) < context and len(lines) == BLOCK_LINES:
+                        if after_block is None:
+                            after_block = self._run(
+                                partial(
+                                    self._block_text,
+                                    block_job,
+                                    block_stream,
+                                    first_line + BLOCK_LINES,
+                                )
+                            )
+                        after += after_block[: context - len(after)]
+                    yield {
+                        "job_uid": block_job,
+                        "stream": block_stream,
+                        "line": first_line + i + 1,
+                        "text": line,
+                        "before": before,
+                        "after": after,
+                    }
+                    found += 1
+                    if found >= limit:
+                        return
+
+
+def log_index(rds_client) -> LogIndex:
+    """The log index of the client's job outputs, indexing in the background."""
+    outputs_dir = Path(rds_client.job._get_job_output_folder())
+    with _indexes_lock:
+        if outputs_dir not in _indexes:
+            syftbox_client: Client = rds_client._syftbox_client
+            path = syftbox_client.config.data_dir.parent / ".syftbox" / LOG_INDEX_FILE
+            path.parent.mkdir(parents=True, exist_ok=True)
+            start = time.perf_counter()
+            _indexes[outputs_dir] = index = LogIndex(path, outputs_dir)
+            index.start()
+            logger.debug(
+                f"Log index of {outputs_dir} opened in "
+                f"{time.perf_counter() - start:.2f}s"
+            )
+        return _indexes[outputs_dir]
+
+
+def close_log_indexes() -> None:
+    """Stop indexing the logs, as the app shuts down."""
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+        _indexes.clear()
+    for index in indexes:
+        index.stop()
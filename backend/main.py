@@ -7,11 +7,16 @@ from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 from pydantic import BaseModel
 
+from backend.lib.compression import CompressionMiddleware
 from backend.lib.html_static_files import HTMLStaticFiles
 
 from .api import api_router
 from .api.client_factory import create_rds_client
+from .changes import stop_watching
 from .config import get_settings
+from .logsearch import close_log_indexes
+from .metrics import MetricsMiddleware
+from .profiling import ProfilingMiddleware
 
 
 class ErrorResponse(BaseModel):
@@ -35,6 +40,8 @@ async def lifespan(app: FastAPI):
     yield
 
     # Shutdown logic
+    stop_watching()
+    close_log_indexes()
     if hasattr(app.state, "rds_client") and app.state.rds_client:
         try:
             app.state.rds_client.close()
@@ -80,6 +87,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(
+    CompressionMiddleware, minimum_size=get_settings().compression_minimum_size
+)
+
+app.add_middleware(MetricsMiddleware)
+
+# Profiling is opt-in; when disabled the middleware isn't installed at all
+if get_settings().profiling_enabled:
+    app.add_middleware(ProfilingMiddleware)
+
 app.include_router(api_router)
 
 # Serve static frontend files in production mode
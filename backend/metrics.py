@@ -0,0 +1,173 @@
+"""Application metrics exposed on `/api/metrics`."""
+
+import copy
+import time
+from functools import wraps
+from typing import Any
+
+from .lib.metrics import Registry
+
+REGISTRY = Registry()
+
+REQUEST_LATENCY = REGISTRY.histogram(
+    "rds_dashboard_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    labelnames=("method", "route", "status"),
+)
+RDS_CALL_LATENCY = REGISTRY.histogram(
+    "rds_dashboard_rds_client_call_duration_seconds",
+    "Latency of calls into the RDS client.",
+    labelnames=("call", "outcome"),
+)
+FS_SCAN_DURATION = REGISTRY.histogram(
+    "rds_dashboard_fs_scan_duration_seconds",
+    "Duration of filesystem scans done by the services.",
+    labelnames=("scan",),
+)
+SHOPIFY_FETCH_DURATION = REGISTRY.histogram(
+    "rds_dashboard_shopify_fetch_duration_seconds",
+    "Duration of requests to the Shopify API.",
+    labelnames=("outcome",),
+)
+INGEST_BYTES = REGISTRY.counter(
+    "rds_dashboard_ingest_bytes",
+    "Bytes of staged dataset files moved into the workspace, by method "
+    "(rename, reflink or copy).",
+    labelnames=("method",),
+)
+VERSION_BYTES = REGISTRY.counter(
+    "rds_dashboard_version_bytes",
+    "Bytes of new dataset versions, by kind: changed from the previous "
+    "version, or stored in the chunk store to keep the previous one.",
+    labelnames=("kind",),
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "rds_dashboard_cache_requests",
+    "Cache lookups by cache name and result (hit or miss).",
+    labelnames=("cache", "result"),
+)
+FLIGHT_CALLS = REGISTRY.counter(
+    "rds_dashboard_single_flight_calls",
+    "Calls of single-flight service methods by result: ran the work (leader) "
+    "or shared a call already in flight (shared).",
+    labelnames=("flight", "result"),
+)
+ADMISSIONS = REGISTRY.counter(
+    "rds_dashboard_admissions",
+    "Claims on admission budgets by result: admitted right away (immediate), "
+    "admitted after waiting (queued) or turned away with a 429 (rejected).",
+    labelnames=("budget", "result"),
+)
+ADMISSION_WAIT = REGISTRY.histogram(
+    "rds_dashboard_admission_wait_seconds",
+    "Time claims on admission budgets spent waiting.",
+    labelnames=("budget",),
+)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Count a cache lookup."""
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def record_flight(flight: str, shared: bool) -> None:
+    """Count a single-flight call."""
+    FLIGHT_CALLS.inc(flight=flight, result="shared" if shared else "leader")
+
+
+def _route_template(scope) -> str:
+    """
+    The template of the route the request matched, e.g. `/api/v1/jobs/{job_uid}`,
+    so UIDs in the URL don't blow up the label cardinality.
+    """
+    # Set by Starlette once the request is routed
+    route = scope.get("route")
+    if getattr(route, "path", None) is None:
+        return "<unmatched>"
+    return scope.get("root_path", "") + route.path
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=_route_template(scope),
+                status=status,
+            )
+
+
+def _timed_call(func, call: str):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            result = func(*args, **kwargs)
+            outcome = "ok"
+            return result
+        finally:
+            RDS_CALL_LATENCY.observe(
+                time.perf_counter() - start, call=call, outcome=outcome
+            )
+
+    return wrapper
+
+
+class _InstrumentedProxy:
+    """Proxy timing every public method call on the wrapped object."""
+
+    _namespaces: frozenset[str] = frozenset()
+
+    def __init__(self, target: Any, prefix: str = ""):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_prefix", prefix)
+        object.__setattr__(self, "_wrapped", {})
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._target, name)
+        if name.startswith("_"):
+            return attr
+
+        if name in self._namespaces:
+            proxy = self._wrapped.get(name)
+            if proxy is None or proxy._target is not attr:
+                proxy = self._wrapped[name] = _InstrumentedProxy(attr, f"{name}.")
+            return proxy
+        if callable(attr):
+            return _timed_call(attr, f"{self._prefix}{name}")
+        return attr
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._target, name, value)
+
+    def __copy__(self) -> "_InstrumentedProxy":
+        # A shallow copy of the target, instrumented the same way
+        return type(self)(copy.copy(self._target), self._prefix)
+
+
+class InstrumentedRDSClient(_InstrumentedProxy):
+    """An RDSClient wrapper recording a latency histogram per call."""
+
+    _namespaces = frozenset({"dataset", "job", "user_code", "runtime"})
@@ -1,5 +1,6 @@
 # Standard library imports
-from typing import List, Union
+from functools import lru_cache
+from typing import Any, List, Union
 
 # Third-party imports
 from pydantic import BaseModel, ConfigDict, Field
@@ -39,3 +40,27 @@ class ListJobsResponse(BaseSchema):
 
 class ListAutoApproveResponse(BaseSchema):
     datasites: List[str]
+
+
+@lru_cache()
+def _output_fields(model: type[BaseModel]) -> tuple[tuple[str, str], ...]:
+    return tuple(
+        (name, field.serialization_alias or field.alias or name)
+        for name, field in model.model_fields.items()
+    )
+
+
+def dump_camel(obj: BaseModel, model: type[BaseSchema], **values: Any) -> dict:
+    """
+    Build `model`'s camelCase output straight from an already validated `obj`.
+
+    Fields `obj` doesn't have (or that should be overridden) are passed as
+    keyword arguments. Nothing is validated or converted here; values are
+    encoded as-is by pydantic-core when the response is rendered, which gives
+    the same JSON as `model.model_dump_json(by_alias=True)`.
+    """
+    data = obj.__dict__
+    return {
+        alias: values[name] if name in values else data[name]
+        for name, alias in _output_fields(model)
+    }
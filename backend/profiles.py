@@ -0,0 +1,190 @@
+"""
+Column profiles of datasets' private data, cached per dataset version.
+
+A dataset's version is a fingerprint of the paths, sizes and mtimes of its
+private files, so a profile stays valid until the data itself changes. Profiles
+are computed one at a time on a background thread; readers get the last
+finished profile (flagged as stale if the data changed since) while a new one
+is computed.
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from hashlib import blake2b
+from pathlib import Path
+from typing import Literal, Optional
+
+from loguru import logger
+
+from .lib.column_profile import profile_file
+from .lib.tabular import table_format
+from .metrics import FS_SCAN_DURATION, record_cache
+
+ProfileStatus = Literal["computing", "ready", "failed"]
+
+
+@dataclass
+class _ProfileEntry:
+    version: str
+    status: ProfileStatus
+    data_dir: Path
+    # Last finished profile, possibly of an older version
+    profile: Optional[dict] = None
+    error: Optional[str] = None
+
+
+_entries: dict[str, _ProfileEntry] = {}
+_lock = threading.Lock()
+_queue: "queue.Queue[str]" = queue.Queue()
+_worker: Optional[threading.Thread] = None
+
+
+def _data_files(data_dir: Path) -> list[Path]:
+    return sorted(
+        path
+        for path in data_dir.rglob("*")
+        if path.is_file() and not path.name.startswith(".")
+    )
+
+
+def dataset_version(data_dir: Path) -> str:
+    """Fingerprint of the files under `data_dir`; costs one `stat` per file."""
+    digest = blake2b(digest_size=16)
+    for path in _data_files(data_dir):
+        stat = path.stat()
+        digest.update(
+            f"{path.relative_to(data_dir)}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode()
+        )
+    return digest.hexdigest()
+
+
+def profile_dataset(data_dir: Path) -> dict:
+    """Profile every tabular file under `data_dir`; other files are listed as skipped."""
+    files, skipped = [], []
+    for path in _data_files(data_dir):
+        relative_path = path.relative_to(data_dir).as_posix()
+        if table_format(path) is None:
+            skipped.append(relative_path)
+            continue
+        try:
+            files.append({"path": relative_path, **profile_file(path)})
+        except (ValueError, OSError) as e:
+            files.append({"path": relative_path, "error": str(e)})
+    return {"files": files, "skipped": skipped}
+
+
+def _snapshot(dataset_uid: str, entry: _ProfileEntry) -> dict:
+    profile = entry.profile
+    return {
+        "dataset_uid": dataset_uid,
+        "status": entry.status,
+        "version": entry.version,
+        "stale": profile is not None and profile["version"] != entry.version,
+        "error": entry.error,
+        "profile": profile,
+    }
+
+
+def _run_worker() -> None:
+    while True:
+        dataset_uid = _queue.get()
+        try:
+            _compute(dataset_uid)
+        except Exception as e:
+            logger.error(f"Error profiling dataset {dataset_uid}: {e}")
+        finally:
+            _queue.task_done()
+
+
+def _compute(dataset_uid: str) -> None:
+    with _lock:
+        entry = _entries[dataset_uid]
+        data_dir = entry.data_dir
+
+    version = dataset_version(data_dir)
+    with _lock:
+        if entry.profile is not None and entry.profile["version"] == version:
+            # Already profiled, e.g. the update didn't touch the data
+            entry.version, entry.status, entry.error = version, "ready", None
+            return
+        entry.version = version
+
+    try:
+        start = time.monotonic()
+        with FS_SCAN_DURATION.time(scan="dataset_profile"):
+            profile = profile_dataset(data_dir)
+        profile.update(
+            version=version,
+            computed_at=datetime.now(timezone.utc).isoformat(),
+            duration=time.monotonic() - start,
+        )
+    except Exception as e:
+        with _lock:
+            entry.status, entry.error = "failed", str(e)
+        raise
+
+    # The data may have changed again while we were reading it
+    if dataset_version(data_dir) != version:
+        logger.debug(f"Dataset {dataset_uid} changed while profiling, recomputing")
+        with _lock:
+            entry.profile = profile
+        _queue.put(dataset_uid)
+        return
+
+    with _lock:
+        entry.profile, entry.status, entry.error = profile, "ready", None
+    logger.debug(f"Profiled dataset {dataset_uid} in {profile['duration']:.2f}s")
+
+
+def _ensure_worker() -> None:
+    global _worker
+    if _worker is None or not _worker.is_alive():
+        # Daemon so a long profile never holds up shutdown
+        _worker = threading.Thread(
+            target=_run_worker, name="dataset-profiler", daemon=True
+        )
+        _worker.start()
+
+
+def schedule_profile(dataset_uid: str, data_dir: Path) -> None:
+    """Queue a background (re)computation of a dataset's profile."""
+    with _lock:
+        entry = _entries.get(dataset_uid)
+        if entry is not None and entry.status == "computing":
+            entry.data_dir = data_dir
+            return
+        if entry is None:
+            entry = _entries[dataset_uid] = _ProfileEntry(
+                version="", status="computing", data_dir=data_dir
+            )
+        else:
+            entry.status, entry.error, entry.data_dir = "computing", None, data_dir
+        _ensure_worker()
+    _queue.put(dataset_uid)
+
+
+def get_profile(dataset_uid: str, data_dir: Path) -> dict:
+    """
+    The dataset's profile and its status.
+
+    When the data changed since the cached profile was computed, a new one is
+    scheduled and the old one is returned flagged as `stale`.
+    """
+    version = dataset_version(data_dir)
+    with _lock:
+        entry = _entries.get(dataset_uid)
+        current = entry is not None and entry.version == version
+        if current and entry.status != "computing":
+            record_cache("dataset_profile", hit=entry.status == "ready")
+            return _snapshot(dataset_uid, entry)
+
+    record_cache("dataset_profile", hit=False)
+    if not current:
+        schedule_profile(dataset_uid, data_dir)
+    with _lock:
+        entry = _entries[dataset_uid]
+        entry.version = version
+        return _snapshot(dataset_uid, entry)
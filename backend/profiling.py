@@ -0,0 +1,119 @@
+"""Opt-in per-request profiling."""
+
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+
+from loguru import logger
+from starlette.concurrency import run_in_threadpool
+
+from .config import get_settings
+from .lib.profiler import ProfileStore, StackSampler
+
+
+@lru_cache()
+def get_profile_store() -> ProfileStore:
+    """Get the store profiles are written to."""
+    settings = get_settings()
+    if settings.profiling_dir:
+        directory = Path(settings.profiling_dir)
+    else:
+        from .context import get_syftbox_context
+
+        directory = get_syftbox_context().private_app_dir / "profiles"
+    return ProfileStore(directory, max_profiles=settings.profiling_max_profiles)
+
+
+def _new_profile_id() -> str:
+    now = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    return f"{now}-{uuid.uuid4().hex[:8]}"
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling selected requests.
+
+    Only added to the app when profiling is enabled. A request is profiled
+    when it carries the profiling header or falls within the sample rate; at
+    most one request is profiled at a time so the sampler's overhead stays
+    bounded. Profiled responses carry an `X-Profile-Id` header.
+
+    Only the event loop thread is sampled. Work the request hands to the
+    threadpool (sync endpoints, `run_in_threadpool`) shows up as the loop
+    awaiting it, not as the work itself: the pool's threads are shared with
+    every other request, so their samples couldn't be told apart. Profiles
+    record this as their `thread`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        settings = get_settings()
+        self.header = settings.profiling_header.lower().encode()
+        self.sample_rate = settings.profiling_sample_rate
+        self.interval = settings.profiling_interval
+        self._busy = threading.Lock()
+
+    def _should_profile(self, scope) -> bool:
+        if scope["type"] != "http" or scope["path"].startswith("/api/v1/debug"):
+            return False
+        if any(name == self.header for name, _ in scope["headers"]):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if not self._should_profile(scope) or not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = _new_profile_id()
+        started_at = datetime.now(timezone.utc)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile_id.encode())
+                ]
+            await send(message)
+
+        sampler = StackSampler(threading.get_ident(), self.interval).start()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            sampler.stop(wait=False)
+            # Joining the sampler and writing the profile would block the loop
+            await run_in_threadpool(
+                self._finish, profile_id, scope, status, started_at, duration, sampler
+            )
+
+    def _finish(self, profile_id, scope, status, started_at, duration, sampler):
+        sampler.stop()
+        self._busy.release()
+        profile = {
+            "id": profile_id,
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": scope.get("query_string", b"").decode(errors="replace"),
+            "status": status,
+            "started_at": started_at.isoformat(),
+            "duration": duration,
+            "thread": "event loop",
+            "cpu_time": sampler.cpu_time,
+            "interval": sampler.interval,
+            "samples": sampler.samples,
+            "wall": dict(sampler.wall),
+            "cpu": dict(sampler.cpu),
+        }
+        try:
+            get_profile_store().save(profile_id, profile)
+            logger.debug(f"Saved profile {profile_id} for {scope['path']}")
+        except Exception as e:
+            logger.warning(f"Failed to save profile {profile_id}: {e}")
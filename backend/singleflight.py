@@ -0,0 +1,61 @@
+"""
+Single-flight service calls.
+
+Several tabs or API clients polling the same endpoint send identical requests
+at nearly the same moment, and each would repeat the full backend work. A
+service method decorated with `single_flight` runs once at a time per set of
+arguments: callers arriving while a call is in flight wait for that call and
+get its result (or its exception) too. Nothing is kept once the call is done,
+so this isn't a cache and results are never staler than the call they shared.
+
+Shared results are the same objects for every caller, so they must not be
+modified after they're returned.
+"""
+
+import asyncio
+from functools import partial, wraps
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+from .metrics import record_flight
+
+T = TypeVar("T")
+
+_flights: dict[Hashable, asyncio.Task] = {}
+
+
+def _landed(key: Hashable, task: asyncio.Task) -> None:
+    if _flights.get(key) is task:
+        del _flights[key]
+    # Mark the exception retrieved in case every caller went away meanwhile
+    if not task.cancelled():
+        task.exception()
+
+
+def single_flight(
+    name: str,
+) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """
+    Make concurrent calls of an async method with equal (hashable) arguments
+    share one call. The result mustn't depend on the instance beyond the RDS
+    client, which is the same for every request.
+    """
+
+    def decorate(method: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @wraps(method)
+        async def wrapper(self, *args, **kwargs) -> T:
+            key = (name, args, tuple(sorted(kwargs.items())))
+            loop = asyncio.get_running_loop()
+            task = _flights.get(key)
+            shared = task is not None and task.get_loop() is loop
+            if not shared:
+                task = loop.create_task(method(self, *args, **kwargs))
+                _flights[key] = task
+                task.add_done_callback(partial(_landed, key))
+            record_flight(name, shared)
+            # A caller going away (e.g. its client disconnecting) doesn't
+            # cancel the call for the others
+            return await asyncio.shield(task)
+
+        return wrapper
+
+    return decorate
@@ -1,10 +1,12 @@
 import json
-from typing import Dict, Literal
+from pathlib import Path
+from typing import Dict, Literal, Optional
 from uuid import UUID
 from pydantic import BaseModel, Field, HttpUrl
-from syft_core import Client
 
-from .config import get_settings
+from .changes import expect_changes, generation
+from .context import get_syftbox_context
+from .metrics import record_cache
 
 
 class ShopifySource(BaseModel):
@@ -15,6 +17,9 @@ class ShopifySource(BaseModel):
 
 type SourcesConfig = Dict[UUID, ShopifySource]
 
+# (path, change generation, sources) of the last read, while the file is watched
+_cache: Optional[tuple[Path, int, SourcesConfig]] = None
+
 
 def find_source(dataset_uid: UUID | str):
     if isinstance(dataset_uid, str):
@@ -25,37 +30,40 @@ def find_source(dataset_uid: UUID | str):
 
 
 def get_sources_config_path():
-    syftbox_client = Client.load()
-    app_settings = get_settings()
-
-    sources_config_path = (
-        syftbox_client.workspace.data_dir
-        / "private"
-        / app_settings.app_name
-        / "dataset-sources.json"
-    )
-
-    return sources_config_path
+    return get_syftbox_context().sources_config_path
 
 
 def load_sources() -> SourcesConfig:
-    sources_config_path = get_sources_config_path()
+    global _cache
 
-    if not sources_config_path.is_file():
-        return {}
-
-    with open(sources_config_path) as f:
-        raw_data = json.load(f)
+    sources_config_path = get_sources_config_path()
+    # Taken before reading, so a change during the read isn't missed
+    current = generation(sources_config_path)
+    cached = _cache
+    if current is not None and cached and cached[:2] == (sources_config_path, current):
+        record_cache("sources", hit=True)
+        return dict(cached[2])
+    record_cache("sources", hit=False)
 
     sources = {}
-    for uid, source_data in raw_data.items():
-        sources[UUID(uid)] = ShopifySource(**source_data)
+    if sources_config_path.is_file():
+        with open(sources_config_path) as f:
+            raw_data = json.load(f)
 
-    return sources
+        for uid, source_data in raw_data.items():
+            sources[UUID(uid)] = ShopifySource(**source_data)
+
+    if current is not None:
+        _cache = (sources_config_path, current, sources)
+    return dict(sources)
 
 
 def save_sources(sources: SourcesConfig):
+    global _cache
+
     sources_config_path = get_sources_config_path()
+    # The change feed may take a moment to notice the write
+    _cache = None
 
     if not sources_config_path.is_file():
         sources_config_path.parent.mkdir(parents=True, exist_ok=True)
@@ -66,6 +74,8 @@ def save_sources(sources: SourcesConfig):
 
     with open(sources_config_path, "w") as f:
         json.dump(serializable_sources, f, indent=2)
+    # Read again from here on, even before the change feed delivers the write
+    expect_changes()
 
 
 def add_dataset_source(uid: UUID, source: ShopifySource):
@@ -0,0 +1,85 @@
+"""
+Staging of new dataset files next to the SyftBox workspace.
+
+Files are staged under `~/.syftbox`, the same filesystem (and parent
+directory) as the private datasets, and outside the synced datasites. RDS
+copies a dataset's files into the workspace when it's created or updated; the
+copy is swapped for a handover (see `lib.handover`) that renames staged files
+into place, so staged bytes are written to disk once instead of twice.
+"""
+
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from loguru import logger
+from syft_core import Client
+
+from .lib.handover import handover_tree
+from .metrics import INGEST_BYTES
+
+STAGING_DIR = "rds-dashboard-staging"
+# Leftover staging directories (e.g. from a crash) older than this are removed
+STALE_STAGING_AGE = 24 * 60 * 60
+
+_cleaned: set[Path] = set()
+_lock = threading.Lock()
+
+
+def staging_root(syftbox_client: Client) -> Path:
+    """The staging directory of the workspace, created on first use."""
+    # Same parent as RDS' private datasets (`~/.syftbox/private_datasets`)
+    root = syftbox_client.config.data_dir.parent / ".syftbox" / STAGING_DIR
+    with _lock:
+        if root not in _cleaned:
+            root.mkdir(parents=True, exist_ok=True)
+            _remove_stale(root)
+            _cleaned.add(root)
+    return root
+
+
+def _remove_stale(root: Path) -> None:
+    cutoff = time.time() - STALE_STAGING_AGE
+    for path in root.iterdir():
+        try:
+            if path.stat().st_mtime < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+                logger.debug(f"Removed stale staging directory {path}")
+        except OSError:
+            continue
+
+
+def is_staged(path: Path, syftbox_client: Client) -> bool:
+    try:
+        Path(path).resolve().relative_to(staging_root(syftbox_client).resolve())
+        return True
+    except ValueError:
+        return False
+
+
+def install_handover(rds_client, syftbox_client: Client) -> None:
+    """
+    Make `rds_client` move staged files into the workspace instead of copying
+    them. Files from anywhere else are still copied.
+    """
+    try:
+        files_manager = rds_client.dataset.local_store.dataset._files_manager
+    except AttributeError:
+        logger.warning("Can't hand staged files over to this RDS client, copying")
+        return
+
+    copy_directory = files_manager.copy_directory
+
+    def handover_directory(src, dest_dir: Path) -> Path:
+        if not is_staged(src, syftbox_client):
+            return copy_directory(src, dest_dir)
+        if not Path(src).is_dir():
+            raise ValueError(f"Source path is not a directory: {src}")
+        handed_over = handover_tree(Path(src), dest_dir)
+        for method, nbytes in handed_over.items():
+            INGEST_BYTES.inc(nbytes, method=method)
+        logger.debug(f"Handed {src} over to {dest_dir}: {dict(handed_over)}")
+        return dest_dir
+
+    files_manager.copy_directory = handover_directory
@@ -0,0 +1,356 @@
+"""
+Resumable, chunked uploads of dataset files with content-addressed dedup.
+
+An upload session is opened with the list of files to send, each with its
+size and content hash. Files are sent in fixed-size chunks, in order, each
+with its own SHA-256; a file's content hash is the SHA-256 of its chunks'
+digests concatenated, so both sides can compute it chunk by chunk and the
+server can check it without reading the file again.
+
+Sessions live on disk (a manifest, the partial files and the digests of their
+received chunks), so an interrupted upload resumes from the last stored chunk,
+even across restarts. Completed files go into a blob store keyed by their
+content hash; a file whose blob already exists is never sent. Datasets get
+their own copy of a blob (a reflink where the filesystem supports it, so no
+bytes are copied), and blobs no upload has used for a while are evicted. A
+blob's last use is kept as the mtime of a `.used` file next to it, since the
+blob itself is never touched once stored.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path, PurePosixPath
+from typing import Iterator, Literal, Optional
+
+from fastapi import HTTPException
+from loguru import logger
+from syft_core import Client
+
+# Fixed chunk size of the protocol, part of every file's content hash
+CHUNK_SIZE = 8 * 1024 * 1024
+UPLOADS_DIR = "rds-dashboard-uploads"
+# Unfinished sessions are dropped after this long without a chunk
+SESSION_TTL = 24 * 60 * 60
+# Blobs are kept this long after their last use, for re-uploads
+UNUSED_BLOB_TTL = 7 * 24 * 60 * 60
+MAX_FILES = 1000
+
+FileRole = Literal["private", "mock"]
+
+_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+# Per file of each session, and per session (index None) for finalizing
+_locks: dict[tuple[str, Optional[int]], threading.Lock] = {}
+_locks_lock = threading.Lock()
+
+
+def content_hash(chunk_digests: list[bytes]) -> str:
+    """A file's content hash from the raw SHA-256 digests of its chunks."""
+    return hashlib.sha256(b"".join(chunk_digests)).hexdigest()
+
+
+def uploads_root(syftbox_client: Client) -> Path:
+    """Upload sessions and blobs, on the same filesystem as the staging area."""
+    root = syftbox_client.config.data_dir.parent / ".syftbox" / UPLOADS_DIR
+    (root / "sessions").mkdir(parents=True, exist_ok=True)
+    (root / "blobs").mkdir(parents=True, exist_ok=True)
+    return root
+
+
+def blob_path(root: Path, sha256: str) -> Path:
+    return root / "blobs" / sha256[:2] / sha256
+
+
+def _used_path(blob: Path) -> Path:
+    return blob.with_name(f"{blob.name}.used")
+
+
+def _mark_used(blob: Path) -> None:
+    """Keep `blob` from being evicted for another UNUSED_BLOB_TTL."""
+    _used_path(blob).touch()
+
+
+def _last_used(blob: Path) -> float:
+    mtime = blob.stat().st_mtime
+    try:
+        return max(mtime, _used_path(blob).stat().st_mtime)
+    except FileNotFoundError:
+        return mtime
+
+
+def _session_dir(root: Path, upload_id: str) -> Path:
+    if not re.fullmatch(r"[0-9a-f]{32}", upload_id):
+        raise HTTPException(status_code=404, detail=f"Upload '{upload_id}' not found")
+    session_dir = root / "sessions" / upload_id
+    if not (session_dir / "manifest.json").exists():
+        raise HTTPException(status_code=404, detail=f"Upload '{upload_id}' not found")
+    return session_dir
+
+
+def _load_manifest(session_dir: Path) -> dict:
+    return json.loads((session_dir / "manifest.json").read_text())
+
+
+def _lock(upload_id: str, index: Optional[int] = None) -> threading.Lock:
+    with _locks_lock:
+        return _locks.setdefault((upload_id, index), threading.Lock())
+
+
+def _forget_locks(upload_id: str) -> None:
+    """Drop the locks of a session that's gone."""
+    with _locks_lock:
+        for key in [key for key in _locks if key[0] == upload_id]:
+            del _locks[key]
+
+
+def _end_session(session_dir: Path) -> None:
+    shutil.rmtree(session_dir, ignore_errors=True)
+    _forget_locks(session_dir.name)
+
+
+def _chunk_digests(session_dir: Path, index: int) -> list[bytes]:
+    path = session_dir / f"{index}.digests"
+    data = path.read_bytes() if path.exists() else b""
+    # A digest cut short by a crash doesn't count
+    return [data[i : i + 32] for i in range(0, len(data) - len(data) % 32, 32)]
+
+
+def _received(entry: dict, digests: list[bytes]) -> int:
+    """Bytes of a file stored so far; only chunks with a digest count."""
+    if entry["present"]:
+        return entry["size"]
+    return min(len(digests) * CHUNK_SIZE, entry["size"])
+
+
+def _validate_path(path: str) -> str:
+    parts = PurePosixPath(path).parts
+    if not parts or path.startswith("/") or any(p in ("", ".", "..") for p in parts):
+        raise HTTPException(status_code=400, detail=f"Invalid file path: {path}")
+    return PurePosixPath(*parts).as_posix()
+
+
+def collect_garbage(root: Path) -> None:
+    """Drop expired sessions and unused blobs."""
+    now = time.time()
+    for session_dir in (root / "sessions").iterdir():
+        try:
+            if now - session_dir.stat().st_mtime > SESSION_TTL:
+                _end_session(session_dir)
+                logger.debug(f"Removed expired upload session {session_dir.name}")
+        except OSError:
+            continue
+    for blob in (root / "blobs").glob("*/*"):
+        try:
+            if not _SHA256.match(blob.name):
+                # A last use record whose blob is gone
+                if not blob.with_suffix("").exists():
+                    blob.unlink()
+            elif now - _last_used(blob) > UNUSED_BLOB_TTL:
+                blob.unlink()
+                _used_path(blob).unlink(missing_ok=True)
+                logger.debug(f"Removed unused blob {blob.name}")
+        except OSError:
+            continue
+
+
+def create_session(root: Path, files: list[dict]) -> dict:
+    """
+    Open an upload session for `files` (path, role, size, sha256).
+
+    Files whose content is already in the blob store are marked present and
+    need no chunks.
+    """
+    if not files:
+        raise HTTPException(status_code=400, detail="No files to upload")
+    if len(files) > MAX_FILES:
+        raise HTTPException(
+            status_code=400, detail=f"At most {MAX_FILES} files per upload"
+        )
+    collect_garbage(root)
+
+    entries, seen = [], set()
+    for f in files:
+        path = _validate_path(f["path"])
+        if (f["role"], path) in seen:
+            raise HTTPException(status_code=400, detail=f"Duplicate file: {path}")
+        seen.add((f["role"], path))
+        sha256 = f["sha256"].lower()
+        if not _SHA256.match(sha256):
+            raise HTTPException(status_code=400, detail=f"Invalid hash for {path}")
+        blob = blob_path(root, sha256)
+        present = blob.exists() and blob.stat().st_size == f["size"]
+        if present:
+            _mark_used(blob)
+        entries.append(
+            {
+                "path": path,
+                "role": f["role"],
+                "size": f["size"],
+                "sha256": sha256,
+                "present": present,
+            }
+        )
+
+    upload_id = uuid.uuid4().hex
+    session_dir = root / "sessions" / upload_id
+    session_dir.mkdir()
+    manifest = {"id": upload_id, "chunk_size": CHUNK_SIZE, "files": entries}
+    (session_dir / "manifest.json").write_text(json.dumps(manifest))
+    present = sum(entry["present"] for entry in entries)
+    logger.debug(f"Upload {upload_id}: {len(entries)} files, {present} already present")
+    return session_status(root, upload_id)
+
+
+def session_status(root: Path, upload_id: str) -> dict:
+    """The session's files with the offset each upload should resume from."""
+    session_dir = _session_dir(root, upload_id)
+    manifest = _load_manifest(session_dir)
+    files = []
+    for index, entry in enumerate(manifest["files"]):
+        received = _received(entry, _chunk_digests(session_dir, index))
+        files.append(
+            {
+                "index": index,
+                "path": entry["path"],
+                "role": entry["role"],
+                "size": entry["size"],
+                "present": entry["present"],
+                "offset": received,
+                "complete": received == entry["size"],
+            }
+        )
+    return {
+        "id": upload_id,
+        "chunk_size": manifest["chunk_size"],
+        "files": files,
+        "complete": all(f["complete"] for f in files),
+    }
+
+
+def write_chunk(
+    root: Path, upload_id: str, index: int, offset: int, data: bytes, sha256: str
+) -> int:
+    """
+    Store one chunk of a file and return the offset of the next one.
+
+    Chunks must be sent in order; a chunk that was already stored is
+    accepted again if it's identical, so retries are harmless.
+    """
+    session_dir = _session_dir(root, upload_id)
+    manifest = _load_manifest(session_dir)
+    if not 0 <= index < len(manifest["files"]):
+        raise HTTPException(status_code=404, detail=f"No file {index} in upload")
+    entry = manifest["files"][index]
+    size = entry["size"]
+
+    digest = hashlib.sha256(data).digest()
+    if digest.hex() != sha256.lower():
+        raise HTTPException(status_code=400, detail="Chunk checksum mismatch")
+    if offset % CHUNK_SIZE or len(data) != min(CHUNK_SIZE, size - offset):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Chunks must be {CHUNK_SIZE} bytes, at multiples of that offset",
+        )
+
+    with _lock(upload_id, index):
+        digests = _chunk_digests(session_dir, index)
+        received = _received(entry, digests)
+        if offset < received:
+            if entry["present"] or digests[offset // CHUNK_SIZE] == digest:
+                return received
+            raise HTTPException(
+                status_code=409, detail="Chunk differs from the one already stored"
+            )
+        if offset > received:
+            raise HTTPException(
+                status_code=409,
+                detail={"message": "Chunk out of order", "offset": received},
+            )
+
+        with open(session_dir / f"{index}.part", "ab") as part:
+            # Drop the tail of a chunk whose digest wasn't recorded
+            part.truncate(received)
+            part.write(data)
+            part.flush()
+            os.fsync(part.fileno())
+        with open(session_dir / f"{index}.digests", "ab") as digests_file:
+            digests_file.truncate(len(digests) * 32)
+            digests_file.write(digest)
+        # Activity keeps the session from expiring
+        os.utime(session_dir)
+        return received + len(data)
+
+
+def finalize_session(root: Path, upload_id: str) -> list[tuple[FileRole, str, Path]]:
+    """
+    Move a complete session's files into the blob store, after checking their
+    content hashes. Returns each file's role, path and blob.
+    """
+    session_dir = _session_dir(root, upload_id)
+    with _session_lock(upload_id):
+        if not session_dir.exists():
+            # By whoever held the lock just before
+            raise HTTPException(
+                status_code=409, detail=f"Upload '{upload_id}' is already finalized"
+            )
+        files = _finalize(root, session_dir)
+        _end_session(session_dir)
+    return files
+
+
+def _finalize(root: Path, session_dir: Path) -> list[tuple[FileRole, str, Path]]:
+    manifest = _load_manifest(session_dir)
+    files = []
+    for index, entry in enumerate(manifest["files"]):
+        blob = blob_path(root, entry["sha256"])
+        if not entry["present"]:
+            digests = _chunk_digests(session_dir, index)
+            if _received(entry, digests) != entry["size"]:
+                raise HTTPException(
+                    status_code=409, detail=f"{entry['path']} is not fully uploaded"
+                )
+            if content_hash(digests) != entry["sha256"]:
+                raise HTTPException(
+                    status_code=400, detail=f"Content hash mismatch for {entry['path']}"
+                )
+            part = session_dir / f"{index}.part"
+            # Empty files never get a chunk
+            part.touch()
+            blob.parent.mkdir(exist_ok=True)
+            os.replace(part, blob)
+        elif not blob.exists():
+            raise HTTPException(
+                status_code=409,
+                detail=f"{entry['path']} is no longer on the server, upload it again",
+            )
+        # Keep it from being evicted before it's copied into the dataset
+        _mark_used(blob)
+        files.append((entry["role"], entry["path"], blob))
+    return files
+
+
+def delete_session(root: Path, upload_id: str) -> None:
+    session_dir = _session_dir(root, upload_id)
+    with _session_lock(upload_id):
+        _end_session(session_dir)
+
+
+@contextmanager
+def _session_lock(upload_id: str) -> Iterator[None]:
+    """Hold the session for finalizing or deleting it, or raise a 409."""
+    lock = _lock(upload_id)
+    if not lock.acquire(blocking=False):
+        raise HTTPException(
+            status_code=409,
+            detail=f"Upload '{upload_id}' is being finalized or deleted",
+        )
+    try:
+        yield
+    finally:
+        lock.release()
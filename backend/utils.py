@@ -1,23 +1,41 @@
 # Standard library imports
 import json
 from pathlib import Path
+from typing import Optional
 
 # Third-party imports
 from fastapi import HTTPException
 from loguru import logger
-from syft_core import Client
 
+# Local imports
+from .changes import expect_changes, generation
+from .context import get_syftbox_context
+from .metrics import record_cache
 
-def get_auto_approve_file_path(client: Client) -> Path:
-    return client.app_data() / "auto_approve.json"
+# (path, change generation, emails) of the last read, while the file is watched
+_auto_approve_cache: Optional[tuple[Path, int, list[str]]] = None
 
 
-def get_auto_approve_list(client: Client) -> list[str]:
+def get_auto_approve_file_path() -> Path:
+    return get_syftbox_context().auto_approve_file_path
+
+
+def get_auto_approve_list() -> list[str]:
     """
     Get the path to the auto-approve file.
     If it doesn't exist, create it.
     """
-    approve_file_path = get_auto_approve_file_path(client)
+    global _auto_approve_cache
+
+    approve_file_path = get_auto_approve_file_path()
+    # Taken before reading, so a change during the read isn't missed
+    current = generation(approve_file_path)
+    cached = _auto_approve_cache
+    if current is not None and cached and cached[:2] == (approve_file_path, current):
+        record_cache("auto_approve", hit=True)
+        return list(cached[2])
+    record_cache("auto_approve", hit=False)
+
     approve_file_path.parent.mkdir(
         parents=True, exist_ok=True
     )  # Ensure the directory exists
@@ -27,7 +45,10 @@ def get_auto_approve_list(client: Client) -> list[str]:
     # read the file and return it as a dictionary
     try:
         with open(approve_file_path, "r") as f:
-            return json.load(f)
+            emails = json.load(f)
+        if current is not None:
+            _auto_approve_cache = (approve_file_path, current, emails)
+        return list(emails)
     except json.JSONDecodeError:
         logger.error(
             "Failed to decode JSON from auto-approve file, returning empty dict"
@@ -38,14 +59,20 @@ def get_auto_approve_list(client: Client) -> list[str]:
         raise HTTPException(status_code=500, detail="Failed to read auto-approve file")
 
 
-def save_auto_approve_list(client: Client, emails: list[str]) -> None:
+def save_auto_approve_list(emails: list[str]) -> None:
     """
     Save the auto-approve data to the file.
     """
-    approve_file_path = get_auto_approve_file_path(client)
+    global _auto_approve_cache
+
+    approve_file_path = get_auto_approve_file_path()
+    # The change feed may take a moment to notice the write
+    _auto_approve_cache = None
     try:
         with open(approve_file_path, "w") as f:
             json.dump(emails, f, indent=4)
+        # Read again from here on, even before the change feed delivers the write
+        expect_changes()
         logger.debug(f"Auto-approve data saved to {approve_file_path}")
     except Exception as e:
         logger.error(f"Error saving auto-approve file: {e}")
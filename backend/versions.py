@@ -0,0 +1,563 @@
+"""
+Versioned history of datasets' private data.
+
+Every version is a manifest listing each file's content-defined chunks (see
+`lib.cdc`). The dataset's private directory always holds the latest version;
+older versions are kept as reverse deltas: when a new version replaces the
+latest one, the chunks of the latest that the new one doesn't have are
+copied to a content-addressed chunk store, shared by all datasets. Storage
+and writes for history thus grow with what changed, not with the dataset, and
+datasets that never change cost nothing but a manifest.
+
+Any version can be checked out (e.g. for a job pinned to it) or restored as
+a new latest version. Versions are keyed by the dataset's UID, which stays
+the same when the dataset is renamed.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterator, Literal, Optional
+
+from fastapi import HTTPException
+from loguru import logger
+from syft_core import Client
+
+from .lib.cdc import iter_chunks
+from .metrics import VERSION_BYTES
+
+VERSIONS_DIR = "rds-dashboard-versions"
+# Oldest versions beyond this many are dropped
+MAX_VERSIONS = 50
+# Checkouts of old versions not used for this long are removed
+CHECKOUT_TTL = 24 * 60 * 60
+
+VersionSource = Literal["baseline", "external", "shopify_sync", "restore"]
+
+_locks: dict[str, threading.RLock] = {}
+_locks_lock = threading.Lock()
+_pins_lock = threading.Lock()
+
+
+class _ChunkStoreLock:
+    """
+    Held shared while chunks are stored for a version that's being written,
+    and exclusively while unreferenced chunks are collected, so that those
+    aren't collected before the version referring to them is written.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._shared = 0
+        self._exclusive = False
+        self._waiting = 0
+
+    @contextmanager
+    def shared(self) -> Iterator[None]:
+        with self._condition:
+            # Collection goes first, or a stream of commits could starve it
+            while self._exclusive or self._waiting:
+                self._condition.wait()
+            self._shared += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._shared -= 1
+                self._condition.notify_all()
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        with self._condition:
+            self._waiting += 1
+            while self._exclusive or self._shared:
+                self._condition.wait()
+            self._waiting -= 1
+            self._exclusive = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._exclusive = False
+                self._condition.notify_all()
+
+
+_chunk_store = _ChunkStoreLock()
+
+
+def versions_root(syftbox_client: Client) -> Path:
+    """Version history of the workspace, next to the private datasets."""
+    root = syftbox_client.config.data_dir.parent / ".syftbox" / VERSIONS_DIR
+    for sub in ("datasets", "chunks", "checkouts"):
+        (root / sub).mkdir(parents=True, exist_ok=True)
+    return root
+
+
+def _dataset_lock(dataset_uid: str) -> threading.RLock:
+    with _locks_lock:
+        return _locks.setdefault(dataset_uid, threading.RLock())
+
+
+def _chunk_path(root: Path, sha256: str) -> Path:
+    return root / "chunks" / sha256[:2] / sha256
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Unique, so concurrent writes of the same file don't interleave
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _snapshot(directory: Path) -> dict[str, dict]:
+    """Chunk every file under `directory`, keyed by relative POSIX path."""
+    files = {}
+    for path in sorted(p for p in directory.rglob("*") if p.is_file()):
+        with open(path, "rb") as f:
+            chunks = [
+                [hashlib.sha256(chunk).hexdigest(), len(chunk)]
+                for chunk in iter_chunks(f)
+            ]
+        stat = path.stat()
+        files[path.relative_to(directory).as_posix()] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "chunks": chunks,
+        }
+    return files
+
+
+def _matches(directory: Path, files: dict[str, dict]) -> bool:
+    """Whether `directory` still holds exactly `files`, judging by stat."""
+    if not directory.is_dir():
+        return False
+    present = {
+        p.relative_to(directory).as_posix(): p.stat()
+        for p in directory.rglob("*")
+        if p.is_file()
+    }
+    return present.keys() == files.keys() and all(
+        stat.st_size == files[path]["size"]
+        and stat.st_mtime_ns == files[path]["mtime_ns"]
+        for path, stat in present.items()
+    )
+
+
+def _same_content(a: dict[str, dict], b: dict[str, dict]) -> bool:
+    return a.keys() == b.keys() and all(a[p]["chunks"] == b[p]["chunks"] for p in a)
+
+
+def _locate(files: dict[str, dict]) -> dict[str, tuple[str, int, int]]:
+    """Where each chunk of `files` is: its file, offset and length."""
+    located = {}
+    for path, entry in files.items():
+        offset = 0
+        for sha256, length in entry["chunks"]:
+            located.setdefault(sha256, (path, offset, length))
+            offset += length
+    return located
+
+
+def _manifests(root: Path, dataset_uid: str) -> list[dict]:
+    """The dataset's versions, oldest first."""
+    history = root / "datasets" / dataset_uid
+    if not history.is_dir():
+        return []
+    return [json.loads(p.read_text()) for p in sorted(history.glob("*.json"))]
+
+
+def _save_manifest(root: Path, dataset_uid: str, manifest: dict) -> None:
+    path = root / "datasets" / dataset_uid / f"{manifest['version']:08d}.json"
+    _write_atomic(path, json.dumps(manifest).encode())
+
+
+def _new_manifest(
+    version: int,
+    files: dict[str, dict],
+    source: VersionSource,
+    restored_from: Optional[int] = None,
+) -> dict:
+    return {
+        "version": version,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "source": source,
+        "restored_from": restored_from,
+        "files": files,
+    }
+
+
+def _latest(root: Path, dataset_uid: str, private_dir: Path) -> dict:
+    """
+    The latest version, which is always what the private directory holds.
+
+    A dataset without history gets its current data as a baseline version.
+    Data changed outside the dashboard is recorded as a new version; chunks
+    only the previous version had are lost then, as they were never stored.
+    """
+    manifests = _manifests(root, dataset_uid)
+    latest = manifests[-1] if manifests else None
+    if latest is not None and _matches(private_dir, latest["files"]):
+        return latest
+
+    files = _snapshot(private_dir)
+    if latest is not None and _same_content(files, latest["files"]):
+        # Only touched; keep the version, refresh the stats
+        latest["files"] = files
+        _save_manifest(root, dataset_uid, latest)
+        return latest
+
+    if latest is None:
+        source: VersionSource = "baseline"
+    else:
+        source = "external"
+        logger.warning(
+            f"Private data of dataset {dataset_uid} changed outside the dashboard, "
+            f"recording it as a new version"
+        )
+    manifest = _new_manifest(latest["version"] + 1 if latest else 1, files, source)
+    _save_manifest(root, dataset_uid, manifest)
+    return manifest
+
+
+def _read_chunk(
+    root: Path,
+    sha256: str,
+    private_dir: Path,
+    located: dict[str, tuple[str, int, int]],
+) -> Optional[bytes]:
+    """A chunk from the chunk store or the latest version's files."""
+    stored = _chunk_path(root, sha256)
+    if stored.exists():
+        return stored.read_bytes()
+    if sha256 not in located:
+        return None
+    path, offset, length = located[sha256]
+    with open(private_dir / path, "rb") as f:
+        f.seek(offset)
+        data = f.read(length)
+    return data if hashlib.sha256(data).hexdigest() == sha256 else None
+
+
+def _materialize(
+    root: Path, manifest: dict, dest: Path, private_dir: Path, latest: dict
+) -> None:
+    located = _locate(latest["files"])
+    for path, entry in manifest["files"].items():
+        target = dest / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with open(target, "wb") as f:
+            for sha256, _ in entry["chunks"]:
+                data = _read_chunk(root, sha256, private_dir, located)
+                if data is None:
+                    raise HTTPException(
+                        status_code=409,
+                        detail=f"Version {manifest['version']} is no longer available",
+                    )
+                f.write(data)
+
+
+def _restorable(root: Path, manifest: dict, latest: dict) -> bool:
+    if manifest is latest:
+        return True
+    located = _locate(latest["files"])
+    return all(
+        sha256 in located or _chunk_path(root, sha256).exists()
+        for entry in manifest["files"].values()
+        for sha256, _ in entry["chunks"]
+    )
+
+
+def _summary(manifest: dict, previous: Optional[dict]) -> dict:
+    """A version without its chunk lists, with the bytes it changed."""
+    before = set()
+    if previous is not None:
+        before = {
+            sha256
+            for entry in previous["files"].values()
+            for sha256, _ in entry["chunks"]
+        }
+    changed = {
+        sha256: length
+        for entry in manifest["files"].values()
+        for sha256, length in entry["chunks"]
+        if sha256 not in before
+    }
+    return {
+        "version": manifest["version"],
+        "created_at": manifest["created_at"],
+        "source": manifest["source"],
+        "restored_from": manifest["restored_from"],
+        "files": len(manifest["files"]),
+        "size": sum(entry["size"] for entry in manifest["files"].values()),
+        "changed_bytes": sum(changed.values()),
+    }
+
+
+def _collect_chunks(root: Path) -> None:
+    """Remove stored chunks no version of any dataset refers to."""
+    with _chunk_store.exclusive():
+        referenced = {
+            sha256
+            for history in (root / "datasets").iterdir()
+            for manifest in _manifests(root, history.name)
+            for entry in manifest["files"].values()
+            for sha256, _ in entry["chunks"]
+        }
+        freed = 0
+        for chunk in (root / "chunks").glob("*/*"):
+            if chunk.name not in referenced:
+                freed += chunk.stat().st_size
+                chunk.unlink(missing_ok=True)
+        if freed:
+            logger.debug(f"Freed {freed} bytes of unreferenced version chunks")
+
+
+def _remove_stale_checkouts(root: Path) -> None:
+    cutoff = time.time() - CHECKOUT_TTL
+    for checkout in (root / "checkouts").glob("*/*"):
+        try:
+            if checkout.stat().st_mtime < cutoff:
+                shutil.rmtree(checkout, ignore_errors=True)
+        except OSError:
+            continue
+
+
+def list_versions(root: Path, dataset_uid: str, private_dir: Path) -> list[dict]:
+    """The dataset's versions, newest first."""
+    with _dataset_lock(dataset_uid):
+        latest = _latest(root, dataset_uid, private_dir)
+        manifests = _manifests(root, dataset_uid)
+    versions = []
+    for i, manifest in enumerate(manifests):
+        summary = _summary(manifest, manifests[i - 1] if i else None)
+        is_latest = manifest["version"] == latest["version"]
+        summary["latest"] = is_latest
+        summary["restorable"] = is_latest or _restorable(root, manifest, latest)
+        versions.append(summary)
+    return versions[::-1]
+
+
+def commit_version(
+    root: Path,
+    dataset_uid: str,
+    private_dir: Path,
+    new_dir: Path,
+    update: Callable[[], Path],
+    source: VersionSource,
+    restored_from: Optional[int] = None,
+) -> Optional[dict]:
+    """
+    Make the files in `new_dir` the dataset's latest version.
+
+    `update` puts them in the private directory (e.g. through a
+    `DatasetUpdate`) and returns it. Chunks only the current version has are
+    stored first, so it stays restorable. Returns the new version's summary,
+    or None without calling `update` if the content didn't change.
+    """
+    with _dataset_lock(dataset_uid):
+        latest = _latest(root, dataset_uid, private_dir)
+        files = _snapshot(new_dir)
+        if _same_content(files, latest["files"]):
+            logger.debug(f"Dataset {dataset_uid} is unchanged, no new version")
+            return None
+
+        with _chunk_store.shared():
+            summary, trimmed = _store_version(
+                root,
+                dataset_uid,
+                private_dir,
+                latest,
+                files,
+                update,
+                source,
+                restored_from,
+            )
+        if trimmed:
+            _collect_chunks(root)
+        return summary
+
+
+def _store_version(
+    root: Path,
+    dataset_uid: str,
+    private_dir: Path,
+    latest: dict,
+    files: dict[str, dict],
+    update: Callable[[], Path],
+    source: VersionSource,
+    restored_from: Optional[int],
+) -> tuple[dict, bool]:
+    """
+    Write a new version, see `commit_version`. Returns its summary and
+    whether old versions were dropped.
+    """
+    keep = {sha256 for entry in files.values() for sha256, _ in entry["chunks"]}
+    stored = 0
+    for sha256, (path, offset, length) in _locate(latest["files"]).items():
+        chunk = _chunk_path(root, sha256)
+        if sha256 in keep or chunk.exists():
+            continue
+        with open(private_dir / path, "rb") as f:
+            f.seek(offset)
+            _write_atomic(chunk, f.read(length))
+        stored += length
+
+    private_dir = update()
+    # The update only adds and replaces files; the version has no others
+    for path in private_dir.rglob("*"):
+        if path.is_file() and path.relative_to(private_dir).as_posix() not in files:
+            path.unlink()
+    for path, entry in files.items():
+        stat = (private_dir / path).stat()
+        entry["size"], entry["mtime_ns"] = stat.st_size, stat.st_mtime_ns
+
+    manifest = _new_manifest(latest["version"] + 1, files, source, restored_from)
+    _save_manifest(root, dataset_uid, manifest)
+    summary = _summary(manifest, latest)
+    VERSION_BYTES.inc(summary["changed_bytes"], kind="changed")
+    VERSION_BYTES.inc(stored, kind="stored")
+    logger.debug(
+        f"Dataset {dataset_uid} v{manifest['version']}: "
+        f"{summary['changed_bytes']} bytes changed, {stored} bytes of history stored"
+    )
+
+    manifests = _manifests(root, dataset_uid)
+    for old in manifests[:-MAX_VERSIONS]:
+        (root / "datasets" / dataset_uid / f"{old['version']:08d}.json").unlink()
+    return summary, len(manifests) > MAX_VERSIONS
+
+
+def restore_version(
+    root: Path,
+    dataset_uid: str,
+    version: int,
+    private_dir: Path,
+    work_dir: Path,
+    update: Callable[[Path], Path],
+) -> dict:
+    """
+    Make an old version the latest again, as a new version.
+
+    The version's files are assembled in `work_dir` and handed to `update`,
+    which puts them in the private directory and returns it.
+    """
+    with _dataset_lock(dataset_uid):
+        latest = _latest(root, dataset_uid, private_dir)
+        manifest = next(
+            (m for m in _manifests(root, dataset_uid) if m["version"] == version),
+            None,
+        )
+        if manifest is None:
+            raise HTTPException(status_code=404, detail=f"No version {version}")
+        if manifest["version"] == latest["version"]:
+            raise HTTPException(
+                status_code=400, detail=f"Version {version} is the latest version"
+            )
+
+        _materialize(root, manifest, work_dir, private_dir, latest)
+        summary = commit_version(
+            root,
+            dataset_uid,
+            private_dir,
+            work_dir,
+            lambda: update(work_dir),
+            source="restore",
+            restored_from=version,
+        )
+        # Same content as the latest; nothing to restore
+        return summary or _summary(latest, None) | {"changed_bytes": 0}
+
+
+def checkout(root: Path, dataset_uid: str, version: int, private_dir: Path) -> Path:
+    """
+    A directory holding the given version's files, e.g. to run a job on.
+
+    That's the private directory for the latest version. Older versions are
+    assembled once and reused until they've gone unused for a while.
+    """
+    with _dataset_lock(dataset_uid):
+        latest = _latest(root, dataset_uid, private_dir)
+        if version == latest["version"]:
+            return private_dir
+
+        target = root / "checkouts" / dataset_uid / str(version)
+        if target.is_dir():
+            os.utime(target)
+            return target
+
+        manifest = next(
+            (m for m in _manifests(root, dataset_uid) if m["version"] == version),
+            None,
+        )
+        if manifest is None:
+            raise HTTPException(status_code=404, detail=f"No version {version}")
+        _remove_stale_checkouts(root)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Left behind by a crash, it goes with the stale checkouts
+        tmp = Path(tempfile.mkdtemp(prefix=f".{version}.", dir=target.parent))
+        try:
+            _materialize(root, manifest, tmp, private_dir, latest)
+            try:
+                os.replace(tmp, target)
+            except OSError:
+                # Checked out by another worker in the meantime
+                if not target.is_dir():
+                    raise
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        logger.debug(f"Checked out version {version} of dataset {dataset_uid}")
+        return target
+
+
+def drop_history(root: Path, dataset_uid: str) -> None:
+    """Forget a deleted dataset's versions, pins and checkouts."""
+    with _dataset_lock(dataset_uid):
+        shutil.rmtree(root / "datasets" / dataset_uid, ignore_errors=True)
+        shutil.rmtree(root / "checkouts" / dataset_uid, ignore_errors=True)
+    with _pins_lock:
+        pins = _load_pins(root)
+        kept = {
+            job: pin for job, pin in pins.items() if pin["dataset_uid"] != dataset_uid
+        }
+        if kept != pins:
+            _write_atomic(root / "pins.json", json.dumps(kept).encode())
+    _collect_chunks(root)
+
+
+def _load_pins(root: Path) -> dict[str, dict]:
+    path = root / "pins.json"
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def pin_job(root: Path, job_uid: str, dataset_uid: str, version: int) -> None:
+    """Run the job on the given version of its dataset from now on."""
+    with _pins_lock:
+        pins = _load_pins(root)
+        pins[job_uid] = {"dataset_uid": dataset_uid, "version": version}
+        _write_atomic(root / "pins.json", json.dumps(pins).encode())
+
+
+def job_pin(root: Path, job_uid: str) -> Optional[dict]:
+    """The dataset version a job is pinned to, if any."""
+    with _pins_lock:
+        return _load_pins(root).get(job_uid)
+
+
+def unpin_job(root: Path, job_uid: str) -> None:
+    with _pins_lock:
+        pins = _load_pins(root)
+        if pins.pop(job_uid, None) is not None:
+            _write_atomic(root / "pins.json", json.dumps(pins).encode())
@@ -0,0 +1,181 @@
+"""Run the benchmark suite.
+
+Usage:
+    python -m benchmarks [--filter NAME] [--update-baseline] [...]
+
+Results are written as JSON. When a baseline file exists, each benchmark's
+median is compared against it and the run exits with status 1 if any of them
+got slower than the allowed threshold.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from loguru import logger
+
+from .workspace import WorkspaceSpec, generate_workspace
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the rds-dashboard benchmarks")
+    parser.add_argument("--filter", default="", help="Only run benchmarks matching")
+    parser.add_argument("--repeat", type=int, default=7, help="Timed runs per bench")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs first")
+    parser.add_argument("--datasets", type=int, default=WorkspaceSpec.datasets)
+    parser.add_argument("--jobs", type=int, default=WorkspaceSpec.jobs)
+    parser.add_argument(
+        "--large-csv-mb",
+        type=float,
+        default=WorkspaceSpec.large_csv_bytes / (1024 * 1024),
+    )
+    parser.add_argument(
+        "--workdir",
+        type=Path,
+        default=None,
+        help="Where to generate the workspace (defaults to a temp dir)",
+    )
+    parser.add_argument("--output", type=Path, default=Path("bench_results.json"))
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Write the results to the baseline file instead of comparing",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown over the baseline median (0.25 = 25%%)",
+    )
+    return parser.parse_args()
+
+
+def time_benchmark(func, repeat: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+
+    return {
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "mean": statistics.fmean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "runs": repeat,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Return the names of benchmarks that regressed past the threshold."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"  {name}: no baseline, skipping comparison")
+            continue
+        ratio = result["median"] / base["median"] if base["median"] else 1.0
+        status = "REGRESSED" if ratio > 1 + threshold else "ok"
+        print(f"  {name}: {ratio:.2f}x baseline [{status}]")
+        if status == "REGRESSED":
+            regressions.append(name)
+    return regressions
+
+
+def main() -> int:
+    args = parse_args()
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    spec = WorkspaceSpec(
+        datasets=args.datasets,
+        jobs=args.jobs,
+        large_csv_bytes=int(args.large_csv_mb * 1024 * 1024),
+    )
+
+    with tempfile.TemporaryDirectory(prefix="rds-bench-") as tmp:
+        root = args.workdir or Path(tmp)
+        start = time.perf_counter()
+        workspace = generate_workspace(root, spec)
+        print(f"Generated workspace in {time.perf_counter() - start:.1f}s at {root}")
+
+        # The services resolve the SyftBox config through the shared context
+        os.environ["SYFTBOX_CLIENT_CONFIG_PATH"] = str(workspace.config_path)
+        from backend.context import invalidate_syftbox_context
+
+        from .fake_rds import FakeRDSClient
+        from .suite import BENCHMARK_ITEMS, BENCHMARKS, BenchContext
+
+        invalidate_syftbox_context()
+
+        loop = asyncio.new_event_loop()
+        client = FakeRDSClient(workspace)
+        ctx = BenchContext(workspace=workspace, client=client, loop=loop)
+
+        results = {}
+        try:
+            for name, setup in BENCHMARKS.items():
+                if args.filter not in name:
+                    continue
+                result = time_benchmark(setup(ctx), args.repeat, args.warmup)
+                line = f"{name}: {result['median'] * 1000:.2f} ms (median)"
+                if name in BENCHMARK_ITEMS:
+                    result["items"] = BENCHMARK_ITEMS[name]
+                    result["per_item"] = result["median"] / result["items"]
+                    line += f", {result['per_item'] * 1e6:.2f} us/item"
+                results[name] = result
+                print(line)
+        finally:
+            client.close()
+            loop.close()
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "spec": spec.__dict__,
+        },
+        "results": results,
+    }
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    args.output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"Results written to {args.output}")
+
+    if not args.baseline.is_file():
+        print(f"No baseline at {args.baseline}; run with --update-baseline first")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("meta", {}).get("spec") != spec.__dict__:
+        print("Warning: baseline was recorded with a different workspace spec")
+
+    print(f"Comparing against {args.baseline} (threshold {args.threshold:.0%}):")
+    regressions = compare(results, baseline["results"], args.threshold)
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
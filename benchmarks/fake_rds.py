@@ -0,0 +1,196 @@
+"""In-process stand-in for `RDSClient` backed by a synthetic workspace.
+
+Records are kept in memory, but the objects handed out are real syft_rds
+models registered against this client, so the services resolve paths exactly
+as they do in production. Log and output reads reuse syft_rds' own
+implementations so their cost is representative. Records are also written to
+real YAML stores, for what reads those directly (the catalog, the activity
+index).
+"""
+
+import shutil
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Optional
+from uuid import UUID, uuid4
+
+from syft_rds.client.client_registry import GlobalClientRegistry
+from syft_rds.client.rds_clients.job import JobRDSClient
+from syft_rds.models import Dataset as SyftDataset
+from syft_rds.models import DatasetUpdate
+from syft_rds.models import Job as SyftJob
+from syft_rds.models.job_models import JobStatus
+from syft_rds.store import YAMLStore
+
+from .workspace import SyntheticWorkspace
+
+
+class _FakeModule:
+    def __init__(
+        self, client: "FakeRDSClient", items: list, store: Optional[YAMLStore] = None
+    ):
+        self._client = client
+        self._items = {item.uid: item for item in items}
+        self._store = store
+        for item in items:
+            item.client_id = client.uid
+            self._save(item)
+
+    def _save(self, item) -> None:
+        if self._store is not None:
+            self._store.create(item, overwrite=True)
+
+    def get_all(self, **filters: Any) -> list:
+        items = sorted(self._items.values(), key=lambda i: i.created_at, reverse=True)
+        return [
+            item.model_copy()
+            for item in items
+            if all(getattr(item, k) == v for k, v in filters.items())
+        ]
+
+    def get(self, uid: Optional[UUID] = None, mode: str = "local", **filters: Any):
+        if uid is not None:
+            if isinstance(uid, str):
+                uid = UUID(uid)
+            item = self._items.get(uid)
+            return item.model_copy() if item else None
+        matches = self.get_all(**filters)
+        return matches[0] if matches else None
+
+
+class _FakeDatasetModule(_FakeModule):
+    def create(
+        self,
+        name: str,
+        path: Path,
+        mock_path: Path,
+        summary: Optional[str] = None,
+        description_path: Optional[Path] = None,
+        auto_approval: Optional[list[str]] = None,
+        **kwargs: Any,
+    ) -> SyftDataset:
+        workspace = self._client.workspace
+        email = workspace.email
+        shutil.copytree(path, workspace.private_datasets_dir / name)
+        shutil.copytree(mock_path, workspace.public_datasets_dir / name)
+        if description_path:
+            shutil.copy(description_path, workspace.public_datasets_dir / name)
+
+        dataset = SyftDataset(
+            name=name,
+            private=f"syft://{email}/.syftbox/private_datasets/{email}/{name}",
+            mock=f"syft://{email}/public/datasets/{name}",
+            summary=summary,
+            readme=None,
+            tags=[],
+            auto_approval=auto_approval or [],
+            client_id=self._client.uid,
+        )
+        self._items[dataset.uid] = dataset
+        self._save(dataset)
+        return dataset.model_copy()
+
+    def update(self, dataset_update: DatasetUpdate) -> SyftDataset:
+        dataset = self._items[dataset_update.uid]
+        if dataset_update.name is not None:
+            dataset.name = dataset_update.name
+        if dataset_update.summary is not None:
+            dataset.summary = dataset_update.summary
+        if dataset_update.auto_approval is not None:
+            dataset.auto_approval = dataset_update.auto_approval
+        if dataset_update.path is not None:
+            private_dir = self._client.workspace.private_datasets_dir / dataset.name
+            shutil.rmtree(private_dir, ignore_errors=True)
+            shutil.copytree(dataset_update.path, private_dir)
+        self._save(dataset)
+        return dataset.model_copy()
+
+    def delete(self, name: str) -> bool:
+        for uid, dataset in list(self._items.items()):
+            if dataset.name == name:
+                del self._items[uid]
+                self._store.delete(uid)
+                return True
+        return False
+
+
+class _FakeJobModule(_FakeModule):
+    # Reuse the real implementations; they only need `get` and the folder
+    get_logs = JobRDSClient.get_logs
+    get_output_dir = JobRDSClient.get_output_dir
+
+    def _get_job_output_folder(self) -> Path:
+        return self._client.workspace.job_output_folder
+
+    def set_status(self, job: SyftJob, status: JobStatus) -> SyftJob:
+        item = self._items[job.uid]
+        item.status = status
+        self._save(item)
+        return item.model_copy()
+
+    def approve(self, job: SyftJob) -> SyftJob:
+        return self.set_status(job, JobStatus.approved)
+
+    def reject(self, job: SyftJob, reason: str = "Unspecified") -> None:
+        self.set_status(job, JobStatus.rejected)
+
+    def delete(self, uid: UUID) -> bool:
+        self._store.delete(uid)
+        return self._items.pop(uid, None) is not None
+
+    def delete_all(self) -> int:
+        count = len(self._items)
+        self._items.clear()
+        self._store.clear()
+        return count
+
+
+class FakeRDSClient:
+    """A `RDSClient` look-alike serving records from a synthetic workspace."""
+
+    def __init__(self, workspace: SyntheticWorkspace):
+        self.workspace = workspace
+        self.uid = uuid4()
+        self.syftbox_client = workspace.syftbox_client
+        self.email = workspace.email
+        self.host = workspace.email
+        self.config = SimpleNamespace(host=workspace.email)
+        # Laid out like syft_rds' local store: one YAML store per record type
+        store_dir = workspace.root / ".fake-rds-store"
+        local_store = SimpleNamespace(
+            job=SimpleNamespace(store=YAMLStore[SyftJob](SyftJob, store_dir)),
+            dataset=SimpleNamespace(
+                store=YAMLStore[SyftDataset](SyftDataset, store_dir)
+            ),
+        )
+        self.dataset = _FakeDatasetModule(
+            self, workspace.datasets, local_store.dataset.store
+        )
+        self.dataset.local_store = local_store
+        self.user_code = _FakeModule(self, workspace.user_codes)
+        self.job = _FakeJobModule(self, workspace.jobs, local_store.job.store)
+        self.job.local_store = local_store
+        GlobalClientRegistry.register_client(self)
+
+    @property
+    def _syftbox_client(self):
+        return self.syftbox_client
+
+    @property
+    def is_admin(self) -> bool:
+        return self.host == self.email
+
+    @property
+    def host_datasite_url(self) -> str:
+        return f"https://syftbox.net/datasites/{self.host}"
+
+    @property
+    def datasets(self) -> list[SyftDataset]:
+        return self.dataset.get_all()
+
+    def run_private(self, job: SyftJob, blocking: bool = True, **kwargs: Any):
+        self.job.set_status(job, JobStatus.job_in_progress)
+        return job
+
+    def close(self) -> None:
+        GlobalClientRegistry.registry.pop(self.uid, None)
@@ -0,0 +1,449 @@
+"""Concurrent load test for the dashboard API.
+
+Usage:
+    python -m benchmarks.loadtest [--tabs 20] [--duration 30] [--serve | --url URL]
+
+By default `backend.main:app` is driven in-process through its ASGI
+interface, so the app shares the event loop with the simulated clients and
+the loop lag reflects what the server would see. `--serve` starts a local
+uvicorn with the same stubbed app and drives it over HTTP; `--url` targets an
+already running instance (whose RDS layer is then whatever it is configured
+with).
+
+Simulated clients:
+- dashboard tabs load everything at once, then poll the account, datasets,
+  jobs and trusted datasites lists
+- log tailers poll a finished job's logs, and now and then search all logs
+- previewers open dataset files, job code and job outputs
+- uploaders create a small dataset and delete it again
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from loguru import logger
+
+from .workspace import WorkspaceSpec, generate_workspace
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+@dataclass
+class EndpointStats:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    bytes: int = 0
+
+    def summary(self, duration: float) -> dict:
+        return {
+            "requests": len(self.latencies),
+            "errors": self.errors,
+            "throughput_rps": len(self.latencies) / duration,
+            "p50_ms": percentile(self.latencies, 50) * 1000,
+            "p95_ms": percentile(self.latencies, 95) * 1000,
+            "p99_ms": percentile(self.latencies, 99) * 1000,
+            "mean_kb": self.bytes / len(self.latencies) / 1024
+            if self.latencies
+            else 0.0,
+        }
+
+
+class ASGITransport:
+    """Send requests straight into an ASGI app without a network hop."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def request(
+        self, method: str, path: str, body: bytes = b"", headers=()
+    ) -> tuple[int, bytes]:
+        path, _, query = path.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [(b"host", b"loadtest")]
+            + [(k.lower().encode(), v.encode()) for k, v in headers],
+            "client": ("127.0.0.1", 0),
+            "server": ("loadtest", 80),
+        }
+        body_sent = False
+        done = asyncio.Event()
+        status = 500
+        chunks = []
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    done.set()
+
+        await self.app(scope, receive, send)
+        done.set()
+        return status, b"".join(chunks)
+
+
+class HTTPTransport:
+    """Plain HTTP using the standard library, run in worker threads."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+
+    def _request(self, method, path, body, headers) -> tuple[int, bytes]:
+        req = urllib.request.Request(
+            self.base_url + path,
+            data=body or None,
+            method=method,
+            headers=dict(headers),
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=120) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+    async def request(self, method, path, body=b"", headers=()) -> tuple[int, bytes]:
+        return await asyncio.to_thread(self._request, method, path, body, headers)
+
+
+def multipart_body(fields: dict[str, str], files: list[tuple[str, str, bytes]]):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"'
+            f"\r\n\r\n{value}\r\n".encode()
+        )
+    for name, filename, content in files:
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; '
+            f'filename="{filename}"\r\nContent-Type: text/csv\r\n\r\n'.encode()
+            + content
+            + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode())
+    headers = [("Content-Type", f"multipart/form-data; boundary={boundary}")]
+    return b"".join(parts), headers
+
+
+class LoadTest:
+    def __init__(self, transport, workspace, args):
+        self.transport = transport
+        self.workspace = workspace
+        self.args = args
+        self.stats: dict[str, EndpointStats] = {}
+        self.loop_lag: list[float] = []
+        self.stop_at = 0.0
+
+    async def call(
+        self, label: str, method: str, path: str, body=b"", headers=()
+    ) -> Optional[bytes]:
+        """Make a request, recording its stats; returns the body on success."""
+        stats = self.stats.setdefault(label, EndpointStats())
+        start = time.perf_counter()
+        try:
+            status, content = await self.transport.request(method, path, body, headers)
+        except Exception as e:
+            logger.warning(f"{label} failed: {e}")
+            status, content = 599, b""
+        stats.latencies.append(time.perf_counter() - start)
+        stats.bytes += len(content)
+        if status >= 400:
+            stats.errors += 1
+            return None
+        return content
+
+    async def think(self) -> None:
+        # Jitter so that clients don't move in lockstep
+        await asyncio.sleep(self.args.think_time * random.uniform(0.5, 1.5))
+
+    def running(self) -> bool:
+        return time.perf_counter() < self.stop_at
+
+    async def dashboard_tab(self) -> None:
+        # The first load gets every section in one request, like the frontend
+        await self.call("GET /api/v1/dashboard", "GET", "/api/v1/dashboard")
+        await self.think()
+        while self.running():
+            await asyncio.gather(
+                self.call("GET /api/v1/account", "GET", "/api/v1/account"),
+                self.call("GET /api/v1/datasets", "GET", "/api/v1/datasets"),
+                self.call(
+                    "GET /api/v1/datasets/activity", "GET", "/api/v1/datasets/activity"
+                ),
+                self.call("GET /api/v1/jobs", "GET", "/api/v1/jobs"),
+                self.call(
+                    "GET /api/v1/trusted-datasites", "GET", "/api/v1/trusted-datasites"
+                ),
+            )
+            await self.think()
+
+    async def log_tailer(self) -> None:
+        jobs = self.finished_jobs()
+        while self.running():
+            job = random.choice(jobs)
+            await self.call(
+                "GET /api/v1/jobs/logs/{job_uid}", "GET", f"/api/v1/jobs/logs/{job.uid}"
+            )
+            if random.random() < 0.25:
+                query = random.choice(["ValueError", "Traceback", "batch 4242"])
+                await self.call(
+                    "GET /api/v1/jobs/logs/search",
+                    "GET",
+                    f"/api/v1/jobs/logs/search?q={query.replace(' ', '+')}",
+                )
+            await self.think()
+
+    async def previewer(self) -> None:
+        jobs = self.finished_jobs()
+        datasets = self.workspace.datasets
+        while self.running():
+            dataset = random.choice(datasets)
+            job = random.choice(jobs)
+            kind = random.choice(["private", "mock"])
+            await self.call(
+                "GET /api/v1/datasets/files/{dataset_uid}",
+                "GET",
+                f"/api/v1/datasets/files/{dataset.uid}?dataset_type={kind}",
+            )
+            await self.call(
+                "GET /api/v1/jobs/code/{job_uid}", "GET", f"/api/v1/jobs/code/{job.uid}"
+            )
+            await self.call(
+                "GET /api/v1/jobs/output/{job_uid}",
+                "GET",
+                f"/api/v1/jobs/output/{job.uid}",
+            )
+            await self.think()
+
+    async def uploader(self) -> None:
+        content = b"a,b,c\n" + b"".join(
+            f"{i},{i * 2},{i * 3}\n".encode() for i in range(self.args.upload_rows)
+        )
+        while self.running():
+            name = f"loadtest-{uuid.uuid4().hex[:8]}"
+            body, headers = multipart_body(
+                {"name": name, "description": "load test upload"},
+                [
+                    ("dataset", f"{name}/data.csv", content),
+                    ("mock_dataset", f"{name}/data.csv", content[:1024]),
+                ],
+            )
+            content = await self.call(
+                "POST /api/v1/datasets/create-from-file",
+                "POST",
+                "/api/v1/datasets/create-from-file",
+                body,
+                headers,
+            )
+            # The dataset is created in the background, wait for it to exist
+            task = json.loads(content) if content else None
+            while task and task["status"] in ("pending", "running"):
+                await asyncio.sleep(0.05)
+                content = await self.call(
+                    "GET /api/v1/datasets/tasks/{task_id}",
+                    "GET",
+                    f"/api/v1/datasets/tasks/{task['id']}",
+                )
+                task = json.loads(content) if content else None
+            await self.call(
+                "DELETE /api/v1/datasets/{dataset_name}",
+                "DELETE",
+                f"/api/v1/datasets/{name}",
+            )
+            await self.think()
+
+    async def monitor_loop_lag(self, interval: float = 0.01) -> None:
+        while self.running():
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            self.loop_lag.append(max(0.0, time.perf_counter() - start - interval))
+
+    def finished_jobs(self):
+        jobs = [
+            job
+            for job in self.workspace.jobs
+            if (self.workspace.job_output_folder / job.uid.hex).exists()
+        ]
+        return jobs or self.workspace.jobs
+
+    async def run(self) -> dict:
+        clients: list[Callable[[], Awaitable[None]]] = (
+            [self.dashboard_tab] * self.args.tabs
+            + [self.log_tailer] * self.args.tailers
+            + [self.previewer] * self.args.previewers
+            + [self.uploader] * self.args.uploaders
+        )
+        start = time.perf_counter()
+        self.stop_at = start + self.args.duration
+        await asyncio.gather(self.monitor_loop_lag(), *(c() for c in clients))
+        duration = time.perf_counter() - start
+
+        return {
+            "config": {
+                "tabs": self.args.tabs,
+                "tailers": self.args.tailers,
+                "previewers": self.args.previewers,
+                "uploaders": self.args.uploaders,
+                "think_time": self.args.think_time,
+                "duration": duration,
+                "mode": self.args.mode,
+            },
+            "endpoints": {
+                label: stats.summary(duration)
+                for label, stats in sorted(self.stats.items())
+            },
+            "total_rps": sum(len(s.latencies) for s in self.stats.values()) / duration,
+            "event_loop_lag_ms": {
+                "p50": percentile(self.loop_lag, 50) * 1000,
+                "p95": percentile(self.loop_lag, 95) * 1000,
+                "p99": percentile(self.loop_lag, 99) * 1000,
+                "max": max(self.loop_lag, default=0.0) * 1000,
+                "mean": statistics.fmean(self.loop_lag) * 1000
+                if self.loop_lag
+                else 0.0,
+            },
+        }
+
+
+def print_report(report: dict) -> None:
+    print(
+        f"\n{'endpoint':<45} {'reqs':>6} {'err':>5} {'rps':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    )
+    for label, s in report["endpoints"].items():
+        print(
+            f"{label:<45} {s['requests']:>6} {s['errors']:>5} "
+            f"{s['throughput_rps']:>8.1f} {s['p50_ms']:>8.1f} "
+            f"{s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f}"
+        )
+    lag = report["event_loop_lag_ms"]
+    print(f"\ntotal throughput: {report['total_rps']:.1f} req/s")
+    if report["config"]["mode"] != "asgi":
+        print("event loop lag: measured on the load generator, not the server")
+    print(
+        f"event loop lag ms: p50 {lag['p50']:.1f}  p95 {lag['p95']:.1f}  "
+        f"p99 {lag['p99']:.1f}  max {lag['max']:.1f}"
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load test the dashboard API")
+    parser.add_argument("--tabs", type=int, default=20, help="Dashboard tabs")
+    parser.add_argument("--tailers", type=int, default=5, help="Log tailers")
+    parser.add_argument("--previewers", type=int, default=3, help="File previewers")
+    parser.add_argument("--uploaders", type=int, default=1, help="Dataset uploaders")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds")
+    parser.add_argument(
+        "--think-time", type=float, default=1.0, help="Seconds between polls"
+    )
+    parser.add_argument("--upload-rows", type=int, default=10_000)
+    parser.add_argument("--datasets", type=int, default=10)
+    parser.add_argument("--jobs", type=int, default=100)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument(
+        "--serve", action="store_true", help="Drive a local uvicorn over HTTP"
+    )
+    target.add_argument("--url", default=None, help="Drive a running instance")
+    parser.add_argument("--port", type=int, default=8765, help="Port for --serve")
+    parser.add_argument("--output", type=Path, default=Path("loadtest_results.json"))
+    args = parser.parse_args()
+    args.mode = "url" if args.url else "serve" if args.serve else "asgi"
+    return args
+
+
+def start_uvicorn(app, port: int):
+    import uvicorn
+
+    config = uvicorn.Config(app, port=port, log_level="warning", lifespan="off")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+def main() -> int:
+    args = parse_args()
+    logger.remove()
+    logger.add(sys.stderr, level="ERROR")
+
+    with tempfile.TemporaryDirectory(prefix="rds-loadtest-") as tmp:
+        workspace = generate_workspace(
+            Path(tmp),
+            WorkspaceSpec(datasets=args.datasets, jobs=args.jobs),
+        )
+        server: Optional[object] = None
+
+        if args.mode == "url":
+            transport = HTTPTransport(args.url)
+        else:
+            # Stub the RDS layer: the app picks up the client from its state
+            # and resolves SyftBox paths from the synthetic workspace config
+            os.environ["SYFTBOX_CLIENT_CONFIG_PATH"] = str(workspace.config_path)
+            from backend.context import invalidate_syftbox_context
+            from backend.main import app
+
+            from .fake_rds import FakeRDSClient
+
+            invalidate_syftbox_context()
+            app.state.rds_client = FakeRDSClient(workspace)
+
+            if args.mode == "serve":
+                server, thread = start_uvicorn(app, args.port)
+                transport = HTTPTransport(f"http://127.0.0.1:{args.port}")
+            else:
+                transport = ASGITransport(app)
+
+        report = asyncio.run(LoadTest(transport, workspace, args).run())
+
+        if server is not None:
+            server.should_exit = True
+            thread.join(timeout=5)
+
+    print_report(report)
+    args.output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
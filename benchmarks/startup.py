@@ -0,0 +1,201 @@
+"""Startup time budget check.
+
+Usage:
+    python -m benchmarks.startup [--update-baseline] [--threshold 0.25]
+
+Each measurement runs in a fresh interpreter:
+- import: time to `import backend.main`, and which deferred modules it loaded
+- ready: time from spawning `uvicorn backend.main:app` until `/api/health`
+  answers, including the lifespan startup against a generated workspace
+
+Startup times depend heavily on the machine, so like the benchmark suite the
+best of `--repeat` runs is compared against a baseline recorded on the same
+machine. Fixed `--import-budget`/`--ready-budget` seconds can be given on top,
+e.g. for a known CI runner. The run exits with status 1 when a time got slower
+than the baseline allows, exceeds a given budget, or a deferred module is
+imported eagerly again; the last needs no baseline.
+"""
+
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+from pathlib import Path
+
+from .workspace import WorkspaceSpec, generate_workspace
+
+DEFAULT_BASELINE = Path(__file__).parent / "startup_baseline.json"
+
+# Only loaded on the code paths that need them
+DEFERRED_MODULES = ("numpy", "pandas", "pyarrow", "requests")
+
+_IMPORT_PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import backend.main
+elapsed = time.perf_counter() - start
+loaded = [m for m in {DEFERRED_MODULES!r} if m in sys.modules]
+print(json.dumps({{"seconds": elapsed, "deferred_loaded": loaded}}))
+"""
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Check the backend startup budget")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Write the results to the baseline file instead of comparing",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown over the baseline (0.25 = 25%%)",
+    )
+    parser.add_argument(
+        "--import-budget",
+        type=float,
+        default=None,
+        help="Max seconds to import backend.main, whatever the baseline",
+    )
+    parser.add_argument(
+        "--ready-budget",
+        type=float,
+        default=None,
+        help="Max seconds from process start to the first /api/health response",
+    )
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--output", type=Path, default=None)
+    return parser.parse_args()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import(env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", _IMPORT_PROBE],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure_ready(env: dict, timeout: float) -> float:
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/api/health"
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with {process.returncode}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except (urllib.error.URLError, ConnectionError):
+                pass
+            time.sleep(0.01)
+        raise TimeoutError(f"No response from {url} after {timeout}s")
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main() -> int:
+    args = parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="rds-startup-") as tmp:
+        workspace = generate_workspace(Path(tmp), WorkspaceSpec(datasets=0, jobs=0))
+        env = dict(
+            os.environ,
+            DEBUG="false",
+            SYFTBOX_CLIENT_CONFIG_PATH=str(workspace.config_path),
+        )
+
+        imports = [measure_import(env) for _ in range(args.repeat)]
+        ready = [measure_ready(env, args.timeout) for _ in range(args.repeat)]
+
+    best = {
+        "import": min(run["seconds"] for run in imports),
+        "ready": min(ready),
+    }
+    deferred_loaded = sorted({m for run in imports for m in run["deferred_loaded"]})
+
+    print(f"import backend.main: {best['import']:.3f}s (best of {args.repeat})")
+    print(f"first /api/health response: {best['ready']:.3f}s (best of {args.repeat})")
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "best_seconds": best,
+        "import_seconds": [run["seconds"] for run in imports],
+        "ready_seconds": ready,
+        "deferred_loaded": deferred_loaded,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+    failures = []
+    if deferred_loaded:
+        failures.append(f"deferred modules imported at startup: {deferred_loaded}")
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+    elif args.baseline.is_file():
+        baseline = json.loads(args.baseline.read_text())
+        if baseline["meta"]["platform"] != platform.platform():
+            print("Warning: baseline was recorded on a different platform")
+        print(f"Comparing against {args.baseline} (threshold {args.threshold:.0%}):")
+        for name, seconds in best.items():
+            base = baseline["best_seconds"][name]
+            ratio = seconds / base if base else 1.0
+            status = "REGRESSED" if ratio > 1 + args.threshold else "ok"
+            print(f"  {name}: {ratio:.2f}x baseline [{status}]")
+            if status == "REGRESSED":
+                failures.append(
+                    f"{name} took {seconds:.2f}s, {ratio:.2f}x the baseline's "
+                    f"{base:.2f}s"
+                )
+    else:
+        print(f"No baseline at {args.baseline}; run with --update-baseline first")
+
+    for name, budget in (("import", args.import_budget), ("ready", args.ready_budget)):
+        if budget is not None and best[name] > budget:
+            failures.append(f"{name} took {best[name]:.2f}s (budget {budget:.2f}s)")
+
+    for failure in failures:
+        print(f"FAILED: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""Benchmarks for the dashboard services.
+
+Each benchmark is registered with `@benchmark` and receives the shared
+`BenchContext`. It returns the zero-argument callable to time; anything done
+before returning is setup and is not measured. Benchmarks registered with
+`items` also report the cost per item.
+"""
+
+import asyncio
+import copy
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Optional
+from uuid import uuid4
+
+from syft_core import Client as SyftBoxClient
+from syft_rds.models import Job as SyftJob
+from syft_rds.store import YAMLStore
+
+from backend.api.responses import FastJSONResponse
+from backend.api.services.dataset_service import DatasetService
+from backend.api.services.job_service import JobService
+from backend.lib.shopify import shopify_json_to_dataframe
+
+from .fake_rds import FakeRDSClient, _FakeJobModule
+from .workspace import SyntheticWorkspace, make_shopify_products
+
+
+@dataclass
+class BenchContext:
+    workspace: SyntheticWorkspace
+    client: FakeRDSClient
+    loop: asyncio.AbstractEventLoop
+
+    def run(self, coro: Awaitable[Any]) -> Any:
+        return self.loop.run_until_complete(coro)
+
+
+BENCHMARKS: dict[str, Callable[[BenchContext], Callable[[], Any]]] = {}
+# Number of items processed per call, for benchmarks that report per-item cost
+BENCHMARK_ITEMS: dict[str, int] = {}
+
+
+def benchmark(name: str, items: Optional[int] = None):
+    """Register a benchmark setup function under `name`."""
+
+    def decorator(setup: Callable[[BenchContext], Callable[[], Any]]):
+        if name in BENCHMARKS:
+            raise ValueError(f"Benchmark {name} is already registered")
+        BENCHMARKS[name] = setup
+        if items:
+            BENCHMARK_ITEMS[name] = items
+        return setup
+
+    return decorator
+
+
+def _finished_job(ctx: BenchContext):
+    return next(
+        job
+        for job in ctx.workspace.jobs
+        if (ctx.workspace.job_output_folder / job.uid.hex).exists()
+    )
+
+
+@benchmark("dataset_service.list_datasets")
+def bench_list_datasets(ctx: BenchContext):
+    service = DatasetService(ctx.client)
+    return lambda: ctx.run(service.list_datasets())
+
+
+@benchmark("dataset_service.get_dataset_files.private")
+def bench_dataset_files_private(ctx: BenchContext):
+    service = DatasetService(ctx.client)
+    uid = str(ctx.workspace.datasets[0].uid)
+    return lambda: ctx.run(service.get_dataset_files(uid, dataset_type="private"))
+
+
+@benchmark("dataset_service.get_dataset_files.mock")
+def bench_dataset_files_mock(ctx: BenchContext):
+    service = DatasetService(ctx.client)
+    uid = str(ctx.workspace.datasets[-1].uid)
+    return lambda: ctx.run(service.get_dataset_files(uid, dataset_type="mock"))
+
+
+@benchmark("dataset_service.download_private_file")
+def bench_download_private(ctx: BenchContext):
+    service = DatasetService(ctx.client)
+    uid = str(ctx.workspace.datasets[0].uid)
+
+    async def download():
+        response = await service.download_private_file(uid)
+        async for _ in response.body_iterator:
+            pass
+
+    return lambda: ctx.run(download())
+
+
+@benchmark("job_service.list_jobs")
+def bench_list_jobs(ctx: BenchContext):
+    service = JobService(ctx.client)
+    return lambda: ctx.run(service.list_jobs())
+
+
+@benchmark("job_service.list_jobs.10k", items=10_000)
+def bench_list_jobs_10k(ctx: BenchContext):
+    # Same records repeated under new uids; list_jobs only touches the index
+    jobs = [
+        job.model_copy(update={"uid": uuid4()})
+        for job in ctx.workspace.jobs * (10_000 // len(ctx.workspace.jobs) + 1)
+    ][:10_000]
+    # The jobs go to a store of their own, read through the catalog like the
+    # workspace's. The catalog database lives next to the SyftBox data dir,
+    # so the client gets its own data dir too.
+    root = ctx.workspace.root / "jobs-10k"
+    syftbox_client = ctx.client.syftbox_client
+    client = copy.copy(ctx.client)
+    client.syftbox_client = SyftBoxClient(
+        syftbox_client.config.model_copy(update={"data_dir": root / "SyftBox"})
+    )
+    local_store = SimpleNamespace(
+        job=SimpleNamespace(store=YAMLStore[SyftJob](SyftJob, root / "store")),
+        dataset=ctx.client.job.local_store.dataset,
+    )
+    client.job = _FakeJobModule(client, jobs, local_store.job.store)
+    client.job.local_store = local_store
+    service = JobService(client)
+    # Include encoding; it is where most of the per-item cost used to go
+    return lambda: FastJSONResponse(ctx.run(service.list_jobs()))
+
+
+@benchmark("job_service.get_job")
+def bench_get_job(ctx: BenchContext):
+    service = JobService(ctx.client)
+    uid = str(ctx.workspace.jobs[-1].uid)
+    return lambda: ctx.run(service.get_job(uid))
+
+
+@benchmark("job_service.get_job_code")
+def bench_get_job_code(ctx: BenchContext):
+    service = JobService(ctx.client)
+    uid = str(ctx.workspace.jobs[0].uid)
+    return lambda: ctx.run(service.get_job_code(uid))
+
+
+@benchmark("job_service.get_logs")
+def bench_get_logs(ctx: BenchContext):
+    service = JobService(ctx.client)
+    uid = str(_finished_job(ctx).uid)
+    return lambda: ctx.run(service.get_logs(uid))
+
+
+@benchmark("job_service.get_output_files")
+def bench_get_output_files(ctx: BenchContext):
+    service = JobService(ctx.client)
+    uid = str(_finished_job(ctx).uid)
+    return lambda: ctx.run(service.get_output_files(uid))
+
+
+@benchmark("shopify.shopify_json_to_dataframe")
+def bench_shopify_to_dataframe(ctx: BenchContext):
+    products = make_shopify_products(2000, variants=3)
+    return lambda: shopify_json_to_dataframe(products)
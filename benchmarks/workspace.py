@@ -0,0 +1,304 @@
+"""Synthetic SyftBox workspace generator for benchmarks."""
+
+import json
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from syft_core import Client as SyftBoxClient
+from syft_core import SyftBoxURL
+from syft_rds.models import Dataset as SyftDataset
+from syft_rds.models import Job as SyftJob
+from syft_rds.models import UserCode
+from syft_rds.models.job_models import JobErrorKind, JobStatus
+from syft_rds.models.user_code_models import UserCodeType
+
+EMAIL = "owner@openmined.org"
+REQUESTERS = [f"researcher{i}@openmined.org" for i in range(8)]
+JOB_STATUSES = [
+    JobStatus.pending_code_review,
+    JobStatus.approved,
+    JobStatus.job_in_progress,
+    JobStatus.job_run_finished,
+    JobStatus.job_run_failed,
+    JobStatus.rejected,
+    JobStatus.shared,
+]
+
+
+@dataclass
+class WorkspaceSpec:
+    """Shape of a synthetic workspace."""
+
+    datasets: int = 20
+    jobs: int = 200
+    files_per_dataset: int = 20
+    nesting: int = 3
+    large_csv_bytes: int = 5 * 1024 * 1024
+    code_files: int = 10
+    venv_files: int = 300
+    log_lines: int = 2000
+    output_files: int = 5
+    seed: int = 0
+
+
+@dataclass
+class SyntheticWorkspace:
+    """A generated workspace and the syft_rds records describing it."""
+
+    root: Path
+    spec: WorkspaceSpec
+    config_path: Path
+    syftbox_client: SyftBoxClient
+    datasets: list[SyftDataset] = field(default_factory=list)
+    user_codes: list[UserCode] = field(default_factory=list)
+    jobs: list[SyftJob] = field(default_factory=list)
+
+    @property
+    def email(self) -> str:
+        return self.syftbox_client.email
+
+    @property
+    def private_datasets_dir(self) -> Path:
+        return self.root / ".syftbox" / "private_datasets" / self.email
+
+    @property
+    def job_output_folder(self) -> Path:
+        return self.root / ".syftbox" / "rds" / self.email / "jobs"
+
+    @property
+    def public_datasets_dir(self) -> Path:
+        return self.syftbox_client.my_datasite / "public" / "datasets"
+
+    @property
+    def user_code_dir(self) -> Path:
+        return self.syftbox_client.my_datasite / "app_data" / "rds" / "user_code"
+
+
+def _write_csv(path: Path, target_bytes: int, rng: random.Random) -> None:
+    """Write a CSV of roughly `target_bytes` bytes."""
+    header = "id,name,category,price,quantity,created_at\n"
+    categories = ["grain", "fruit", "vegetable", "dairy", "meat"]
+    written = 0
+    row_id = 0
+    with open(path, "w") as f:
+        f.write(header)
+        written += len(header)
+        while written < target_bytes:
+            lines = []
+            for _ in range(1000):
+                row_id += 1
+                lines.append(
+                    f"{row_id},item-{rng.randrange(10**6)},"
+                    f"{categories[row_id % len(categories)]},"
+                    f"{rng.random() * 100:.2f},{rng.randrange(1000)},"
+                    f"2024-{row_id % 12 + 1:02d}-{row_id % 28 + 1:02d}\n"
+                )
+            chunk = "".join(lines)
+            f.write(chunk)
+            written += len(chunk)
+
+
+def _write_dataset_files(
+    base: Path, spec: WorkspaceSpec, rng: random.Random, large: bool
+) -> None:
+    base.mkdir(parents=True, exist_ok=True)
+    if large:
+        _write_csv(base / "data.csv", spec.large_csv_bytes, rng)
+    else:
+        _write_csv(base / "data.csv", 64 * 1024, rng)
+
+    for i in range(spec.files_per_dataset - 1):
+        depth = i % (spec.nesting + 1)
+        parent = base.joinpath(*[f"part{d:02d}" for d in range(depth)])
+        parent.mkdir(parents=True, exist_ok=True)
+        if i % 4 == 3:
+            (parent / f"blob{i}.bin").write_bytes(rng.randbytes(4096))
+        else:
+            _write_csv(parent / f"chunk{i}.csv", 8 * 1024, rng)
+
+
+def _write_code_dir(code_dir: Path, spec: WorkspaceSpec) -> None:
+    code_dir.mkdir(parents=True, exist_ok=True)
+    (code_dir / "main.py").write_text(
+        "import pandas as pd\n\n"
+        "df = pd.read_csv('data.csv')\n"
+        "print(df.describe())\n" * 20
+    )
+    for i in range(spec.code_files - 1):
+        module = code_dir / "pkg" / f"module_{i}.py"
+        module.parent.mkdir(parents=True, exist_ok=True)
+        module.write_text(f"def func_{i}(x):\n    return x * {i}\n" * 50)
+
+    # A virtualenv the dashboard is expected to skip while scanning
+    site_packages = code_dir / ".venv" / "lib" / "python3.12" / "site-packages"
+    for i in range(spec.venv_files):
+        pkg = site_packages / f"dep{i % 30}"
+        pkg.mkdir(parents=True, exist_ok=True)
+        (pkg / f"mod{i}.py").write_text("x = 1\n" * 20)
+
+
+def _write_job_run(
+    run_dir: Path, spec: WorkspaceSpec, rng: random.Random, failed: bool
+) -> None:
+    logs_dir = run_dir / "logs"
+    logs_dir.mkdir(parents=True, exist_ok=True)
+    (logs_dir / "stdout.log").write_text(
+        "".join(
+            f"[{i:06d}] processed batch {rng.randrange(10**6)} ok\n"
+            for i in range(spec.log_lines)
+        )
+    )
+    stderr = "Traceback (most recent call last):\nValueError: bad input\n"
+    (logs_dir / "stderr.log").write_text(stderr if failed else "")
+
+    output_dir = run_dir / "output"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(spec.output_files):
+        if i == 0:
+            (output_dir / "result.json").write_text(
+                json.dumps({"rows": [rng.random() for _ in range(2000)]})
+            )
+        elif i % 3 == 0:
+            (output_dir / f"plot{i}.png").write_bytes(rng.randbytes(32 * 1024))
+        else:
+            _write_csv(output_dir / f"table{i}.csv", 32 * 1024, rng)
+
+
+def generate_workspace(root: Path, spec: WorkspaceSpec) -> SyntheticWorkspace:
+    """Generate a SyftBox workspace with datasets, user code and job runs."""
+    rng = random.Random(spec.seed)
+    root = root.resolve()
+    data_dir = root / "SyftBox"
+    config_path = root / "config.json"
+    config_path.parent.mkdir(parents=True, exist_ok=True)
+    config_path.write_text(
+        json.dumps(
+            {
+                "data_dir": str(data_dir),
+                "email": EMAIL,
+                "server_url": "http://localhost:8080",
+            }
+        )
+    )
+
+    syftbox_client = SyftBoxClient.load(config_path)
+    syftbox_client.workspace.mkdirs()
+    workspace = SyntheticWorkspace(
+        root=root,
+        spec=spec,
+        config_path=config_path,
+        syftbox_client=syftbox_client,
+    )
+
+    for i in range(spec.datasets):
+        name = f"dataset-{i:04d}"
+        private_dir = workspace.private_datasets_dir / name
+        mock_dir = workspace.public_datasets_dir / name
+        # Only the first dataset carries the large CSV to keep generation fast
+        _write_dataset_files(private_dir, spec, rng, large=i == 0)
+        _write_dataset_files(mock_dir, spec, rng, large=False)
+        (mock_dir / "README.md").write_text(f"# {name}\n\nSynthetic dataset.\n")
+
+        workspace.datasets.append(
+            SyftDataset(
+                name=name,
+                private=SyftBoxURL(
+                    f"syft://{EMAIL}/.syftbox/private_datasets/{EMAIL}/{name}"
+                ),
+                mock=SyftBoxURL(f"syft://{EMAIL}/public/datasets/{name}"),
+                summary=f"Synthetic dataset {i}",
+                readme=SyftBoxURL(f"syft://{EMAIL}/public/datasets/{name}/README.md"),
+                tags=["synthetic"],
+                created_by=EMAIL,
+            )
+        )
+
+    for i in range(spec.jobs):
+        user_code = UserCode(
+            name=f"code-{i:05d}",
+            code_type=UserCodeType.FOLDER,
+            entrypoint="main.py",
+            created_by=REQUESTERS[i % len(REQUESTERS)],
+        )
+        code_dir = workspace.user_code_dir / user_code.uid.hex
+        # Code directories are shared by many jobs in practice; only write a
+        # handful of distinct ones so generation stays quick
+        if i < 10:
+            _write_code_dir(code_dir, spec)
+        else:
+            code_dir = workspace.user_code_dir / workspace.user_codes[i % 10].uid.hex
+        user_code.dir_url = syftbox_client.to_syft_url(code_dir)
+        workspace.user_codes.append(user_code)
+
+        status = JOB_STATUSES[i % len(JOB_STATUSES)]
+        job = SyftJob(
+            name=f"job-{i:05d}",
+            dataset_name=workspace.datasets[i % max(spec.datasets, 1)].name
+            if spec.datasets
+            else None,
+            user_code_id=user_code.uid,
+            created_by=user_code.created_by,
+            description=f"Synthetic job {i}",
+            status=status,
+            error=JobErrorKind.execution_failed
+            if status == JobStatus.job_run_failed
+            else JobErrorKind.no_error,
+        )
+        if status in (
+            JobStatus.job_run_finished,
+            JobStatus.job_run_failed,
+            JobStatus.shared,
+        ):
+            _write_job_run(
+                workspace.job_output_folder / job.uid.hex,
+                spec,
+                rng,
+                failed=status == JobStatus.job_run_failed,
+            )
+        workspace.jobs.append(job)
+
+    return workspace
+
+
+def make_shopify_products(
+    products: int, variants: int = 3, seed: int = 0
+) -> dict[str, list[dict]]:
+    """Build a Shopify `products.json` payload."""
+    rng = random.Random(seed)
+    return {
+        "products": [
+            {
+                "id": 1000 + p,
+                "title": f"Product {p}",
+                "vendor": f"Vendor {p % 17}",
+                "product_type": f"Type {p % 5}",
+                "handle": f"product-{p}",
+                "status": "active",
+                "tags": "synthetic, benchmark",
+                "created_at": "2024-01-01T10:00:00-05:00",
+                "updated_at": "2024-02-01T10:00:00-05:00",
+                "published_at": "2024-01-02T10:00:00-05:00",
+                "image": {"src": f"https://cdn.example.com/{p}.png"} if p % 2 else None,
+                "variants": [
+                    {
+                        "id": 10**6 + p * variants + v,
+                        "title": f"Variant {v}",
+                        "sku": f"SKU-{p}-{v}",
+                        "price": f"{rng.random() * 100:.2f}",
+                        "compare_at_price": None
+                        if v % 2
+                        else f"{rng.random() * 120:.2f}",
+                        "inventory_quantity": rng.randrange(500),
+                        "weight": rng.random() * 5,
+                        "weight_unit": "kg",
+                        "requires_shipping": True,
+                        "taxable": True,
+                        "barcode": "",
+                    }
+                    for v in range(variants)
+                ],
+            }
+            for p in range(products)
+        ]
+    }
@@ -9,6 +9,8 @@ import { cn } from "@/lib/utils"
 
 interface ActivityGraphProps {
   data: number[]
+  // First day of the first week; weeks end today if not given
+  startDate?: Date
   chartHeightPx?: number
   className?: string
 }
@@ -17,6 +19,7 @@ const CHART_HEIGHT_PX = 96
 
 export function ActivityGraph({
   data,
+  startDate,
   className,
   chartHeightPx = CHART_HEIGHT_PX,
 }: ActivityGraphProps) {
@@ -48,22 +51,31 @@ export function ActivityGraph({
   }
 
   const getWeekDateRange = (weekIndex: number) => {
-    const now = new Date()
-    const weeksAgo = 11 - weekIndex
-    const endDate = new Date(now)
-    endDate.setDate(now.getDate() - weeksAgo * 7)
-    const startDate = new Date(endDate)
-    startDate.setDate(endDate.getDate() - 6)
+    let weekStart: Date
+    let weekEnd: Date
+    if (startDate) {
+      weekStart = new Date(startDate)
+      weekStart.setUTCDate(startDate.getUTCDate() + weekIndex * 7)
+      weekEnd = new Date(weekStart)
+      weekEnd.setUTCDate(weekStart.getUTCDate() + 6)
+    } else {
+      const now = new Date()
+      const weeksAgo = data.length - 1 - weekIndex
+      weekEnd = new Date(now)
+      weekEnd.setDate(now.getDate() - weeksAgo * 7)
+      weekStart = new Date(weekEnd)
+      weekStart.setDate(weekEnd.getDate() - 6)
+    }
 
+    // Server weeks are UTC days
+    const format: Intl.DateTimeFormatOptions = {
+      month: "short",
+      day: "numeric",
+      timeZone: startDate ? "UTC" : undefined,
+    }
     return {
-      start: startDate.toLocaleDateString(undefined, {
-        month: "short",
-        day: "numeric",
-      }),
-      end: endDate.toLocaleDateString(undefined, {
-        month: "short",
-        day: "numeric",
-      }),
+      start: weekStart.toLocaleDateString(undefined, format),
+      end: weekEnd.toLocaleDateString(undefined, format),
     }
   }
 
@@ -17,7 +17,14 @@ import {
 import { Alert, AlertDescription } from "@/components/ui/alert"
 import { Loader2, Upload, FolderOpen, FileIcon, Folder } from "lucide-react"
 import { ToggleGroup, ToggleGroupItem } from "@/components/ui/toggle-group"
-import { apiService } from "@/lib/api/api"
+import { datasetTaskLabel, datasetsApi } from "@/lib/api/datasets"
+import type { DatasetTask } from "@/lib/api/types"
+import {
+  uploadDataset,
+  type UploadProgress,
+  type UploadSource,
+} from "@/lib/api/uploads"
+import { formatBytes } from "@/lib/utils"
 import { useDragDrop } from "@/components/drag-drop-context"
 import { useMutation, useQueryClient } from "@tanstack/react-query"
 import { toast } from "sonner"
@@ -43,6 +50,10 @@ export function CreateDatasetModal({
   const [error, setError] = useState("")
   const [uploadMode, setUploadMode] = useState<"file" | "folder">("file")
   const [mockUploadMode, setMockUploadMode] = useState<"file" | "folder">("file")
+  const [task, setTask] = useState<DatasetTask | null>(null)
+  const [uploadProgress, setUploadProgress] = useState<UploadProgress | null>(
+    null,
+  )
   const {
     isDragging,
     activeDropZone,
@@ -55,8 +66,24 @@ export function CreateDatasetModal({
   const queryClient = useQueryClient()
 
   const createDatasetMutation = useMutation({
-    mutationFn: apiService.createDataset,
-    onSuccess: (data) => {
+    mutationFn: async ({
+      sources,
+      dataset,
+    }: {
+      sources: UploadSource[]
+      dataset: { name: string; description: string }
+    }) =>
+      datasetsApi.waitForDatasetTask(
+        await uploadDataset(sources, dataset, setUploadProgress),
+        setTask,
+      ),
+    onSettled: () => setUploadProgress(null),
+    onError: (err) => {
+      setTask(null)
+      setError(err instanceof Error ? err.message : "Failed to create dataset")
+    },
+    onSuccess: () => {
+      setTask(null)
       queryClient.invalidateQueries({
         queryKey: ["datasets"],
       })
@@ -131,21 +158,20 @@ export function CreateDatasetModal({
     setError("")
 
     try {
-      const formData = new FormData()
+      // Paths within the dataset: a folder's files lose the folder's name
+      const toSources = (list: FileList, role: UploadSource["role"]) =>
+        Array.from(list).map((file) => ({
+          file,
+          role,
+          path: file.webkitRelativePath
+            ? file.webkitRelativePath.split("/").slice(1).join("/")
+            : file.name,
+        }))
 
-      // Add all files from the dataset folder/file
-      Array.from(files).forEach((file) => {
-        formData.append("dataset", file, file.webkitRelativePath || file.name)
+      createDatasetMutation.mutate({
+        sources: [...toSources(files, "private"), ...toSources(mockFiles, "mock")],
+        dataset: { name: name.trim(), description: description.trim() },
       })
-      formData.append("name", name.trim())
-      formData.append("description", description.trim() || "")
-
-      // Add all files from the mock dataset folder/file
-      Array.from(mockFiles).forEach((file) => {
-        formData.append("mock_dataset", file, file.webkitRelativePath || file.name)
-      })
-
-      createDatasetMutation.mutate(formData)
       // const result = await apiService.createDataset(formData);
 
       // if (result.success) {
@@ -173,10 +199,13 @@ export function CreateDatasetModal({
     setDescription("")
     setError("")
     setLoading(false)
+    setTask(null)
   }
 
+  const busy = loading || createDatasetMutation.isPending
+
   const handleOpenChange = (newOpen: boolean) => {
-    if (!newOpen && !loading) {
+    if (!newOpen && !busy) {
       resetForm()
     }
     onOpenChange(newOpen)
@@ -393,15 +422,19 @@ export function CreateDatasetModal({
               type="button"
               variant="outline"
               onClick={() => handleOpenChange(false)}
-              disabled={loading}
+              disabled={busy}
             >
               Cancel
             </Button>
-            <Button type="submit" disabled={loading}>
-              {loading ? (
+            <Button type="submit" disabled={busy}>
+              {busy ? (
                 <>
                   <Loader2 className="mr-2 h-4 w-4 animate-spin" />
-                  Uploading...
+                  {task
+                    ? datasetTaskLabel(task)
+                    : uploadProgress
+                      ? `${uploadProgress.phase === "hashing" ? "Hashing" : "Uploading"} ${formatBytes(uploadProgress.bytesDone)} / ${formatBytes(uploadProgress.bytesTotal)}`
+                      : "Uploading..."}
                 </>
               ) : (
                 <>
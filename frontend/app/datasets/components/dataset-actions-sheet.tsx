@@ -34,6 +34,8 @@ import {
 import { useState } from "react"
 import { UpdateDatasetModal } from "./update-dataset-modal"
 import { DatasetFilesDialog } from "./dataset-files-dialog"
+import { DatasetProfileDialog } from "./dataset-profile-dialog"
+import { DatasetHistoryDialog } from "./dataset-history-dialog"
 import { toast } from "sonner"
 
 interface DatasetActionsSheetProps {
@@ -170,12 +172,20 @@ export function DatasetActionsSheet({
                 <CardContent>
                   <ActivityGraph
                     data={dataset.activityData}
+                    startDate={dataset.activityStart}
                     className="w-full"
                     chartHeightPx={128}
                   />
                   <div className="text-muted-foreground mt-4 flex items-center justify-between text-xs">
-                    <div>Total Requests: 1</div>
-                    <div>Avg: 0/week</div>
+                    <div>Total Requests: {dataset.requestsCount}</div>
+                    <div>
+                      Avg:{" "}
+                      {(
+                        dataset.activityData.reduce((a, b) => a + b, 0) /
+                        dataset.activityData.length
+                      ).toFixed(1)}
+                      /week
+                    </div>
                   </div>
                 </CardContent>
               </Card>
@@ -197,6 +207,8 @@ export function DatasetActionsSheet({
                   Download Dataset
                 </Button>
                 <DatasetFilesDialog dataset={dataset} />
+                <DatasetProfileDialog dataset={dataset} />
+                <DatasetHistoryDialog dataset={dataset} />
                 <UpdateDatasetModal dataset={dataset} />
                 <Button
                   variant="outline"
@@ -158,7 +158,10 @@ export function DatasetCard({
           ) : null}
         </div>
         {/* Right side - Activity graph */}
-        <ActivityGraph data={dataset.activityData} />
+        <ActivityGraph
+          data={dataset.activityData}
+          startDate={dataset.activityStart}
+        />
       </CardContent>
     </Card>
   )
@@ -24,9 +24,10 @@ import {
   CheckIcon,
 } from "lucide-react"
 import { datasetsApi } from "@/lib/api/datasets"
-import type { Dataset } from "@/lib/api/types"
+import { isTabularFile, type Dataset } from "@/lib/api/types"
 import { cn } from "@/lib/utils"
 import { CodeHighlighter } from "@/app/jobs/components/code-highlighter"
+import { TablePreviewView } from "@/components/table-preview"
 
 interface TreeNode {
   name: string
@@ -86,6 +87,15 @@ export function DatasetFilesDialog({ dataset }: { dataset: Dataset }) {
   const files = filesData?.files || {}
   const fileList = Object.keys(files).sort()
   const fileTree = buildFileTree(fileList)
+  const tabular = selectedFile !== null && isTabularFile(selectedFile)
+
+  // Tabular files are previewed server-side, so large ones work too
+  const { data: tablePreview, isLoading: isPreviewLoading, isError: isPreviewError } = useQuery({
+    queryKey: ["dataset-file-preview", dataset.uid, datasetType, selectedFile],
+    queryFn: () =>
+      datasetsApi.getDatasetFilePreview(dataset.uid, selectedFile!, datasetType),
+    enabled: open && tabular,
+  })
 
   // Set the first file as selected if nothing is selected
   useEffect(() => {
@@ -212,15 +222,21 @@ export function DatasetFilesDialog({ dataset }: { dataset: Dataset }) {
                       className="p-4"
                       style={{ maxWidth: "100%", overflow: "hidden" }}
                     >
-                      {files[selectedFile] ? (
+                      {tabular && tablePreview ? (
+                        <TablePreviewView preview={tablePreview} />
+                      ) : tabular && isPreviewLoading ? (
+                        <div className="text-muted-foreground text-xs italic">
+                          Loading preview...
+                        </div>
+                      ) : files[selectedFile] ? (
                         files[selectedFile].startsWith("[") &&
                         files[selectedFile].endsWith("]") ? (
                           // Display metadata messages (binary files, errors, etc.)
                           <div className="text-muted-foreground text-xs italic">
                             {files[selectedFile]}
                           </div>
-                        ) : selectedFile.endsWith('.csv') || selectedFile.endsWith('.tsv') ? (
-                          // Display CSV/TSV as plain text with wrapping
+                        ) : tabular && isPreviewError ? (
+                          // Fall back to plain text if the table can't be parsed
                           <pre
                             className="text-xs text-slate-50 font-mono whitespace-pre-wrap"
                             style={{
@@ -0,0 +1,179 @@
+"use client"
+
+import { useState } from "react"
+import { useMutation, useQuery, useQueryClient } from "@tanstack/react-query"
+import {
+  Dialog,
+  DialogContent,
+  DialogDescription,
+  DialogHeader,
+  DialogTitle,
+  DialogTrigger,
+} from "@/components/ui/dialog"
+import { Badge } from "@/components/ui/badge"
+import { Button } from "@/components/ui/button"
+import { ScrollArea } from "@/components/ui/scroll-area"
+import { HistoryIcon, Loader2, RotateCcw } from "lucide-react"
+import { toast } from "sonner"
+import { datasetsApi } from "@/lib/api/datasets"
+import type { Dataset, DatasetVersion } from "@/lib/api/types"
+import { formatBytes, timeAgo } from "@/lib/utils"
+
+function sourceLabel(version: DatasetVersion): string {
+  switch (version.source) {
+    case "baseline":
+      return "Initial data"
+    case "external":
+      return "Changed outside the dashboard"
+    case "shopify_sync":
+      return "Shopify sync"
+    case "restore":
+      return `Restored version ${version.restored_from}`
+  }
+}
+
+function VersionRow({
+  version,
+  restoring,
+  onRestore,
+}: {
+  version: DatasetVersion
+  restoring: boolean
+  onRestore: () => void
+}) {
+  return (
+    <tr className="border-b last:border-0">
+      <td className="py-2 pr-3 font-medium">
+        v{version.version}
+        {version.latest && (
+          <Badge variant="secondary" className="ml-2">
+            Latest
+          </Badge>
+        )}
+      </td>
+      <td className="py-2 pr-3">{sourceLabel(version)}</td>
+      <td className="py-2 pr-3 text-muted-foreground" title={version.created_at}>
+        {timeAgo(version.created_at)}
+      </td>
+      <td className="py-2 pr-3 text-right">{formatBytes(version.size)}</td>
+      <td className="py-2 pr-3 text-right text-muted-foreground">
+        {formatBytes(version.changed_bytes)}
+      </td>
+      <td className="py-2 text-right">
+        {!version.latest && (
+          <Button
+            size="sm"
+            variant="outline"
+            onClick={onRestore}
+            disabled={restoring || !version.restorable}
+            title={
+              version.restorable
+                ? undefined
+                : "The data of this version is no longer available"
+            }
+          >
+            <RotateCcw />
+            Restore
+          </Button>
+        )}
+      </td>
+    </tr>
+  )
+}
+
+export function DatasetHistoryDialog({ dataset }: { dataset: Dataset }) {
+  const [open, setOpen] = useState(false)
+  const queryClient = useQueryClient()
+
+  const { data, isLoading, error } = useQuery({
+    queryKey: ["dataset-versions", dataset.uid],
+    queryFn: () => datasetsApi.getDatasetVersions(dataset.uid),
+    enabled: open,
+  })
+
+  const restoreMutation = useMutation({
+    mutationFn: datasetsApi.restoreDatasetVersion,
+    onSuccess: ({ version }) => {
+      toast.success(
+        version.restored_from
+          ? `Restored version ${version.restored_from} as version ${version.version}`
+          : "The dataset already has this data",
+      )
+    },
+    onError: (err) => {
+      toast.error("Couldn't restore the version", {
+        description: err instanceof Error ? err.message : undefined,
+      })
+    },
+    onSettled: () => {
+      queryClient.invalidateQueries({
+        queryKey: ["dataset-versions", dataset.uid],
+      })
+      return queryClient.invalidateQueries({ queryKey: ["datasets"] })
+    },
+  })
+
+  return (
+    <Dialog open={open} onOpenChange={setOpen}>
+      <DialogTrigger asChild>
+        <Button variant="outline" className="w-full justify-start">
+          <HistoryIcon />
+          Version History
+        </Button>
+      </DialogTrigger>
+      <DialogContent className="!max-w-[50vw] !w-[50vw] !max-h-[90vh] p-5">
+        <DialogHeader>
+          <DialogTitle>Version History: {dataset.name}</DialogTitle>
+          <DialogDescription>
+            Every change to the private data is kept as a version. Restoring
+            an old version adds it back as the newest one.
+          </DialogDescription>
+        </DialogHeader>
+
+        {isLoading && (
+          <div className="flex items-center gap-2 text-xs text-muted-foreground">
+            <Loader2 className="h-3 w-3 animate-spin" />
+            Loading versions...
+          </div>
+        )}
+        {error && (
+          <div className="text-xs text-red-600">
+            Couldn&apos;t load the versions: {error.message}
+          </div>
+        )}
+
+        {data && (
+          <ScrollArea className="max-h-[calc(90vh-160px)]">
+            <table className="w-full text-xs">
+              <thead>
+                <tr className="border-b text-muted-foreground text-left">
+                  <th className="py-1 pr-3 font-medium">Version</th>
+                  <th className="py-1 pr-3 font-medium">Change</th>
+                  <th className="py-1 pr-3 font-medium">Created</th>
+                  <th className="py-1 pr-3 font-medium text-right">Size</th>
+                  <th className="py-1 pr-3 font-medium text-right">Changed</th>
+                  <th className="py-1" />
+                </tr>
+              </thead>
+              <tbody>
+                {data.versions.map((version) => (
+                  <VersionRow
+                    key={version.version}
+                    version={version}
+                    restoring={restoreMutation.isPending}
+                    onRestore={() =>
+                      restoreMutation.mutate({
+                        uid: dataset.uid,
+                        version: version.version,
+                      })
+                    }
+                  />
+                ))}
+              </tbody>
+            </table>
+          </ScrollArea>
+        )}
+      </DialogContent>
+    </Dialog>
+  )
+}
@@ -0,0 +1,159 @@
+"use client"
+
+import { useState } from "react"
+import { useQuery } from "@tanstack/react-query"
+import {
+  Dialog,
+  DialogContent,
+  DialogDescription,
+  DialogHeader,
+  DialogTitle,
+  DialogTrigger,
+} from "@/components/ui/dialog"
+import { Button } from "@/components/ui/button"
+import { ScrollArea } from "@/components/ui/scroll-area"
+import { BarChart3Icon, Loader2 } from "lucide-react"
+import { datasetsApi } from "@/lib/api/datasets"
+import type { ColumnProfile, Dataset, FileProfile } from "@/lib/api/types"
+import { formatBytes, timeAgo } from "@/lib/utils"
+
+// How often to poll while the profile is being computed
+const COMPUTING_POLL_INTERVAL = 2000
+
+function formatValue(value: unknown): string {
+  if (value === null || value === undefined) return "—"
+  if (typeof value === "number") return value.toLocaleString()
+  if (typeof value === "object") return JSON.stringify(value)
+  return String(value)
+}
+
+function ColumnRow({ column }: { column: ColumnProfile }) {
+  return (
+    <tr className="border-b last:border-0">
+      <td className="py-1 pr-3 font-medium">{column.name}</td>
+      <td className="py-1 pr-3 text-muted-foreground" title={column.physical_type}>
+        {column.type}
+      </td>
+      <td className="py-1 pr-3 text-right">
+        {(column.null_rate * 100).toFixed(1)}%
+      </td>
+      <td className="py-1 pr-3 text-right">
+        {column.distinct === undefined
+          ? "—"
+          : `${column.distinct_exact ? "" : "≈"}${column.distinct.toLocaleString()}`}
+      </td>
+      <td className="py-1 pr-3 max-w-40 truncate" title={formatValue(column.min)}>
+        {formatValue(column.min)}
+      </td>
+      <td className="py-1 max-w-40 truncate" title={formatValue(column.max)}>
+        {formatValue(column.max)}
+      </td>
+    </tr>
+  )
+}
+
+function FileProfileView({ file }: { file: FileProfile }) {
+  return (
+    <div className="space-y-1">
+      <div className="text-xs font-medium flex items-center justify-between">
+        <span>{file.path}</span>
+        {file.rows !== undefined && file.size !== undefined && (
+          <span className="text-muted-foreground">
+            {file.rows.toLocaleString()} rows · {formatBytes(file.size)}
+          </span>
+        )}
+      </div>
+      {file.error ? (
+        <div className="text-xs text-red-600 italic">{file.error}</div>
+      ) : (
+        <table className="w-full text-xs">
+          <thead>
+            <tr className="border-b text-muted-foreground text-left">
+              <th className="py-1 pr-3 font-medium">Column</th>
+              <th className="py-1 pr-3 font-medium">Type</th>
+              <th className="py-1 pr-3 font-medium text-right">Nulls</th>
+              <th className="py-1 pr-3 font-medium text-right">Distinct</th>
+              <th className="py-1 pr-3 font-medium">Min</th>
+              <th className="py-1 font-medium">Max</th>
+            </tr>
+          </thead>
+          <tbody>
+            {file.columns?.map((column) => (
+              <ColumnRow key={column.name} column={column} />
+            ))}
+          </tbody>
+        </table>
+      )}
+    </div>
+  )
+}
+
+export function DatasetProfileDialog({ dataset }: { dataset: Dataset }) {
+  const [open, setOpen] = useState(false)
+
+  const { data, isLoading } = useQuery({
+    queryKey: ["dataset-profile", dataset.uid],
+    queryFn: () => datasetsApi.getDatasetProfile(dataset.uid),
+    enabled: open,
+    refetchInterval: (query) =>
+      query.state.data?.status === "computing" ? COMPUTING_POLL_INTERVAL : false,
+  })
+
+  const profile = data?.profile
+
+  return (
+    <Dialog open={open} onOpenChange={setOpen}>
+      <DialogTrigger asChild>
+        <Button variant="outline" className="w-full justify-start">
+          <BarChart3Icon />
+          Profile Columns
+        </Button>
+      </DialogTrigger>
+      <DialogContent className="!max-w-[50vw] !w-[50vw] !max-h-[90vh] p-5">
+        <DialogHeader>
+          <DialogTitle>Column Profile: {dataset.name}</DialogTitle>
+          <DialogDescription>
+            Types, null rates, value ranges and distinct counts of the private
+            data. Distinct counts marked ≈ are estimates.
+          </DialogDescription>
+        </DialogHeader>
+
+        {(isLoading || data?.status === "computing") && (
+          <div className="flex items-center gap-2 text-xs text-muted-foreground">
+            <Loader2 className="h-3 w-3 animate-spin" />
+            {profile ? "The data changed, updating the profile..." : "Computing the profile..."}
+          </div>
+        )}
+        {data?.status === "failed" && (
+          <div className="text-xs text-red-600">
+            Couldn&apos;t profile this dataset: {data.error}
+          </div>
+        )}
+
+        {profile && (
+          <ScrollArea className="max-h-[calc(90vh-160px)]">
+            <div className="space-y-4 pr-4">
+              {profile.files.length === 0 ? (
+                <div className="text-xs text-muted-foreground italic">
+                  No tabular files to profile
+                </div>
+              ) : (
+                profile.files.map((file) => (
+                  <FileProfileView key={file.path} file={file} />
+                ))
+              )}
+              {profile.skipped.length > 0 && (
+                <div className="text-xs text-muted-foreground">
+                  Not profiled: {profile.skipped.join(", ")}
+                </div>
+              )}
+              <div className="text-xs text-muted-foreground">
+                Computed {timeAgo(profile.computed_at)}
+              </div>
+            </div>
+          </ScrollArea>
+        )}
+      </DialogContent>
+    </Dialog>
+  )
+}
@@ -18,11 +18,17 @@ import {
 } from "@/components/ui/form"
 import { Input } from "@/components/ui/input"
 import { Textarea } from "@/components/ui/textarea"
-import { AddShopifyDatasetFormSchema, datasetsApi } from "@/lib/api/datasets"
+import {
+  AddShopifyDatasetFormSchema,
+  datasetTaskLabel,
+  datasetsApi,
+} from "@/lib/api/datasets"
+import type { DatasetTask } from "@/lib/api/types"
 import { ApiError, FormFieldError } from "@/lib/api/errors"
 import { zodResolver } from "@hookform/resolvers/zod"
 import { useMutation, useQueryClient } from "@tanstack/react-query"
 import { FileDownIcon, Loader2 } from "lucide-react"
+import { useState } from "react"
 import { useForm } from "react-hook-form"
 import { toast } from "sonner"
 import { z } from "zod"
@@ -38,6 +44,7 @@ export function ImportShopifyDatasetModal({
   onOpenChange,
 }: ImportShopifyDatasetModalProps) {
   const queryClient = useQueryClient()
+  const [task, setTask] = useState<DatasetTask | null>(null)
 
   const form = useForm<z.infer<typeof AddShopifyDatasetFormSchema>>({
     resolver: zodResolver(AddShopifyDatasetFormSchema),
@@ -52,7 +59,12 @@ export function ImportShopifyDatasetModal({
   const { setError } = form
 
   const addShopifyDatasetMutation = useMutation({
-    mutationFn: datasetsApi.addShopifyDataset,
+    mutationFn: async (values: z.infer<typeof AddShopifyDatasetFormSchema>) =>
+      datasetsApi.waitForDatasetTask(
+        await datasetsApi.addShopifyDataset(values),
+        setTask,
+      ),
+    onSettled: () => setTask(null),
     onError: (error) => {
       if (error instanceof FormFieldError) {
         //@ts-ignore: <- NOTE: maybe remove this in the future
@@ -158,7 +170,7 @@ export function ImportShopifyDatasetModal({
                 {isPending ? (
                   <>
                     <Loader2 className="h-4 w-4 animate-spin" />
-                    Importing...
+                    {task ? datasetTaskLabel(task) : "Importing..."}
                   </>
                 ) : (
                   <>
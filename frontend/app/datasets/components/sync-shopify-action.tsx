@@ -1,6 +1,7 @@
 import { Button } from "@/components/ui/button"
 import { datasetsApi } from "@/lib/api/datasets"
 import type { Dataset } from "@/lib/api/types"
+import { formatBytes } from "@/lib/utils"
 import { useMutation, useQueryClient } from "@tanstack/react-query"
 import { RefreshCwIcon } from "lucide-react"
 import { useRef } from "react"
@@ -12,13 +13,22 @@ export function SyncShopifyDatasetAction({ dataset }: { dataset: Dataset }) {
 
   const syncDatasetMutation = useMutation({
     mutationFn: datasetsApi.syncShopifyDataset,
-    onSuccess: () => {
-      toast.success("Dataset synced successfully")
+    onSuccess: ({ version }) => {
+      if (version) {
+        toast.success(`Dataset synced to version ${version.version}`, {
+          description: `${formatBytes(version.changed_bytes)} changed`,
+        })
+      } else {
+        toast.success("Dataset is already up to date")
+      }
     },
     onSettled: () => {
       if (iconWrapperRef.current) {
         iconWrapperRef.current.style.animationIterationCount = "1"
       }
+      queryClient.invalidateQueries({
+        queryKey: ["dataset-versions", dataset.uid],
+      })
       return queryClient.invalidateQueries({ queryKey: ["datasets"] })
     },
   })
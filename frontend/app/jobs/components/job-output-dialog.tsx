@@ -12,12 +12,31 @@ import {
 } from "@/components/ui/dialog"
 import { Button } from "@/components/ui/button"
 import { ScrollArea } from "@/components/ui/scroll-area"
-import { FolderOutputIcon, FileIcon, FolderIcon, ChevronRight, ChevronDown, CopyIcon, CheckIcon, RefreshCwIcon } from "lucide-react"
-import { jobsApi } from "@/lib/api/jobs"
+import { FolderOutputIcon, FileIcon, FolderIcon, ChevronRight, ChevronDown, CopyIcon, CheckIcon, RefreshCwIcon, DownloadIcon } from "lucide-react"
+import { jobsApi, type JobOutputFile } from "@/lib/api/jobs"
 import type { Job } from "@/lib/api/api"
+import { isTabularFile } from "@/lib/api/types"
 import { cn } from "@/lib/utils"
 import { CodeHighlighter } from "./code-highlighter"
 import { QUERY_CONFIG } from "@/lib/constants"
+import { TablePreviewView } from "@/components/table-preview"
+
+// Larger files are offered as a download instead of being previewed
+const MAX_PREVIEW_SIZE = 1024 * 1024
+
+function formatFileSize(size: number): string {
+  if (size >= 1024 * 1024) return `${(size / (1024 * 1024)).toFixed(2)} MB`
+  if (size >= 1024) return `${(size / 1024).toFixed(2)} KB`
+  return `${size} B`
+}
+
+function decodeText(buffer: ArrayBuffer): string | null {
+  try {
+    return new TextDecoder("utf-8", { fatal: true }).decode(buffer)
+  } catch {
+    return null
+  }
+}
 
 interface TreeNode {
   name: string
@@ -65,18 +84,40 @@ export function JobOutputDialog({ job, children }: { job: Job; children?: React.
   const [expandedFolders, setExpandedFolders] = useState<Set<string>>(new Set())
   const [copied, setCopied] = useState(false)
 
-  const { data: outputData, isLoading, refetch, isRefetching } = useQuery({
-    queryKey: ["job-output", job.uid],
-    queryFn: () => jobsApi.getJobOutput(job.uid),
+  // Poll only the manifest; file contents are fetched on selection and
+  // refetched only when that file's size or mtime changes
+  const { data: manifest, isLoading, refetch, isRefetching } = useQuery({
+    queryKey: ["job-output-manifest", job.uid],
+    queryFn: () => jobsApi.getJobOutputManifest(job.uid),
     enabled: open,
     refetchInterval: job.status === "running" ? QUERY_CONFIG.REFETCH_INTERVAL : false,
     staleTime: 0,
     gcTime: 0,
   })
 
-  const files = outputData?.files || {}
-  const fileList = Object.keys(files).sort()
+  const filesByPath = new Map<string, JobOutputFile>(
+    (manifest?.files || []).map((file) => [file.path, file])
+  )
+  const fileList = Array.from(filesByPath.keys()).sort()
   const fileTree = buildFileTree(fileList)
+  const selected = selectedFile ? filesByPath.get(selectedFile) : undefined
+  // Tables are previewed server-side whatever their size
+  const tabular = selected !== undefined && isTabularFile(selected.path)
+  const previewable = selected !== undefined && !tabular && selected.size <= MAX_PREVIEW_SIZE
+
+  const { data: selectedContent, isLoading: isContentLoading } = useQuery({
+    queryKey: ["job-output-file", job.uid, selected?.path, selected?.size, selected?.mtime],
+    queryFn: async () => decodeText(await jobsApi.getJobOutputFile(job.uid, selected!.path)),
+    enabled: open && previewable,
+    staleTime: Infinity,
+  })
+
+  const { data: tablePreview, isLoading: isPreviewLoading, isError: isPreviewError } = useQuery({
+    queryKey: ["job-output-preview", job.uid, selected?.path, selected?.size, selected?.mtime],
+    queryFn: () => jobsApi.getJobOutputPreview(job.uid, selected!.path),
+    enabled: open && tabular,
+    staleTime: Infinity,
+  })
 
   // Set the first file as selected if nothing is selected
   useEffect(() => {
@@ -140,6 +181,19 @@ export function JobOutputDialog({ job, children }: { job: Job; children?: React.
               <RefreshCwIcon className={`h-4 w-4 ${isRefetching ? "animate-spin" : ""}`} />
             </Button>
           </div>
+          <div className="flex justify-end mr-6">
+            <Button
+              variant="outline"
+              size="sm"
+              asChild
+              title="Download all output files as a zip"
+            >
+              <a href={jobsApi.getJobOutputArchiveUrl(job.uid)} download>
+                <DownloadIcon className="mr-2 h-4 w-4" />
+                Download all
+              </a>
+            </Button>
+          </div>
         </DialogHeader>
 
         <div className="flex gap-4 h-[calc(90vh-180px)] overflow-hidden">
@@ -169,18 +223,52 @@ export function JobOutputDialog({ job, children }: { job: Job; children?: React.
 
           {/* File Content Display */}
           <div className="flex-1 min-w-0 overflow-hidden">
-            {selectedFile && selectedFile in files ? (
+            {selected ? (
               <div className="h-full flex flex-col overflow-hidden">
-                <div className="text-xs font-medium mb-2 text-muted-foreground">
-                  {selectedFile}
+                <div className="text-xs font-medium mb-2 text-muted-foreground flex items-center justify-between">
+                  <span>
+                    {selected.path} ({formatFileSize(selected.size)})
+                  </span>
+                  <a
+                    href={jobsApi.getJobOutputFileUrl(job.uid, selected.path)}
+                    download
+                    className="flex items-center gap-1 hover:text-foreground"
+                  >
+                    <DownloadIcon className="h-3 w-3" />
+                    Download
+                  </a>
                 </div>
                 <div className="flex-1 rounded-md border bg-slate-950 overflow-hidden">
                   <ScrollArea className="h-full w-full">
                     <div className="p-4" style={{ maxWidth: '100%', overflow: 'hidden' }}>
-                      {files[selectedFile] ? (
+                      {tabular ? (
+                        isPreviewLoading ? (
+                          <div className="text-muted-foreground text-xs italic">
+                            Loading preview...
+                          </div>
+                        ) : tablePreview ? (
+                          <TablePreviewView preview={tablePreview} />
+                        ) : (
+                          <div className="text-muted-foreground text-xs italic">
+                            {isPreviewError ? "Could not parse this table, download it to view" : "No preview available"}
+                          </div>
+                        )
+                      ) : !previewable ? (
+                        <div className="text-muted-foreground text-xs italic">
+                          File too large to preview: {formatFileSize(selected.size)}
+                        </div>
+                      ) : isContentLoading ? (
+                        <div className="text-muted-foreground text-xs italic">
+                          Loading file...
+                        </div>
+                      ) : selectedContent === null ? (
+                        <div className="text-muted-foreground text-xs italic">
+                          Binary file, download it to view
+                        </div>
+                      ) : selectedContent ? (
                         <CodeHighlighter
-                          code={files[selectedFile]}
-                          filePath={selectedFile}
+                          code={selectedContent}
+                          filePath={selected.path}
                         />
                       ) : (
                         <div className="text-muted-foreground text-xs italic">
@@ -199,17 +287,17 @@ export function JobOutputDialog({ job, children }: { job: Job; children?: React.
           </div>
         </div>
 
-        {outputData?.output_dir && (
+        {manifest?.output_dir && (
           <div className="flex items-start gap-2 text-xs mt-2">
             <span className="text-muted-foreground font-medium">Output directory:</span>
             <span className="flex-1 break-all text-blue-500 underline">
-              {outputData.output_dir}
+              {manifest.output_dir}
             </span>
             <Button
               variant="ghost"
               size="sm"
               className="h-6 px-2 flex-shrink-0"
-              onClick={() => copyToClipboard(outputData.output_dir)}
+              onClick={() => copyToClipboard(manifest.output_dir)}
             >
               {copied ? (
                 <CheckIcon className="h-3 w-3 text-green-500" />
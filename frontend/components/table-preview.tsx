@@ -0,0 +1,77 @@
+"use client"
+
+import type { TablePreview, TablePreviewColumn } from "@/lib/api/types"
+
+function formatCell(value: unknown): string {
+  if (value === null || value === undefined) return ""
+  if (typeof value === "object") return JSON.stringify(value)
+  return String(value)
+}
+
+function columnSummary(column: TablePreviewColumn): string {
+  const lines = [column.physical_type ?? column.type]
+  if (column.null_count !== undefined) {
+    lines.push(`nulls: ${column.null_count.toLocaleString()}`)
+  }
+  if (column.min !== undefined) {
+    lines.push(`min: ${formatCell(column.min)}`, `max: ${formatCell(column.max)}`)
+  }
+  return lines.join("\n")
+}
+
+export function TablePreviewView({ preview }: { preview: TablePreview }) {
+  if (preview.columns.length === 0) {
+    return (
+      <div className="text-muted-foreground text-xs italic">
+        This file is empty
+      </div>
+    )
+  }
+
+  return (
+    <div className="space-y-2">
+      <div className="text-xs text-slate-400">
+        Showing {preview.rows.length.toLocaleString()} of{" "}
+        {preview.total_rows.toLocaleString()} rows
+        {preview.row_groups !== undefined &&
+          ` in ${preview.row_groups.toLocaleString()} row groups`}
+      </div>
+      <div className="overflow-x-auto">
+        <table className="text-xs text-slate-50 font-mono border-collapse">
+          <thead>
+            <tr>
+              {preview.columns.map((column, i) => (
+                <th
+                  key={i}
+                  title={columnSummary(column)}
+                  className="text-left font-medium px-2 py-1 border-b border-slate-700 whitespace-nowrap align-bottom"
+                >
+                  <div>{column.name}</div>
+                  <div className="text-[10px] font-normal text-slate-400">
+                    {column.type}
+                    {column.nullable && column.type !== "null" ? "?" : ""}
+                  </div>
+                </th>
+              ))}
+            </tr>
+          </thead>
+          <tbody>
+            {preview.rows.map((row, rowIndex) => (
+              <tr key={rowIndex} className="hover:bg-slate-900">
+                {row.map((value, i) => (
+                  <td
+                    key={i}
+                    className="px-2 py-0.5 border-b border-slate-800 whitespace-nowrap max-w-xs truncate"
+                    title={formatCell(value)}
+                  >
+                    {formatCell(value)}
+                  </td>
+                ))}
+              </tr>
+            ))}
+          </tbody>
+        </table>
+      </div>
+    </div>
+  )
+}
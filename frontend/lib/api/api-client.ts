@@ -33,6 +33,20 @@ class ApiClient {
     return this.request<T>(endpoint)
   }
 
+  url(endpoint: string): string {
+    return `${this.getBaseUrl()}${endpoint}`
+  }
+
+  async getArrayBuffer(endpoint: string): Promise<ArrayBuffer> {
+    const response = await fetch(this.url(endpoint))
+
+    if (response.ok) {
+      return response.arrayBuffer()
+    }
+
+    throw await parseErrorResponse(response)
+  }
+
   post<T>(endpoint: string, data: unknown): Promise<T> {
     return this.request<T>(endpoint, {
       method: "POST",
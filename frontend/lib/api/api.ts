@@ -1,5 +1,6 @@
 import { getApiBaseUrl } from "./config"
-import type { AccountInfo } from "./types"
+import { takeBootstrapSection } from "./dashboard"
+import type { AccountInfo, DatasetTask } from "./types"
 
 export interface Job {
   uid: string
@@ -56,9 +57,8 @@ interface AutoApproveResponse {
 }
 
 export const apiService = {
-  async createDataset(
-    formData: FormData,
-  ): Promise<{ success: boolean; message: string }> {
+  // Starts the creation, see `datasetsApi.waitForDatasetTask`
+  async createDataset(formData: FormData): Promise<DatasetTask> {
     try {
       const response = await fetch(
         `${getApiBaseUrl()}/api/v1/datasets/create-from-file`,
@@ -74,11 +74,7 @@ export const apiService = {
         throw new Error(error.detail || "Failed to create dataset")
       }
 
-      await response.json()
-      return {
-        success: true,
-        message: `Dataset "${formData.get("name")}" created successfully`,
-      }
+      return response.json()
     } catch (error) {
       console.error("Error creating dataset:", error)
       throw error
@@ -86,12 +82,15 @@ export const apiService = {
   },
 
   async getJobs(): Promise<{ jobs: Job[] }> {
-    const response = await fetch(`${getApiBaseUrl()}/api/v1/jobs`)
-    if (!response.ok) {
-      const error = await response.json()
-      throw new Error(error.detail || "Failed to fetch jobs")
+    let data = await takeBootstrapSection<JobListResponse>("jobs")
+    if (!data) {
+      const response = await fetch(`${getApiBaseUrl()}/api/v1/jobs`)
+      if (!response.ok) {
+        const error = await response.json()
+        throw new Error(error.detail || "Failed to fetch jobs")
+      }
+      data = (await response.json()) as JobListResponse
     }
-    const data: JobListResponse = await response.json()
     return {
       jobs: data.jobs.map((job) => ({
         uid: job.uid,
@@ -139,6 +138,9 @@ export const apiService = {
   },
 
   async getAccountInfo(): Promise<AccountInfo> {
+    const bootstrapped = await takeBootstrapSection<AccountInfo>("account")
+    if (bootstrapped) return bootstrapped
+
     const response = await fetch(`${getApiBaseUrl()}/api/v1/account`)
 
     if (!response.ok) {
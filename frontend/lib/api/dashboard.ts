@@ -0,0 +1,45 @@
+import { apiClient } from "./api-client"
+
+// Sections of the first load not taken by then may be out of date, they're
+// loaded from their own endpoints instead
+const BOOTSTRAP_TTL = 10_000
+
+export interface DashboardSection<T> {
+  version: string | null
+  data: T | null
+  error: unknown
+}
+
+type Dashboard = Record<string, DashboardSection<unknown>>
+type Bootstrap = { dashboard: Dashboard; receivedAt: number }
+
+let bootstrap: Promise<Bootstrap | null> | null = null
+const taken = new Set<string>()
+
+/**
+ * The first load of a section of the dashboard (`account`, `datasets`,
+ * `activity`, `jobs` or `trustedDatasites`) comes from one request that
+ * gathers all of them. Returns undefined for later loads, or if the section
+ * couldn't be loaded that way; the caller then uses the section's endpoint.
+ */
+export async function takeBootstrapSection<T>(
+  name: string,
+): Promise<T | undefined> {
+  if (taken.has(name)) return undefined
+  taken.add(name)
+
+  if (!bootstrap) {
+    bootstrap = apiClient
+      .get<Dashboard>("/api/v1/dashboard")
+      .then((dashboard) => ({ dashboard, receivedAt: Date.now() }))
+      .catch((error) => {
+        console.error("Error loading the dashboard:", error)
+        return null
+      })
+  }
+  const result = await bootstrap
+  if (!result || Date.now() - result.receivedAt > BOOTSTRAP_TTL) {
+    return undefined
+  }
+  return (result.dashboard[name]?.data as T | null) ?? undefined
+}
@@ -1,8 +1,17 @@
 import z from "zod"
 import { apiClient } from "./api-client"
-import type { Dataset, DatasetResponse } from "./types"
+import { takeBootstrapSection } from "./dashboard"
+import type {
+  Dataset,
+  DatasetProfile,
+  DatasetResponse,
+  DatasetsActivity,
+  DatasetTask,
+  DatasetVersion,
+  TablePreview,
+} from "./types"
+import { errorFromDetail } from "./errors"
 import { formatBytes } from "../utils"
-import { apiService, type Job } from "./api"
 
 export const AddShopifyDatasetFormSchema = z.object({
   name: z.string().min(1, { message: "A dataset name is required" }),
@@ -37,46 +46,47 @@ export const UpdateShopifyDatasetFormSchema = z.object({
   description: z.string().optional(),
 })
 
-export const datasetsApi = {
-  async getDatasets(): Promise<{ datasets: Dataset[] }> {
-    const data = (await apiClient.get(`/api/v1/datasets`)) as {
-      datasets: DatasetResponse[]
-    }
-    const jobs = await apiService.getJobs()
+// Weeks of activity shown per dataset
+const ACTIVITY_WEEKS = 12
 
-    const jobMap = jobs.jobs.reduce((map, job) => {
-      const jobs = map.get(job.datasetName) || []
-      map.set(job.datasetName, [...jobs, job])
-      return map
-    }, new Map<string, Job[]>())
+// How often to poll a dataset creation task
+const TASK_POLL_INTERVAL = 1000
 
-    // Get the unique users count for each dataset
-    const uniqueUsersMap = jobs.jobs.reduce((map, job) => {
-      const uniqueEmails = map.get(job.datasetName) || new Set<string>()
-      uniqueEmails.add(job.requesterEmail)
-      map.set(job.datasetName, uniqueEmails)
-      return map
-    }, new Map<string, Set<string>>())
+const TASK_PHASE_LABELS: Record<DatasetTask["phase"], string> = {
+  queued: "Waiting",
+  receiving: "Receiving",
+  staging: "Staging",
+  generating_mock: "Generating mock",
+  registering: "Registering",
+  done: "Done",
+}
 
-    // Get activity data for the past 12 weeks
-    const getWeekNumber = (date: Date): number => {
-      const now = new Date()
-      const diffTime = now.getTime() - date.getTime()
-      const diffWeeks = Math.floor(diffTime / (1000 * 60 * 60 * 24 * 7))
-      return diffWeeks
-    }
+// e.g. "Receiving 12 MB / 40 MB"
+export function datasetTaskLabel(task: DatasetTask): string {
+  const label = TASK_PHASE_LABELS[task.phase]
+  if (!task.bytes_done) return `${label}...`
+  const total = task.bytes_total ? ` / ${formatBytes(task.bytes_total)}` : ""
+  return `${label} ${formatBytes(task.bytes_done)}${total}`
+}
 
-    const activityDataMap = jobs.jobs.reduce((map, job) => {
-      const weekNumber = getWeekNumber(job.requestedTime)
-      // Only consider jobs from the past 12 weeks
-      if (weekNumber >= 0 && weekNumber < 12) {
-        const currentActivity = map.get(job.datasetName) || Array(12).fill(0)
-        // weekNumber 0 is current week, so we need to reverse the index
-        currentActivity[11 - weekNumber]++
-        map.set(job.datasetName, currentActivity)
-      }
-      return map
-    }, new Map<string, number[]>())
+export const datasetsApi = {
+  async getDatasets(): Promise<{ datasets: Dataset[] }> {
+    const [data, activity] = await Promise.all([
+      takeBootstrapSection<{ datasets: DatasetResponse[] }>("datasets").then(
+        (data) =>
+          data ??
+          apiClient.get<{ datasets: DatasetResponse[] }>(`/api/v1/datasets`),
+      ),
+      // Precomputed on the server, so this doesn't grow with the job count
+      takeBootstrapSection<DatasetsActivity>("activity").then((activity) =>
+        activity?.weeks === ACTIVITY_WEEKS
+          ? activity
+          : apiClient.get<DatasetsActivity>(
+              `/api/v1/datasets/activity?weeks=${ACTIVITY_WEEKS}`,
+            ),
+      ),
+    ])
+    const activityStart = new Date(`${activity.week_start}T00:00:00Z`)
 
     return {
       datasets: data.datasets.map((dataset) => ({
@@ -89,15 +99,21 @@ export const datasetsApi = {
         lastUpdated: new Date(dataset.updatedAt),
         accessRequests: 0,
         permissions: [],
-        usersCount: uniqueUsersMap.get(dataset.name)?.size || 0,
-        requestsCount: jobMap.get(dataset.name)?.length || 0,
-        activityData: activityDataMap.get(dataset.name) || Array(12).fill(0),
+        usersCount: activity.datasets[dataset.name]?.users ?? 0,
+        requestsCount: activity.datasets[dataset.name]?.requests ?? 0,
+        activityData:
+          activity.datasets[dataset.name]?.weekly ??
+          Array(ACTIVITY_WEEKS).fill(0),
+        activityStart,
         source: dataset.source,
       })),
     }
   },
   addShopifyDataset: (data: z.infer<typeof AddShopifyDatasetFormSchema>) => {
-    return apiClient.post<{}>("/api/v1/datasets/import-from-shopify", data)
+    return apiClient.post<DatasetTask>(
+      "/api/v1/datasets/import-from-shopify",
+      data,
+    )
   },
   updateShopifyDataset: ({
     uid,
@@ -109,8 +125,20 @@ export const datasetsApi = {
     return apiClient.put<{}>(`/api/v1/datasets/update/${uid}`, data)
   },
   syncShopifyDataset: (uid: string) => {
-    return apiClient.put<{ dataset: Dataset }>(
-      `/api/v1/datasets/sync-shopify-dataset/${uid}`,
+    // `version` is null if the store data didn't change
+    return apiClient.put<{
+      dataset: DatasetResponse
+      version: DatasetVersion | null
+    }>(`/api/v1/datasets/sync-shopify-dataset/${uid}`, {})
+  },
+  getDatasetVersions: (uid: string) => {
+    return apiClient.get<{ versions: DatasetVersion[] }>(
+      `/api/v1/datasets/${uid}/versions`,
+    )
+  },
+  restoreDatasetVersion: ({ uid, version }: { uid: string; version: number }) => {
+    return apiClient.post<{ version: DatasetVersion }>(
+      `/api/v1/datasets/${uid}/versions/${version}/restore`,
       {},
     )
   },
@@ -119,4 +147,35 @@ export const datasetsApi = {
       `/api/v1/datasets/files/${uid}?dataset_type=${dataset_type}`,
     )
   },
+  getDatasetFilePreview: (
+    uid: string,
+    path: string,
+    dataset_type: "private" | "mock" = "private",
+  ) => {
+    const params = new URLSearchParams({ path, dataset_type })
+    return apiClient.get<TablePreview>(
+      `/api/v1/datasets/files/${uid}/preview?${params}`,
+    )
+  },
+  getDatasetTask: (taskId: string) => {
+    return apiClient.get<DatasetTask>(`/api/v1/datasets/tasks/${taskId}`)
+  },
+  // Poll a creation task until it finishes; rejects with the task's error
+  async waitForDatasetTask(
+    task: DatasetTask,
+    onProgress?: (task: DatasetTask) => void,
+  ): Promise<DatasetTask> {
+    while (task.status === "pending" || task.status === "running") {
+      onProgress?.(task)
+      await new Promise((resolve) => setTimeout(resolve, TASK_POLL_INTERVAL))
+      task = await datasetsApi.getDatasetTask(task.id)
+    }
+    if (task.status === "failed") {
+      throw errorFromDetail(task.error, task.error_status ?? 500)
+    }
+    return task
+  },
+  getDatasetProfile: (uid: string) => {
+    return apiClient.get<DatasetProfile>(`/api/v1/datasets/${uid}/profile`)
+  },
 }
@@ -27,6 +27,24 @@ export class ApiError extends Error {
   }
 }
 
+// Build the error for a failed request's `detail`
+export function errorFromDetail(
+  detail: unknown,
+  status: number,
+  statusText = "",
+): Error {
+  if (
+    detail !== null &&
+    typeof detail === "object" &&
+    (detail as { type?: string }).type === "FormFieldError"
+  ) {
+    const { message, loc } = detail as { message: string; loc: string }
+    return new FormFieldError(message, loc)
+  }
+  const message = typeof detail === "string" ? detail : JSON.stringify(detail)
+  return new ApiError(message, status, statusText)
+}
+
 export async function parseErrorResponse(response: Response): Promise<Error> {
   const contentType = response.headers.get("content-type")
   const isJson = contentType?.includes("application/json")
@@ -1,4 +1,5 @@
 import { apiClient } from "./api-client"
+import type { TablePreview } from "./types"
 
 export interface JobLogs {
   logs_dir: string
@@ -16,6 +17,23 @@ export interface JobOutput {
   files: Record<string, string>
 }
 
+export interface JobOutputFile {
+  path: string
+  size: number
+  mtime: number
+}
+
+export interface JobOutputManifest {
+  output_dir: string
+  token: string
+  files: JobOutputFile[]
+}
+
+const encodePath = (path: string) => path.split("/").map(encodeURIComponent).join("/")
+
+const outputFileEndpoint = (jobUid: string, path: string) =>
+  `/api/v1/jobs/output/${jobUid}/files/${encodePath(path)}`
+
 export const jobsApi = {
   getJob: (jobUid: string) => {
     return apiClient.get<any>(`/api/v1/jobs/${jobUid}`)
@@ -41,6 +59,21 @@ export const jobsApi = {
   getJobOutput: (jobUid: string) => {
     return apiClient.get<JobOutput>(`/api/v1/jobs/output/${jobUid}`)
   },
+  getJobOutputManifest: (jobUid: string) => {
+    return apiClient.get<JobOutputManifest>(`/api/v1/jobs/output/${jobUid}/manifest`)
+  },
+  getJobOutputFile: (jobUid: string, path: string) => {
+    return apiClient.getArrayBuffer(outputFileEndpoint(jobUid, path))
+  },
+  getJobOutputPreview: (jobUid: string, path: string) => {
+    return apiClient.get<TablePreview>(`/api/v1/jobs/output/${jobUid}/preview/${encodePath(path)}`)
+  },
+  getJobOutputFileUrl: (jobUid: string, path: string) => {
+    return apiClient.url(outputFileEndpoint(jobUid, path))
+  },
+  getJobOutputArchiveUrl: (jobUid: string) => {
+    return apiClient.url(`/api/v1/jobs/output/${jobUid}/archive`)
+  },
   deleteJob: (jobUid: string) => {
     return apiClient.delete<{}>(`/api/v1/jobs/${jobUid}`)
   },
@@ -1,7 +1,9 @@
 import { apiClient } from "./api-client"
+import { takeBootstrapSection } from "./dashboard"
 
 export const trustedDatasitesApi = {
   getTrustedDatasites: async () =>
+    (await takeBootstrapSection<{ datasites: string[] }>("trustedDatasites")) ??
     apiClient.get<{ datasites: string[] }>("/api/v1/trusted-datasites"),
   setTrustedDatasites: async (datasites: string[]) =>
     apiClient.post<{}>("/api/v1/trusted-datasites", { datasites }),
@@ -40,11 +40,139 @@ export interface Dataset {
   usersCount: number
   requestsCount: number
   activityData: number[]
+  // First day of the oldest week in `activityData`
+  activityStart: Date
   source: undefined | ShopifySource
 }
 
+export interface DatasetsActivity {
+  // First day (a Monday) of the oldest week
+  week_start: string
+  weeks: number
+  // Datasets without requests are left out
+  datasets: Record<
+    string,
+    { weekly: number[]; requests: number; users: number }
+  >
+}
+
 export interface AccountInfo {
   email: string
   is_admin: boolean
   host_datasite_url: string
 }
+
+export interface TablePreviewColumn {
+  name: string
+  type: "boolean" | "integer" | "float" | "datetime" | "string" | "object" | "array" | "mixed" | "null"
+  nullable: boolean
+  // Parquet/Arrow only
+  physical_type?: string
+  null_count?: number
+  min?: unknown
+  max?: unknown
+}
+
+export interface TablePreview {
+  path: string
+  format: "csv" | "tsv" | "jsonl" | "parquet" | "arrow"
+  size: number
+  columns: TablePreviewColumn[]
+  rows: unknown[][]
+  total_rows: number
+  row_groups?: number
+}
+
+export interface ColumnProfile {
+  name: string
+  type: TablePreviewColumn["type"]
+  count: number
+  null_count: number
+  null_rate: number
+  // Omitted for nested Parquet/Arrow columns
+  distinct?: number
+  distinct_exact?: boolean
+  physical_type?: string
+  min?: unknown
+  max?: unknown
+}
+
+export interface FileProfile {
+  path: string
+  format?: TablePreview["format"]
+  size?: number
+  rows?: number
+  columns?: ColumnProfile[]
+  error?: string
+}
+
+export interface DatasetProfile {
+  dataset_uid: string
+  status: "computing" | "ready" | "failed"
+  version: string
+  // The profile is of an older version of the data
+  stale: boolean
+  error: string | null
+  profile: {
+    files: FileProfile[]
+    skipped: string[]
+    version: string
+    computed_at: string
+    duration: number
+  } | null
+}
+
+export type DatasetTaskPhase =
+  | "queued"
+  | "receiving"
+  | "staging"
+  | "generating_mock"
+  | "registering"
+  | "done"
+
+export interface DatasetTask {
+  id: string
+  kind: "upload" | "shopify"
+  name: string
+  status: "pending" | "running" | "succeeded" | "failed"
+  phase: DatasetTaskPhase
+  bytes_done: number
+  // Unknown for phases without byte progress
+  bytes_total: number | null
+  // The error's detail, a message or a FormFieldError
+  error: unknown
+  error_status: number | null
+  dataset: DatasetResponse | null
+  created_at: string
+  updated_at: string
+}
+
+export interface DatasetVersion {
+  version: number
+  created_at: string
+  source: "baseline" | "external" | "shopify_sync" | "restore"
+  restored_from: number | null
+  files: number
+  size: number
+  // Bytes of chunks the previous version didn't have
+  changed_bytes: number
+  latest?: boolean
+  restorable?: boolean
+}
+
+export const TABULAR_EXTENSIONS = [
+  ".csv",
+  ".tsv",
+  ".jsonl",
+  ".ndjson",
+  ".parquet",
+  ".pq",
+  ".arrow",
+  ".feather",
+  ".ipc",
+]
+
+export function isTabularFile(path: string): boolean {
+  const lower = path.toLowerCase()
+  return TABULAR_EXTENSIONS.some((ext) => lower.endsWith(ext))
+}
@@ -0,0 +1,215 @@
+import { apiService } from "./api"
+import { apiClient } from "./api-client"
+import { parseErrorResponse } from "./errors"
+import type { DatasetTask } from "./types"
+
+// Fixed by the upload protocol; a file's content hash depends on it
+export const UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+// Attempts per chunk before the upload gives up (it can be resumed later)
+const CHUNK_ATTEMPTS = 4
+const RESUME_KEY_PREFIX = "rds-upload:"
+
+export interface UploadSource {
+  file: File
+  path: string
+  role: "private" | "mock"
+}
+
+interface UploadSessionFile {
+  index: number
+  path: string
+  role: "private" | "mock"
+  size: number
+  present: boolean
+  offset: number
+  complete: boolean
+}
+
+interface UploadSession {
+  id: string
+  chunk_size: number
+  files: UploadSessionFile[]
+  complete: boolean
+}
+
+export interface UploadProgress {
+  phase: "hashing" | "uploading"
+  bytesDone: number
+  bytesTotal: number
+}
+
+function toHex(buffer: ArrayBuffer): string {
+  return Array.from(new Uint8Array(buffer), (b) =>
+    b.toString(16).padStart(2, "0"),
+  ).join("")
+}
+
+function chunkOf(file: File, offset: number): Blob {
+  return file.slice(offset, offset + UPLOAD_CHUNK_SIZE)
+}
+
+// SHA-256 of the SHA-256 digests of the file's chunks
+async function contentHash(
+  file: File,
+  onChunk: (bytes: number) => void,
+): Promise<string> {
+  const digests: Uint8Array[] = []
+  for (let offset = 0; offset < file.size; offset += UPLOAD_CHUNK_SIZE) {
+    const chunk = await chunkOf(file, offset).arrayBuffer()
+    digests.push(new Uint8Array(await crypto.subtle.digest("SHA-256", chunk)))
+    onChunk(chunk.byteLength)
+  }
+  const joined = new Uint8Array(digests.length * 32)
+  digests.forEach((digest, i) => joined.set(digest, i * 32))
+  return toHex(await crypto.subtle.digest("SHA-256", joined))
+}
+
+// Identifies the same selection of files across page reloads
+function resumeKey(sources: UploadSource[]): string {
+  return (
+    RESUME_KEY_PREFIX +
+    sources
+      .map((s) => `${s.role}:${s.path}:${s.file.size}:${s.file.lastModified}`)
+      .join("|")
+  )
+}
+
+async function putChunk(
+  uploadId: string,
+  index: number,
+  file: File,
+  offset: number,
+): Promise<number> {
+  const chunk = await chunkOf(file, offset).arrayBuffer()
+  const checksum = toHex(await crypto.subtle.digest("SHA-256", chunk))
+  const url = apiClient.url(
+    `/api/v1/datasets/uploads/${uploadId}/files/${index}?offset=${offset}`,
+  )
+
+  for (let attempt = 1; ; attempt++) {
+    try {
+      const response = await fetch(url, {
+        method: "PUT",
+        body: chunk,
+        headers: { "X-Chunk-SHA256": checksum },
+      })
+      if (response.ok) return (await response.json()).offset
+      // Out of order: the server tells where to continue from
+      if (response.status === 409) {
+        const { detail } = await response.clone().json()
+        if (typeof detail?.offset === "number") return detail.offset
+      }
+      if (response.status < 500 || attempt >= CHUNK_ATTEMPTS) {
+        throw await parseErrorResponse(response)
+      }
+    } catch (error) {
+      // Network errors are retried like server errors
+      if (!(error instanceof TypeError) || attempt >= CHUNK_ATTEMPTS) throw error
+    }
+    await new Promise((resolve) => setTimeout(resolve, 500 * 2 ** attempt))
+  }
+}
+
+async function openSession(
+  sources: UploadSource[],
+  onProgress: (progress: UploadProgress) => void,
+): Promise<UploadSession> {
+  const key = resumeKey(sources)
+  const previous = localStorage.getItem(key)
+  if (previous) {
+    try {
+      return await apiClient.get<UploadSession>(
+        `/api/v1/datasets/uploads/${previous}`,
+      )
+    } catch {
+      // Expired or finalized, start over
+      localStorage.removeItem(key)
+    }
+  }
+
+  const bytesTotal = sources.reduce((total, s) => total + s.file.size, 0)
+  let bytesDone = 0
+  const files = []
+  for (const source of sources) {
+    const sha256 = await contentHash(source.file, (bytes) => {
+      bytesDone += bytes
+      onProgress({ phase: "hashing", bytesDone, bytesTotal })
+    })
+    files.push({
+      path: source.path,
+      role: source.role,
+      size: source.file.size,
+      sha256,
+    })
+  }
+  const session = await apiClient.post<UploadSession>(
+    "/api/v1/datasets/uploads",
+    { files },
+  )
+  localStorage.setItem(key, session.id)
+  return session
+}
+
+// Chunks are hashed with crypto.subtle, which browsers only provide in
+// secure contexts (HTTPS or localhost)
+function canUploadInChunks(): boolean {
+  return typeof crypto !== "undefined" && crypto.subtle !== undefined
+}
+
+// All files in one multipart request, which can't be resumed
+function uploadMultipart(
+  sources: UploadSource[],
+  dataset: { name: string; description: string },
+): Promise<DatasetTask> {
+  const formData = new FormData()
+  for (const { file, role } of sources) {
+    formData.append(
+      role === "private" ? "dataset" : "mock_dataset",
+      file,
+      file.webkitRelativePath || file.name,
+    )
+  }
+  formData.append("name", dataset.name)
+  formData.append("description", dataset.description)
+  return apiService.createDataset(formData)
+}
+
+/**
+ * Upload the files in resumable chunks and start creating the dataset.
+ *
+ * Files the server already has are skipped. If the upload is interrupted,
+ * calling this again with the same files resumes it. Where chunks can't be
+ * hashed (pages served over plain HTTP), the files are sent in one multipart
+ * request instead.
+ */
+export async function uploadDataset(
+  sources: UploadSource[],
+  dataset: { name: string; description: string },
+  onProgress: (progress: UploadProgress) => void,
+): Promise<DatasetTask> {
+  if (!canUploadInChunks()) return uploadMultipart(sources, dataset)
+
+  const session = await openSession(sources, onProgress)
+
+  const bytesTotal = session.files.reduce((total, f) => total + f.size, 0)
+  let bytesDone = session.files.reduce((total, f) => total + f.offset, 0)
+  onProgress({ phase: "uploading", bytesDone, bytesTotal })
+
+  for (const entry of session.files) {
+    const { file } = sources[entry.index]
+    let offset = entry.offset
+    while (offset < entry.size) {
+      const next = await putChunk(session.id, entry.index, file, offset)
+      bytesDone += next - offset
+      offset = next
+      onProgress({ phase: "uploading", bytesDone, bytesTotal })
+    }
+  }
+
+  const task = await apiClient.post<DatasetTask>(
+    `/api/v1/datasets/uploads/${session.id}/finalize`,
+    dataset,
+  )
+  localStorage.removeItem(resumeKey(sources))
+  return task
+}
@@ -0,0 +1,103 @@
+import asyncio
+import hashlib
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from backend import admission
+from backend.admission import MEMORY, PREVIEWS, UPLOADS, admit, budget, reserve
+from backend.api.services.upload_service import UploadService
+from backend.config import get_settings
+from backend.uploads import content_hash, create_session, uploads_root
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(admission, "_budgets", {})
+    monkeypatch.setattr(settings, "admission_previews", 1)
+    monkeypatch.setattr(settings, "admission_uploads", 1)
+    monkeypatch.setattr(settings, "admission_memory_bytes", 1024)
+    monkeypatch.setattr(settings, "admission_timeout", 0.05)
+    return settings
+
+
+def test_request_over_budget_gets_a_429(settings):
+    app = FastAPI()
+
+    @app.get("/preview")
+    async def preview():
+        async with admit(PREVIEWS):
+            return {"ok": True}
+
+    client = TestClient(app)
+    assert client.get("/preview").status_code == 200
+
+    # Taken at once, so it can be held from outside the app's event loop
+    held = asyncio.run(reserve(PREVIEWS))
+    response = client.get("/preview")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == str(settings.admission_retry_after)
+
+    held()
+    assert client.get("/preview").status_code == 200
+
+
+def test_waiting_request_is_admitted_once_released(settings):
+    settings.admission_timeout = 5
+
+    async def main():
+        held = await reserve(PREVIEWS)
+        waiting = asyncio.ensure_future(reserve(PREVIEWS))
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        held()
+        (await asyncio.wait_for(waiting, 1))()
+
+    asyncio.run(main())
+    assert budget(PREVIEWS)._available == 1
+
+
+def test_memory_is_claimed_before_the_body_is_read(settings, tmp_path):
+    data_dir = tmp_path / "SyftBox"
+    data_dir.mkdir()
+    syftbox_client = SimpleNamespace(config=SimpleNamespace(data_dir=data_dir))
+    service = UploadService(SimpleNamespace(_syftbox_client=syftbox_client))
+    chunk = b"id,name\n1,a\n"
+    sha256 = hashlib.sha256(chunk).hexdigest()
+    upload_id = create_session(
+        uploads_root(syftbox_client),
+        [
+            {
+                "path": "data.csv",
+                "role": "private",
+                "size": len(chunk),
+                "sha256": content_hash([hashlib.sha256(chunk).digest()]),
+            }
+        ],
+    )["id"]
+
+    reads = []
+
+    async def body():
+        reads.append(len(chunk))
+        yield chunk
+
+    async def main():
+        # A preview holding all the memory
+        held = await reserve(PREVIEWS, 1024)
+        with pytest.raises(HTTPException) as e:
+            await service.put_chunk(upload_id, 0, 0, body(), sha256, len(chunk))
+        assert e.value.status_code == 429
+        assert not reads
+        held()
+
+        result = await service.put_chunk(upload_id, 0, 0, body(), sha256, len(chunk))
+        assert result == {"index": 0, "offset": len(chunk)}
+        assert reads == [len(chunk)]
+
+    asyncio.run(main())
+    assert budget(MEMORY)._available == 1024
+    assert budget(UPLOADS)._available == 1
@@ -0,0 +1,165 @@
+import sqlite3
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from syft_core import SyftBoxURL
+from syft_rds.models import Dataset as SyftDataset, Job as SyftJob, JobStatus
+from syft_rds.store import YAMLStore
+
+from backend.catalog import SCHEMA_VERSION, Catalog
+
+EMAIL = "owner@example.org"
+START = datetime(2025, 3, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def jobs(tmp_path):
+    return YAMLStore[SyftJob](SyftJob, tmp_path / "store")
+
+
+@pytest.fixture
+def datasets(tmp_path):
+    return YAMLStore[SyftDataset](SyftDataset, tmp_path / "store")
+
+
+@pytest.fixture
+def open_catalog(tmp_path, jobs, datasets):
+    opened = []
+
+    def open_catalog() -> Catalog:
+        catalog = Catalog(
+            tmp_path / "catalog.sqlite3", jobs.item_type_dir, datasets.item_type_dir
+        )
+        opened.append(catalog)
+        return catalog
+
+    yield open_catalog
+    for catalog in opened:
+        catalog._db.close()
+
+
+def job(i: int, status=JobStatus.pending_code_review, dataset="census", by="a"):
+    created_at = START + timedelta(hours=i)
+    return SyftJob(
+        name=f"job-{i}",
+        dataset_name=dataset,
+        user_code_id=uuid.uuid4(),
+        created_by=f"{by}@example.org",
+        created_at=created_at,
+        updated_at=created_at,
+        status=status,
+    )
+
+
+def dataset(name: str) -> SyftDataset:
+    return SyftDataset(
+        name=name,
+        private=SyftBoxURL(f"syft://{EMAIL}/private/datasets/{name}"),
+        mock=SyftBoxURL(f"syft://{EMAIL}/public/datasets/{name}"),
+        summary=None,
+        readme=None,
+        tags=[],
+    )
+
+
+def names(listed: list[dict]) -> list[str]:
+    return [item["name"] for item in listed]
+
+
+def test_refresh_takes_in_changed_and_removed_records(open_catalog, jobs, datasets):
+    first, second, third = (jobs.create(job(i)) for i in range(3))
+    datasets.create(dataset("census"))
+    catalog = open_catalog()
+    assert names(catalog.jobs()) == ["job-2", "job-1", "job-0"]
+    assert catalog.dataset(name="census") is not None
+
+    second.status = JobStatus.approved
+    jobs.create(second, overwrite=True)
+    jobs.delete(third.uid)
+    datasets.clear()
+    datasets.create(dataset("survey"))
+
+    assert [(j["name"], j["status"]) for j in catalog.jobs()] == [
+        ("job-1", "approved"),
+        ("job-0", "pending_code_review"),
+    ]
+    assert catalog.job(third.uid) is None
+    assert catalog.job(first.uid).name == "job-0"
+    assert catalog.dataset(name="census") is None
+    assert [d.name for d in catalog.datasets()] == ["survey"]
+
+
+def test_jobs_are_filtered_and_paged(open_catalog, jobs):
+    for i, (status, dataset_name, by) in enumerate(
+        [
+            (JobStatus.pending_code_review, "census", "a"),
+            (JobStatus.approved, "census", "b"),
+            (JobStatus.pending_code_review, "survey", "b"),
+            (JobStatus.rejected, "census", "a"),
+            (JobStatus.pending_code_review, "census", "b"),
+        ]
+    ):
+        jobs.create(job(i, status, dataset_name, by))
+    catalog = open_catalog()
+
+    assert names(catalog.jobs(status="pending_code_review")) == [
+        "job-4",
+        "job-2",
+        "job-0",
+    ]
+    assert names(catalog.jobs(dataset="census", requester="b@example.org")) == [
+        "job-4",
+        "job-1",
+    ]
+    assert names(catalog.jobs(limit=2)) == ["job-4", "job-3"]
+    assert names(catalog.jobs(limit=2, offset=2)) == ["job-2", "job-1"]
+    assert names(catalog.jobs(offset=4)) == ["job-0"]
+    assert names(catalog.jobs(status="pending_code_review", limit=1, offset=1)) == [
+        "job-2"
+    ]
+    assert catalog.job_counts(dataset="census") == {
+        "pending_code_review": 2,
+        "approved": 1,
+        "rejected": 1,
+    }
+
+
+def corrupt(path):
+    with open(path, "r+b") as f:
+        f.seek(100)
+        f.write(b"\xff" * 4096)
+
+
+def other_schema(path):
+    db = sqlite3.connect(path)
+    db.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+    db.close()
+
+
+@pytest.mark.parametrize("damage", [corrupt, other_schema])
+def test_unusable_database_is_rebuilt_on_open(tmp_path, open_catalog, jobs, damage):
+    for i in range(3):
+        jobs.create(job(i))
+    catalog = open_catalog()
+    catalog.refresh()
+    catalog._db.close()
+    for suffix in ("-wal", "-shm"):
+        (tmp_path / f"catalog.sqlite3{suffix}").unlink(missing_ok=True)
+    damage(tmp_path / "catalog.sqlite3")
+
+    catalog = open_catalog()
+    assert catalog._db.execute("PRAGMA quick_check").fetchone()[0] == "ok"
+    assert names(catalog.jobs()) == ["job-2", "job-1", "job-0"]
+
+
+def test_deleted_database_is_rebuilt(tmp_path, open_catalog, jobs):
+    jobs.create(job(0))
+    catalog = open_catalog()
+    assert names(catalog.jobs()) == ["job-0"]
+
+    for suffix in ("", "-wal", "-shm"):
+        (tmp_path / f"catalog.sqlite3{suffix}").unlink(missing_ok=True)
+    jobs.create(job(1))
+    assert names(catalog.jobs()) == ["job-1", "job-0"]
+    assert (tmp_path / "catalog.sqlite3").exists()
@@ -0,0 +1,66 @@
+import time
+
+import pytest
+
+from backend import changes
+from backend.changes import ChangeBus, ChangeFeed
+
+
+@pytest.fixture
+def feed():
+    feed = ChangeFeed(ChangeBus())
+    feed.start()
+    yield feed
+    feed.stop()
+
+
+def wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_generation_moves_on_with_changes(feed, tmp_path):
+    path = tmp_path / "jobs"
+    feed.watch(changes.JOB_RECORDS, path)
+    seen = feed.generation(path)
+    assert seen is not None
+    assert feed.generation(path) == seen
+
+    (path / "job.yaml").write_text("status: pending\n")
+    wait_for(lambda: feed.generation(path) != seen)
+
+
+def test_generation_is_trusted_for_a_bounded_time(feed, tmp_path, monkeypatch):
+    path = tmp_path / "jobs"
+    feed.watch(changes.JOB_RECORDS, path)
+    seen = feed.generation(path)
+
+    now = time.monotonic()
+    monkeypatch.setattr(
+        changes.time, "monotonic", lambda: now + changes.RESCAN_INTERVAL
+    )
+    # Nothing changed as far as the feed knows, but it may have missed it
+    assert feed.generation(path) != seen
+
+
+def test_own_writes_move_the_generation_on(feed, tmp_path):
+    path = tmp_path / "sources.json"
+    feed.watch_file(changes.SOURCES, path)
+    seen = feed.generation(path)
+
+    feed.expect_changes()
+    assert feed.generation(path) != seen
+
+
+def test_no_generation_without_a_running_watcher(feed, tmp_path):
+    path = tmp_path / "jobs"
+    assert feed.generation(path) is None
+
+    feed.watch(changes.JOB_RECORDS, path)
+    assert feed.generation(path) is not None
+    for emitter in list(feed._observer.emitters):
+        emitter.stop()
+        emitter.join()
+    assert feed.generation(path) is None
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import zlib
+
+from backend.lib import compression
+from backend.lib.compression import CompressionMiddleware
+
+
+def respond(media_type: str, chunks: list[bytes], etag: str = '"v1"'):
+    async def app(scope, receive, send):
+        headers = [(b"content-type", media_type.encode()), (b"etag", etag.encode())]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        for i, chunk in enumerate(chunks):
+            more_body = i < len(chunks) - 1
+            await send(
+                {"type": "http.response.body", "body": chunk, "more_body": more_body}
+            )
+
+    return CompressionMiddleware(app)
+
+
+def request(app) -> tuple[dict, list[bytes]]:
+    """The response headers and the body of each message sent."""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(b"accept-encoding", b"gzip")],
+    }
+    asyncio.run(app(scope, receive, send))
+    start, *bodies = messages
+    headers = {k.decode(): v.decode() for k, v in start["headers"]}
+    return headers, [message["body"] for message in bodies]
+
+
+def records(n: int) -> list[bytes]:
+    return [b'{"job": %d, "line": "training step done"}\n' % i for i in range(n)]
+
+
+def test_each_streamed_record_is_sent_right_away():
+    sent = records(50)
+    headers, bodies = request(respond("application/x-ndjson", sent))
+
+    assert headers["content-encoding"] == "gzip"
+    assert len(bodies) == len(sent)
+    decompressor = zlib.decompressobj(31)
+    for record, body in zip(sent, bodies):
+        # Everything sent so far can be read without waiting for the rest
+        assert decompressor.decompress(body) == record
+
+
+def test_other_streamed_bodies_are_flushed_in_batches():
+    sent = records(5000)
+    headers, bodies = request(respond("text/plain", sent))
+
+    total = sum(len(record) for record in sent)
+    assert len(bodies) <= total // compression.FLUSH_SIZE + 2
+    assert zlib.decompress(b"".join(bodies), 31) == b"".join(sent)
+
+
+def test_encoded_bodies_get_a_weak_etag():
+    headers, _ = request(respond("application/json", [b"[" + b"1," * 1000 + b"1]"]))
+    assert headers["content-encoding"] == "gzip"
+    assert headers["etag"] == 'W/"v1"'
+
+    headers, _ = request(respond("application/json", [b"[1]"]))
+    assert "content-encoding" not in headers
+    assert headers["etag"] == '"v1"'
+
+
+def test_large_chunks_are_compressed_off_the_event_loop(monkeypatch):
+    threads = []
+    compress = compression.StreamCompressor.compress
+
+    def recorded(self, data):
+        threads.append(threading.get_ident())
+        return compress(self, data)
+
+    monkeypatch.setattr(compression.StreamCompressor, "compress", recorded)
+    big = b"x" * compression.THREAD_SIZE
+    headers, bodies = request(respond("application/json", [b"[]" * 600, big]))
+
+    loop_thread = threading.get_ident()
+    assert threads[0] == loop_thread
+    assert threads[1] != loop_thread
+    assert zlib.decompress(b"".join(bodies), 31) == b"[]" * 600 + big
@@ -0,0 +1,95 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from backend.api.dependencies import get_rds_client
+from backend.api.routers import dashboard
+from backend.api.services.dataset_service import DatasetService
+from backend.api.services.job_service import JobService
+from backend.api.services.trusted_datasites_service import TrustedDatasitesService
+
+SECTIONS = {"account", "datasets", "activity", "jobs", "trustedDatasites"}
+
+
+@pytest.fixture
+def content(monkeypatch):
+    """What each section's service returns, changed by the tests."""
+    content = {
+        "datasets": {"datasets": [{"name": "census"}]},
+        "activity": {"weeks": 4, "datasets": {}},
+        "jobs": {"jobs": [{"name": "job-0", "status": "approved"}]},
+        "trustedDatasites": {"datasites": ["a@example.org"]},
+    }
+
+    def returning(section):
+        async def method(self, *args, **kwargs):
+            result = content[section]
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        return method
+
+    monkeypatch.setattr(DatasetService, "list_datasets", returning("datasets"))
+    monkeypatch.setattr(DatasetService, "get_activity", returning("activity"))
+    monkeypatch.setattr(JobService, "list_jobs", returning("jobs"))
+    monkeypatch.setattr(
+        TrustedDatasitesService,
+        "get_auto_approved_datasites",
+        returning("trustedDatasites"),
+    )
+    return content
+
+
+@pytest.fixture
+def client(content) -> TestClient:
+    rds_client = SimpleNamespace(
+        email="owner@example.org",
+        is_admin=True,
+        host_datasite_url="https://syftbox.net/datasites/owner@example.org",
+        _syftbox_client=None,
+    )
+    app = FastAPI()
+    app.include_router(dashboard.router)
+    app.dependency_overrides[get_rds_client] = lambda: rds_client
+    return TestClient(app)
+
+
+def test_known_sections_are_left_out(client, content):
+    first = client.get("/dashboard").json()
+    assert first.keys() == SECTIONS
+    assert first["jobs"]["data"] == content["jobs"]
+    assert first["account"]["data"]["email"] == "owner@example.org"
+    assert all(section["error"] is None for section in first.values())
+
+    known = [section["version"] for section in first.values()]
+    again = client.get("/dashboard", params={"known": known}).json()
+    assert again == {name: {**section, "data": None} for name, section in first.items()}
+
+
+def test_only_changed_sections_are_sent_again(client, content):
+    first = client.get("/dashboard").json()
+    known = [section["version"] for section in first.values()]
+
+    content["jobs"] = {"jobs": [{"name": "job-0", "status": "job_run_finished"}]}
+    changed = client.get("/dashboard", params={"known": known}).json()
+    assert changed["jobs"]["version"] != first["jobs"]["version"]
+    assert changed["jobs"]["data"] == content["jobs"]
+    assert [name for name, section in changed.items() if section["data"]] == ["jobs"]
+
+
+def test_failed_section_leaves_the_others(client, content):
+    content["activity"] = HTTPException(status_code=500, detail="index unreadable")
+    content["datasets"] = RuntimeError("store gone")
+
+    result = client.get("/dashboard").json()
+    assert result["activity"] == {
+        "version": None,
+        "data": None,
+        "error": "index unreadable",
+    }
+    assert result["datasets"]["error"] == "store gone"
+    assert result["jobs"]["data"] == content["jobs"]
+    assert result["trustedDatasites"]["error"] is None
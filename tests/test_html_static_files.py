@@ -0,0 +1,101 @@
+import gzip
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.lib.html_static_files import (
+    IMMUTABLE_CACHE_CONTROL,
+    REVALIDATE_CACHE_CONTROL,
+    HTMLStaticFiles,
+)
+
+PAGE = "<html><body>" + "<p>dataset</p>" * 200 + "</body></html>"
+SCRIPT = "console.log('chunk');\n" * 100
+
+
+@pytest.fixture
+def out(tmp_path):
+    out = tmp_path / "out"
+    (out / "_next" / "static").mkdir(parents=True)
+    (out / "datasets").mkdir()
+    (out / "index.html").write_text(PAGE)
+    (out / "jobs.html").write_text(PAGE.replace("dataset", "job"))
+    (out / "datasets" / "index.html").write_text(PAGE)
+    (out / "_next" / "static" / "app.3f2a.js").write_text(SCRIPT)
+    # Told apart from one compressed on request by its content
+    (out / "_next" / "static" / "app.3f2a.js.gz").write_bytes(
+        gzip.compress(b"// precompressed\n" + SCRIPT.encode())
+    )
+    return out
+
+
+def client(out) -> TestClient:
+    app = FastAPI()
+    app.mount("/", HTMLStaticFiles(directory=out, html=True))
+    return TestClient(app)
+
+
+def test_routes_resolve_from_the_index(out, monkeypatch):
+    files = client(out)
+
+    def lookup_path(self, path):
+        raise AssertionError(f"{path} looked up on disk")
+
+    # Indexed when the app is created, the files aren't looked up again
+    monkeypatch.setattr(HTMLStaticFiles, "lookup_path", lookup_path)
+
+    assert files.get("/").text == PAGE
+    assert files.get("/jobs").text == PAGE.replace("dataset", "job")
+    assert files.get("/datasets/").text == PAGE
+    redirect = files.get("/datasets", follow_redirects=False)
+    assert redirect.status_code == 307
+    assert redirect.headers["location"].endswith("/datasets/")
+
+
+def test_hashed_assets_are_immutable_and_the_rest_revalidated(out):
+    files = client(out)
+    assert files.get("/_next/static/app.3f2a.js").headers["cache-control"] == (
+        IMMUTABLE_CACHE_CONTROL
+    )
+    page = files.get("/jobs")
+    assert page.headers["cache-control"] == REVALIDATE_CACHE_CONTROL
+
+    revalidated = files.get("/jobs", headers={"if-none-match": page.headers["etag"]})
+    assert revalidated.status_code == 304
+
+
+def test_precompressed_sibling_is_served(out):
+    response = client(out).get(
+        "/_next/static/app.3f2a.js", headers={"accept-encoding": "gzip"}
+    )
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.text == "// precompressed\n" + SCRIPT
+
+
+def test_stale_sibling_is_ignored_and_gzip_made_on_request(out):
+    script = out / "_next" / "static" / "app.3f2a.js"
+    stat = script.stat()
+    os.utime(script.with_name("app.3f2a.js.gz"), (0, stat.st_mtime - 60))
+    files = client(out)
+
+    response = files.get(
+        "/_next/static/app.3f2a.js", headers={"accept-encoding": "gzip"}
+    )
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == SCRIPT
+    assert response.headers["etag"].endswith('-gzip"')
+    revalidated = files.get(
+        "/_next/static/app.3f2a.js",
+        headers={"if-none-match": response.headers["etag"]},
+    )
+    assert revalidated.status_code == 304
+
+    identity = files.get("/", headers={"accept-encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    ranged = files.get("/", headers={"accept-encoding": "gzip", "range": "bytes=0-5"})
+    assert ranged.status_code == 206
+    assert "content-encoding" not in ranged.headers
+    assert ranged.content == PAGE[:6].encode()
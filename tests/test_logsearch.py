@@ -0,0 +1,125 @@
+import uuid
+
+import pytest
+
+from backend import logsearch
+from backend.logsearch import BLOCK_LINES, LogIndex
+
+JOB = str(uuid.UUID("8c4e1a52-3f0b-4d7e-9c61-2a5b7d9e0f13"))
+
+
+@pytest.fixture
+def outputs_dir(tmp_path):
+    return tmp_path / "outputs"
+
+
+@pytest.fixture
+def index(tmp_path, outputs_dir):
+    index = LogIndex(tmp_path / "logs.sqlite3", outputs_dir)
+    yield index
+    index.stop()
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """The offsets log files are read from."""
+    offsets = []
+    read_lines = logsearch._read_lines
+
+    def recorded(file):
+        offsets.append(file.tell())
+        return read_lines(file)
+
+    monkeypatch.setattr(logsearch, "_read_lines", recorded)
+    return offsets
+
+
+def log(outputs_dir, stream="stdout"):
+    path = outputs_dir / uuid.UUID(JOB).hex / "logs" / f"{stream}.log"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def lines(start: int, stop: int) -> str:
+    return "".join(f"step {i:04d} done\n" for i in range(start, stop))
+
+
+def found(index, query: str, **kwargs) -> list[tuple[str, int, str]]:
+    return [
+        (match["stream"], match["line"], match["text"])
+        for match in index.search(query, **kwargs)
+    ]
+
+
+def test_appended_lines_are_read_from_the_last_full_block(index, outputs_dir, reads):
+    path = log(outputs_dir)
+    path.write_text(lines(0, 100))
+    index.refresh()
+    assert found(index, "step 0042") == [("stdout", 43, "step 0042 done")]
+    assert reads == [0]
+
+    with path.open("a") as f:
+        f.write(lines(100, 150) + "finished ")
+    index.refresh()
+    # Only the last, incomplete block is read again
+    assert reads[1] == len(lines(0, BLOCK_LINES))
+    assert found(index, "step 0042") == [("stdout", 43, "step 0042 done")]
+    assert found(index, "step 0120") == [("stdout", 121, "step 0120 done")]
+
+    # A line is found whole once its end is written
+    with path.open("a") as f:
+        f.write("without errors\n")
+    index.refresh()
+    assert found(index, "finished without") == [
+        ("stdout", 151, "finished without errors")
+    ]
+
+
+def test_rewritten_log_is_read_again(index, outputs_dir, reads):
+    path = log(outputs_dir)
+    path.write_text(lines(0, 100))
+    index.refresh()
+
+    path.write_text("run again\n" + lines(1000, 1150))
+    index.refresh()
+    assert reads == [0, 0]
+    assert found(index, "step 0042") == []
+    assert found(index, "step 1042") == [("stdout", 44, "step 1042 done")]
+    assert found(index, "run again") == [("stdout", 1, "run again")]
+
+
+def test_unchanged_log_is_not_read_again(index, outputs_dir, reads):
+    log(outputs_dir).write_text(lines(0, 10))
+    index.refresh()
+    index.refresh()
+    assert reads == [0]
+
+
+def test_removed_log_is_dropped(index, outputs_dir):
+    log(outputs_dir, "stderr").write_text("Traceback: boom\n")
+    log(outputs_dir).write_text("all good\n")
+    index.refresh()
+    assert found(index, "boom") == [("stderr", 1, "Traceback: boom")]
+    assert found(index, "boom", stream="stdout") == []
+
+    log(outputs_dir, "stderr").unlink()
+    index.refresh()
+    assert found(index, "boom") == []
+    assert found(index, "good") == [("stdout", 1, "all good")]
+
+
+def test_matches_come_with_context_across_blocks(index, outputs_dir):
+    log(outputs_dir).write_text(lines(0, 2 * BLOCK_LINES))
+    index.refresh()
+
+    [match] = index.search(f"step {BLOCK_LINES:04d}", context=2)
+    assert match["before"] == [
+        f"step {BLOCK_LINES - 2:04d} done",
+        f"step {BLOCK_LINES - 1:04d} done",
+    ]
+    assert match["after"] == [
+        f"step {BLOCK_LINES + 1:04d} done",
+        f"step {BLOCK_LINES + 2:04d} done",
+    ]
+    with pytest.raises(ValueError):
+        index.search("ab")
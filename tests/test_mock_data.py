@@ -0,0 +1,42 @@
+import math
+
+import numpy as np
+import pytest
+
+from backend.lib.mock_data import fit_column, sample_column
+
+
+def test_non_finite_numbers_count_as_nulls():
+    values = [str(i) for i in range(100)] + ["nan", "inf", "-inf", "NaN", ""]
+    model = fit_column("amount", values)
+
+    assert model.kind == "float"
+    assert model.null_rate == pytest.approx(5 / len(values))
+    assert all(math.isfinite(q) for q in model.values)
+    assert (model.values[0], model.values[-1]) == (0, 99)
+
+
+def test_only_non_finite_numbers_is_a_null_column():
+    model = fit_column("amount", ["nan", "inf", ""])
+
+    assert model.kind == "null"
+    assert model.null_rate == 1.0
+
+
+def test_float_decimals_ignore_non_finite_cells():
+    values = [f"{i / 100:.2f}" for i in range(200)] + ["nan"] * 10
+    model = fit_column("ratio", values)
+
+    assert model.kind == "float"
+    assert model.decimals == 2
+
+
+def test_datetime_separator_is_the_most_common_one():
+    values = [f"2024-01-{day:02d} 10:00:00" for day in range(1, 29)]
+    values += ["2024-02-01T10:00:00", "2024-02-02"]
+    model = fit_column("created", values)
+
+    assert model.kind == "datetime"
+    assert model.separator == " "
+    cells = sample_column(model, 20, np.random.default_rng(0))
+    assert all(cell == "" or cell[10] == " " for cell in cells)
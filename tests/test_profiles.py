@@ -0,0 +1,110 @@
+import threading
+
+import pytest
+
+from backend import profiles
+from backend.lib.column_profile import HyperLogLog, profile_file
+
+
+def test_distinct_counts_are_exact_then_estimated():
+    small = HyperLogLog()
+    small.add(f"user-{i % 300}" for i in range(10_000))
+    assert (small.estimate(), small.exact is not None) == (300, True)
+
+    large = HyperLogLog()
+    for start in range(0, 200_000, 10_000):
+        large.add(f"user-{i}" for i in range(start, start + 10_000))
+    assert large.exact is None
+    assert large.estimate() == pytest.approx(200_000, rel=0.03)
+
+
+def test_hashed_numbers_count_like_strings():
+    np = pytest.importorskip("numpy")
+    from backend.lib.column_profile import _hash_numbers
+
+    hll = HyperLogLog()
+    values = np.arange(50_000, dtype=np.int64)
+    hll.add_hashes(_hash_numbers(values))
+    hll.add_hashes(_hash_numbers(values[:1000]))
+    assert hll.estimate() == pytest.approx(50_000, rel=0.03)
+
+
+def test_csv_columns_are_profiled_in_one_pass(tmp_path, monkeypatch):
+    monkeypatch.setattr("backend.lib.column_profile.TEXT_CHUNK_ROWS", 7)
+    rows = ["id,score,joined,city"]
+    rows += [f"{i},{i / 2},2024-01-{i % 28 + 1:02d},c{i % 5}" for i in range(40)]
+    rows += ["40,,,", "41,n/a,2024-02-01,c1,extra"]
+    path = tmp_path / "people.csv"
+    path.write_text("\n".join(rows) + "\n")
+
+    profile = profile_file(path)
+    assert profile["rows"] == 42
+    columns = {column["name"]: column for column in profile["columns"]}
+    assert columns["id"]["type"] == "integer"
+    assert (columns["id"]["min"], columns["id"]["max"]) == (0, 41)
+    assert columns["id"]["distinct"] == 42
+    # One value that isn't a number makes it text
+    assert columns["score"]["type"] == "string"
+    assert columns["score"]["null_count"] == 1
+    assert columns["joined"]["type"] == "datetime"
+    assert columns["city"]["distinct"] == 5
+    # A ragged row adds a column that's null everywhere before
+    assert columns["column_5"]["null_count"] == 41
+    assert all(column["distinct_exact"] for column in profile["columns"])
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiles, "_entries", {})
+    data_dir = tmp_path / "private"
+    data_dir.mkdir()
+    (data_dir / "a.csv").write_text("id,v\n1,a\n2,b\n")
+    (data_dir / "notes.txt").write_text("not a table\n")
+    return data_dir
+
+
+def settled(dataset_uid, data_dir) -> dict:
+    profiles._queue.join()
+    return profiles.get_profile(dataset_uid, data_dir)
+
+
+def test_changed_data_serves_the_stale_profile_while_recomputing(data_dir, monkeypatch):
+    first = profiles.get_profile("d1", data_dir)
+    assert (first["status"], first["profile"]) == ("computing", None)
+
+    ready = settled("d1", data_dir)
+    assert (ready["status"], ready["stale"]) == ("ready", False)
+    assert ready["profile"]["skipped"] == ["notes.txt"]
+    assert ready["profile"]["files"][0]["rows"] == 2
+    assert profiles.get_profile("d1", data_dir) == ready
+
+    release = threading.Event()
+    profile_dataset = profiles.profile_dataset
+
+    def held(data_dir):
+        release.wait(5)
+        return profile_dataset(data_dir)
+
+    monkeypatch.setattr(profiles, "profile_dataset", held)
+    with open(data_dir / "a.csv", "a") as f:
+        f.write("3,c\n")
+    changed = profiles.get_profile("d1", data_dir)
+    assert (changed["status"], changed["stale"]) == ("computing", True)
+    assert changed["version"] != ready["version"]
+    assert changed["profile"] == ready["profile"]
+    assert profiles.get_profile("d1", data_dir) == changed
+
+    release.set()
+    recomputed = settled("d1", data_dir)
+    assert (recomputed["status"], recomputed["stale"]) == ("ready", False)
+    assert recomputed["version"] == changed["version"]
+    assert recomputed["profile"]["files"][0]["rows"] == 3
+
+
+def test_untouched_data_keeps_its_profile(data_dir):
+    profiles.get_profile("d2", data_dir)
+    computed_at = settled("d2", data_dir)["profile"]["computed_at"]
+
+    # E.g. a dataset update that didn't touch the files
+    profiles.schedule_profile("d2", data_dir)
+    assert settled("d2", data_dir)["profile"]["computed_at"] == computed_at
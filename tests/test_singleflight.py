@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from backend.singleflight import _flights, single_flight
+
+
+class Service:
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    @single_flight("test_items")
+    async def items(self, kind: str, limit: int = 10) -> list[str]:
+        self.calls += 1
+        await self.release.wait()
+        if kind == "broken":
+            raise ValueError(f"no {kind} items")
+        return [kind] * limit
+
+
+async def started(*calls) -> list[asyncio.Task]:
+    tasks = [asyncio.ensure_future(call) for call in calls]
+    # Let every call reach the shared flight
+    await asyncio.sleep(0)
+    return tasks
+
+
+def test_identical_calls_share_one_call():
+    async def main():
+        service = Service()
+        tasks = await started(*(service.items("jobs", limit=2) for _ in range(3)))
+        service.release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert service.calls == 1
+        assert results == [["jobs", "jobs"]] * 3
+        assert results[0] is results[1] is results[2]
+        assert not _flights
+
+    asyncio.run(main())
+
+
+def test_calls_with_other_arguments_run_separately():
+    async def main():
+        service = Service()
+        tasks = await started(
+            service.items("jobs"), service.items("jobs", limit=1), service.items("x")
+        )
+        service.release.set()
+        await asyncio.gather(*tasks)
+
+        assert service.calls == 3
+
+    asyncio.run(main())
+
+
+def test_every_caller_gets_the_error():
+    async def main():
+        service = Service()
+        tasks = await started(*(service.items("broken") for _ in range(3)))
+        service.release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert service.calls == 1
+        assert all(isinstance(result, ValueError) for result in results)
+        # Landed, so the next call runs again
+        with pytest.raises(ValueError):
+            await service.items("broken")
+        assert service.calls == 2
+
+    asyncio.run(main())
+
+
+def test_a_caller_going_away_leaves_the_call_running():
+    async def main():
+        service = Service()
+        leaving, staying = await started(service.items("jobs"), service.items("jobs"))
+        leaving.cancel()
+        await asyncio.sleep(0)
+        service.release.set()
+
+        assert await staying == ["jobs"] * 10
+        assert leaving.cancelled()
+        assert service.calls == 1
+
+    asyncio.run(main())
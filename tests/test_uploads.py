@@ -0,0 +1,188 @@
+import hashlib
+import os
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from backend import uploads
+from backend.lib.handover import handover_file
+
+CHUNK_SIZE = 4
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    monkeypatch.setattr(uploads, "CHUNK_SIZE", CHUNK_SIZE)
+    (tmp_path / "sessions").mkdir()
+    (tmp_path / "blobs").mkdir()
+    return tmp_path
+
+
+def chunks(data: bytes) -> list[bytes]:
+    return [data[i : i + CHUNK_SIZE] for i in range(0, len(data), CHUNK_SIZE)]
+
+
+def open_session(root, data: bytes, path: str = "data.csv") -> str:
+    digests = [hashlib.sha256(chunk).digest() for chunk in chunks(data)]
+    file = {
+        "path": path,
+        "role": "private",
+        "size": len(data),
+        "sha256": uploads.content_hash(digests),
+    }
+    return uploads.create_session(root, [file])["id"]
+
+
+def send(root, upload_id: str, data: bytes, index: int, offset: int) -> int:
+    chunk = data[offset : offset + CHUNK_SIZE]
+    sha256 = hashlib.sha256(chunk).hexdigest()
+    return uploads.write_chunk(root, upload_id, index, offset, chunk, sha256)
+
+
+def upload(root, data: bytes) -> str:
+    upload_id = open_session(root, data)
+    for offset in range(0, len(data), CHUNK_SIZE):
+        send(root, upload_id, data, 0, offset)
+    return upload_id
+
+
+def test_upload_resumes_from_the_last_stored_chunk(root):
+    data = b"id,name\n1,a\n2,b\n"
+    upload_id = open_session(root, data)
+    assert send(root, upload_id, data, 0, 0) == 4
+    assert send(root, upload_id, data, 0, 4) == 8
+
+    # A retried chunk is accepted again, one past the next is refused
+    assert send(root, upload_id, data, 0, 4) == 8
+    with pytest.raises(HTTPException) as e:
+        send(root, upload_id, data, 0, 12)
+    assert e.value.status_code == 409
+    assert e.value.detail["offset"] == 8
+
+    # Interrupted midway through a chunk: the partial write doesn't count
+    with open(root / "sessions" / upload_id / "0.part", "ab") as part:
+        part.write(b"2,")
+    status = uploads.session_status(root, upload_id)
+    assert status["files"][0]["offset"] == 8
+    assert not status["complete"]
+
+    for offset in range(8, len(data), CHUNK_SIZE):
+        send(root, upload_id, data, 0, offset)
+    assert uploads.session_status(root, upload_id)["complete"]
+    [(role, path, blob)] = uploads.finalize_session(root, upload_id)
+    assert (role, path) == ("private", "data.csv")
+    assert blob.read_bytes() == data
+
+
+def test_chunk_differing_from_the_stored_one_is_refused(root):
+    data = b"abcdefgh"
+    upload_id = open_session(root, data)
+    send(root, upload_id, data, 0, 0)
+    with pytest.raises(HTTPException) as e:
+        uploads.write_chunk(
+            root, upload_id, 0, 0, b"abcX", hashlib.sha256(b"abcX").hexdigest()
+        )
+    assert e.value.status_code == 409
+
+
+def test_content_already_stored_needs_no_chunks(root):
+    data = b"same content"
+    uploads.finalize_session(root, upload(root, data))
+
+    upload_id = open_session(root, data, path="copy.csv")
+    status = uploads.session_status(root, upload_id)
+    assert status["files"][0]["present"]
+    assert status["complete"]
+    [(_, _, blob)] = uploads.finalize_session(root, upload_id)
+    assert blob.read_bytes() == data
+
+
+def test_finalize_while_finalizing_is_a_conflict(root, monkeypatch):
+    data = b"0123456789"
+    upload_id = upload(root, data)
+
+    finalizing, proceed = threading.Event(), threading.Event()
+    finalize = uploads._finalize
+
+    def slow_finalize(*args):
+        finalizing.set()
+        proceed.wait(5)
+        return finalize(*args)
+
+    monkeypatch.setattr(uploads, "_finalize", slow_finalize)
+    results = []
+    first = threading.Thread(
+        target=lambda: results.append(uploads.finalize_session(root, upload_id))
+    )
+    first.start()
+    assert finalizing.wait(5)
+    with pytest.raises(HTTPException) as e:
+        uploads.finalize_session(root, upload_id)
+    assert e.value.status_code == 409
+    proceed.set()
+    first.join()
+
+    [[(_, _, blob)]] = results
+    assert blob.read_bytes() == data
+    with pytest.raises(HTTPException) as e:
+        uploads.finalize_session(root, upload_id)
+    assert e.value.status_code in (404, 409)
+
+
+def test_concurrent_finalizes_finish_once(root):
+    for i in range(20):
+        data = f"row {i}\n".encode() * 3
+        upload_id = upload(root, data)
+        start = threading.Barrier(2)
+        outcomes = []
+
+        def finalize():
+            start.wait()
+            try:
+                outcomes.append(uploads.finalize_session(root, upload_id))
+            except HTTPException as e:
+                outcomes.append(e.status_code)
+
+        threads = [threading.Thread(target=finalize) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        [files] = [outcome for outcome in outcomes if isinstance(outcome, list)]
+        assert [o for o in outcomes if o is not files] in ([404], [409])
+        assert files[0][2].read_bytes() == data
+
+
+def test_ended_sessions_leave_no_locks(root):
+    finalized = upload(root, b"abcdefgh")
+    uploads.finalize_session(root, finalized)
+    deleted = open_session(root, b"ijklmnop")
+    send(root, deleted, b"ijklmnop", 0, 0)
+    uploads.delete_session(root, deleted)
+
+    assert not [key for key in uploads._locks if key[0] in (finalized, deleted)]
+
+
+def test_unused_blobs_are_evicted_by_their_last_use(root):
+    old = time.time() - uploads.UNUSED_BLOB_TTL - 60
+    [(_, _, reused)] = uploads.finalize_session(root, upload(root, b"reused\n"))
+    [(_, _, unused)] = uploads.finalize_session(root, upload(root, b"unused\n"))
+    for blob in (reused, unused):
+        os.utime(blob, (old, old))
+    os.utime(uploads._used_path(unused), (old, old))
+    dataset_file = root / "dataset" / "data.csv"
+    handover_file(reused, dataset_file, keep_source=True)
+    mtime = dataset_file.stat().st_mtime
+
+    # Sent again: found in the store, without touching it
+    upload_id = open_session(root, b"reused\n")
+    assert uploads.session_status(root, upload_id)["files"][0]["present"]
+    assert reused.stat().st_mtime == old
+    assert not unused.exists() and not uploads._used_path(unused).exists()
+    # The dataset's copy is its own
+    assert dataset_file.stat().st_ino != reused.stat().st_ino
+    assert dataset_file.stat().st_mtime == mtime
+    assert dataset_file.read_bytes() == b"reused\n"
@@ -0,0 +1,187 @@
+import shutil
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from backend import versions
+
+DATASET = "0d1f7d3c-2b8e-4f4e-9a51-7c3a2f9d1e10"
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / "versions"
+    for sub in ("datasets", "chunks", "checkouts"):
+        (root / sub).mkdir(parents=True)
+    return root
+
+
+@pytest.fixture
+def private_dir(tmp_path):
+    private_dir = tmp_path / "private"
+    private_dir.mkdir()
+    write(private_dir, {"a.csv": "id,v\n1,a\n", "b.csv": "id,w\n1,b\n"})
+    return private_dir
+
+
+def write(directory, files: dict[str, str]) -> None:
+    for path, text in files.items():
+        (directory / path).parent.mkdir(parents=True, exist_ok=True)
+        (directory / path).write_text(text)
+
+
+def read(directory) -> dict[str, str]:
+    return {
+        p.relative_to(directory).as_posix(): p.read_text()
+        for p in directory.rglob("*")
+        if p.is_file()
+    }
+
+
+def replace_with(private_dir):
+    def update(new_dir):
+        shutil.copytree(new_dir, private_dir, dirs_exist_ok=True)
+        return private_dir
+
+    return update
+
+
+def commit(root, private_dir, tmp_path, files: dict[str, str], dataset=DATASET):
+    new_dir = tmp_path / f"new-{dataset}"
+    shutil.rmtree(new_dir, ignore_errors=True)
+    new_dir.mkdir()
+    write(new_dir, files)
+    update = replace_with(private_dir)
+    return versions.commit_version(
+        root, dataset, private_dir, new_dir, lambda: update(new_dir), "shopify_sync"
+    )
+
+
+def stored_chunks(root) -> set[str]:
+    return {chunk.name for chunk in (root / "chunks").glob("*/*")}
+
+
+def test_commit_and_restore_round_trip(root, private_dir, tmp_path):
+    v1 = read(private_dir)
+    v2 = {"a.csv": "id,v\n1,a\n2,c\n", "b.csv": v1["b.csv"]}
+    assert commit(root, private_dir, tmp_path, v2)["version"] == 2
+    v3 = {"a.csv": v2["a.csv"], "c/d.csv": "id\n9\n"}
+    assert commit(root, private_dir, tmp_path, v3)["version"] == 3
+    assert read(private_dir) == v3
+    # Nothing changed, no version
+    assert commit(root, private_dir, tmp_path, v3) is None
+
+    listed = versions.list_versions(root, DATASET, private_dir)
+    assert [v["version"] for v in listed] == [3, 2, 1]
+    assert [v["source"] for v in listed] == ["shopify_sync", "shopify_sync", "baseline"]
+    assert all(v["restorable"] for v in listed)
+    assert [v["latest"] for v in listed] == [True, False, False]
+
+    assert read(versions.checkout(root, DATASET, 1, private_dir)) == v1
+    assert read(versions.checkout(root, DATASET, 2, private_dir)) == v2
+    assert versions.checkout(root, DATASET, 3, private_dir) == private_dir
+
+    work_dir = tmp_path / "work"
+    work_dir.mkdir()
+    restored = versions.restore_version(
+        root, DATASET, 1, private_dir, work_dir, replace_with(private_dir)
+    )
+    assert (restored["version"], restored["source"]) == (4, "restore")
+    assert restored["restored_from"] == 1
+    assert read(private_dir) == v1
+    assert read(versions.checkout(root, DATASET, 3, private_dir)) == v3
+
+
+def test_restoring_the_latest_or_a_missing_version_fails(root, private_dir, tmp_path):
+    commit(root, private_dir, tmp_path, {"a.csv": "changed\n"})
+    for version, status in ((2, 400), (7, 404)):
+        with pytest.raises(HTTPException) as e:
+            versions.restore_version(
+                root, DATASET, version, private_dir, tmp_path, replace_with(private_dir)
+            )
+        assert e.value.status_code == status
+
+
+def test_external_changes_become_a_version(root, private_dir):
+    versions.list_versions(root, DATASET, private_dir)
+    write(private_dir, {"b.csv": "edited by hand\n"})
+
+    [latest, baseline] = versions.list_versions(root, DATASET, private_dir)
+    assert (latest["version"], latest["source"]) == (2, "external")
+    assert baseline["source"] == "baseline"
+
+
+def test_dropped_versions_chunks_are_collected(
+    root, private_dir, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(versions, "MAX_VERSIONS", 2)
+    for i in range(2, 6):
+        commit(root, private_dir, tmp_path, {"a.csv": f"version {i}\n"})
+
+    listed = versions.list_versions(root, DATASET, private_dir)
+    assert [v["version"] for v in listed] == [5, 4]
+    referenced = {
+        sha256
+        for manifest in versions._manifests(root, DATASET)
+        for entry in manifest["files"].values()
+        for sha256, _ in entry["chunks"]
+    }
+    assert stored_chunks(root) and stored_chunks(root) <= referenced
+    assert read(versions.checkout(root, DATASET, 4, private_dir)) == {
+        "a.csv": "version 4\n"
+    }
+
+    versions.drop_history(root, DATASET)
+    assert stored_chunks(root) == set()
+
+
+def test_collection_waits_for_a_commit_in_progress(root, tmp_path):
+    other = "5b0c8a9e-6f1d-4c2a-8e3b-1d2f3a4b5c6d"
+    other_dir = tmp_path / "other"
+    other_dir.mkdir()
+    write(other_dir, {"x.csv": "kept only in history\n"})
+    versions.list_versions(root, other, other_dir)
+
+    collector = threading.Thread(target=versions._collect_chunks, args=(root,))
+    new_dir = tmp_path / "new"
+    new_dir.mkdir()
+    write(new_dir, {"x.csv": "new content\n"})
+
+    def update():
+        # The old chunk is stored, but no manifest refers to it yet
+        collector.start()
+        collector.join(0.2)
+        assert collector.is_alive()
+        return replace_with(other_dir)(new_dir)
+
+    versions.commit_version(root, other, other_dir, new_dir, update, "shopify_sync")
+    collector.join(5)
+    assert not collector.is_alive()
+    assert read(versions.checkout(root, other, 1, other_dir)) == {
+        "x.csv": "kept only in history\n"
+    }
+
+
+def test_concurrent_writes_of_a_file_dont_collide(tmp_path):
+    path = tmp_path / "pins.json"
+    start = threading.Barrier(8)
+    errors = []
+
+    def write(i: int) -> None:
+        start.wait()
+        try:
+            for _ in range(50):
+                versions._write_atomic(path, b"%d" % i * 1000)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert len(set(path.read_bytes())) == 1
+    assert [p.name for p in tmp_path.iterdir()] == ["pins.json"]
@@ -0,0 +1,41 @@
+import io
+import os
+import zipfile
+
+from backend.lib.zipstream import CHUNK_SIZE, iter_zip
+
+
+def test_streamed_archive_holds_every_file(tmp_path):
+    files = {
+        "stdout.log": b"step 1 done\n" * 1000,
+        "output/empty.csv": b"",
+        "output/model/weights.bin": os.urandom(3 * CHUNK_SIZE + 17),
+    }
+    for name, data in files.items():
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_bytes(data)
+
+    paths = sorted(p for p in tmp_path.rglob("*") if p.is_file())
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(iter_zip(tmp_path, paths))))
+    assert archive.testzip() is None
+    assert {name: archive.read(name) for name in archive.namelist()} == files
+
+
+def test_bytes_are_sent_as_they_are_produced(tmp_path):
+    for name in ("a.bin", "b.bin"):
+        (tmp_path / name).write_bytes(os.urandom(4 * CHUNK_SIZE))
+    read = []
+
+    def paths():
+        for name in ("a.bin", "b.bin"):
+            read.append(name)
+            yield tmp_path / name
+
+    chunks = iter_zip(tmp_path, paths())
+    first = next(chunks)
+    # Sent while the first file is still being read
+    assert read == ["a.bin"]
+    assert len(first) < CHUNK_SIZE * 2
+    rest = list(chunks)
+    assert read == ["a.bin", "b.bin"]
+    assert max(len(chunk) for chunk in rest) < CHUNK_SIZE * 2